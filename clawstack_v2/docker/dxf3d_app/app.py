@@ -779,7 +779,23 @@ def _dedup_segments(segments):
     return unique, len(segments) - len(unique)
 
 
-def _auto_gap_tol(segments, max_gap: float = 5.0):
+def _endpoint_tree(segments):
+    """
+    Build a KDTree over all segment endpoints.
+    Endpoint 2*i is the start of segments[i], 2*i+1 its end.
+    Returns (points_array, tree).
+    """
+    from scipy.spatial import KDTree
+    import numpy as np
+
+    arr = np.empty((2 * len(segments), 2), dtype=float)
+    for i, (s, e, _) in enumerate(segments):
+        arr[2 * i] = s[0], s[1]
+        arr[2 * i + 1] = e[0], e[1]
+    return arr, KDTree(arr)
+
+
+def _auto_gap_tol(segments, max_gap: float = 5.0, tree=None):
     """
     Analyse the distribution of endpoint-to-endpoint distances to estimate
     an appropriate gap_tol automatically.
@@ -787,7 +803,8 @@ def _auto_gap_tol(segments, max_gap: float = 5.0):
     Strategy:
     - Collect all segment endpoints.
     - For each endpoint, find the nearest endpoint belonging to a *different*
-      segment (using scipy KDTree).
+      segment (using scipy KDTree; pass the result of _endpoint_tree to
+      reuse an existing tree).
     - Filter distances in the range (TOL*10, max_gap).
     - Return the 90th-percentile of those distances × 1.5 so that nearly all
       real gaps are bridged, or GAP_TOL_DEFAULT if no informative gaps exist.
@@ -796,24 +813,13 @@ def _auto_gap_tol(segments, max_gap: float = 5.0):
     if not segments:
         return GAP_TOL_DEFAULT, []
 
-    from scipy.spatial import KDTree
     import numpy as np
 
-    # Build (point, segment_index) arrays
-    pts = []
-    seg_ids = []
-    for i, (s, e, _) in enumerate(segments):
-        pts.append(s)
-        pts.append(e)
-        seg_ids.append(i)
-        seg_ids.append(i)
-
-    if len(pts) < 4:
+    if len(segments) < 2:
         return GAP_TOL_DEFAULT, []
 
-    arr = np.array(pts, dtype=float)
-    seg_ids = np.array(seg_ids)
-    tree = KDTree(arr)
+    arr, tree = tree if tree is not None else _endpoint_tree(segments)
+    seg_ids = np.arange(len(arr)) // 2
 
     # For each point, find nearest 4 neighbours (first is itself)
     dists, idxs = tree.query(arr, k=min(4, len(arr)))
@@ -833,38 +839,56 @@ def _auto_gap_tol(segments, max_gap: float = 5.0):
     return auto, gap_dists
 
 
-def _chain_segments(segments, gap_tol: float = GAP_TOL_DEFAULT):
+def _chain_segments(segments, gap_tol: float = GAP_TOL_DEFAULT, tree=None):
     """
     Chain open (start, end, midpoints) segments into closed loops.
     Endpoints within gap_tol are considered connected (gap snap).
+
+    Neighbour candidates come from one batched KDTree radius query over all
+    endpoints; consumed segments are dropped through an alive mask, so each
+    step only looks at endpoints near the chain tip instead of scanning every
+    remaining segment.  The nearest live endpoint wins, ties going to the
+    lowest segment index and start-before-end, as in the original scan.
     """
-    remaining = list(range(len(segments)))
+    n = len(segments)
     result = []
+    if not n:
+        return result
     search_dist = max(gap_tol, TOL * 10)
 
-    def find_next(end):
-        best_i, best_rev, best_d = None, False, search_dist
-        for i in remaining:
-            s, e, _ = segments[i]
-            ds = _dist2d(end, s)
-            de = _dist2d(end, e)
-            if ds < best_d:
-                best_d, best_i, best_rev = ds, i, False
-            if de < best_d:
-                best_d, best_i, best_rev = de, i, True
-        return best_i, best_rev
-
-    while remaining:
-        start_idx = remaining.pop(0)
+    arr, tree = tree if tree is not None else _endpoint_tree(segments)
+    neighbours = tree.query_ball_point(arr, search_dist)
+    pts = arr.tolist()
+    alive = [True] * n
+
+    def find_next(tip):
+        x, y = pts[tip]
+        best_p, best_d = None, search_dist
+        for p in neighbours[tip]:
+            if not alive[p >> 1]:
+                continue
+            px, py = pts[p]
+            d = math.sqrt((x - px) ** 2 + (y - py) ** 2)
+            if d < best_d or (d == best_d and best_p is not None and p < best_p):
+                best_d, best_p = d, p
+        return best_p
+
+    for start_idx in range(n):
+        if not alive[start_idx]:
+            continue
+        alive[start_idx] = False
         s, e, mid = segments[start_idx]
         chain = [s] + mid + [e]
+        tip = 2 * start_idx + 1
         while True:
-            idx, rev = find_next(chain[-1])
-            if idx is None:
+            p = find_next(tip)
+            if p is None:
                 break
-            remaining.remove(idx)
+            idx, rev = p >> 1, bool(p & 1)
+            alive[idx] = False
             ss, se, sm = segments[idx]
             chain.extend((list(reversed(sm)) + [ss]) if rev else (sm + [se]))
+            tip = p ^ 1
         if _dist2d(chain[0], chain[-1]) < search_dist and len(chain) >= 3:
             result.append(chain[:-1])
     return result
@@ -1082,15 +1106,17 @@ def extract_loops(doc, layer: str, gap_tol: float = GAP_TOL_DEFAULT,
     _dedup_count = 0
     _auto_gap = None
     _gap_dists = []
+    _tree = None
     if segments and auto_clean:
         segments, _dedup_count = _dedup_segments(segments)
         if gap_tol == GAP_TOL_DEFAULT:  # only auto-compute when user didn't override
-            _auto_gap, _gap_dists = _auto_gap_tol(segments, max_gap=max_auto_gap)
+            _tree = _endpoint_tree(segments)
+            _auto_gap, _gap_dists = _auto_gap_tol(segments, max_gap=max_auto_gap, tree=_tree)
             gap_tol = _auto_gap
 
     # ── Chain open segments into closed loops ─────────────────────────────
     if segments:
-        loops.extend(_chain_segments(segments, gap_tol))
+        loops.extend(_chain_segments(segments, gap_tol, tree=_tree))
 
     # Attach diagnostics as attributes for UI display
     extract_loops._last_dedup_count = _dedup_count
@@ -3319,6 +3345,58 @@ TEST_SUITE = [
 ]
 
 
+def run_chain_benchmark(suite: list, scales=(1, 4, 16, 64)) -> list[dict]:
+    """
+    Time _chain_segments on the extended-suite shapes at increasing sizes.
+    Every DXF case is converted to loops once; the loops are split back into
+    LINE segments, each shape is placed in its own cell of a 1 m grid and
+    the whole set is tiled `scale` times (like an exploded progressive-die
+    strip), then shuffled with a fixed seed before chaining.
+    Returns one row per scale with segment count, wall time and µs/segment.
+    No API calls.
+    """
+    import random
+    import time
+
+    shapes = []
+    for item in suite:
+        if "gen_mesh" in item:
+            continue
+        try:
+            doc = ezdxf.read(io.StringIO(item["gen"]().decode("utf-8")))
+            loops = extract_loops(doc, "")
+        except Exception:
+            continue
+        if loops:
+            shapes.append(loops)
+    n_loops = sum(len(loops) for loops in shapes)
+
+    rows = []
+    for scale in scales:
+        n_cells = scale * len(shapes)
+        cols = max(1, int(math.ceil(math.sqrt(n_cells))))
+        segs = []
+        for k in range(n_cells):
+            dx, dy = 1000.0 * (k % cols), 1000.0 * (k // cols)
+            for loop in shapes[k % len(shapes)]:
+                for i, a in enumerate(loop):
+                    b = loop[(i + 1) % len(loop)]
+                    segs.append(((a[0] + dx, a[1] + dy), (b[0] + dx, b[1] + dy), []))
+        random.Random(scale).shuffle(segs)
+        t0 = time.perf_counter()
+        loops = _chain_segments(segs, GAP_TOL_DEFAULT)
+        elapsed = time.perf_counter() - t0
+        rows.append({
+            "scale": scale,
+            "segments": len(segs),
+            "loops": len(loops),
+            "expected_loops": n_loops * scale,
+            "sec": round(elapsed, 4),
+            "us_per_segment": round(elapsed / max(len(segs), 1) * 1e6, 2),
+        })
+    return rows
+
+
 def run_test_suite(suite: list) -> list[dict]:
     """Run all test cases through the DXF→mesh pipeline. Return scored results."""
     results = []
@@ -5065,6 +5143,19 @@ with st.expander("詳細テストスイート (100種+) — 面数・精度・Wa
                         except Exception as e:
                             st.error(f"3D描画エラー: {e}")
 
+# ── Segment chaining benchmark ───────────────────────────────────────────────
+st.divider()
+with st.expander("輪郭チェイン性能ベンチマーク — セグメント数スケーリング", expanded=False):
+    st.markdown(
+        "詳細テストスイートの全形状を LINE セグメントに分解し、1/4/16/64 倍にタイル配置して "
+        "`_chain_segments` の処理時間を計測します。µs/セグメントがほぼ一定なら線形スケーリングです。"
+    )
+    if st.button("ベンチマーク実行", key="run_chain_bench"):
+        import pandas as pd
+        with st.spinner("計測中..."):
+            bench_rows = run_chain_benchmark(build_extended_test_suite())
+        st.dataframe(pd.DataFrame(bench_rows), hide_index=True, use_container_width=True)
+
 # ── CSG 3D テスト (manifold3d + qwen3.5 AI検証) ──────────────────────────────
 st.divider()
 with st.expander("🔷 CSG 3D テスト — 真の3D形状 (立方体接合・穴あけ・複合)", expanded=False):
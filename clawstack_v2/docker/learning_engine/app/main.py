@@ -3,16 +3,20 @@ from __future__ import annotations
 import hashlib
 import json
 import os
+import re
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
+import numpy as np
 import requests
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qm
 
@@ -30,7 +34,14 @@ class Settings(BaseModel):
     embedding_base_url: str = os.getenv("EMBEDDING_BASE_URL", "").rstrip("/")
     embedding_model: str = os.getenv("EMBEDDING_MODEL", "bge-small-en-v1.5")
     embedding_size: int = int(os.getenv("EMBEDDING_SIZE", "256"))
+    embedding_batch_size: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    # 1: whitespace tokens only (points indexed before CJK bigrams); 2: CJK runs as bigrams.
+    fallback_embedding_version: int = int(os.getenv("FALLBACK_EMBEDDING_VERSION", "2"))
+    upsert_batch_size: int = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256"))
+    bulk_max_items: int = int(os.getenv("BULK_INGEST_MAX_ITEMS", "5000"))
     memory_top_k: int = int(os.getenv("MEMORY_TOP_K", "8"))
+    search_workers: int = int(os.getenv("MEMORY_SEARCH_WORKERS", "8"))
+    health_cache_sec: float = float(os.getenv("HEALTH_CACHE_SEC", "10"))
     include_cross_org_default: bool = os.getenv("INCLUDE_CROSS_ORG_DEFAULT", "false").lower() == "true"
 
 
@@ -181,6 +192,12 @@ class CaeRunIngestRequest(BaseModel):
     extra: dict[str, Any] = Field(default_factory=dict)
 
 
+class BulkIngestRequest(BaseModel):
+    # Items are validated one by one in bulk_ingest so a bad item is reported
+    # in its own result instead of rejecting the whole batch with a 422.
+    items: list[Any]
+
+
 class CompareCaseRequest(BaseModel):
     source_org: str = Field(default="unknown")
     include_cross_org: bool | None = None
@@ -252,52 +269,136 @@ class SearchMemoryRequest(BaseModel):
     top_k: int | None = None
 
 
+# Hiragana, katakana, CJK ideographs (incl. ext. A / compatibility) and halfwidth katakana.
+CJK_CHARS = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f"
+HASH_PIECE = re.compile(rf"[{CJK_CHARS}]+|[^\s{CJK_CHARS}]+")
+CJK_START = re.compile(rf"[{CJK_CHARS}]")
+WORD_SLOT_CACHE_MAX = 1 << 18
+
+
+def word_tokens(word: str) -> list[str]:
+    """Split one whitespace-delimited word; CJK runs become character bigrams."""
+    if word.isascii():
+        return [word]
+    tokens: list[str] = []
+    for piece in HASH_PIECE.findall(word):
+        if len(piece) < 2 or not CJK_START.match(piece):
+            tokens.append(piece)
+        else:
+            tokens.extend([piece[i : i + 2] for i in range(len(piece) - 1)])
+    return tokens
+
+
+def hash_tokens(text: str) -> list[str]:
+    """Whitespace tokens, with CJK runs split out and replaced by character bigrams.
+
+    Japanese has no spaces, so text.lower().split() turns a whole sentence
+    into one token. Tokens without CJK characters are kept as-is so Latin
+    text hashes exactly as before.
+    """
+    return [token for word in text.lower().split() for token in word_tokens(word)]
+
+
 class SimpleEmbedding:
-    def __init__(self, size: int) -> None:
+    def __init__(self, size: int, fallback_version: int = 2) -> None:
         self.size = size
+        self.fallback_version = fallback_version
+        # Stamped into point payloads as embedding_source; points whose source
+        # differs from the running one need re-embedding to be comparable.
+        self.fallback_source = f"fallback-v{fallback_version}"
+        self.session = requests.Session()
+        # word -> signed slots (idx + 1, negated for sign -1) of its tokens;
+        # bounded, cleared when full. Mail bodies repeat heavily (quotes,
+        # signatures), so most words are hits and skip both tokenizing and sha256.
+        self.word_slots: dict[str, list[int]] = {}
+
+    def _word_slots(self, word: str) -> list[int]:
+        slots = []
+        for token in (word_tokens(word) if self.fallback_version >= 2 else [word]):
+            digest = hashlib.sha256(token.encode("utf-8")).digest()
+            slot = int.from_bytes(digest[:4], "big") % self.size + 1
+            slots.append(slot if digest[4] % 2 == 0 else -slot)
+        if len(self.word_slots) >= WORD_SLOT_CACHE_MAX:
+            self.word_slots.clear()
+        self.word_slots[word] = slots
+        return slots
 
     def _fallback_embed(self, text: str) -> list[float]:
-        buckets = [0.0] * self.size
-        for token in text.lower().split():
-            digest = hashlib.sha256(token.encode("utf-8")).digest()
-            idx = int.from_bytes(digest[:4], "big") % self.size
-            sign = 1.0 if digest[4] % 2 == 0 else -1.0
-            buckets[idx] += sign
-        norm = sum(v * v for v in buckets) ** 0.5 or 1.0
-        return [v / norm for v in buckets]
+        return self._fallback_embed_many([text])[0]
+
+    def _fallback_embed_many(self, texts: list[str]) -> list[list[float]]:
+        """Signed feature hashing of hash_tokens(), one matrix for the whole batch."""
+        cache = self.word_slots
+        lookup = self._word_slots
+        slots: list[int] = []
+        offsets = [0]
+        for text in texts:
+            for word in text.lower().split():
+                slots.extend(cache.get(word) or lookup(word))
+            offsets.append(len(slots))
+        signed = np.asarray(slots, dtype=np.int64)
+        rows = np.repeat(np.arange(len(texts)), np.diff(offsets))
+        flat = rows * self.size + np.abs(signed) - 1
+        matrix = np.bincount(flat, weights=np.sign(signed).astype(float), minlength=len(texts) * self.size)
+        matrix = matrix.reshape(len(texts), self.size)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).tolist()
 
     def _normalize_vector_size(self, vector: list[float]) -> list[float]:
         if len(vector) == self.size:
             return vector
-        resized = [0.0] * self.size
         if not vector:
-            return resized
-        for idx, value in enumerate(vector):
-            resized[idx % self.size] += float(value)
-        norm = sum(v * v for v in resized) ** 0.5 or 1.0
-        return [v / norm for v in resized]
+            return [0.0] * self.size
+        values = np.asarray(vector, dtype=float)
+        resized = np.bincount(np.arange(len(values)) % self.size, weights=values, minlength=self.size)
+        norm = np.linalg.norm(resized) or 1.0
+        return (resized / norm).tolist()
+
+    def _remote_embed(self, texts: list[str], timeout: float) -> list[list[float]]:
+        resp = self.session.post(
+            f"{settings.embedding_base_url}/embeddings",
+            json={"input": texts, "model": settings.embedding_model},
+            timeout=timeout,
+        )
+        resp.raise_for_status()
+        data = sorted(resp.json()["data"], key=lambda item: item.get("index", 0))
+        if len(data) != len(texts):
+            raise ValueError(f"expected {len(texts)} embeddings, got {len(data)}")
+        return [self._normalize_vector_size(item["embedding"]) for item in data]
 
     def embed(self, text: str) -> list[float]:
-        if settings.embedding_base_url:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_many_tagged(texts)[0]
+
+    def embed_many_tagged(self, texts: list[str]) -> tuple[list[list[float]], list[str]]:
+        """Embed in batches of settings.embedding_batch_size; a failed batch falls back to feature hashing.
+
+        Also returns, per vector, the embedding source (remote model name or
+        fallback-v<N>) so stored points record which embedder produced them.
+        """
+        if not settings.embedding_base_url:
+            return self._fallback_embed_many(texts), [self.fallback_source] * len(texts)
+        vectors: list[list[float]] = []
+        sources: list[str] = []
+        batch_size = max(1, settings.embedding_batch_size)
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start : start + batch_size]
             try:
-                resp = requests.post(
-                    f"{settings.embedding_base_url}/embeddings",
-                    json={"input": [text], "model": settings.embedding_model},
-                    timeout=20,
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                vec = data["data"][0]["embedding"]
-                return self._normalize_vector_size(vec)
+                vectors.extend(self._remote_embed(batch, timeout=20 + 0.5 * len(batch)))
+                sources.extend([settings.embedding_model] * len(batch))
             except Exception:
-                pass
-        return self._fallback_embed(text)
+                vectors.extend(self._fallback_embed_many(batch))
+                sources.extend([self.fallback_source] * len(batch))
+        return vectors, sources
 
 
 class MemoryStore:
     def __init__(self) -> None:
         self.client = QdrantClient(url=settings.qdrant_url, check_compatibility=False)
-        self.embedder = SimpleEmbedding(settings.embedding_size)
+        self.embedder = SimpleEmbedding(settings.embedding_size, settings.fallback_embedding_version)
         self.collection_sizes = {
             "defect_case_memory": settings.embedding_size,
             "email_thread_memory": settings.embedding_size,
@@ -307,22 +408,55 @@ class MemoryStore:
             "cae_run_memory": settings.embedding_size,
             "judgement_memory": settings.embedding_size,
         }
+        # Collections known to exist, so upserts and searches skip the
+        # get_collection round trip. Entries are dropped by forget_collection()
+        # when Qdrant reports a collection missing (deleted behind our back).
+        self.known_collections: set[str] = set()
+        self.registry_lock = threading.Lock()
+        self.search_pool = ThreadPoolExecutor(max_workers=max(1, settings.search_workers), thread_name_prefix="memory-search")
+        self.health_lock = threading.Lock()
+        self.health_cache: tuple[float, dict[str, Any]] | None = None
 
     def ensure_collection(self, name: str) -> None:
+        with self.registry_lock:
+            if name in self.known_collections:
+                return
         size = self.collection_sizes.get(name, settings.embedding_size)
         try:
             self.client.get_collection(name)
-            return
         except Exception:
-            pass
+            try:
+                self.client.create_collection(
+                    collection_name=name,
+                    vectors_config=qm.VectorParams(size=size, distance=qm.Distance.COSINE),
+                )
+            except Exception as exc:
+                if "already exists" not in str(exc):
+                    raise
+        with self.registry_lock:
+            self.known_collections.add(name)
+
+    def forget_collection(self, name: str | None = None) -> None:
+        """Invalidate the registry entry for name (or every entry) and the health cache."""
+        with self.registry_lock:
+            if name is None:
+                self.known_collections.clear()
+            else:
+                self.known_collections.discard(name)
+        with self.health_lock:
+            self.health_cache = None
+
+    def with_collection(self, collection: str, call):
+        """Run call() against an ensured collection; recreate it once if it vanished."""
+        self.ensure_collection(collection)
         try:
-            self.client.create_collection(
-                collection_name=name,
-                vectors_config=qm.VectorParams(size=size, distance=qm.Distance.COSINE),
-            )
+            return call()
         except Exception as exc:
-            if "already exists" not in str(exc):
+            if not is_missing_collection(exc):
                 raise
+        self.forget_collection(collection)
+        self.ensure_collection(collection)
+        return call()
 
     def collection_snapshot(self) -> list[dict[str, Any]]:
         snapshots: list[dict[str, Any]] = []
@@ -407,41 +541,65 @@ class MemoryStore:
             ordered.append("tags: " + ", ".join(tags))
         return "\n".join(ordered)
 
-    def upsert_memory(self, collection: str, payload: dict[str, Any], point_id: str | None = None) -> dict[str, Any]:
-        self.ensure_collection(collection)
+    def prepare_point(self, collection: str, payload: dict[str, Any], point_id: str | None = None) -> tuple[str, str, dict[str, Any]]:
         external_id = point_id or str(uuid.uuid4())
-        point_id = qdrant_point_id(external_id)
         payload = dict(payload)
         payload["memory_type"] = collection.removesuffix("_memory")
         payload["created_at"] = payload.get("created_at") or utc_now_iso()
         payload["updated_at"] = utc_now_iso()
         payload["external_id"] = external_id
-        embedding_text = self.build_text(payload)
-        vector = self.embedder.embed(embedding_text)
-        last_error: Exception | None = None
+        return qdrant_point_id(external_id), external_id, payload
+
+    def _upsert_points(self, collection: str, points: list[qm.PointStruct], wait: bool = True) -> None:
         for attempt in range(3):
             try:
-                self.client.upsert(
-                    collection_name=collection,
-                    points=[
-                        qm.PointStruct(
-                            id=point_id,
-                            vector=vector,
-                            payload=payload,
-                        )
-                    ],
-                )
-                last_error = None
-                break
-            except Exception as exc:
-                last_error = exc
+                self.client.upsert(collection_name=collection, points=points, wait=wait)
+                return
+            except Exception:
                 if attempt == 2:
                     raise
                 time.sleep(0.5 * (attempt + 1))
-        if last_error is not None:
-            raise last_error
+
+    def upsert_memory(self, collection: str, payload: dict[str, Any], point_id: str | None = None) -> dict[str, Any]:
+        point_id, external_id, payload = self.prepare_point(collection, payload, point_id)
+        vectors, sources = self.embedder.embed_many_tagged([self.build_text(payload)])
+        payload["embedding_source"] = sources[0]
+        point = qm.PointStruct(id=point_id, vector=vectors[0], payload=payload)
+        self.with_collection(collection, lambda: self._upsert_points(collection, [point]))
         return {"id": point_id, "external_id": external_id, "collection": collection}
 
+    def upsert_memories(self, collection: str, items: list[tuple[dict[str, Any], str | None]]) -> list[dict[str, Any]]:
+        """Bulk upsert: batched embeddings, many points per Qdrant call.
+
+        Every chunk but the last is sent with wait=false so Qdrant applies it
+        while the next chunk is built; the last one waits, and since updates
+        to a collection are applied in order, its ack covers the whole set.
+        Returns one status entry per input item, in input order.
+        """
+        prepared = [self.prepare_point(collection, payload, point_id) for payload, point_id in items]
+        vectors, sources = self.embedder.embed_many_tagged([self.build_text(payload) for _id, _ext, payload in prepared])
+        for (_id, _ext, payload), source in zip(prepared, sources):
+            payload["embedding_source"] = source
+        results: list[dict[str, Any]] = [
+            {"index": index, "status": "ok", "record": {"id": point_id, "external_id": external_id, "collection": collection}}
+            for index, (point_id, external_id, _payload) in enumerate(prepared)
+        ]
+        chunk_size = max(1, settings.upsert_batch_size)
+        starts = list(range(0, len(prepared), chunk_size))
+        for n, start in enumerate(starts):
+            chunk = range(start, min(start + chunk_size, len(prepared)))
+            points = [
+                qm.PointStruct(id=prepared[i][0], vector=vectors[i], payload=prepared[i][2])
+                for i in chunk
+            ]
+            try:
+                wait = n == len(starts) - 1
+                self.with_collection(collection, lambda: self._upsert_points(collection, points, wait=wait))
+            except Exception as exc:
+                for i in chunk:
+                    results[i] = {"index": i, "status": "error", "error": str(exc), "external_id": prepared[i][1]}
+        return results
+
     def search(
         self,
         collection: str,
@@ -451,8 +609,10 @@ class MemoryStore:
         source_org: str | None,
         allowed_reuse_scope: list[str],
     ) -> list[dict[str, Any]]:
-        self.ensure_collection(collection)
         vector = self.embedder.embed(query_text)
+        return self.search_vector(collection, vector, top_k, self.build_filter(include_cross_org, source_org, allowed_reuse_scope))
+
+    def build_filter(self, include_cross_org: bool, source_org: str | None, allowed_reuse_scope: list[str]) -> qm.Filter | None:
         conditions: list[qm.FieldCondition] = [
             qm.FieldCondition(
                 key="review_status",
@@ -465,13 +625,18 @@ class MemoryStore:
         ]
         if not include_cross_org and source_org:
             conditions.append(qm.FieldCondition(key="source_org", match=qm.MatchValue(value=source_org)))
-        query_filter = qm.Filter(must=conditions) if conditions else None
-        hits = self.client.search(
-            collection_name=collection,
-            query_vector=vector,
-            limit=top_k,
-            with_payload=True,
-            query_filter=query_filter,
+        return qm.Filter(must=conditions) if conditions else None
+
+    def search_vector(self, collection: str, vector: list[float], top_k: int, query_filter: qm.Filter | None) -> list[dict[str, Any]]:
+        hits = self.with_collection(
+            collection,
+            lambda: self.client.search(
+                collection_name=collection,
+                query_vector=vector,
+                limit=top_k,
+                with_payload=True,
+                query_filter=query_filter,
+            ),
         )
         result = []
         for hit in hits:
@@ -485,6 +650,54 @@ class MemoryStore:
             )
         return result
 
+    def search_many(
+        self,
+        collections: list[str],
+        query_text: str,
+        top_k: int,
+        include_cross_org: bool,
+        source_org: str | None,
+        allowed_reuse_scope: list[str],
+    ) -> dict[str, list[dict[str, Any]] | Exception]:
+        """Embed query_text once and search every collection concurrently.
+
+        Returns hits (or the raised exception) per collection, in request order.
+        """
+        vector = self.embedder.embed(query_text)
+        query_filter = self.build_filter(include_cross_org, source_org, allowed_reuse_scope)
+        futures = {
+            collection: self.search_pool.submit(self.search_vector, collection, vector, top_k, query_filter)
+            for collection in dict.fromkeys(collections)
+        }
+        outcome: dict[str, list[dict[str, Any]] | Exception] = {}
+        for collection, future in futures.items():
+            try:
+                outcome[collection] = future.result()
+            except Exception as exc:
+                outcome[collection] = exc
+        return outcome
+
+    def health_snapshot(self) -> dict[str, Any]:
+        """Collection list and per-collection counts, cached for settings.health_cache_sec."""
+        with self.health_lock:
+            cached = self.health_cache
+            if cached is not None and time.monotonic() - cached[0] < settings.health_cache_sec:
+                return cached[1]
+            snapshot = {
+                "collections": [c.name for c in self.client.get_collections().collections],
+                "collection_details": self.collection_snapshot(),
+                "snapshot_at": utc_now_iso(),
+            }
+            self.health_cache = (time.monotonic(), snapshot)
+            return snapshot
+
+
+def is_missing_collection(exc: Exception) -> bool:
+    if getattr(exc, "status_code", None) == 404:
+        return True
+    text = str(exc).lower()
+    return "not found" in text and "collection" in text
+
 
 store = MemoryStore()
 app = FastAPI(title="OpenClaw Learning Engine", version="0.1.0")
@@ -509,13 +722,13 @@ def read_workspace_json(name: str) -> dict[str, Any]:
 @app.get("/health")
 def health() -> dict[str, Any]:
     try:
-        collections = store.client.get_collections().collections
-        snapshots = store.collection_snapshot()
+        snapshot = store.health_snapshot()
         return {
             "status": "ok",
             "qdrant": "ok",
-            "collections": [c.name for c in collections],
-            "collection_details": snapshots,
+            "collections": snapshot["collections"],
+            "collection_details": snapshot["collection_details"],
+            "snapshot_at": snapshot["snapshot_at"],
             "workspace_sync": {
                 "email_learning": read_workspace_json("email_learning_memory_sync_status.json"),
                 "cae_learning": read_workspace_json("cae_learning_memory_sync_status.json"),
@@ -524,6 +737,7 @@ def health() -> dict[str, Any]:
             "settings": {
                 "embedding_model": settings.embedding_model,
                 "embedding_size": settings.embedding_size,
+                "fallback_embedding_version": settings.fallback_embedding_version,
                 "memory_top_k": settings.memory_top_k,
                 "include_cross_org_default": settings.include_cross_org_default,
             },
@@ -536,11 +750,92 @@ def health() -> dict[str, Any]:
         }
 
 
-@app.post("/ingest/case")
-def ingest_case(req: CaseIngestRequest) -> dict[str, Any]:
+def case_ingest_item(req: CaseIngestRequest) -> tuple[dict[str, Any], str]:
     payload = req.model_dump()
     case_id = payload.pop("case_id", None) or f"case-{uuid.uuid4()}"
     payload["case_id"] = case_id
+    return payload, case_id
+
+
+def quality_issue_ingest_item(req: QualityIssueIngestRequest) -> tuple[dict[str, Any], str]:
+    payload = req.model_dump()
+    issue_id = payload.pop("issue_id", None) or f"quality-issue-{uuid.uuid4()}"
+    payload["issue_id"] = issue_id
+    return payload, issue_id
+
+
+def improvement_activity_ingest_item(req: ImprovementActivityIngestRequest) -> tuple[dict[str, Any], str]:
+    payload = req.model_dump()
+    activity_id = payload.pop("activity_id", None) or f"improvement-activity-{uuid.uuid4()}"
+    payload["activity_id"] = activity_id
+    return payload, activity_id
+
+
+def email_message_ingest_item(req: EmailMessageIngestRequest) -> tuple[dict[str, Any], str]:
+    payload = req.model_dump()
+    message_id = payload.pop("message_id", None) or f"email-message-{uuid.uuid4()}"
+    payload["message_id"] = message_id
+    payload["thread_id"] = payload.get("thread_id") or f"thread-{uuid.uuid4()}"
+    return payload, message_id
+
+
+def email_thread_ingest_item(req: EmailThreadIngestRequest) -> tuple[dict[str, Any], str]:
+    payload = req.model_dump()
+    thread_id = payload.pop("thread_id", None) or f"email-thread-{uuid.uuid4()}"
+    payload["thread_id"] = thread_id
+    return payload, thread_id
+
+
+def cae_run_ingest_item(req: CaeRunIngestRequest) -> tuple[dict[str, Any], str]:
+    payload = req.model_dump()
+    run_id = payload.pop("run_id", None) or f"cae-run-{uuid.uuid4()}"
+    payload["run_id"] = run_id
+    return payload, run_id
+
+
+def validation_detail(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}" for error in exc.errors()
+    )
+
+
+def bulk_ingest(
+    collection: str,
+    model: type[BaseModel],
+    build_item: Callable[[Any], tuple[dict[str, Any], str]],
+    raw_items: list[Any],
+) -> dict[str, Any]:
+    if len(raw_items) > settings.bulk_max_items:
+        raise HTTPException(status_code=413, detail=f"too many items: {len(raw_items)} > {settings.bulk_max_items}")
+    started = time.monotonic()
+    results: list[dict[str, Any] | None] = [None] * len(raw_items)
+    valid_indexes: list[int] = []
+    items: list[tuple[dict[str, Any], str]] = []
+    for index, raw in enumerate(raw_items):
+        try:
+            items.append(build_item(model.model_validate(raw)))
+        except ValidationError as exc:
+            results[index] = {"index": index, "status": "error", "error": f"invalid item: {validation_detail(exc)}"}
+            continue
+        valid_indexes.append(index)
+    stored = store.upsert_memories(collection, items) if items else []
+    for index, result in zip(valid_indexes, stored):
+        results[index] = {**result, "index": index}
+    errors = sum(1 for item in results if item["status"] != "ok")
+    return {
+        "status": "ok" if not errors else ("partial" if errors < len(results) else "error"),
+        "collection": collection,
+        "total": len(results),
+        "ingested": len(results) - errors,
+        "errors": errors,
+        "elapsed_sec": round(time.monotonic() - started, 3),
+        "results": results,
+    }
+
+
+@app.post("/ingest/case")
+def ingest_case(req: CaseIngestRequest) -> dict[str, Any]:
+    payload, case_id = case_ingest_item(req)
     record = store.upsert_memory("defect_case_memory", payload=payload, point_id=case_id)
     return {
         "status": "ok",
@@ -548,11 +843,14 @@ def ingest_case(req: CaseIngestRequest) -> dict[str, Any]:
     }
 
 
+@app.post("/ingest/case/bulk")
+def ingest_case_bulk(req: BulkIngestRequest) -> dict[str, Any]:
+    return bulk_ingest("defect_case_memory", CaseIngestRequest, case_ingest_item, req.items)
+
+
 @app.post("/ingest/quality-issue")
 def ingest_quality_issue(req: QualityIssueIngestRequest) -> dict[str, Any]:
-    payload = req.model_dump()
-    issue_id = payload.pop("issue_id", None) or f"quality-issue-{uuid.uuid4()}"
-    payload["issue_id"] = issue_id
+    payload, issue_id = quality_issue_ingest_item(req)
     record = store.upsert_memory("quality_issue_memory", payload=payload, point_id=issue_id)
     return {
         "status": "ok",
@@ -560,11 +858,14 @@ def ingest_quality_issue(req: QualityIssueIngestRequest) -> dict[str, Any]:
     }
 
 
+@app.post("/ingest/quality-issue/bulk")
+def ingest_quality_issue_bulk(req: BulkIngestRequest) -> dict[str, Any]:
+    return bulk_ingest("quality_issue_memory", QualityIssueIngestRequest, quality_issue_ingest_item, req.items)
+
+
 @app.post("/ingest/improvement-activity")
 def ingest_improvement_activity(req: ImprovementActivityIngestRequest) -> dict[str, Any]:
-    payload = req.model_dump()
-    activity_id = payload.pop("activity_id", None) or f"improvement-activity-{uuid.uuid4()}"
-    payload["activity_id"] = activity_id
+    payload, activity_id = improvement_activity_ingest_item(req)
     record = store.upsert_memory("improvement_activity_memory", payload=payload, point_id=activity_id)
     return {
         "status": "ok",
@@ -572,12 +873,14 @@ def ingest_improvement_activity(req: ImprovementActivityIngestRequest) -> dict[s
     }
 
 
+@app.post("/ingest/improvement-activity/bulk")
+def ingest_improvement_activity_bulk(req: BulkIngestRequest) -> dict[str, Any]:
+    return bulk_ingest("improvement_activity_memory", ImprovementActivityIngestRequest, improvement_activity_ingest_item, req.items)
+
+
 @app.post("/ingest/email-message")
 def ingest_email_message(req: EmailMessageIngestRequest) -> dict[str, Any]:
-    payload = req.model_dump()
-    message_id = payload.pop("message_id", None) or f"email-message-{uuid.uuid4()}"
-    payload["message_id"] = message_id
-    payload["thread_id"] = payload.get("thread_id") or f"thread-{uuid.uuid4()}"
+    payload, message_id = email_message_ingest_item(req)
     record = store.upsert_memory("email_fact_memory", payload=payload, point_id=message_id)
     return {
         "status": "ok",
@@ -585,11 +888,14 @@ def ingest_email_message(req: EmailMessageIngestRequest) -> dict[str, Any]:
     }
 
 
+@app.post("/ingest/email-message/bulk")
+def ingest_email_message_bulk(req: BulkIngestRequest) -> dict[str, Any]:
+    return bulk_ingest("email_fact_memory", EmailMessageIngestRequest, email_message_ingest_item, req.items)
+
+
 @app.post("/ingest/email-thread")
 def ingest_email_thread(req: EmailThreadIngestRequest) -> dict[str, Any]:
-    payload = req.model_dump()
-    thread_id = payload.pop("thread_id", None) or f"email-thread-{uuid.uuid4()}"
-    payload["thread_id"] = thread_id
+    payload, thread_id = email_thread_ingest_item(req)
     record = store.upsert_memory("email_thread_memory", payload=payload, point_id=thread_id)
     return {
         "status": "ok",
@@ -597,11 +903,14 @@ def ingest_email_thread(req: EmailThreadIngestRequest) -> dict[str, Any]:
     }
 
 
+@app.post("/ingest/email-thread/bulk")
+def ingest_email_thread_bulk(req: BulkIngestRequest) -> dict[str, Any]:
+    return bulk_ingest("email_thread_memory", EmailThreadIngestRequest, email_thread_ingest_item, req.items)
+
+
 @app.post("/ingest/cae-run")
 def ingest_cae_run(req: CaeRunIngestRequest) -> dict[str, Any]:
-    payload = req.model_dump()
-    run_id = payload.pop("run_id", None) or f"cae-run-{uuid.uuid4()}"
-    payload["run_id"] = run_id
+    payload, run_id = cae_run_ingest_item(req)
     record = store.upsert_memory("cae_run_memory", payload=payload, point_id=run_id)
     return {
         "status": "ok",
@@ -609,6 +918,11 @@ def ingest_cae_run(req: CaeRunIngestRequest) -> dict[str, Any]:
     }
 
 
+@app.post("/ingest/cae-run/bulk")
+def ingest_cae_run_bulk(req: BulkIngestRequest) -> dict[str, Any]:
+    return bulk_ingest("cae_run_memory", CaeRunIngestRequest, cae_run_ingest_item, req.items)
+
+
 @app.post("/compare/case")
 def compare_case(req: CompareCaseRequest) -> dict[str, Any]:
     payload = req.model_dump()
@@ -711,21 +1025,19 @@ def search_memory(req: SearchMemoryRequest) -> dict[str, Any]:
     if include_cross_org is None:
         include_cross_org = settings.include_cross_org_default
 
+    outcome = store.search_many(
+        collections=req.collections,
+        query_text=req.query,
+        top_k=req.top_k or settings.memory_top_k,
+        include_cross_org=include_cross_org,
+        source_org=req.source_org,
+        allowed_reuse_scope=req.allowed_reuse_scope,
+    )
     results: list[dict[str, Any]] = []
-    for collection in req.collections:
-        try:
-            results.extend(
-                store.search(
-                    collection=collection,
-                    query_text=req.query,
-                    top_k=req.top_k or settings.memory_top_k,
-                    include_cross_org=include_cross_org,
-                    source_org=req.source_org,
-                    allowed_reuse_scope=req.allowed_reuse_scope,
-                )
-            )
-        except Exception as exc:
-            raise HTTPException(status_code=500, detail=f"search failed in {collection}: {exc}") from exc
+    for collection, hits in outcome.items():
+        if isinstance(hits, Exception):
+            raise HTTPException(status_code=500, detail=f"search failed in {collection}: {hits}") from hits
+        results.extend(hits)
 
     results.sort(key=lambda item: item["score"], reverse=True)
     return {
@@ -743,11 +1055,17 @@ def root() -> dict[str, Any]:
         "routes": [
             "/health",
             "/ingest/case",
+            "/ingest/case/bulk",
             "/ingest/quality-issue",
+            "/ingest/quality-issue/bulk",
             "/ingest/improvement-activity",
+            "/ingest/improvement-activity/bulk",
             "/ingest/email-message",
+            "/ingest/email-message/bulk",
             "/ingest/email-thread",
+            "/ingest/email-thread/bulk",
             "/ingest/cae-run",
+            "/ingest/cae-run/bulk",
             "/compare/case",
             "/compare/email-thread",
             "/compare/cae-run",
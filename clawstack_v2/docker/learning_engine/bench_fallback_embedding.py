@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: vectorized hashing fallback embedder vs the original
+pure-Python implementation.
+
+Usage (from this directory):
+  python3 bench_fallback_embedding.py [--texts 200] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+os.environ["EMBEDDING_BASE_URL"] = ""
+
+from app.main import SimpleEmbedding, hash_tokens, settings  # noqa: E402
+
+
+def legacy_fallback_embed(text: str, size: int) -> list[float]:
+    buckets = [0.0] * size
+    for token in text.lower().split():
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        idx = int.from_bytes(digest[:4], "big") % size
+        sign = 1.0 if digest[4] % 2 == 0 else -1.0
+        buckets[idx] += sign
+    norm = sum(v * v for v in buckets) ** 0.5 or 1.0
+    return [v / norm for v in buckets]
+
+
+def sample_texts(count: int) -> list[str]:
+    en = "Re: flash burr on cover plate lot {i} containment sorted 100% root cause die wear shim added "
+    ja = "件名：カバープレートのバリ発生について ロット{i}で外観不良を確認しました。金型摩耗が原因と推定し、全数選別を実施します。"
+    return [(en.format(i=i) * 6) + (ja.format(i=i) * 6) for i in range(count)]
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    size = settings.embedding_size
+    texts = sample_texts(args.texts)
+    embedder = SimpleEmbedding(size)
+
+    legacy = timed(lambda: [legacy_fallback_embed(t, size) for t in texts], args.repeat)
+    single = timed(lambda: [embedder._fallback_embed(t) for t in texts], args.repeat)
+    batch = timed(lambda: embedder._fallback_embed_many(texts), args.repeat)
+    cold = timed(lambda: SimpleEmbedding(size)._fallback_embed_many(texts), args.repeat)
+
+    ascii_text = "flash burr on cover plate die wear"
+    same = max(abs(a - b) for a, b in zip(legacy_fallback_embed(ascii_text, size), embedder._fallback_embed(ascii_text)))
+    print(f"texts={len(texts)} size={size} chars/text={len(texts[0])}")
+    print(f"  legacy per-text   {legacy * 1000:8.1f} ms")
+    print(f"  numpy per-text    {single * 1000:8.1f} ms  ({legacy / single:.1f}x)")
+    print(f"  numpy batch       {batch * 1000:8.1f} ms  ({legacy / batch:.1f}x)")
+    print(f"  numpy batch cold  {cold * 1000:8.1f} ms  ({legacy / cold:.1f}x, empty word cache)")
+    print(f"  max |diff| vs legacy on Latin-only text: {same:.2e}")
+    print(f"  tokens per text: legacy={len(texts[0].lower().split())} cjk-bigram={len(hash_tokens(texts[0]))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark: array-backed .inp parser / Radioss writer vs the original
+line-by-line implementation on a synthetic C3D4 mesh.
+
+The mesh is a structured n×n×n node grid (default ~1M nodes) with every hex
+cell split into 5 tetrahedra. Each variant runs in its own subprocess so the
+reported peak RSS is not shared between them.
+
+Usage (from this directory):
+  python3 bench_inp_converter.py [--nodes 1000000] [--skip-legacy]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import inp_converter as ic  # noqa: E402
+
+# Hex corners (i, j, k offsets) and the 5-tet split of a cube
+_CORNERS = np.array([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0),
+                     (0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)])
+_TETS = np.array([(0, 1, 3, 4), (1, 2, 3, 6), (1, 4, 5, 6), (3, 4, 6, 7), (1, 3, 4, 6)])
+
+
+def write_synthetic_inp(path: Path, nodes: int) -> tuple[int, int]:
+    n = max(2, round(nodes ** (1 / 3)))
+    grid = np.arange(n ** 3).reshape(n, n, n)   # [i, j, k] → node index
+    ijk = np.indices((n, n, n)).reshape(3, -1).T
+    xyz = ijk * 0.5 + np.random.default_rng(0).uniform(-0.05, 0.05, ijk.shape)
+
+    cells = np.indices((n - 1,) * 3).reshape(3, -1).T
+    corner_ids = np.stack([grid[cells[:, 0] + di, cells[:, 1] + dj, cells[:, 2] + dk]
+                           for di, dj, dk in _CORNERS], axis=1) + 1
+    tets = corner_ids[:, _TETS].reshape(-1, 4)
+    eids = np.arange(1, len(tets) + 1)
+
+    with open(path, 'w') as f:
+        f.write('** synthetic Prepomax-style mesh\n*Node\n')
+        ic._write_rows(f, '%d, %.9g, %.9g, %.9g\n', np.arange(1, n ** 3 + 1), xyz)
+        f.write('*Element, Type=C3D4, Elset=Blank\n')
+        ic._write_rows(f, '%d, %d, %d, %d, %d\n', eids, tets)
+        f.write('*Material, Name=Steel\n*Density\n7.85e-09,\n*Elastic\n210000, 0.3\n'
+                '*Solid Section, Elset=Blank, Material=Steel\n'
+                '*Step\n*Dynamic, Explicit\n1e-7, 0.02, 1e-8\n*End step\n')
+    return n ** 3, len(tets)
+
+
+def legacy_convert(inp_path: str, out_path: str):
+    """The original *Node / *Element parsing and /NODE / /TETRA4 formatting."""
+    lines = Path(inp_path).read_text(encoding='utf-8', errors='replace').splitlines()
+    nodes: dict = {}
+    elements: dict = {}
+    section, elset = None, None
+    for line in lines:
+        raw = line.strip()
+        low = raw.lower()
+        if raw.startswith('*') and not raw.startswith('**'):
+            section = None
+            if low.startswith('*node'):
+                section = 'node'
+            elif low.startswith('*element'):
+                section = 'elem'
+                elset = ic.InpConverter._kw_param(None, raw, 'elset')
+            continue
+        if not raw or raw.startswith('**'):
+            continue
+        parts = raw.split(',')
+        if section == 'node' and len(parts) >= 4:
+            nodes[int(parts[0])] = (float(parts[1]) * 1e-3, float(parts[2]) * 1e-3, float(parts[3]) * 1e-3)
+        elif section == 'elem' and len(parts) >= 5:
+            ns = [int(p) for p in parts[1:5]]
+            elements.setdefault(elset, []).append((int(parts[0]), ns[0], ns[1], ns[2], ns[3]))
+
+    out = ['/NODE']
+    for nid, (x, y, z) in sorted(nodes.items()):
+        out.append(f'{nid:>10d} {x:>20.12E} {y:>20.12E} {z:>20.12E}')
+    for es, elems in elements.items():
+        part_id = list(elements.keys()).index(es) + 1
+        out.append(f'/TETRA4/{part_id}')
+        for eid, n1, n2, n3, n4 in elems:
+            out.append(f'{eid:>10d}{n1:>10d}{n2:>10d}{n3:>10d}{n4:>10d}')
+    Path(out_path).write_text('\n'.join(out) + '\n', encoding='utf-8')
+
+
+def mesh_digest(rad_path: str) -> str:
+    """SHA-256 of the /NODE ... element sections (up to the first /MAT)."""
+    h = hashlib.sha256()
+    inside = False
+    with open(rad_path, encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('/NODE'):
+                inside = True
+            elif line.startswith('/MAT'):
+                break
+            if inside:
+                h.update(line.encode())
+    return h.hexdigest()
+
+
+def run_variant(variant: str, inp_path: str, out_dir: str) -> dict:
+    t0 = time.perf_counter()
+    if variant == 'legacy':
+        out_path = str(Path(out_dir) / 'legacy_0000.rad')
+        legacy_convert(inp_path, out_path)
+        parse = None
+    else:
+        with open(inp_path, encoding='utf-8') as f:
+            conv = ic.InpConverter(f)
+        parse = time.perf_counter() - t0
+        out_path = str(Path(out_dir) / 'array_0000.rad')
+        with open(out_path, 'w', encoding='utf-8') as f:
+            conv.write_starter(f, 'bench')
+    total = time.perf_counter() - t0
+    return {
+        'total': total,
+        'parse': parse,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'digest': mesh_digest(out_path),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nodes', type=int, default=1_000_000)
+    parser.add_argument('--skip-legacy', action='store_true')
+    parser.add_argument('--variant', choices=('legacy', 'array'), help=argparse.SUPPRESS)
+    parser.add_argument('--inp', help=argparse.SUPPRESS)
+    parser.add_argument('--out', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.inp, args.out)))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inp_path = Path(tmp) / 'mesh.inp'
+        t0 = time.perf_counter()
+        n_nodes, n_elems = write_synthetic_inp(inp_path, args.nodes)
+        size_mb = inp_path.stat().st_size / 2 ** 20
+        print(f'nodes={n_nodes} tets={n_elems} inp={size_mb:.0f} MiB (generated in {time.perf_counter() - t0:.1f} s)')
+
+        results = {}
+        for variant in (('array',) if args.skip_legacy else ('legacy', 'array')):
+            proc = subprocess.run([sys.executable, __file__, '--variant', variant, '--inp', str(inp_path), '--out', tmp],
+                                  capture_output=True, text=True, check=True)
+            results[variant] = r = json.loads(proc.stdout)
+            parse = f'  (parse {r["parse"]:.1f} s)' if r['parse'] is not None else ''
+            print(f'  {variant:<7} {r["total"]:7.1f} s  peak RSS {r["peak_rss_mb"]:7.0f} MiB{parse}')
+
+        if 'legacy' in results:
+            legacy, array = results['legacy'], results['array']
+            print(f'  speedup {legacy["total"] / array["total"]:.1f}x, '
+                  f'/NODE + /TETRA4 output identical: {legacy["digest"] == array["digest"]}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,15 +3,25 @@ inp_converter.py — Prepomax/CalculiX .inp → OpenRadioss .rad 変換
 
 対応:
   - 単位系: MM_TON_S_C (mm, tonne, s) → kg / m / s
-  - 要素: C3D4 → TETRA4
+  - 要素: C3D4 / C3D10 → TETRA4 (C3D10 は頂点4節点のみ使用)
+          C3D8 / C3D8R / C3D8I / C3D20 / C3D20R → BRICK (頂点8節点)
   - 材料: 弾性のみ → LAW1 / 弾性+塑性 → LAW2
   - 境界条件: *Boundary + *Amplitude → /IMPVEL + /FUNCT
   - 接触: *Contact pair → /INTER/TYPE25
+
+大規模メッシュ対応:
+  ファイルは 1 行ずつ読み、*Node / *Element のデータ行は _CHUNK_LINES 行ごとに
+  np.loadtxt でまとめて NumPy 配列へ変換する (節点: id 配列 + (N,3) 座標、
+  要素: (M, 1+節点数) 整数配列)。/NODE・/TETRA4・/BRICK の書き出しも
+  チャンク単位の一括フォーマットで、1 行ずつの int()/float()/f-string を避ける。
 """
 
+import io
 import re
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+import numpy as np
 
 
 # ── 単位変換係数 (MM_TON_S_C → kg/m/s) ──────────────────────────────────────
@@ -24,12 +34,130 @@ _MODULUS_FACTOR = 1e6
 # 応力: MPa → Pa = ×1e6
 _STRESS_FACTOR  = 1e6
 
+# CalculiX 要素タイプ → (Radioss キーワード, 総節点数, 出力する頂点数)
+# 2 次要素は先頭の頂点節点だけを使う (CalculiX の節点順は頂点 → 中間節点)
+_ELEMENT_TYPES = {
+    'C3D4':   ('TETRA4', 4, 4),
+    'C3D10':  ('TETRA4', 10, 4),
+    'C3D8':   ('BRICK', 8, 8),
+    'C3D8R':  ('BRICK', 8, 8),
+    'C3D8I':  ('BRICK', 8, 8),
+    'C3D20':  ('BRICK', 20, 8),
+    'C3D20R': ('BRICK', 20, 8),
+}
+# TYPE= 指定なし: 従来どおり先頭4節点で TETRA4
+_DEFAULT_ELEMENT = ('TETRA4', 4, 4)
+
+# 材料ブロック内で読み飛ばすキーワード (これ以外のキーワードで材料定義が終わる)
+_MATERIAL_IGNORED = ('*expansion', '*conductivity', '*specific heat')
+
+# データ行をこの行数ごとに配列化する (Python 文字列の保持量を抑える)
+_CHUNK_LINES = 200_000
+# 書き出し時に 1 回でフォーマットする行数
+_WRITE_ROWS  = 50_000
+
+
+class _Lines:
+    """入力行の逐次読み出し。読み過ぎたキーワード行は push() で戻す"""
+
+    def __init__(self, source: Iterable[str]):
+        self._it   = iter(source)
+        self._back: List[str] = []
+
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        if self._back:
+            return self._back.pop()
+        return next(self._it)
+
+    def push(self, line: str):
+        self._back.append(line)
+
+    def data(self) -> Iterator[str]:
+        """次のキーワード行までのデータ行 (strip 済み、空行・コメント除く)"""
+        for line in self:
+            s = line.strip()
+            if not s or s.startswith('**'):
+                continue
+            if s.startswith('*'):
+                self.push(line)
+                return
+            yield s
+
+
+def _read_table(rows: Iterable[str], dtype, ncols: int, width: int) -> np.ndarray:
+    """
+    カンマ区切りのデータ行を先頭 ncols 列の (n, ncols) 配列に読む。
+    width: 1 レコードの値の数 (行末カンマで次行に続く要素行の連結に使う)
+    """
+    chunks: List[np.ndarray] = []
+    buf: List[str] = []
+    for s in rows:
+        buf.append(s)
+        # 継続行 (行末カンマ) の途中ではチャンクを切らない
+        if len(buf) >= _CHUNK_LINES and not s.endswith(','):
+            chunks.append(_parse_rows(buf, dtype, ncols, width))
+            buf = []
+    if buf:
+        chunks.append(_parse_rows(buf, dtype, ncols, width))
+    if not chunks:
+        return np.empty((0, ncols), dtype=dtype)
+    return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+
+def _parse_rows(buf: List[str], dtype, ncols: int, width: int) -> np.ndarray:
+    # 高速経路: 全行が同じ列数なら np.loadtxt で一括変換
+    try:
+        arr = np.loadtxt(buf, dtype=dtype, delimiter=',', comments=None, ndmin=2)
+    except ValueError:
+        pass
+    else:
+        if arr.shape[1] >= ncols:
+            return arr[:, :ncols]
+    return _parse_rows_slow(buf, dtype, ncols, width)
+
+
+def _parse_rows_slow(buf: List[str], dtype, ncols: int, width: int) -> np.ndarray:
+    """列数が揃わないブロック: 継続行を連結し、列不足の行は従来どおり読み飛ばす"""
+    conv = int if np.issubdtype(dtype, np.integer) else float
+    out: List[List] = []
+    pending: List[str] = []
+    for s in buf:
+        pending.extend(p for p in s.split(',') if p.strip())
+        if s.endswith(',') and len(pending) < width:
+            continue
+        if len(pending) >= ncols:
+            out.append([conv(p) for p in pending[:ncols]])
+        pending = []
+    if len(pending) >= ncols:
+        out.append([conv(p) for p in pending[:ncols]])
+    if not out:
+        return np.empty((0, ncols), dtype=dtype)
+    return np.array(out, dtype=dtype)
+
+
+def _write_rows(out: TextIO, row_fmt: str, *columns: np.ndarray):
+    """
+    columns を横に並べた表を row_fmt で書く。_WRITE_ROWS 行分の書式を連結し
+    1 回の % 演算でフォーマットする (f-string と同一の出力)
+    """
+    n = len(columns[0])
+    for start in range(0, n, _WRITE_ROWS):
+        stop  = min(n, start + _WRITE_ROWS)
+        block = np.column_stack([c[start:stop] for c in columns])
+        out.write((row_fmt * (stop - start)) % tuple(block.ravel().tolist()))
+
 
 class InpConverter:
-    def __init__(self, inp_text: str):
-        self._lines = inp_text.splitlines()
-        self.nodes: Dict[int, Tuple[float, float, float]] = {}
-        self.elements: Dict[str, List[Tuple]] = {}  # elset_name → [(eid, n1,n2,n3,n4),...]
+    def __init__(self, source: Union[str, Iterable[str]]):
+        """source: .inp の全文、または行のイテラブル (開いたファイルなど)"""
+        self.node_ids = np.empty(0, dtype=np.int64)              # 昇順
+        self.node_xyz = np.empty((0, 3), dtype=np.float64)       # [m]
+        # elset_name → {'TETRA4': (M,5) [eid,n1..n4], 'BRICK': (M,9) [eid,n1..n8]}
+        self.elements: Dict[str, Dict[str, np.ndarray]] = {}
+        self.skipped_types: Dict[str, int] = {}                  # 非対応要素タイプ → 要素数
         self.materials: Dict[str, dict] = {}
         self.sections: List[Tuple[str, str]] = []   # [(elset, mat_name),...]
         self.amplitudes: Dict[str, List[Tuple[float, float]]] = {}
@@ -37,192 +165,154 @@ class InpConverter:
         self.contact_pairs: List[Tuple[str, str]] = []
         self.step_end_time: float = 0.035
         self.dt_min: float = 5e-7
-        self._parse()
+        if isinstance(source, str):
+            source = source.splitlines()
+        self._parse(_Lines(source))
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def n_elements(self) -> int:
+        return sum(len(a) for blocks in self.elements.values() for a in blocks.values())
 
     # ── パーサ ────────────────────────────────────────────────────────────────
 
-    def _parse(self):
-        i = 0
-        lines = self._lines
-        while i < len(lines):
-            raw = lines[i].strip()
+    def _parse(self, lines: _Lines):
+        node_chunks: List[np.ndarray] = []
+        elem_chunks: Dict[str, Dict[str, List[np.ndarray]]] = {}
+        mat: Optional[dict] = None      # 読み込み中の *Material
+
+        for line in lines:
+            raw = line.strip()
+            if not raw.startswith('*') or raw.startswith('**'):
+                continue
             low = raw.lower()
 
-            if low.startswith('*node') and not low.startswith('*node print') \
-                    and not low.startswith('*node output'):
-                i = self._parse_nodes(i + 1)
-            elif low.startswith('*element'):
-                elset = self._kw_param(raw, 'elset') or f'part_{len(self.elements)}'
-                i = self._parse_elements(i + 1, elset)
+            if low.startswith(('*density', '*elastic', '*plastic') + _MATERIAL_IGNORED):
+                if mat is not None:
+                    self._parse_material_data(lines, low, mat)
+                continue
+            mat = None
+
+            if low.startswith('*node') and not low.startswith(('*node print', '*node output', '*node file')):
+                node_chunks.append(_read_table(lines.data(), np.float64, 4, 4))
+            elif low.startswith('*element') and not low.startswith('*element output'):
+                elset = self._kw_param(raw, 'elset') or f'part_{len(elem_chunks)}'
+                self._parse_elements(lines, raw, elem_chunks.setdefault(elset, {}))
             elif low.startswith('*material'):
                 name = self._kw_param(raw, 'name') or f'mat_{len(self.materials)}'
-                i = self._parse_material(i + 1, name)
+                mat = {'name': name, 'density': 7800.0, 'E': 2.1e11, 'nu': 0.28,
+                       'plastic': None}
+                self.materials[name] = mat
             elif low.startswith('*solid section'):
                 elset  = self._kw_param(raw, 'elset') or ''
-                mat    = self._kw_param(raw, 'material') or ''
-                self.sections.append((elset, mat))
-                i += 1
+                mat_name = self._kw_param(raw, 'material') or ''
+                self.sections.append((elset, mat_name))
             elif low.startswith('*amplitude'):
                 name = self._kw_param(raw, 'name') or f'amp_{len(self.amplitudes)}'
-                i = self._parse_amplitude(i + 1, name)
+                self._parse_amplitude(lines, name)
             elif low.startswith('*contact pair'):
-                i = self._parse_contact_pairs(i + 1)
+                self._parse_contact_pairs(lines)
             elif low.startswith('*boundary'):
-                amp = self._kw_param(raw, 'amplitude')
-                i = self._parse_boundary(i + 1, amp)
+                self._parse_boundary(lines, self._kw_param(raw, 'amplitude'))
             elif low.startswith('*dynamic'):
                 # *Dynamic, ...\n  dt_init, end_time, dt_min, dt_max
-                if i + 1 < len(lines):
-                    vals = [v.strip() for v in lines[i + 1].split(',')]
+                for s in lines.data():
+                    vals = [v.strip() for v in s.split(',')]
                     try:
                         self.step_end_time = float(vals[1])
                         self.dt_min        = float(vals[2]) if len(vals) > 2 else 5e-7
                     except (ValueError, IndexError):
                         pass
-                i += 2
-            else:
-                i += 1
+                    break
+
+        self._finish_nodes(node_chunks)
+        for elset, blocks in elem_chunks.items():
+            merged = {kw: (arrs[0] if len(arrs) == 1 else np.concatenate(arrs))
+                      for kw, arrs in blocks.items()}
+            merged = {kw: a for kw, a in merged.items() if len(a)}
+            if merged:
+                self.elements[elset] = merged
 
     def _kw_param(self, line: str, key: str) -> Optional[str]:
         m = re.search(rf'{key}\s*=\s*([^,\n]+)', line, re.IGNORECASE)
         return m.group(1).strip() if m else None
 
-    def _is_keyword(self, line: str) -> bool:
-        s = line.strip()
-        return s.startswith('*') and not s.startswith('**')
-
-    def _parse_nodes(self, start: int) -> int:
-        i = start
-        while i < len(self._lines):
-            raw = self._lines[i].strip()
-            if not raw or raw.startswith('**'):
-                i += 1
-                continue
-            if self._is_keyword(raw):
-                break
-            parts = raw.split(',')
-            if len(parts) >= 4:
-                nid = int(parts[0])
-                x, y, z = float(parts[1]), float(parts[2]), float(parts[3])
-                self.nodes[nid] = (x * _MM_TO_M, y * _MM_TO_M, z * _MM_TO_M)
-            i += 1
-        return i
-
-    def _parse_elements(self, start: int, elset: str) -> int:
-        elems = self.elements.setdefault(elset, [])
-        i = start
-        while i < len(self._lines):
-            raw = self._lines[i].strip()
-            if not raw or raw.startswith('**'):
-                i += 1
-                continue
-            if self._is_keyword(raw):
+    def _finish_nodes(self, chunks: List[np.ndarray]):
+        if not chunks:
+            return
+        table = chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+        ids   = table[:, 0].astype(np.int64)
+        # 同じ節点番号が複数回あれば後勝ち、出力は番号順
+        order = np.argsort(ids, kind='stable')
+        ids_s = ids[order]
+        last  = np.ones(len(ids_s), dtype=bool)
+        last[:-1] = ids_s[1:] != ids_s[:-1]
+        keep  = order[last]
+        self.node_ids = ids[keep]
+        self.node_xyz = table[keep, 1:4] * _MM_TO_M
+
+    def _parse_elements(self, lines: _Lines, raw: str, blocks: Dict[str, List[np.ndarray]]):
+        etype = (self._kw_param(raw, 'type') or '').upper()
+        if etype and etype not in _ELEMENT_TYPES:
+            count = sum(1 for _ in lines.data())
+            self.skipped_types[etype] = self.skipped_types.get(etype, 0) + count
+            return
+        kw, width, corners = _ELEMENT_TYPES.get(etype, _DEFAULT_ELEMENT)
+        table = _read_table(lines.data(), np.int64, 1 + corners, 1 + width)
+        blocks.setdefault(kw, []).append(table)
+
+    def _parse_material_data(self, lines: _Lines, low: str, mat: dict):
+        if low.startswith('*density'):
+            for s in lines.data():
+                try:
+                    mat['density'] = float(s.split(',')[0]) * _DENSITY_FACTOR
+                except ValueError:
+                    pass
                 break
-            parts = raw.split(',')
-            if len(parts) >= 5:
-                eid = int(parts[0])
-                ns  = [int(p) for p in parts[1:5]]
-                elems.append((eid, ns[0], ns[1], ns[2], ns[3]))
-            i += 1
-        return i
-
-    def _parse_material(self, start: int, name: str) -> int:
-        mat = {'name': name, 'density': 7800.0, 'E': 2.1e11, 'nu': 0.28,
-               'plastic': None}
-        self.materials[name] = mat
-        i = start
-        while i < len(self._lines):
-            raw = self._lines[i].strip()
-            low = raw.lower()
-            if self._is_keyword(raw) and not low.startswith('*density') \
-                    and not low.startswith('*elastic') \
-                    and not low.startswith('*plastic') \
-                    and not low.startswith('*expansion') \
-                    and not low.startswith('*conductivity') \
-                    and not low.startswith('*specific heat'):
+        elif low.startswith('*elastic'):
+            for s in lines.data():
+                vals = s.split(',')
+                try:
+                    mat['E']  = float(vals[0]) * _MODULUS_FACTOR
+                    mat['nu'] = float(vals[1]) if len(vals) > 1 else 0.3
+                except ValueError:
+                    pass
                 break
-            if low.startswith('*density'):
-                i += 1
-                if i < len(self._lines):
+        elif low.startswith('*plastic'):
+            plastic_pts = []
+            for s in lines.data():
+                vals = s.split(',')
+                if len(vals) >= 2:
                     try:
-                        rho_inp = float(self._lines[i].strip().split(',')[0])
-                        mat['density'] = rho_inp * _DENSITY_FACTOR
+                        plastic_pts.append((float(vals[0]) * _STRESS_FACTOR,
+                                            float(vals[1])))
                     except ValueError:
                         pass
-            elif low.startswith('*elastic'):
-                i += 1
-                if i < len(self._lines):
-                    vals = self._lines[i].strip().split(',')
-                    try:
-                        mat['E']  = float(vals[0]) * _MODULUS_FACTOR
-                        mat['nu'] = float(vals[1]) if len(vals) > 1 else 0.3
-                    except ValueError:
-                        pass
-            elif low.startswith('*plastic'):
-                plastic_pts = []
-                i += 1
-                while i < len(self._lines):
-                    pr = self._lines[i].strip()
-                    if not pr or pr.startswith('**') or self._is_keyword(pr):
-                        break
-                    vals = pr.split(',')
-                    if len(vals) >= 2:
-                        try:
-                            plastic_pts.append((float(vals[0]) * _STRESS_FACTOR,
-                                                float(vals[1])))
-                        except ValueError:
-                            pass
-                    i += 1
-                mat['plastic'] = plastic_pts
-                continue
-            i += 1
-        return i
+            mat['plastic'] = plastic_pts
 
-    def _parse_amplitude(self, start: int, name: str) -> int:
+    def _parse_amplitude(self, lines: _Lines, name: str):
         pts: List[Tuple[float, float]] = []
-        i = start
-        while i < len(self._lines):
-            raw = self._lines[i].strip()
-            if not raw or raw.startswith('**'):
-                i += 1
-                continue
-            if self._is_keyword(raw):
-                break
-            vals = [v.strip() for v in raw.split(',')]
+        for s in lines.data():
+            vals = [v.strip() for v in s.split(',')]
             for j in range(0, len(vals) - 1, 2):
                 try:
                     pts.append((float(vals[j]), float(vals[j + 1])))
                 except ValueError:
                     pass
-            i += 1
         self.amplitudes[name] = pts
-        return i
-
-    def _parse_contact_pairs(self, start: int) -> int:
-        i = start
-        while i < len(self._lines):
-            raw = self._lines[i].strip()
-            if not raw or raw.startswith('**'):
-                i += 1
-                continue
-            if self._is_keyword(raw):
-                break
-            parts = [p.strip() for p in raw.split(',')]
+
+    def _parse_contact_pairs(self, lines: _Lines):
+        for s in lines.data():
+            parts = [p.strip() for p in s.split(',')]
             if len(parts) >= 2:
                 self.contact_pairs.append((parts[0], parts[1]))
-            i += 1
-        return i
-
-    def _parse_boundary(self, start: int, amplitude: Optional[str]) -> int:
-        i = start
-        while i < len(self._lines):
-            raw = self._lines[i].strip()
-            if not raw or raw.startswith('**'):
-                i += 1
-                continue
-            if self._is_keyword(raw):
-                break
-            parts = [p.strip() for p in raw.split(',')]
+
+    def _parse_boundary(self, lines: _Lines, amplitude: Optional[str]):
+        for s in lines.data():
+            parts = [p.strip() for p in s.split(',')]
             if len(parts) >= 3:
                 try:
                     nid  = int(parts[0])
@@ -235,8 +325,6 @@ class InpConverter:
                     })
                 except ValueError:
                     pass
-            i += 1
-        return i
 
     # ── RAD 生成 ──────────────────────────────────────────────────────────────
 
@@ -253,7 +341,14 @@ class InpConverter:
         return prop_ids, mat_map, mat_ids
 
     def generate_starter(self, title: str = 'Converted from Prepomax') -> str:
+        buf = io.StringIO()
+        self.write_starter(buf, title)
+        return buf.getvalue()
+
+    def write_starter(self, out: TextIO, title: str = 'Converted from Prepomax'):
+        """スターター (_0000.rad) を out に書き出す。節点・要素はチャンク単位で直接書く"""
         prop_ids, elset_mat_map, mat_ids = self._build_parts()
+        part_ids = {elset: idx + 1 for idx, elset in enumerate(self.elements)}
 
         lines = []
         lines.append('#RADIOSS STARTER')
@@ -267,16 +362,16 @@ class InpConverter:
 
         # ── ノード ─────────────────────────────────────────────────────────────
         lines.append('/NODE')
-        for nid, (x, y, z) in sorted(self.nodes.items()):
-            lines.append(f'{nid:>10d} {x:>20.12E} {y:>20.12E} {z:>20.12E}')
+        out.write('\n'.join(lines) + '\n')
+        _write_rows(out, '%10d %20.12E %20.12E %20.12E\n', self.node_ids, self.node_xyz)
 
-        # ── 要素 ──────────────────────────────────────────────────────────────
-        for elset, elems in self.elements.items():
-            part_id = list(self.elements.keys()).index(elset) + 1
-            lines.append(f'/TETRA4/{part_id}')
-            for eid, n1, n2, n3, n4 in elems:
-                lines.append(f'{eid:>10d}{n1:>10d}{n2:>10d}{n3:>10d}{n4:>10d}')
+        # ── 要素 (/TETRA4, /BRICK) ────────────────────────────────────────────
+        for elset, blocks in self.elements.items():
+            for kw, table in blocks.items():
+                out.write(f'/{kw}/{part_ids[elset]}\n')
+                _write_rows(out, '%10d' * table.shape[1] + '\n', table)
 
+        lines = []
         # ── 材料 ──────────────────────────────────────────────────────────────
         for mat_name, mat in self.materials.items():
             mid = mat_ids[mat_name]
@@ -336,7 +431,7 @@ class InpConverter:
 
         # ── PART ─────────────────────────────────────────────────────────────
         for elset in self.elements:
-            part_id = list(self.elements.keys()).index(elset) + 1
+            part_id = part_ids[elset]
             pid     = prop_ids.get(elset, 1)
             mid     = elset_mat_map.get(elset, 1)
             lines.append(f'/PART/{part_id}')
@@ -346,7 +441,7 @@ class InpConverter:
 
         # ── スキンサーフェス PART ────────────────────────────────────────────
         for elset in self.elements:
-            part_id    = list(self.elements.keys()).index(elset) + 1
+            part_id    = part_ids[elset]
             skin_part  = part_id + 100
             mid        = elset_mat_map.get(elset, 1)
             lines.append(f'/PART/{skin_part}')
@@ -356,7 +451,7 @@ class InpConverter:
 
         # ── サーフェス定義 ───────────────────────────────────────────────────
         for elset in self.elements:
-            part_id    = list(self.elements.keys()).index(elset) + 1
+            part_id    = part_ids[elset]
             skin_part  = part_id + 100
             surf_id    = part_id * 100 + 200
             lines.append(f'/SURF/PART/{surf_id}/0')
@@ -467,7 +562,7 @@ class InpConverter:
             lines.append('         0         0                   0.0         0         0')
 
         lines.append('/END')
-        return '\n'.join(lines) + '\n'
+        out.write('\n'.join(lines) + '\n')
 
     def generate_engine(self, title: str = 'Converted from Prepomax') -> str:
         dt_anim = self.step_end_time / 40.0
@@ -499,40 +594,43 @@ def convert(inp_path: str, out_dir: str) -> dict:
     .inp を読み込み、_0000.rad と _0001.rad を out_dir に書き出す。
     戻り値: {'starter': path, 'engine': path, 'warnings': [...]}
     """
-    inp_text = Path(inp_path).read_text(encoding='utf-8', errors='replace')
     stem     = Path(inp_path).stem
     today    = __import__('datetime').date.today().strftime('%Y%m%d')
     base     = f'{stem}_{today}'
 
-    conv = InpConverter(inp_text)
+    # 全文を文字列に載せず、行単位で読みながら解析する
+    with open(inp_path, encoding='utf-8', errors='replace') as f:
+        conv = InpConverter(f)
     warnings = []
 
-    if not conv.nodes:
+    if not conv.n_nodes:
         warnings.append('ノードが見つかりません。*Node セクションを確認してください。')
     if not conv.elements:
-        warnings.append('要素が見つかりません。C3D4以外の要素は非対応です。')
+        warnings.append('要素が見つかりません。対応要素は C3D4/C3D10/C3D8(R/I)/C3D20(R) です。')
+    if conv.skipped_types:
+        skipped = ', '.join(f'{t} ({n})' for t, n in conv.skipped_types.items())
+        warnings.append(f'非対応の要素タイプをスキップしました: {skipped}')
     if not conv.materials:
         warnings.append('材料が見つかりません。')
 
     title = f'Converted_{stem}'
-    starter_text = conv.generate_starter(title)
-    engine_text  = conv.generate_engine(title)
 
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
     starter_path = out / f'{base}_0000.rad'
     engine_path  = out / f'{base}_0001.rad'
 
-    starter_path.write_text(starter_text, encoding='utf-8')
-    engine_path.write_text(engine_text,   encoding='utf-8')
+    with open(starter_path, 'w', encoding='utf-8') as f:
+        conv.write_starter(f, title)
+    engine_path.write_text(conv.generate_engine(title), encoding='utf-8')
 
     return {
         'starter':  str(starter_path),
         'engine':   str(engine_path),
         'base':     base,
         'stats': {
-            'nodes':     len(conv.nodes),
-            'elements':  sum(len(e) for e in conv.elements.values()),
+            'nodes':     conv.n_nodes,
+            'elements':  conv.n_elements,
             'parts':     len(conv.elements),
             'materials': len(conv.materials),
             'contacts':  len(conv.contact_pairs),
@@ -1,16 +1,29 @@
 """
 server.py — Progressive Die Hub FastAPI バックエンド
+
+ソルバー実行 (run-radioss / run-calculix / anim-to-vtk) は task_queue の
+ワーカーで実行し、202 + タスク情報を即座に返す。進捗は
+GET /api/tasks/{task_id} (ポーリング) または /api/tasks/{task_id}/events (SSE)、
+キャンセルは DELETE /api/tasks/{task_id}。
 """
+import asyncio
+import io
+import json
+import multiprocessing
 import os
+import re
+import shlex
 import shutil
 import subprocess
+import tarfile
 import tempfile
 import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 from fastapi import FastAPI, File, Form, HTTPException, UploadFile
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
 import geometry_processor as gp
@@ -19,6 +32,8 @@ import radioss_generator as rg
 import calculix_generator as cg
 import report_generator as rep
 import inp_converter as ic
+import vtk_convert as vc
+from task_queue import QueueFull, Task, TaskQueue
 
 # ── 定数 ─────────────────────────────────────────────────────────────────────
 JOBS_DIR = Path("/tmp/pdie_jobs")
@@ -27,6 +42,22 @@ JOBS_DIR.mkdir(parents=True, exist_ok=True)
 OPENRADIOSS_CONTAINER = "clawstack-unified-openradioss-1"
 ANTIGRAVITY_CONTAINER = "clawstack-unified-clawdbot-gateway-1"
 
+# コンテナ単位の同時実行数。OpenRadioss は 1 run = 2 スレッド (-nt 2) なので
+# 既定はコア数/2 → 打ち抜きと曲げはコアに余裕があれば並列に走る
+RADIOSS_SLOTS  = int(os.getenv("PDIE_RADIOSS_SLOTS", str(max(1, (os.cpu_count() or 2) // 2))))
+CALCULIX_SLOTS = int(os.getenv("PDIE_CALCULIX_SLOTS", "1"))
+RADIOSS_TIMEOUT  = 300
+CALCULIX_TIMEOUT = 120
+# ANIM→VTK: 1 回の exec 内で並列に変換するフレーム数 / VTU 変換プロセス数
+ANIM_PARALLEL   = int(os.getenv("PDIE_ANIM_PARALLEL", str(max(1, min(8, os.cpu_count() or 1)))))
+VTU_WORKERS     = int(os.getenv("PDIE_VTU_WORKERS", str(max(1, min(4, os.cpu_count() or 1)))))
+ANIM_TO_VTK_BIN = '/opt/openradioss/OpenRadioss/exec/anim_to_vtk_linux64_gf'
+
+tasks = TaskQueue(slots={
+    OPENRADIOSS_CONTAINER: RADIOSS_SLOTS,
+    ANTIGRAVITY_CONTAINER: CALCULIX_SLOTS,
+})
+
 app = FastAPI(title="Progressive Die Hub", version="1.0.0")
 app.mount("/static", StaticFiles(directory="/app/static"), name="static")
 
@@ -39,7 +70,6 @@ def _job_dir(job_id: str) -> Path:
 
 
 def _load_job(job_id: str) -> dict:
-    import json
     p = JOBS_DIR / job_id / "job.json"
     if not p.exists():
         raise HTTPException(404, f"ジョブが見つかりません: {job_id}")
@@ -47,7 +77,6 @@ def _load_job(job_id: str) -> dict:
 
 
 def _save_job(job_id: str, data: dict):
-    import json
     p = JOBS_DIR / job_id / "job.json"
     p.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
 
@@ -239,90 +268,194 @@ async def generate_fem(
     })
 
 
-@app.post("/api/run-radioss")
-async def run_radioss(job_id: str = Form(...)):
-    """OpenRadioss コンテナで打ち抜き+曲げ解析を実行"""
+def _container_exec(container: str, script: str, name: str, cli: bool = True):
+    """
+    コンテナ内で script を新しいプロセスグループとして実行するコマンドと、
+    そのグループを停止する関数を返す (キャンセル/タイムアウト用)。
+    cli=True なら docker CLI のコマンド、False なら exec_run に渡す argv。
+    """
+    pidfile = f'/tmp/pdie-{name}-{uuid.uuid4().hex[:8]}.pid'
+    cmd = ['setsid', '-w', 'bash', '-lc',
+           f'echo $$ > {pidfile}; {script}; rc=$?; rm -f {pidfile}; exit $rc']
+    if cli:
+        cmd = ['docker', 'exec', container] + cmd
+
+    def abort():
+        subprocess.run(
+            ['docker', 'exec', container, 'bash', '-c',
+             f'[ -f {pidfile} ] && kill -TERM -- -$(cat {pidfile}); rm -f {pidfile}'],
+            capture_output=True, timeout=15)
+
+    return cmd, abort
+
+
+def _run_result(task: Task, cmd, abort, timeout: float) -> dict:
+    try:
+        r = task.run(cmd, timeout=timeout, on_abort=abort)
+    except subprocess.TimeoutExpired:
+        return {'returncode': -1, 'stdout': f'タイムアウト ({timeout:.0f} 秒)', 'success': False}
+    return {
+        'returncode': r.returncode,
+        'stdout':     r.stdout[-2000:],
+        'success':    r.returncode == 0,
+    }
+
+
+def _task_response(task: Task) -> JSONResponse:
+    return JSONResponse(task.to_dict(), status_code=202)
+
+
+def _submit(kind: str, fn, job_id: Optional[str] = None) -> JSONResponse:
+    try:
+        task = tasks.submit(kind, fn, job_id=job_id)
+    except QueueFull as e:
+        raise HTTPException(429, str(e))
+    return _task_response(task)
+
+
+def _radioss_deck(task: Task, job_dir_path: Path, label: str, starter: str, engine: str) -> dict:
+    """1 デッキ (starter+engine) を OpenRadioss コンテナで実行"""
+    # /work のファイル名はジョブ間で共通 → 同じデッキ名は同時に 1 つだけ
+    with tasks.hold(task, OPENRADIOSS_CONTAINER, key=f'radioss:{label}'):
+        task.update(current=f'OpenRadioss {label} 実行中...')
+        for f in (f'{starter}.rad', f'{engine}.rad'):
+            src = job_dir_path / f
+            if src.exists():
+                task.run(['docker', 'cp', str(src), f'{OPENRADIOSS_CONTAINER}:/work/{f}'], timeout=60)
+        cmd, abort = _container_exec(
+            OPENRADIOSS_CONTAINER,
+            f'cd /work && openradioss -nt 2 {starter} {engine} 2>&1 | tail -20',
+            f'{task.id}-{label}')
+        return _run_result(task, cmd, abort, RADIOSS_TIMEOUT)
+
+
+def _radioss_task(task: Task, job_id: str) -> dict:
     job_dir_path = _job_dir(job_id)
 
     # コンテナ起動確認（未起動なら起動）
-    check = subprocess.run(
+    task.update(0.02, 'OpenRadioss コンテナ確認中...')
+    check = task.run(
         ['docker', 'inspect', '--format', '{{.State.Running}}',
-         OPENRADIOSS_CONTAINER],
-        capture_output=True, text=True)
+         OPENRADIOSS_CONTAINER], timeout=30)
     if check.stdout.strip() != 'true':
         try:
-            subprocess.run(
-                ['docker', 'compose', 'up', '-d', 'openradioss'],
-                cwd='/workspace', timeout=30, check=True)
-        except Exception as e:
-            raise HTTPException(503, f"OpenRadioss コンテナ起動失敗: {e}")
-
-    # 入力ファイルをコンテナへコピー
-    for f in ['blanking_starter.rad', 'blanking_engine.rad',
-              'bending_starter.rad',  'bending_engine.rad']:
-        src = job_dir_path / f
-        if src.exists():
-            subprocess.run(['docker', 'cp', str(src),
-                            f'{OPENRADIOSS_CONTAINER}:/work/{f}'])
-
-    # 実行
-    results = {}
-    for label, starter, engine in [
+            r = task.run(['docker', 'compose', 'up', '-d', 'openradioss'],
+                         cwd='/workspace', timeout=30)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise RuntimeError(f"OpenRadioss コンテナ起動失敗: {e}")
+        if r.returncode != 0:
+            raise RuntimeError(f"OpenRadioss コンテナ起動失敗: {r.stderr.strip()[-500:]}")
+
+    # 打ち抜きと曲げは別デッキ・別出力名 → 実行枠があれば並列
+    decks = [
         ('blanking', 'blanking_starter', 'blanking_engine'),
         ('bending',  'bending_starter',  'bending_engine'),
-    ]:
-        r = subprocess.run(
-            ['docker', 'exec', OPENRADIOSS_CONTAINER,
-             'bash', '-lc',
-             f'cd /work && openradioss -nt 2 {starter} {engine} 2>&1 | tail -20'],
-            capture_output=True, text=True, timeout=300)
-        results[label] = {
-            'returncode': r.returncode,
-            'stdout':     r.stdout[-2000:],
-            'success':    r.returncode == 0,
-        }
-
-    return JSONResponse({'job_id': job_id, 'results': results})
-
-
-@app.post("/api/run-calculix")
-async def run_calculix(job_id: str = Form(...)):
-    """CalculiX (Antigravity コンテナ) でパンチ強度解析を実行"""
+    ]
+    task.update(0.05, 'OpenRadioss 実行待ち...')
+    results = {}
+    with ThreadPoolExecutor(max_workers=len(decks)) as ex:
+        futures = {label: ex.submit(_radioss_deck, task, job_dir_path, label, starter, engine)
+                   for label, starter, engine in decks}
+        for label, fut in futures.items():
+            results[label] = fut.result()
+            task.update(0.05 + 0.95 * len(results) / len(decks),
+                        f'OpenRadioss {label} 完了 ({len(results)}/{len(decks)})')
+    return {'job_id': job_id, 'results': results}
+
+
+@app.post("/api/run-radioss", status_code=202)
+async def run_radioss(job_id: str = Form(...)):
+    """OpenRadioss コンテナで打ち抜き+曲げ解析を実行 (タスク投入)"""
+    _load_job(job_id)
+    return _submit('radioss', lambda task: _radioss_task(task, job_id), job_id=job_id)
+
+
+def _calculix_task(task: Task, job_id: str) -> dict:
     job_dir_path = _job_dir(job_id)
 
-    check = subprocess.run(
+    task.update(0.02, 'Antigravity コンテナ確認中...')
+    check = task.run(
         ['docker', 'inspect', '--format', '{{.State.Running}}',
-         ANTIGRAVITY_CONTAINER],
-        capture_output=True, text=True)
+         ANTIGRAVITY_CONTAINER], timeout=30)
     if check.stdout.strip() != 'true':
-        raise HTTPException(503,
+        raise RuntimeError(
             "Antigravity コンテナが未起動です。"
             "`docker compose up -d antigravity` で起動してください")
 
+    inp_files = [f for f in ['punch_strength', 'die_strength']
+                 if (job_dir_path / f'{f}.inp').exists()]
     results = {}
-    for inp_file in ['punch_strength', 'die_strength']:
-        src = job_dir_path / f'{inp_file}.inp'
-        if not src.exists():
-            continue
-        subprocess.run(['docker', 'cp', str(src),
-                        f'{ANTIGRAVITY_CONTAINER}:/tmp/{inp_file}.inp'])
-        r = subprocess.run(
-            ['docker', 'exec', ANTIGRAVITY_CONTAINER,
-             'bash', '-lc',
-             f'cd /tmp && ccx {inp_file} 2>&1 | tail -20'],
-            capture_output=True, text=True, timeout=120)
-        results[inp_file] = {
-            'returncode': r.returncode,
-            'stdout':     r.stdout[-2000:],
-            'success':    r.returncode == 0,
-        }
-
-    return JSONResponse({'job_id': job_id, 'results': results})
+    for inp_file in inp_files:
+        with tasks.hold(task, ANTIGRAVITY_CONTAINER, key=f'calculix:{inp_file}'):
+            task.update(current=f'CalculiX {inp_file} 実行中...')
+            task.run(['docker', 'cp', str(job_dir_path / f'{inp_file}.inp'),
+                      f'{ANTIGRAVITY_CONTAINER}:/tmp/{inp_file}.inp'], timeout=60)
+            cmd, abort = _container_exec(
+                ANTIGRAVITY_CONTAINER,
+                f'cd /tmp && ccx {inp_file} 2>&1 | tail -20',
+                f'{task.id}-{inp_file}')
+            results[inp_file] = _run_result(task, cmd, abort, CALCULIX_TIMEOUT)
+        task.update(len(results) / len(inp_files), f'CalculiX {inp_file} 完了')
+
+    return {'job_id': job_id, 'results': results}
+
+
+@app.post("/api/run-calculix", status_code=202)
+async def run_calculix(job_id: str = Form(...)):
+    """CalculiX (Antigravity コンテナ) でパンチ強度解析を実行 (タスク投入)"""
+    _load_job(job_id)
+    return _submit('calculix', lambda task: _calculix_task(task, job_id), job_id=job_id)
+
+
+# ── タスク (ソルバー実行) ───────────────────────────────────────────────────────
+
+def _get_task(task_id: str) -> Task:
+    task = tasks.get(task_id)
+    if task is None:
+        raise HTTPException(404, f"タスクが見つかりません: {task_id}")
+    return task
+
+
+@app.get("/api/tasks")
+async def list_tasks(job_id: Optional[str] = None):
+    return JSONResponse({'tasks': [t.to_dict() for t in tasks.list(job_id)]})
+
+
+@app.get("/api/tasks/{task_id}")
+async def get_task(task_id: str):
+    return JSONResponse(_get_task(task_id).to_dict())
+
+
+@app.get("/api/tasks/{task_id}/events")
+async def task_events(task_id: str):
+    """タスク状態の Server-Sent Events。状態が変わるたびに送信し、終了で閉じる"""
+    task = _get_task(task_id)
+
+    async def stream():
+        seen = -1
+        while True:
+            if task.version != seen:
+                seen = task.version
+                payload = json.dumps(task.to_dict(), ensure_ascii=False)
+                yield f"data: {payload}\n\n"
+                if task.finished:
+                    return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(stream(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache'})
+
+
+@app.delete("/api/tasks/{task_id}")
+async def cancel_task(task_id: str):
+    _get_task(task_id)
+    return JSONResponse(tasks.cancel(task_id).to_dict())
 
 
 @app.post("/api/convert-inp")
-async def convert_inp(file: UploadFile = File(...)):
+def convert_inp(file: UploadFile = File(...)):
     """Prepomax .inp → OpenRadioss _0000.rad / _0001.rad 変換"""
+    # 数百万節点のメッシュでは数秒かかるため同期関数 (スレッドプール) で実行する
     if not file.filename.lower().endswith('.inp'):
         raise HTTPException(400, "拡張子 .inp のファイルのみ対応しています")
 
@@ -330,8 +463,8 @@ async def convert_inp(file: UploadFile = File(...)):
     job_dir = _job_dir(job_id)
     inp_path = job_dir / file.filename
 
-    content = await file.read()
-    inp_path.write_bytes(content)
+    with open(inp_path, 'wb') as f:
+        shutil.copyfileobj(file.file, f, 1 << 20)
 
     try:
         result = ic.convert(str(inp_path), str(job_dir))
@@ -417,7 +550,7 @@ def _ensure_openradioss():
 
 
 @app.get("/api/anim-scan")
-async def anim_scan():
+def anim_scan():
     """OpenRadioss /work 内の ANIM ファイルセット（プレフィックス）を列挙"""
     _ensure_openradioss()
     client = _docker_client()
@@ -430,71 +563,178 @@ async def anim_scan():
     return JSONResponse({'prefixes': prefixes})
 
 
-@app.post("/api/anim-to-vtk")
-async def anim_to_vtk(prefix: str = Form(...)):
-    """OpenRadioss ANIM ファイル → VTK 変換"""
+@app.post("/api/anim-to-vtk", status_code=202)
+async def anim_to_vtk(
+    prefix:   str  = Form(...),
+    output:   str  = Form('vtk'),
+    compress: bool = Form(True),
+):
+    """
+    OpenRadioss ANIM ファイル → VTK 変換 (タスク投入)
+
+    output='vtu' ならレガシー VTK をバイナリ XML (.vtu, compress=True で zlib) に変換する。
+    """
+    if output not in ('vtk', 'vtu'):
+        raise HTTPException(400, f"未対応の出力形式: {output}")
+    job_id = str(uuid.uuid4())[:8]
+    return _submit('anim-to-vtk',
+                   lambda task: _anim_to_vtk_task(task, prefix, job_id, output, compress),
+                   job_id=job_id)
+
+
+class _ChunkReader(io.RawIOBase):
+    """exec_run(stream=True) のチャンク列を読み込み可能なストリームにする"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buf = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buf:
+            try:
+                self._buf = next(self._chunks)
+            except StopIteration:
+                return 0
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+
+def _anim_to_vtk_task(task: Task, prefix: str, job_id: str,
+                      output: str = 'vtk', compress: bool = True) -> dict:
+    task.update(0.02, 'OpenRadioss コンテナ確認中...')
     _ensure_openradioss()
     client = _docker_client()
     c = client.containers.get(OPENRADIOSS_CONTAINER)
 
-    job_id  = str(uuid.uuid4())[:8]
     job_dir = _job_dir(job_id)
 
     # ANIMファイル一覧取得
     _, ls_out = c.exec_run(
         ['bash', '-lc', f'ls /work/{prefix}A[0-9]* 2>/dev/null | sort'])
-    anim_files = [Path(f.strip()).name for f in
-                  (ls_out.decode('utf-8', errors='replace') if ls_out else '').strip().split('\n')
-                  if f.strip()]
+    # glob は変換済みの {prefix}A001.vtk なども拾うので、ANIM 本体 (A + 数字) だけに絞る
+    anim_re = re.compile(re.escape(prefix) + r'A[0-9]+')
+    anim_files = [name for name in
+                  (Path(f.strip()).name for f in
+                   (ls_out.decode('utf-8', errors='replace') if ls_out else '').strip().split('\n'))
+                  if anim_re.fullmatch(name)]
 
     if not anim_files:
-        raise HTTPException(404, f"ANIMファイルが見つかりません: {prefix}A*")
-
-    # 各ANIMファイルをVTKに変換（標準出力 → .vtk ファイルとして保存）
-    vtk_files = []
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise RuntimeError(f"ANIMファイルが見つかりません: {prefix}A*")
+
+    # 全フレームを 1 回の exec で ANIM_PARALLEL 本ずつ並列変換（標準出力 → .vtk）。
+    # 1 フレーム終わるごとに "名前<TAB>終了コード<TAB>ログ先頭" の 1 行を出力する
+    script = (
+        'cd /work && printf "%s\\n" ' + ' '.join(shlex.quote(f) for f in anim_files) +
+        f' | xargs -P {ANIM_PARALLEL} -I@ bash -c '
+        + shlex.quote(
+            f'{ANIM_TO_VTK_BIN} /work/@ > /work/@.vtk 2>/tmp/@.log; rc=$?; '
+            'printf "%s\\t%s\\t%s\\n" @ $rc "$(head -c 200 /tmp/@.log | tr "\\n\\t" "  ")"')
+    )
+    status = {}
     logs = []
-    all_ok = True
-    for anim_name in anim_files:
-        vtk_name = anim_name + '.vtk'
-        exit_code, output = c.exec_run(
-            ['bash', '-lc',
-             f'/opt/openradioss/OpenRadioss/exec/anim_to_vtk_linux64_gf /work/{anim_name}'
-             f' > /work/{vtk_name} 2>/tmp/{anim_name}.log; cat /tmp/{anim_name}.log'])
-        log_text = output.decode('utf-8', errors='replace') if output else ''
-        logs.append(f'[{anim_name}] exit={exit_code}  {log_text[:200]}')
-        if exit_code == 0:
-            vtk_files.append(vtk_name)
-        else:
-            all_ok = False
-
-    # VTKファイルをジョブディレクトリへコピー
-    import tarfile, io
-    for vtk_name in vtk_files:
+    with tasks.hold(task, OPENRADIOSS_CONTAINER, key=f'anim:{prefix}'):
+        argv, abort = _container_exec(OPENRADIOSS_CONTAINER, script,
+                                      f'{task.id}-anim', cli=False)
+        task.update(0.05, f'VTK変換中... 0/{len(anim_files)}')
+        _, stream = c.exec_run(argv, stream=True, stderr=False)
+        pending = b''
         try:
-            bits, _ = c.get_archive(f'/work/{vtk_name}')
-            buf = io.BytesIO(b''.join(bits))
-            with tarfile.open(fileobj=buf) as tf:
-                member = tf.getmembers()[0]
-                member.name = vtk_name
-                tf.extract(member, path=str(job_dir))
-        except Exception:
-            pass
+            for chunk in stream:
+                if task.cancelled:
+                    abort()
+                    task.check_cancelled()
+                pending += chunk
+                *lines, pending = pending.split(b'\n')
+                for line in lines:
+                    name, _, rest = line.decode('utf-8', errors='replace').partition('\t')
+                    code, _, log_text = rest.partition('\t')
+                    if name not in anim_files:
+                        continue
+                    status[name] = code == '0'
+                    logs.append(f'[{name}] exit={code}  {log_text.strip()}')
+                task.update(0.05 + 0.55 * len(status) / len(anim_files),
+                            f'VTK変換中... {len(status)}/{len(anim_files)}')
+        finally:
+            stream.close()
+
+    for name in anim_files:
+        if name not in status:
+            logs.append(f'[{name}] 変換結果なし')
+    vtk_files = [a + '.vtk' for a in anim_files if status.get(a)]
+    all_ok = len(vtk_files) == len(anim_files)
+
+    # VTKファイルを 1 本の tar ストリームで受け取り、メモリに溜めずにジョブディレクトリへ展開
+    task.update(0.6, 'VTKファイル取得中...')
+    wanted = set(vtk_files)
+    received = []
+    vtu_pool = ProcessPoolExecutor(max_workers=VTU_WORKERS,
+                                   mp_context=multiprocessing.get_context('spawn')) \
+        if output == 'vtu' else None
+    vtu_jobs = {}
+    try:
+        if vtk_files:
+            _, tar_stream = c.exec_run(['tar', '-cf', '-', '-C', '/work', *vtk_files],
+                                       stream=True, stderr=False)
+            try:
+                reader = io.BufferedReader(_ChunkReader(tar_stream), buffer_size=1 << 20)
+                with tarfile.open(fileobj=reader, mode='r|') as tf:
+                    for member in tf:
+                        task.check_cancelled()
+                        name = Path(member.name).name
+                        if not member.isfile() or name not in wanted:
+                            continue
+                        dst = job_dir / name
+                        with tf.extractfile(member) as src, open(dst, 'wb') as out:
+                            shutil.copyfileobj(src, out, 1 << 20)
+                        received.append(name)
+                        if vtu_pool is not None:
+                            vtu_jobs[name] = vtu_pool.submit(vc.convert_file, str(dst), compress)
+                        task.update(0.6 + 0.2 * len(received) / len(vtk_files),
+                                    f'VTKファイル取得中... {len(received)}/{len(vtk_files)}')
+            except (tarfile.TarError, OSError) as e:
+                logs.append(f'[tar] 取得エラー: {e}')
+            finally:
+                tar_stream.close()
+
+        # .vtu 変換（失敗したフレームは .vtk のまま残す）
+        out_files = {name: name for name in received}
+        for i, (name, fut) in enumerate(vtu_jobs.items()):
+            task.check_cancelled()
+            try:
+                out_files[name] = fut.result()
+            except Exception as e:
+                logs.append(f'[{name}] VTU変換失敗: {e}')
+            task.update(0.8 + 0.2 * (i + 1) / len(vtu_jobs),
+                        f'VTU変換中... {i + 1}/{len(vtu_jobs)}')
+    finally:
+        if vtu_pool is not None:
+            vtu_pool.shutdown(wait=True, cancel_futures=True)
+
+    if len(received) != len(vtk_files):
+        all_ok = False
+    result_files = [out_files[n] for n in vtk_files if n in out_files]
 
     # .pvd インデックスファイル生成
     pvd_name = prefix + '.pvd'
     pvd_lines = ['<?xml version="1.0"?>\n<VTKFile type="Collection">\n  <Collection>\n']
-    for i, vtk_name in enumerate(vtk_files):
-        pvd_lines.append(f'    <DataSet timestep="{i}" file="{vtk_name}"/>\n')
+    for i, name in enumerate(result_files):
+        pvd_lines.append(f'    <DataSet timestep="{i}" file="{name}"/>\n')
     pvd_lines.append('  </Collection>\n</VTKFile>\n')
     (job_dir / pvd_name).write_text(''.join(pvd_lines), encoding='utf-8')
-    vtk_files.append(pvd_name)
+    result_files.append(pvd_name)
 
-    return JSONResponse({
+    return {
         'job_id':    job_id,
         'stdout':    '\n'.join(logs[-20:]),
-        'vtk_files': vtk_files,
+        'vtk_files': result_files,
         'success':   all_ok,
-    })
+    }
 
 
 @app.get("/api/vtk-jobs")
@@ -505,7 +745,7 @@ async def list_vtk_jobs():
         for job_dir in sorted(JOBS_DIR.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True):
             if not job_dir.is_dir():
                 continue
-            vtk_files = sorted(f.name for f in job_dir.iterdir() if f.suffix == '.vtk')
+            vtk_files = sorted(f.name for f in job_dir.iterdir() if f.suffix in ('.vtk', '.vtu'))
             pvd_files = sorted(f.name for f in job_dir.iterdir() if f.suffix == '.pvd')
             if vtk_files or pvd_files:
                 import time
@@ -536,7 +776,7 @@ async def delete_all_vtk_jobs():
         for job_dir in JOBS_DIR.iterdir():
             if not job_dir.is_dir():
                 continue
-            has_vtk = any(f.suffix in ('.vtk', '.pvd') for f in job_dir.iterdir())
+            has_vtk = any(f.suffix in ('.vtk', '.vtu', '.pvd') for f in job_dir.iterdir())
             if has_vtk:
                 shutil.rmtree(job_dir, ignore_errors=True)
                 deleted.append(job_dir.name)
@@ -38,6 +38,42 @@ async function apiPost(url, formData) {
   return json;
 }
 
+// ソルバー実行はタスクとして受け付けられる (202)。SSE で完了まで待ち、
+// EventSource が使えない/切れた場合はポーリングに切り替える。
+function waitTask(task, onUpdate) {
+  return new Promise((resolve, reject) => {
+    const settle = t => {
+      if (onUpdate) onUpdate(t);
+      if (t.state === 'done') { resolve(t.result); return true; }
+      if (t.state === 'failed' || t.state === 'cancelled') {
+        reject(new Error(t.state === 'cancelled' ? 'キャンセルされました' : (t.error || 'タスク失敗')));
+        return true;
+      }
+      return false;
+    };
+    const poll = async () => {
+      try {
+        const res = await fetch(API + `/api/tasks/${task.task_id}`);
+        const t = await res.json();
+        if (!res.ok) throw new Error(t.detail || 'API エラー');
+        if (!settle(t)) setTimeout(poll, 1000);
+      } catch (e) {
+        reject(e);
+      }
+    };
+    if (settle(task)) return;
+    if (!window.EventSource) { poll(); return; }
+    const es = new EventSource(API + `/api/tasks/${task.task_id}/events`);
+    es.onmessage = e => { if (settle(JSON.parse(e.data))) es.close(); };
+    es.onerror = () => { es.close(); poll(); };
+  });
+}
+
+function taskProgress(btnId, label) {
+  return t => setLoading(btnId, true,
+    `${label} ${Math.round(t.progress * 100)}% ${t.current || ''}`);
+}
+
 // ── タブ切替 ──────────────────────────────────────────────────────────────────
 function switchTab(n) {
   document.querySelectorAll('.tab-content').forEach(el => el.classList.remove('active'));
@@ -329,7 +365,8 @@ async function runRadioss() {
   const fd = new FormData();
   fd.append('job_id', state.jobId);
   try {
-    const res = await apiPost('/api/run-radioss', fd);
+    const task = await apiPost('/api/run-radioss', fd);
+    const res  = await waitTask(task, taskProgress('btn-run-radioss', 'OpenRadioss'));
     let html = '<div style="margin-top:10px">';
     for (const [label, r] of Object.entries(res.results)) {
       html += `<div class="msg ${r.success?'msg-ok':'msg-warn'}">
@@ -356,7 +393,8 @@ async function runCalculix() {
   const fd = new FormData();
   fd.append('job_id', state.jobId);
   try {
-    const res = await apiPost('/api/run-calculix', fd);
+    const task = await apiPost('/api/run-calculix', fd);
+    const res  = await waitTask(task, taskProgress('btn-run-ccx', 'CalculiX'));
     let html = '<div style="margin-top:10px">';
     for (const [label, r] of Object.entries(res.results)) {
       html += `<div class="msg ${r.success?'msg-ok':'msg-warn'}">
@@ -444,8 +482,12 @@ async function runAnimToVtk() {
 
   const fd = new FormData();
   fd.append('prefix', prefix);
+  fd.append('output', $('anim-output-select').value);
   try {
-    const res = await apiPost('/api/anim-to-vtk', fd);
+    const task = await apiPost('/api/anim-to-vtk', fd);
+    const res  = await waitTask(task, t =>
+      msg('anim-convert-msg', 'info',
+        `<span class="spinner"></span>${Math.round(t.progress * 100)}% ${t.current || ''}`));
     renderAnimResult(res);
     msg('anim-convert-msg', res.success ? 'ok' : 'warn',
       res.success ? '✅ 変換完了' : '⚠ 変換に一部エラーがあります（ログを確認してください）');
@@ -0,0 +1,228 @@
+"""
+task_queue.py — ソルバー実行タスクキュー
+
+OpenRadioss / CalculiX / ANIM→VTK の実行はイベントループを塞がないよう
+スレッドプールで実行し、タスクIDで状態を問い合わせる。
+
+  - TaskQueue.submit()  : 上限付きキューに投入 (満杯なら QueueFull)
+  - TaskQueue.hold()    : コンテナ単位の同時実行数 + 同名デッキの排他
+                          (/work の入出力ファイル名が衝突しないように)
+  - Task.run()          : subprocess 実行。キャンセル/タイムアウト時は
+                          ローカルプロセスとコンテナ内プロセスグループを停止
+
+状態: queued → running → done | failed | cancelled
+タスクはメモリ上のみ (再起動で消える)。完了済みは TASK_KEEP 件まで保持。
+
+環境変数:
+  PDIE_TASK_WORKERS    同時実行タスク数 (default 4)
+  PDIE_TASK_QUEUE_MAX  未完了タスク数の上限 (default 32)
+  PDIE_TASK_KEEP       保持する完了済みタスク数 (default 200)
+"""
+import os
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, List, Optional
+
+TASK_WORKERS   = int(os.getenv("PDIE_TASK_WORKERS", "4"))
+TASK_QUEUE_MAX = int(os.getenv("PDIE_TASK_QUEUE_MAX", "32"))
+TASK_KEEP      = int(os.getenv("PDIE_TASK_KEEP", "200"))
+
+_POLL_SEC = 0.5
+FINISHED = ('done', 'failed', 'cancelled')
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Task:
+    def __init__(self, kind: str, job_id: Optional[str] = None):
+        self.id          = uuid.uuid4().hex[:12]
+        self.kind        = kind
+        self.job_id      = job_id
+        self.state       = 'queued'
+        self.progress    = 0.0
+        self.current     = '待機中'
+        self.result: Optional[dict] = None
+        self.error: Optional[str]   = None
+        self.created_at  = time.time()
+        self.started_at: Optional[float]  = None
+        self.finished_at: Optional[float] = None
+        self.version     = 0          # 状態が変わるたびに増える (SSE 差分検出用)
+        self._cancel     = threading.Event()
+        self._lock       = threading.Lock()
+
+    # ── 状態 ──────────────────────────────────────────────────────────────────
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def update(self, progress: Optional[float] = None, current: Optional[str] = None):
+        with self._lock:
+            if progress is not None:
+                self.progress = round(max(self.progress, min(progress, 1.0)), 3)
+            if current is not None:
+                self.current = current
+            self.version += 1
+
+    def _set_state(self, state: str, **fields):
+        with self._lock:
+            self.state = state
+            for k, v in fields.items():
+                setattr(self, k, v)
+            self.version += 1
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise TaskCancelled()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                'task_id':     self.id,
+                'kind':        self.kind,
+                'job_id':      self.job_id,
+                'state':       self.state,
+                'progress':    self.progress,
+                'current':     self.current,
+                'result':      self.result,
+                'error':       self.error,
+                'created_at':  self.created_at,
+                'started_at':  self.started_at,
+                'finished_at': self.finished_at,
+            }
+
+    # ── 実行補助 ──────────────────────────────────────────────────────────────
+
+    def wait_for(self, acquire: Callable[[float], bool]):
+        """キャンセル可能な待機: acquire(timeout) が True を返すまで繰り返す"""
+        while not acquire(_POLL_SEC):
+            self.check_cancelled()
+
+    def run(self, cmd: List[str], timeout: float, cwd: Optional[str] = None,
+            on_abort: Optional[Callable[[], None]] = None) -> subprocess.CompletedProcess:
+        """
+        subprocess.run(capture_output=True, text=True) 相当。
+        キャンセル時は TaskCancelled、タイムアウト時は subprocess.TimeoutExpired。
+        いずれの場合もプロセスを kill し、on_abort (コンテナ内の停止処理) を呼ぶ。
+        """
+        self.check_cancelled()
+        proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                out, err = proc.communicate(timeout=_POLL_SEC)
+                return subprocess.CompletedProcess(cmd, proc.returncode, out, err)
+            except subprocess.TimeoutExpired:
+                cancelled = self._cancel.is_set()
+                if not cancelled and time.monotonic() < deadline:
+                    continue
+                proc.kill()
+                proc.communicate()
+                if on_abort:
+                    try:
+                        on_abort()
+                    except Exception:
+                        pass
+                if cancelled:
+                    raise TaskCancelled()
+                raise subprocess.TimeoutExpired(cmd, timeout)
+
+
+class TaskQueue:
+    def __init__(self, workers: int = TASK_WORKERS, max_pending: int = TASK_QUEUE_MAX,
+                 slots: Optional[Dict[str, int]] = None):
+        self._pool        = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pdie-task')
+        self._max_pending = max_pending
+        self._tasks: Dict[str, Task] = {}
+        self._slots = {name: threading.BoundedSemaphore(max(1, n)) for name, n in (slots or {}).items()}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock  = threading.Lock()
+
+    # ── 投入・参照 ────────────────────────────────────────────────────────────
+
+    def submit(self, kind: str, fn: Callable[[Task], dict], job_id: Optional[str] = None) -> Task:
+        """fn(task) をワーカーで実行し、戻り値を task.result に格納する"""
+        task = Task(kind, job_id)
+        with self._lock:
+            pending = sum(1 for t in self._tasks.values() if not t.finished)
+            if pending >= self._max_pending:
+                raise QueueFull(f"実行待ちタスクが上限 ({self._max_pending}) に達しています")
+            self._tasks[task.id] = task
+            self._prune()
+        self._pool.submit(self._execute, task, fn)
+        return task
+
+    def get(self, task_id: str) -> Optional[Task]:
+        return self._tasks.get(task_id)
+
+    def list(self, job_id: Optional[str] = None) -> List[Task]:
+        tasks = [t for t in list(self._tasks.values()) if job_id is None or t.job_id == job_id]
+        return sorted(tasks, key=lambda t: t.created_at, reverse=True)
+
+    def cancel(self, task_id: str) -> Optional[Task]:
+        task = self._tasks.get(task_id)
+        if task is None or task.finished:
+            return task
+        task._cancel.set()
+        if task.state == 'queued':
+            task._set_state('cancelled', current='キャンセル', finished_at=time.time())
+        else:
+            task.update(current='キャンセル中...')
+        return task
+
+    # ── 資源 ──────────────────────────────────────────────────────────────────
+
+    @contextmanager
+    def hold(self, task: Task, container: str, key: Optional[str] = None):
+        """コンテナの実行枠と (任意) 排他キーを確保する。待機中もキャンセル可能"""
+        # 排他キーを先に取る: キー待ちのタスクが実行枠を占有しないように
+        with ExitStack() as stack:
+            if key is not None:
+                with self._lock:
+                    lock = self._locks.setdefault(key, threading.Lock())
+                task.wait_for(lambda t: lock.acquire(timeout=t))
+                stack.callback(lock.release)
+            sem = self._slots.get(container)
+            if sem is not None:
+                task.wait_for(lambda t: sem.acquire(timeout=t))
+                stack.callback(sem.release)
+            yield
+
+    # ── 内部 ──────────────────────────────────────────────────────────────────
+
+    def _execute(self, task: Task, fn: Callable[[Task], dict]):
+        if task.finished:       # 実行前にキャンセル済み
+            return
+        task._set_state('running', started_at=time.time(), current='実行中')
+        try:
+            result = fn(task)
+        except TaskCancelled:
+            task._set_state('cancelled', current='キャンセル', finished_at=time.time())
+        except Exception as e:
+            task._set_state('failed', error=str(e) or type(e).__name__,
+                            current=f'エラー: {e}', finished_at=time.time())
+        else:
+            task._set_state('done', result=result, progress=1.0,
+                            current='完了', finished_at=time.time())
+
+    def _prune(self):
+        done = [t for t in self._tasks.values() if t.finished]
+        if len(done) <= TASK_KEEP:
+            return
+        done.sort(key=lambda t: t.finished_at or 0)
+        for t in done[:len(done) - TASK_KEEP]:
+            del self._tasks[t.id]
@@ -0,0 +1,259 @@
+"""
+vtk_convert.py — レガシー ASCII VTK (anim_to_vtk 出力) → VTU (XML UnstructuredGrid)
+
+anim_to_vtk_linux64_gf はテキストの UNSTRUCTURED_GRID を出力する。フレーム数が
+多い陽解法の結果ではファイルが大きく ParaView の読み込みも遅いので、
+バイナリ (appended raw) + zlib 圧縮の .vtu に変換する。
+
+対応:
+  - DATASET UNSTRUCTURED_GRID (ASCII)
+  - CELLS: 旧形式 (個数付き) / 5.1 形式 (OFFSETS + CONNECTIVITY)
+  - POINT_DATA / CELL_DATA: SCALARS, VECTORS, NORMALS, TENSORS, FIELD
+  - データセット直下の FIELD (TIME, CYCLE など)
+
+未対応の構造 (BINARY, 他の DATASET 等) は ValueError。
+呼び出し側は元の .vtk を残してフォールバックする。
+"""
+
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+
+# ── 型対応 ───────────────────────────────────────────────────────────────────
+_INT_TYPES = {
+    'bit', 'char', 'unsigned_char', 'short', 'unsigned_short', 'int',
+    'unsigned_int', 'long', 'unsigned_long', 'vtkidtype', 'vtktypeint64',
+    'vtktypeint32',
+}
+_VTU_TYPES = {
+    np.dtype(np.float32): 'Float32',
+    np.dtype(np.float64): 'Float64',
+    np.dtype(np.int32):   'Int32',
+    np.dtype(np.int64):   'Int64',
+    np.dtype(np.uint8):   'UInt8',
+}
+_BLOCK_SIZE = 1 << 15      # zlib ブロックサイズ (VTK 既定と同じ 32 KiB)
+
+
+def _dtype(vtk_type: str) -> np.dtype:
+    t = vtk_type.lower()
+    if t in _INT_TYPES:
+        return np.dtype(np.int32) if t in ('int', 'short', 'char', 'bit', 'vtktypeint32') \
+            else np.dtype(np.int64)
+    if t == 'double':
+        return np.dtype(np.float64)
+    if t == 'float':
+        return np.dtype(np.float32)
+    raise ValueError(f"未対応のデータ型: {vtk_type}")
+
+
+def _is_header(line: str) -> bool:
+    c = line[:1]
+    return c.isalpha() and line[:3].lower() not in ('nan', 'inf')
+
+
+# ── 読み込み ─────────────────────────────────────────────────────────────────
+
+def _blocks(lines: List[str]) -> List[Tuple[List[str], str]]:
+    """(ヘッダ行トークン, 後続の数値行を連結した文字列) の列"""
+    blocks: List[Tuple[List[str], str]] = []
+    header: Optional[List[str]] = None
+    data: List[str] = []
+    for line in lines:
+        s = line.strip()
+        if not s:
+            continue
+        if _is_header(s):
+            if header is not None:
+                blocks.append((header, ' '.join(data)))
+            header, data = s.split(), []
+        else:
+            data.append(s)
+    if header is not None:
+        blocks.append((header, ' '.join(data)))
+    return blocks
+
+
+def _numbers(text: str, count: int, dtype: np.dtype) -> np.ndarray:
+    parse = np.int64 if dtype.kind == 'i' else np.float64
+    arr = np.fromstring(text, dtype=parse, sep=' ') if text else np.empty(0, parse)
+    if arr.size != count:
+        raise ValueError(f"データ数が一致しません (期待 {count}, 実際 {arr.size})")
+    return arr.astype(dtype, copy=False)
+
+
+def _legacy_cells(data: np.ndarray, n_cells: int) -> Tuple[np.ndarray, np.ndarray]:
+    """旧形式 [n, id0..idn-1, n, ...] → (connectivity, offsets)"""
+    if n_cells == 0:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    k = int(data[0])
+    if data.size == n_cells * (k + 1):
+        table = data.reshape(n_cells, k + 1)
+        if np.all(table[:, 0] == k):
+            return table[:, 1:].reshape(-1), np.arange(1, n_cells + 1, dtype=np.int64) * k
+    values = data.tolist()
+    counts = [0] * n_cells
+    pos = 0
+    for i in range(n_cells):
+        counts[i] = values[pos]
+        pos += counts[i] + 1
+    counts = np.asarray(counts, np.int64)
+    if pos != data.size:
+        raise ValueError("CELLS のサイズが一致しません")
+    starts = np.cumsum(counts + 1) - counts
+    keep = np.ones(data.size, bool)
+    keep[starts - 1] = False
+    return data[keep], np.cumsum(counts)
+
+
+def read_legacy(path) -> dict:
+    """レガシー ASCII VTK を読み込み、メッシュ辞書を返す"""
+    text = Path(path).read_text(encoding='latin-1')
+    lines = text.splitlines()
+    if len(lines) < 4 or not lines[0].startswith('# vtk'):
+        raise ValueError("VTK ファイルではありません")
+    if lines[2].strip().upper() != 'ASCII':
+        raise ValueError(f"未対応の形式: {lines[2].strip()}")
+
+    mesh = {
+        'points': None, 'connectivity': None, 'offsets': None, 'types': None,
+        'point_data': {}, 'cell_data': {}, 'field_data': {},
+    }
+    target: Dict[str, np.ndarray] = mesh['field_data']
+    n_target = 0
+    blocks = _blocks(lines[3:])
+    i = 0
+    while i < len(blocks):
+        head, data = blocks[i]
+        key = head[0].upper()
+        i += 1
+        if key == 'DATASET':
+            if head[1].upper() != 'UNSTRUCTURED_GRID':
+                raise ValueError(f"未対応の DATASET: {head[1]}")
+        elif key == 'POINTS':
+            n = int(head[1])
+            mesh['points'] = _numbers(data, 3 * n, _dtype(head[2])).reshape(n, 3)
+        elif key == 'CELLS':
+            if i < len(blocks) and blocks[i][0][0].upper() == 'OFFSETS':
+                (_, od), (_, cd) = blocks[i], blocks[i + 1]
+                i += 2
+                offsets = _numbers(od, int(head[1]), np.dtype(np.int64))
+                mesh['offsets'] = offsets[1:]
+                mesh['connectivity'] = _numbers(cd, int(head[2]), np.dtype(np.int64))
+            else:
+                n = int(head[1])
+                raw = _numbers(data, int(head[2]), np.dtype(np.int64))
+                mesh['connectivity'], mesh['offsets'] = _legacy_cells(raw, n)
+        elif key == 'CELL_TYPES':
+            mesh['types'] = _numbers(data, int(head[1]), np.dtype(np.int64)).astype(np.uint8)
+        elif key in ('POINT_DATA', 'CELL_DATA'):
+            target = mesh['point_data' if key == 'POINT_DATA' else 'cell_data']
+            n_target = int(head[1])
+        elif key == 'SCALARS':
+            ncomp = int(head[3]) if len(head) > 3 else 1
+            if i >= len(blocks) or blocks[i][0][0].upper() != 'LOOKUP_TABLE':
+                raise ValueError(f"SCALARS {head[1]} に LOOKUP_TABLE がありません")
+            arr = _numbers(blocks[i][1], n_target * ncomp, _dtype(head[2]))
+            i += 1
+            target[head[1]] = arr.reshape(n_target, ncomp) if ncomp > 1 else arr
+        elif key in ('VECTORS', 'NORMALS'):
+            target[head[1]] = _numbers(data, 3 * n_target, _dtype(head[2])).reshape(n_target, 3)
+        elif key == 'TENSORS':
+            target[head[1]] = _numbers(data, 9 * n_target, _dtype(head[2])).reshape(n_target, 9)
+        elif key == 'FIELD':
+            for _ in range(int(head[2])):
+                (name, ncomp, ntup, vtype), adata = blocks[i][0][:4], blocks[i][1]
+                i += 1
+                arr = _numbers(adata, int(ncomp) * int(ntup), _dtype(vtype))
+                target[name] = arr.reshape(int(ntup), int(ncomp)) if int(ncomp) > 1 else arr
+        elif key == 'METADATA':
+            # 5.1 のメタデータ (INFORMATION / COMPONENT_NAMES) は表示に不要
+            while i < len(blocks) and blocks[i][0][0].upper() in ('INFORMATION', 'NAME', 'DATA', 'COMPONENT_NAMES'):
+                i += 1
+        else:
+            raise ValueError(f"未対応のキーワード: {head[0]}")
+
+    if mesh['points'] is None or mesh['connectivity'] is None or mesh['types'] is None:
+        raise ValueError("POINTS / CELLS / CELL_TYPES がありません")
+    return mesh
+
+
+# ── 書き出し ─────────────────────────────────────────────────────────────────
+
+def _encode(arr: np.ndarray, compress: bool) -> bytes:
+    raw = np.ascontiguousarray(arr).tobytes()
+    if not compress:
+        return np.uint64(len(raw)).tobytes() + raw
+    blocks = [zlib.compress(raw[p:p + _BLOCK_SIZE], 6) for p in range(0, len(raw), _BLOCK_SIZE)] or [b'']
+    last = len(raw) - (len(blocks) - 1) * _BLOCK_SIZE if raw else 0
+    header = np.array([len(blocks), _BLOCK_SIZE, last] + [len(b) for b in blocks], dtype=np.uint64)
+    return header.tobytes() + b''.join(blocks)
+
+
+def write_vtu(mesh: dict, path, compress: bool = True) -> Path:
+    """メッシュ辞書を VTU (appended raw, 任意で zlib 圧縮) として書き出す"""
+    path = Path(path)
+    appended: List[bytes] = []
+    offset = 0
+
+    def array_xml(name: str, arr: np.ndarray, extra: str = '') -> str:
+        nonlocal offset
+        arr = np.asarray(arr)
+        if arr.dtype not in _VTU_TYPES:
+            arr = arr.astype(np.float64 if arr.dtype.kind == 'f' else np.int64)
+        ncomp = arr.shape[1] if arr.ndim > 1 else 1
+        blob = _encode(arr, compress)
+        xml = (f'<DataArray type="{_VTU_TYPES[arr.dtype]}" Name={quoteattr(name)} '
+               f'NumberOfComponents="{ncomp}"{extra} format="appended" offset="{offset}"/>')
+        appended.append(blob)
+        offset += len(blob)
+        return xml
+
+    points = mesh['points']
+    parts = ['<?xml version="1.0"?>\n']
+    comp = ' compressor="vtkZLibDataCompressor"' if compress else ''
+    parts.append(f'<VTKFile type="UnstructuredGrid" version="1.0" byte_order="LittleEndian" '
+                 f'header_type="UInt64"{comp}>\n<UnstructuredGrid>\n')
+    if mesh['field_data']:
+        parts.append('<FieldData>\n')
+        for name, arr in mesh['field_data'].items():
+            arr = np.atleast_1d(arr)
+            parts.append(array_xml(name, arr, f' NumberOfTuples="{arr.shape[0]}"') + '\n')
+        parts.append('</FieldData>\n')
+    parts.append(f'<Piece NumberOfPoints="{len(points)}" NumberOfCells="{len(mesh["types"])}">\n')
+    for tag, key in (('PointData', 'point_data'), ('CellData', 'cell_data')):
+        parts.append(f'<{tag}>\n')
+        for name, arr in mesh[key].items():
+            parts.append(array_xml(name, arr) + '\n')
+        parts.append(f'</{tag}>\n')
+    parts.append('<Points>\n' + array_xml('Points', points) + '\n</Points>\n')
+    parts.append('<Cells>\n')
+    parts.append(array_xml('connectivity', mesh['connectivity'].astype(np.int64, copy=False)) + '\n')
+    parts.append(array_xml('offsets', mesh['offsets'].astype(np.int64, copy=False)) + '\n')
+    parts.append(array_xml('types', mesh['types'].astype(np.uint8, copy=False)) + '\n')
+    parts.append('</Cells>\n</Piece>\n</UnstructuredGrid>\n<AppendedData encoding="raw">\n_')
+
+    with open(path, 'wb') as f:
+        f.write(''.join(parts).encode('utf-8'))
+        for blob in appended:
+            f.write(blob)
+        f.write(b'\n</AppendedData>\n</VTKFile>\n')
+    return path
+
+
+def legacy_to_vtu(src, dst=None, compress: bool = True) -> Path:
+    """レガシー .vtk → .vtu (dst 省略時は拡張子を置き換え)"""
+    src = Path(src)
+    dst = Path(dst) if dst else src.with_suffix('.vtu')
+    return write_vtu(read_legacy(src), dst, compress=compress)
+
+
+def convert_file(path: str, compress: bool = True) -> str:
+    """.vtk → .vtu (プロセスプール用)。成功したら元の .vtk を削除し、.vtu のファイル名を返す"""
+    src = Path(path)
+    dst = legacy_to_vtu(src, compress=compress)
+    src.unlink()
+    return dst.name
@@ -14,6 +14,10 @@ import pypdf
 import docx
 import openpyxl
 import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # --- CONFIG ---
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://ollama:11434")
@@ -38,6 +42,14 @@ WHYWHY_MODEL_GEMINI = os.getenv("WHYWHY_MODEL_GEMINI", "openai/gemini-2.5-flash"
 WHYWHY_MODEL_CHATGPT = os.getenv("WHYWHY_MODEL_CHATGPT", "gpt-5.4")
 WHYWHY_MODEL_CLAUDE = os.getenv("WHYWHY_MODEL_CLAUDE", "anthropic/claude-sonnet-4-5")
 WHYWHY_MODEL_COSTS_JSON = os.getenv("WHYWHY_MODEL_COSTS_JSON", "")
+WHYWHY_AGENT_CONCURRENT = os.getenv("WHYWHY_AGENT_CONCURRENT", "1") != "0"
+WHYWHY_AGENT_TIMEOUT_SEC = float(os.getenv("WHYWHY_AGENT_TIMEOUT_SEC", "90"))
+RETRIEVAL_TTL_SEC = {
+    "embedding": float(os.getenv("RETRIEVAL_TTL_EMBEDDING_SEC", "86400")),
+    "internal": float(os.getenv("RETRIEVAL_TTL_INTERNAL_SEC", "600")),
+    "web": float(os.getenv("RETRIEVAL_TTL_WEB_SEC", "3600")),
+}
+RETRIEVAL_CACHE_MAX_ENTRIES = int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", "512"))
 COLLECTION_NAME = "iatf_knowledge"
 
 WHYWHY_AGENT_CATALOG = {
@@ -179,6 +191,98 @@ def merge_reference_context(*sections):
             blocks.append(f"{title}:\n{body}")
     return "\n\n".join(blocks)
 
+class RetrievalCache:
+    """Thread-safe TTL cache for reference lookups, one namespace per source."""
+
+    def __init__(self, max_entries=RETRIEVAL_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, source, key):
+        with self._lock:
+            entry = self._entries.get((source, key))
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[(source, key)]
+                return False, None
+            return True, value
+
+    def put(self, source, key, value):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                self._entries = {k: v for k, v in self._entries.items() if v[0] >= now}
+                while len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[(source, key)] = (time.monotonic() + RETRIEVAL_TTL_SEC[source], value)
+
+@st.cache_resource
+def get_retrieval_cache():
+    # Module globals are rebuilt on every Streamlit rerun; cache_resource keeps one cache per process.
+    return RetrievalCache()
+
+def normalize_query(text):
+    return " ".join(unicodedata.normalize("NFKC", text or "").lower().split())
+
+def cached_lookup(cache, source, key, fetch):
+    """Return (value, "hit"|"miss"); empty results are not cached so outages retry."""
+    hit, value = cache.get(source, key)
+    if hit:
+        return value, "hit"
+    value = fetch()
+    if value:
+        cache.put(source, key, value)
+    return value, "miss"
+
+def cached_internal_context(cache, query, limit):
+    def fetch():
+        vec, _ = cached_lookup(cache, "embedding", normalize_query(query), lambda: get_embedding(query))
+        return search_qdrant(vec, limit=limit) if vec else ""
+    return cached_lookup(cache, "internal", (normalize_query(query), limit), fetch)
+
+def cached_web_context(cache, query, limit=3):
+    return cached_lookup(cache, "web", (normalize_query(query), limit), lambda: search_web(query, limit=limit))
+
+def retrieve_reference_context(query, web_query, use_internal_docs=True, use_web_docs=True, rag_limit=5):
+    """Fetch internal RAG and web context, from cache where possible.
+
+    On a miss the Qdrant and SearXNG lookups run in parallel.  Returns
+    (rag_context, web_context, status) where status records hit/miss/off
+    per source and the elapsed milliseconds.
+    """
+    started = time.perf_counter()
+    # Resolve the cache_resource on the script thread; the lookup workers have no ScriptRunContext.
+    cache = get_retrieval_cache()
+    status = {"internal": "off", "web": "off"}
+    lookups = {}
+    if use_internal_docs:
+        lookups["internal"] = lambda: cached_internal_context(cache, query, rag_limit)
+    if use_web_docs:
+        lookups["web"] = lambda: cached_web_context(cache, web_query)
+    results = {}
+    if len(lookups) > 1:
+        with ThreadPoolExecutor(max_workers=len(lookups), thread_name_prefix="retrieval") as executor:
+            futures = {name: executor.submit(fn) for name, fn in lookups.items()}
+            results = {name: future.result() for name, future in futures.items()}
+    else:
+        results = {name: fn() for name, fn in lookups.items()}
+    for name, (_, state) in results.items():
+        status[name] = state
+    status["elapsed_ms"] = (time.perf_counter() - started) * 1000
+    rag_context = results.get("internal", ("", "off"))[0]
+    web_context = results.get("web", ("", "off"))[0]
+    return rag_context, web_context, status
+
+def format_retrieval_status(status):
+    icons = {"hit": "cache hit", "miss": "fetched", "off": "off"}
+    return (
+        f"Reference context: internal {icons.get(status.get('internal'), '-')} / "
+        f"web {icons.get(status.get('web'), '-')} | {status.get('elapsed_ms', 0):.0f} ms"
+    )
+
 def load_whywhy_cost_table():
     if not WHYWHY_MODEL_COSTS_JSON.strip():
         return {}
@@ -227,7 +331,7 @@ def ask_ai_local(prompt, context_text=""):
     except Exception as e:
         return f"笞・・AI Offline: {e}"
 
-def ask_ai_deep(prompt, context_text="", model_name="", system_prompt_override=""):
+def ask_ai_deep(prompt, context_text="", model_name="", system_prompt_override="", timeout=90):
     selected_model = model_name or FMEA_DEEP_MODEL
     if not selected_model:
         return "Deep AI model is not configured."
@@ -253,7 +357,7 @@ def ask_ai_deep(prompt, context_text="", model_name="", system_prompt_override="
         data=json.dumps(body).encode("utf-8"),
         headers=headers,
     )
-    with urllib.request.urlopen(req, timeout=90) as response:
+    with urllib.request.urlopen(req, timeout=timeout) as response:
         payload = json.loads(response.read().decode("utf-8"))
     choices = payload.get("choices", [])
     if not choices:
@@ -470,7 +574,7 @@ def build_gdt_checklist_markdown(model_name: str, drawing_name: str = "") -> str
     ]
     return "\n".join(lines)
 
-def ask_ai_deep_with_meta(prompt, context_text="", model_name="", system_prompt_override=""):
+def ask_ai_deep_with_meta(prompt, context_text="", model_name="", system_prompt_override="", timeout=90):
     selected_model = model_name or FMEA_DEEP_MODEL
     if not selected_model:
         return {
@@ -502,7 +606,7 @@ def ask_ai_deep_with_meta(prompt, context_text="", model_name="", system_prompt_
         data=json.dumps(body).encode("utf-8"),
         headers=headers,
     )
-    with urllib.request.urlopen(req, timeout=90) as response:
+    with urllib.request.urlopen(req, timeout=timeout) as response:
         payload = json.loads(response.read().decode("utf-8"))
     choices = payload.get("choices", [])
     message = choices[0].get("message", {}) if choices else {}
@@ -545,29 +649,22 @@ def build_whywhy_context(problem, whys, use_internal_docs=True, use_web_docs=Tru
     query_parts = [problem, *[item for item in whys if item]]
     query = " | ".join([part for part in query_parts if part]).strip()
     if not query:
-        return "", "", "", ""
-    rag_context = ""
-    if use_internal_docs:
-        vec = get_embedding(query)
-        rag_context = search_qdrant(vec, limit=rag_limit) if vec else ""
-    web_context = ""
-    if use_web_docs:
-        web_context = search_web(f'5 why root cause analysis manufacturing quality {problem}', limit=3)
+        return "", "", "", "", {}
+    rag_context, web_context, status = retrieve_reference_context(
+        query,
+        f'5 why root cause analysis manufacturing quality {problem}',
+        use_internal_docs=use_internal_docs,
+        use_web_docs=use_web_docs,
+        rag_limit=rag_limit,
+    )
     context = merge_reference_context(
         ("MITSUI / INTERNAL QUALITY KNOWLEDGE", rag_context),
         ("PUBLIC WEB KNOWLEDGE", web_context),
     )
-    return query, rag_context, web_context, context
+    return query, rag_context, web_context, context, status
 
-def run_whywhy_agents(problem, whys, selected_agent_names, context_text, synthesis_enabled=True):
-    steps_text = "\n".join([f"{index}. {item}" for index, item in enumerate(whys, start=1) if item]) or "(No why steps entered)"
-    role_plan = {
-        1: "Lead Investigator",
-        2: "Logic Auditor",
-        3: "Countermeasure Critic",
-    }
-    agent_outputs = []
-    usage_rollup = {
+def new_usage_rollup():
+    return {
         "prompt_tokens": 0,
         "completion_tokens": 0,
         "total_tokens": 0,
@@ -575,6 +672,117 @@ def run_whywhy_agents(problem, whys, selected_agent_names, context_text, synthes
         "cost_known": False,
         "calls": 0,
     }
+
+def add_usage_to_rollup(usage_rollup, reply_meta):
+    usage = reply_meta.get("usage", {})
+    usage_rollup["prompt_tokens"] += usage.get("prompt_tokens", 0)
+    usage_rollup["completion_tokens"] += usage.get("completion_tokens", 0)
+    usage_rollup["total_tokens"] += usage.get("total_tokens", 0)
+    usage_rollup["calls"] += 1
+    if isinstance(reply_meta.get("estimated_cost_usd"), (int, float)):
+        usage_rollup["estimated_cost_usd"] += float(reply_meta["estimated_cost_usd"])
+        usage_rollup["cost_known"] = True
+
+def finalize_usage_rollup(usage_rollup):
+    usage_rollup["estimated_cost_usd"] = usage_rollup["estimated_cost_usd"] if usage_rollup["cost_known"] else None
+    return usage_rollup
+
+def failed_agent_meta(model_name, error):
+    return {
+        "content": f"[Agent review unavailable: {error}]",
+        "model": model_name,
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        "estimated_cost_usd": None,
+        "error": str(error),
+    }
+
+def run_agent_job(job, context_text, timeout_sec):
+    try:
+        return ask_ai_deep_with_meta(
+            job["prompt"],
+            context_text=context_text,
+            system_prompt_override=job["system_prompt"],
+            model_name=job["agent"].get("model", ""),
+            timeout=timeout_sec,
+        )
+    except Exception as e:
+        if isinstance(e, TimeoutError) or isinstance(getattr(e, "reason", None), TimeoutError):
+            e = f"timed out after {timeout_sec:.0f}s"
+        return failed_agent_meta(job["agent"].get("model", ""), e)
+
+def run_agent_fanout(agent_jobs, context_text, usage_rollup, concurrent=None, timeout_sec=None, on_agent_done=None):
+    """Run one deep-AI review per agent job and return the outputs in job order.
+
+    With concurrent mode every agent is sent to LiteLLM at once, so a review
+    takes about as long as the slowest agent instead of the sum of all of
+    them.  Each agent call times out on its own after timeout_sec (socket
+    timeout of the LiteLLM request) and is then recorded as failed, so the
+    fan-out waits for every agent and no reply or token usage is dropped.
+    Results are collected, added to usage_rollup and passed to on_agent_done
+    on the calling thread, so the rollup needs no lock and the callback may
+    write Streamlit elements.  Failed agents are not counted as calls.
+    """
+    concurrent = WHYWHY_AGENT_CONCURRENT if concurrent is None else concurrent
+    timeout_sec = WHYWHY_AGENT_TIMEOUT_SEC if timeout_sec is None else timeout_sec
+    outputs = [None] * len(agent_jobs)
+
+    def record(index, reply_meta):
+        job = agent_jobs[index]
+        if not reply_meta.get("error"):
+            add_usage_to_rollup(usage_rollup, reply_meta)
+        outputs[index] = {
+            "agent_name": job["agent_name"],
+            "assigned_role": job["assigned_role"],
+            "model": reply_meta.get("model", job["agent"].get("model", "")),
+            "focus": job["agent"].get("focus", ""),
+            "reply": reply_meta.get("content", ""),
+            "usage": reply_meta.get("usage", {}),
+            "estimated_cost_usd": reply_meta.get("estimated_cost_usd"),
+            "error": reply_meta.get("error"),
+        }
+        if on_agent_done:
+            on_agent_done(outputs[index])
+
+    if not concurrent or len(agent_jobs) <= 1:
+        for index, job in enumerate(agent_jobs):
+            record(index, run_agent_job(job, context_text, timeout_sec))
+        return outputs
+
+    executor = ThreadPoolExecutor(max_workers=len(agent_jobs), thread_name_prefix="review-agent")
+    futures = {
+        executor.submit(run_agent_job, job, context_text, timeout_sec): index
+        for index, job in enumerate(agent_jobs)
+    }
+    try:
+        for future in as_completed(futures):
+            record(futures[future], future.result())
+    finally:
+        executor.shutdown(wait=True)
+    return outputs
+
+def make_agent_progress_callback(placeholder, total):
+    """Return an on_agent_done callback that shows each review as it lands."""
+    done = []
+
+    def on_agent_done(item):
+        done.append(item)
+        with placeholder.container():
+            st.caption(f"Agent reviews received: {len(done)}/{total}")
+            for entry in done:
+                status = "⚠️" if entry.get("error") else "✅"
+                with st.expander(f"{status} {entry['agent_name']} | {entry['assigned_role']} | {entry['model']}"):
+                    st.markdown(entry["reply"])
+
+    return on_agent_done
+
+def run_whywhy_agents(problem, whys, selected_agent_names, context_text, synthesis_enabled=True, concurrent=None, on_agent_done=None):
+    steps_text = "\n".join([f"{index}. {item}" for index, item in enumerate(whys, start=1) if item]) or "(No why steps entered)"
+    role_plan = {
+        1: "Lead Investigator",
+        2: "Logic Auditor",
+        3: "Countermeasure Critic",
+    }
+    agent_jobs = []
     for index, agent_name in enumerate(selected_agent_names, start=1):
         agent = WHYWHY_AGENT_CATALOG.get(agent_name, {})
         assigned_role = role_plan.get(index, agent.get("role", "Reviewer"))
@@ -601,34 +809,26 @@ Task:
 6. If the backward check fails, point out the exact why-step where the reverse logic breaks.
 7. Keep the response concise and structured.
 """
-        reply_meta = ask_ai_deep_with_meta(
-            prompt,
-            context_text=context_text,
-            system_prompt_override=system_prompt,
-            model_name=agent.get("model", ""),
-        )
-        usage = reply_meta.get("usage", {})
-        usage_rollup["prompt_tokens"] += usage.get("prompt_tokens", 0)
-        usage_rollup["completion_tokens"] += usage.get("completion_tokens", 0)
-        usage_rollup["total_tokens"] += usage.get("total_tokens", 0)
-        usage_rollup["calls"] += 1
-        if isinstance(reply_meta.get("estimated_cost_usd"), (int, float)):
-            usage_rollup["estimated_cost_usd"] += float(reply_meta["estimated_cost_usd"])
-            usage_rollup["cost_known"] = True
-        agent_outputs.append({
+        agent_jobs.append({
             "agent_name": agent_name,
             "assigned_role": assigned_role,
-            "model": reply_meta.get("model", agent.get("model", "")),
-            "focus": agent.get("focus", ""),
-            "reply": reply_meta.get("content", ""),
-            "usage": usage,
-            "estimated_cost_usd": reply_meta.get("estimated_cost_usd"),
+            "agent": agent,
+            "prompt": prompt,
+            "system_prompt": system_prompt,
         })
 
+    usage_rollup = new_usage_rollup()
+    agent_outputs = run_agent_fanout(
+        agent_jobs,
+        context_text,
+        usage_rollup,
+        concurrent=concurrent,
+        on_agent_done=on_agent_done,
+    )
+
     if not synthesis_enabled:
         summary = agent_outputs[0]["reply"] if agent_outputs else "No agent output."
-        usage_rollup["estimated_cost_usd"] = usage_rollup["estimated_cost_usd"] if usage_rollup["cost_known"] else None
-        return agent_outputs, summary, usage_rollup
+        return agent_outputs, summary, finalize_usage_rollup(usage_rollup)
 
     synthesis_prompt = f"""
 Problem:
@@ -661,33 +861,25 @@ Create a final integrated 5-Why review with these sections:
         ),
         model_name=moderator.get("model", ""),
     )
-    synthesis_usage = synthesis_meta.get("usage", {})
-    usage_rollup["prompt_tokens"] += synthesis_usage.get("prompt_tokens", 0)
-    usage_rollup["completion_tokens"] += synthesis_usage.get("completion_tokens", 0)
-    usage_rollup["total_tokens"] += synthesis_usage.get("total_tokens", 0)
-    usage_rollup["calls"] += 1
-    if isinstance(synthesis_meta.get("estimated_cost_usd"), (int, float)):
-        usage_rollup["estimated_cost_usd"] += float(synthesis_meta["estimated_cost_usd"])
-        usage_rollup["cost_known"] = True
-    usage_rollup["estimated_cost_usd"] = usage_rollup["estimated_cost_usd"] if usage_rollup["cost_known"] else None
-    return agent_outputs, synthesis_meta.get("content", ""), usage_rollup
+    add_usage_to_rollup(usage_rollup, synthesis_meta)
+    return agent_outputs, synthesis_meta.get("content", ""), finalize_usage_rollup(usage_rollup)
 
 def build_standard_review_context(query, web_query, use_internal_docs=True, use_web_docs=True, rag_limit=5):
     query = (query or "").strip()
     if not query:
-        return "", "", "", ""
-    rag_context = ""
-    if use_internal_docs:
-        vec = get_embedding(query)
-        rag_context = search_qdrant(vec, limit=rag_limit) if vec else ""
-    web_context = ""
-    if use_web_docs:
-        web_context = search_web(web_query, limit=3)
+        return "", "", "", "", {}
+    rag_context, web_context, status = retrieve_reference_context(
+        query,
+        web_query,
+        use_internal_docs=use_internal_docs,
+        use_web_docs=use_web_docs,
+        rag_limit=rag_limit,
+    )
     context = merge_reference_context(
         ("MITSUI / INTERNAL QUALITY KNOWLEDGE", rag_context),
         ("PUBLIC WEB KNOWLEDGE", web_context),
     )
-    return query, rag_context, web_context, context
+    return query, rag_context, web_context, context, status
 
 def run_multi_agent_quality_review(
     subject_title,
@@ -697,21 +889,15 @@ def run_multi_agent_quality_review(
     review_task_text,
     synthesis_task_text,
     synthesis_enabled=True,
+    concurrent=None,
+    on_agent_done=None,
 ):
     role_plan = {
         1: "Lead Investigator",
         2: "Logic Auditor",
         3: "Countermeasure Critic",
     }
-    agent_outputs = []
-    usage_rollup = {
-        "prompt_tokens": 0,
-        "completion_tokens": 0,
-        "total_tokens": 0,
-        "estimated_cost_usd": 0.0,
-        "cost_known": False,
-        "calls": 0,
-    }
+    agent_jobs = []
     for index, agent_name in enumerate(selected_agent_names, start=1):
         agent = WHYWHY_AGENT_CATALOG.get(agent_name, {})
         assigned_role = role_plan.get(index, agent.get("role", "Reviewer"))
@@ -729,34 +915,26 @@ def run_multi_agent_quality_review(
 Task:
 {review_task_text}
 """
-        reply_meta = ask_ai_deep_with_meta(
-            prompt,
-            context_text=context_text,
-            system_prompt_override=system_prompt,
-            model_name=agent.get("model", ""),
-        )
-        usage = reply_meta.get("usage", {})
-        usage_rollup["prompt_tokens"] += usage.get("prompt_tokens", 0)
-        usage_rollup["completion_tokens"] += usage.get("completion_tokens", 0)
-        usage_rollup["total_tokens"] += usage.get("total_tokens", 0)
-        usage_rollup["calls"] += 1
-        if isinstance(reply_meta.get("estimated_cost_usd"), (int, float)):
-            usage_rollup["estimated_cost_usd"] += float(reply_meta["estimated_cost_usd"])
-            usage_rollup["cost_known"] = True
-        agent_outputs.append({
+        agent_jobs.append({
             "agent_name": agent_name,
             "assigned_role": assigned_role,
-            "model": reply_meta.get("model", agent.get("model", "")),
-            "focus": agent.get("focus", ""),
-            "reply": reply_meta.get("content", ""),
-            "usage": usage,
-            "estimated_cost_usd": reply_meta.get("estimated_cost_usd"),
+            "agent": agent,
+            "prompt": prompt,
+            "system_prompt": system_prompt,
         })
 
+    usage_rollup = new_usage_rollup()
+    agent_outputs = run_agent_fanout(
+        agent_jobs,
+        context_text,
+        usage_rollup,
+        concurrent=concurrent,
+        on_agent_done=on_agent_done,
+    )
+
     if not synthesis_enabled:
         summary = agent_outputs[0]["reply"] if agent_outputs else "No agent output."
-        usage_rollup["estimated_cost_usd"] = usage_rollup["estimated_cost_usd"] if usage_rollup["cost_known"] else None
-        return agent_outputs, summary, usage_rollup
+        return agent_outputs, summary, finalize_usage_rollup(usage_rollup)
 
     moderator_name = selected_agent_names[0] if selected_agent_names else "Gemini"
     moderator = WHYWHY_AGENT_CATALOG.get(moderator_name, {})
@@ -780,16 +958,8 @@ Task:
         ),
         model_name=moderator.get("model", ""),
     )
-    synthesis_usage = synthesis_meta.get("usage", {})
-    usage_rollup["prompt_tokens"] += synthesis_usage.get("prompt_tokens", 0)
-    usage_rollup["completion_tokens"] += synthesis_usage.get("completion_tokens", 0)
-    usage_rollup["total_tokens"] += synthesis_usage.get("total_tokens", 0)
-    usage_rollup["calls"] += 1
-    if isinstance(synthesis_meta.get("estimated_cost_usd"), (int, float)):
-        usage_rollup["estimated_cost_usd"] += float(synthesis_meta["estimated_cost_usd"])
-        usage_rollup["cost_known"] = True
-    usage_rollup["estimated_cost_usd"] = usage_rollup["estimated_cost_usd"] if usage_rollup["cost_known"] else None
-    return agent_outputs, synthesis_meta.get("content", ""), usage_rollup
+    add_usage_to_rollup(usage_rollup, synthesis_meta)
+    return agent_outputs, synthesis_meta.get("content", ""), finalize_usage_rollup(usage_rollup)
 
 def default_pfmea_rows(process_step):
     return [{
@@ -1486,8 +1656,9 @@ elif page == "FMEA Editor":
             f"Requirement: {requirement}\n"
             f"Current PFMEA rows:\n" + ("\n".join(records) if records else f"- Process Step: {process_step}")
         )
+        agent_progress = st.empty()
         with st.spinner("Reviewing FMEA with multiple AI agents..."):
-            query, rag_context, web_context, context = build_standard_review_context(
+            query, rag_context, web_context, context, retrieval_status = build_standard_review_context(
                 query=f"PFMEA {process_step} {process_function} {requirement} {' '.join([str(v) for v in edited_df.fillna('').astype(str).values.flatten()[:20]])}",
                 web_query=f"PFMEA manufacturing process function failure mode effect cause controls action {process_step}",
                 use_internal_docs=use_internal_docs,
@@ -1518,7 +1689,11 @@ elif page == "FMEA Editor":
                     "6. Evidence / procedures to confirm next"
                 ),
                 synthesis_enabled=mode_preset["synthesis"],
+                on_agent_done=make_agent_progress_callback(agent_progress, len(effective_agents)),
             )
+        agent_progress.empty()
+        if retrieval_status:
+            st.caption(format_retrieval_status(retrieval_status))
 
         st.subheader("Integrated Conclusion")
         st.markdown(synthesis)
@@ -1612,8 +1787,9 @@ elif page == "FTA (Fault Tree)":
             f"Current fault tree branch draft:\n" +
             "\n".join([f"- {item}" for item in cause_lines])
         )
+        agent_progress = st.empty()
         with st.spinner("Reviewing FTA with multiple AI agents..."):
-            query, rag_context, web_context, context = build_standard_review_context(
+            query, rag_context, web_context, context, retrieval_status = build_standard_review_context(
                 query=f"FTA {top_event} {' '.join(cause_lines)}",
                 web_query=f"fault tree analysis manufacturing root causes {top_event}",
                 use_internal_docs=use_internal_docs,
@@ -1641,7 +1817,11 @@ elif page == "FTA (Fault Tree)":
                     "5. Evidence to confirm next"
                 ),
                 synthesis_enabled=mode_preset["synthesis"],
+                on_agent_done=make_agent_progress_callback(agent_progress, len(effective_agents)),
             )
+        agent_progress.empty()
+        if retrieval_status:
+            st.caption(format_retrieval_status(retrieval_status))
 
         st.subheader("Integrated Conclusion")
         st.markdown(synthesis)
@@ -1723,8 +1903,9 @@ elif page == "Why-Why Analysis":
 
     if st.button("Run Multi-AI Review"):
         effective_agents = effective_agents or ["Gemini"]
+        agent_progress = st.empty()
         with st.spinner("Reviewing with multiple AI agents..."):
-            query, rag_context, web_context, context = build_whywhy_context(
+            query, rag_context, web_context, context, retrieval_status = build_whywhy_context(
                 problem,
                 whys,
                 use_internal_docs=use_internal_docs,
@@ -1737,7 +1918,11 @@ elif page == "Why-Why Analysis":
                 effective_agents,
                 context,
                 synthesis_enabled=mode_preset["synthesis"],
+                on_agent_done=make_agent_progress_callback(agent_progress, len(effective_agents)),
             )
+        agent_progress.empty()
+        if retrieval_status:
+            st.caption(format_retrieval_status(retrieval_status))
 
         st.subheader("Integrated Conclusion")
         st.markdown(synthesis)
@@ -15,6 +15,8 @@ from typing import Iterable
 
 import numpy as np
 
+from pose.store import PoseSequence
+
 
 THERBLIGS = {
     "TE": ("Transport Empty", False),
@@ -77,9 +79,12 @@ class TherbligLabeler:
         self.template = template
         self.expected_flow = template.get("expected_flow", [])
 
-    def label(self, segments: list[dict], pose_data: list[dict]) -> list[dict]:
-        fps = pose_data[0].get("fps", 30.0) if pose_data else 30.0
+    def label(self, segments: list[dict], pose_data: PoseSequence | list[dict]) -> list[dict]:
+        pose_data = PoseSequence.coerce(pose_data)
+        fps = pose_data.fps
         body_scale = self._estimate_body_scale(pose_data)
+        tracks = _PoseTracks(pose_data)
+        features_by_segment: list[dict] = []
 
         preliminary: list[dict] = []
         prev_label: str | None = None
@@ -88,7 +93,8 @@ class TherbligLabeler:
             s = seg["start_frame"]
             e = seg["end_frame"]
             dur = seg["end_sec"] - seg["start_sec"]
-            feats = self._extract_features(pose_data, s, e, fps)
+            feats = self._extract_features(tracks, s, e, fps)
+            features_by_segment.append(feats)
             classification = self._classify(feats, dur, prev_label, idx)
 
             label = classification["label"]
@@ -124,76 +130,25 @@ class TherbligLabeler:
             prev_label = label
 
         smoothed = self._smooth_labels(preliminary)
-        self._refresh_most_fields(smoothed, body_scale, [self._extract_features(
-            pose_data, seg["start_frame"], seg["end_frame"], fps
-        ) for seg in segments])
+        self._refresh_most_fields(smoothed, body_scale, features_by_segment)
         return smoothed
 
-    def _extract_features(self, pose_data: list[dict], s: int, e: int, fps: float) -> dict:
-        frames = pose_data[s: e + 1]
-        if not frames:
+    def _extract_features(self, tracks: "_PoseTracks", s: int, e: int, fps: float) -> dict:
+        s = max(s, 0)
+        e = min(e, tracks.n_frames - 1)
+        if e < s:
             return _empty_features()
+        n_frames = e - s + 1
+
+        right_wrist, right_vel = tracks.track(16, s, e)
+        left_wrist, left_vel = tracks.track(15, s, e)
+        right_shoulder, _ = tracks.track(12, s, e)
+        left_shoulder, _ = tracks.track(11, s, e)
+        trunk_count = tracks.trunk_count[e + 1] - tracks.trunk_count[s]
+        trunk_bend = (tracks.trunk_sum[e + 1] - tracks.trunk_sum[s]) / trunk_count if trunk_count else 0.0
+        lo, hi = np.searchsorted(tracks.spread_frames, (s, e + 1))
+        wrist_spread = tracks.spread[lo:hi]
 
-        right_wrist = []
-        left_wrist = []
-        right_shoulder = []
-        left_shoulder = []
-        nose = []
-        hips = []
-        trunk_angles = []
-        wrist_spread = []
-
-        for frame in frames:
-            lms = frame.get("landmarks", [])
-            n = len(lms)
-
-            def lm(i: int):
-                if n <= i:
-                    return None
-                item = lms[i]
-                if item.get("visibility", 0.0) <= 0.3:
-                    return None
-                return (item["x"], item["y"])
-
-            rw = lm(16)
-            lw = lm(15)
-            rs = lm(12)
-            ls = lm(11)
-            nd = lm(0)
-            rh = lm(24)
-            lh = lm(23)
-
-            if rw:
-                right_wrist.append(rw)
-            if lw:
-                left_wrist.append(lw)
-            if rs:
-                right_shoulder.append(rs)
-            if ls:
-                left_shoulder.append(ls)
-            if nd:
-                nose.append(nd)
-            if rh and lh:
-                hip_mid = ((rh[0] + lh[0]) / 2, (rh[1] + lh[1]) / 2)
-                hips.append(hip_mid)
-                if nd:
-                    dx = nd[0] - hip_mid[0]
-                    dy = nd[1] - hip_mid[1]
-                    if abs(dy) > 1e-6:
-                        trunk_angles.append(math.degrees(math.atan2(abs(dx), abs(dy))))
-            if rw and lw:
-                wrist_spread.append(math.hypot(rw[0] - lw[0], rw[1] - lw[1]))
-
-        def velocities(points: list[tuple[float, float]]) -> np.ndarray:
-            if len(points) < 2:
-                return np.array([0.0], dtype=float)
-            return np.array([
-                math.hypot(points[i][0] - points[i - 1][0], points[i][1] - points[i - 1][1])
-                for i in range(1, len(points))
-            ], dtype=float)
-
-        right_vel = velocities(right_wrist)
-        left_vel = velocities(left_wrist)
         right_travel = float(np.sum(right_vel))
         left_travel = float(np.sum(left_vel))
         active_side = "right" if right_travel >= left_travel else "left"
@@ -222,24 +177,21 @@ class TherbligLabeler:
 
         active_disp = 0.0
         if len(active_pts) >= 2:
-            active_disp = math.hypot(
-                active_pts[-1][0] - active_pts[0][0],
-                active_pts[-1][1] - active_pts[0][1],
-            )
+            active_disp = math.hypot(*(active_pts[-1] - active_pts[0]))
         path_efficiency = active_disp / max(active_travel, 1e-6)
 
         active_above_shoulder = False
-        if active_pts and active_shoulders:
-            active_above_shoulder = active_pts[-1][1] < active_shoulders[-1][1]
+        if len(active_pts) and len(active_shoulders):
+            active_above_shoulder = bool(active_pts[-1][1] < active_shoulders[-1][1])
 
         oscillations = _count_direction_reversals(active_pts)
         bilateral_ratio = min(right_travel, left_travel) / max(max(right_travel, left_travel), 1e-6)
         hand_separation_change = 0.0
         if len(wrist_spread) >= 2:
-            hand_separation_change = wrist_spread[-1] - wrist_spread[0]
+            hand_separation_change = float(wrist_spread[-1] - wrist_spread[0])
 
-        vis_ratio = (len(right_wrist) + len(left_wrist)) / max(len(frames) * 2, 1)
-        stillness_ratio = sum(1 for v in active_vel if v < 0.004) / max(len(active_vel), 1)
+        vis_ratio = (len(right_wrist) + len(left_wrist)) / max(n_frames * 2, 1)
+        stillness_ratio = np.count_nonzero(active_vel < 0.004) / max(len(active_vel), 1)
 
         return {
             "active_side": active_side,
@@ -254,12 +206,12 @@ class TherbligLabeler:
             "left_travel": left_travel,
             "path_efficiency": path_efficiency,
             "active_above_shoulder": active_above_shoulder,
-            "trunk_bend": float(np.mean(trunk_angles)) if trunk_angles else 0.0,
+            "trunk_bend": float(trunk_bend),
             "oscillations": oscillations,
             "bilateral_ratio": bilateral_ratio,
             "hand_separation_change": hand_separation_change,
             "vis_ratio": float(vis_ratio),
-            "n_frames": len(frames),
+            "n_frames": n_frames,
             "stillness_ratio": float(stillness_ratio),
             "start_stillness": start_stillness,
             "end_stillness": end_stillness,
@@ -460,19 +412,64 @@ class TherbligLabeler:
         return {"A": A, "B": B, "G": G, "P": P, "tmu": tmu}
 
     @staticmethod
-    def _estimate_body_scale(pose_data: list[dict]) -> float:
-        heights = []
-        for frame in pose_data[: min(100, len(pose_data))]:
-            lms = frame.get("landmarks", [])
-            if len(lms) < 25:
-                continue
-            nose = lms[0]
-            hip_y = (lms[23]["y"] + lms[24]["y"]) / 2
-            if nose["visibility"] > 0.5 and lms[23]["visibility"] > 0.5:
-                heights.append(abs(nose["y"] - hip_y))
-        if not heights:
+    def _estimate_body_scale(pose_data: PoseSequence) -> float:
+        head = pose_data.slice(0, min(100, len(pose_data)))
+        nose_y, hip_l_y, hip_r_y = (head.xy(i)[:, 1] for i in (0, 23, 24))
+        ok = head.visible(0, 0.5) & head.visible(23, 0.5) & np.isfinite(hip_r_y)
+        if not ok.any():
             return 0.005
-        return float(np.median(heights)) / 102 * 100
+        hip_y = (hip_l_y[ok] + hip_r_y[ok]) / 2
+        return float(np.median(np.abs(nose_y[ok] - hip_y))) / 102 * 100
+
+
+class _PoseTracks:
+    """Whole-sequence arrays that _extract_features() slices per segment.
+
+    For each tracked landmark: positions of the frames where it is visible
+    (visibility > 0.3) and the step length between consecutive visible
+    positions; a segment is then a searchsorted range instead of a per-frame
+    scan. Trunk bend uses prefix sums so its per-segment mean is O(1).
+    """
+
+    LANDMARKS = (11, 12, 15, 16)
+
+    def __init__(self, pose_data: PoseSequence):
+        self.n_frames = len(pose_data)
+        self.frames: dict[int, np.ndarray] = {}
+        self.points: dict[int, np.ndarray] = {}
+        self.steps: dict[int, np.ndarray] = {}
+        xy = {i: pose_data.xy(i) for i in (0, 11, 12, 15, 16, 23, 24)}
+        vis = {i: pose_data.visible(i, 0.3) for i in (0, 11, 12, 15, 16, 23, 24)}
+        for i in self.LANDMARKS:
+            self._add_track(i, vis[i], xy[i])
+
+        # Wrist spread, frames where both wrists are visible
+        self.spread_frames = np.flatnonzero(vis[16] & vis[15])
+        self.spread = np.hypot(*(xy[16] - xy[15])[self.spread_frames].T)
+
+        # Trunk bend: nose vs hip midpoint, frames where all three are visible
+        hip_mid = (xy[24] + xy[23]) / 2
+        d = xy[0] - hip_mid
+        with np.errstate(invalid="ignore"):
+            ok = vis[24] & vis[23] & vis[0] & (np.abs(d[:, 1]) > 1e-6)
+        angles = np.where(ok, np.degrees(np.arctan2(np.abs(d[:, 0]), np.abs(d[:, 1]))), 0.0)
+        self.trunk_sum = np.concatenate(([0.0], np.cumsum(angles)))
+        self.trunk_count = np.concatenate(([0], np.cumsum(ok)))
+
+    def _add_track(self, key: int, visible: np.ndarray, values: np.ndarray) -> None:
+        frames = np.flatnonzero(visible)
+        points = values[frames]
+        self.frames[key] = frames
+        self.points[key] = points
+        self.steps[key] = np.hypot(*np.diff(points, axis=0).T)
+
+    def track(self, key: int, s: int, e: int) -> tuple[np.ndarray, np.ndarray]:
+        """Visible positions within frames s..e and the step lengths between them."""
+        lo, hi = np.searchsorted(self.frames[key], (s, e + 1))
+        points = self.points[key][lo:hi]
+        if hi - lo < 2:
+            return points, np.array([0.0], dtype=float)
+        return points, self.steps[key][lo : hi - 1]
 
 
 def _a_index(travel_cm: float) -> int:
@@ -528,23 +525,15 @@ def _normalize_template_label(label: str) -> str:
     return mapping.get(label, label)
 
 
-def _count_direction_reversals(points: Iterable[tuple[float, float]]) -> int:
-    pts = list(points)
-    reversals = 0
+def _count_direction_reversals(points: Iterable[tuple[float, float]] | np.ndarray) -> int:
+    pts = np.asarray(points, dtype=float).reshape(-1, 2)
     if len(pts) < 5:
-        return reversals
-
-    xs = [pt[0] for pt in pts]
-    ys = [pt[1] for pt in pts]
-    for coords in (xs, ys):
-        for i in range(2, len(coords)):
-            d1 = coords[i - 1] - coords[i - 2]
-            d2 = coords[i] - coords[i - 1]
-            if abs(d1) < 1e-5 or abs(d2) < 1e-5:
-                continue
-            if d1 * d2 < 0:
-                reversals += 1
-    return reversals
+        return 0
+
+    d = np.diff(pts, axis=0)
+    d1, d2 = d[:-1], d[1:]
+    counted = (np.abs(d1) >= 1e-5) & (np.abs(d2) >= 1e-5) & (d1 * d2 < 0)
+    return int(np.count_nonzero(counted))
 
 
 def _visibility_multiplier(vis_ratio: float) -> float:
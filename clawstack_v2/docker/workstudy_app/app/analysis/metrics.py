@@ -3,6 +3,7 @@ Metrics Engine — Compute KPIs, waste patterns, and ergonomic risk.
 """
 import numpy as np
 from pose.estimator import PoseEstimator
+from pose.store import PoseSequence
 from analysis.most_calculator import MOSTCalculator
 
 
@@ -13,10 +14,11 @@ class MetricsEngine:
         self.waste_patterns = template.get("waste_patterns", [])
         self.focus_kpi = template.get("focus_kpi", [])
 
-    def compute(self, pose_data: list[dict], segments: list[dict], labels: list[dict]) -> dict:
+    def compute(self, pose_data: PoseSequence | list[dict], segments: list[dict], labels: list[dict]) -> dict:
         """Compute all metrics for the analysis."""
+        pose_data = PoseSequence.coerce(pose_data)
         total_frames = len(pose_data)
-        fps = pose_data[0].get("fps", 30.0) if pose_data else 30.0
+        fps = pose_data.fps
         total_time = total_frames / fps
 
         kpi = {}
@@ -138,45 +140,30 @@ class MetricsEngine:
             "most": most_result,
         }
 
-    def _compute_hand_travel(self, pose_data: list[dict]) -> float:
-        total = 0.0
-        prev = None
-        for frame in pose_data:
-            lms = frame.get("landmarks", [])
-            if len(lms) > 16:
-                curr = np.array([lms[16]["x"], lms[16]["y"]])
-                if prev is not None:
-                    total += np.linalg.norm(curr - prev)
-                prev = curr
-        return total
-
-    def _count_direction_changes(self, pose_data: list[dict]) -> int:
+    def _compute_hand_travel(self, pose_data: PoseSequence) -> float:
+        wrist = pose_data.xy(16)[pose_data.detected]
+        if len(wrist) < 2:
+            return 0.0
+        return float(np.sum(np.hypot(*np.diff(wrist, axis=0).T)))
+
+    def _count_direction_changes(self, pose_data: PoseSequence) -> int:
         """Improved Search detection: Count direction changes in hand trajectory."""
-        changes = 0
         if len(pose_data) < 5:
             return 0
-        
-        # Smoothed direction tracking
-        velocities = []
-        for i in range(1, len(pose_data)):
-            lms_prev = pose_data[i-1].get("landmarks", [])
-            lms_curr = pose_data[i].get("landmarks", [])
-            if len(lms_prev) > 16 and len(lms_curr) > 16:
-                v = np.array([lms_curr[16]["x"] - lms_prev[16]["x"], 
-                             lms_curr[16]["y"] - lms_prev[16]["y"]])
-                velocities.append(v)
-        
+
+        # Frame-to-frame wrist velocity, only where both frames have a pose
+        wrist = pose_data.xy(16)
+        both = pose_data.detected[1:] & pose_data.detected[:-1]
+        velocities = (wrist[1:] - wrist[:-1])[both]
         if len(velocities) < 2:
             return 0
-            
-        for i in range(1, len(velocities)):
-            v1 = velocities[i-1]
-            v2 = velocities[i]
-            if np.linalg.norm(v1) > 0.005 and np.linalg.norm(v2) > 0.005:
-                cos_sim = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
-                if cos_sim < 0: # Threshold for direction change (anti-parallel)
-                    changes += 1
-        return changes
+
+        speed = np.linalg.norm(velocities, axis=1)
+        v1, v2 = velocities[:-1], velocities[1:]
+        moving = (speed[:-1] > 0.005) & (speed[1:] > 0.005)
+        # cos_sim < 0 (anti-parallel) <=> dot product < 0 for non-zero vectors
+        reversed_ = np.einsum("ij,ij->i", v1, v2) < 0
+        return int(np.count_nonzero(moving & reversed_))
 
     def _count_recheck_loops(self, labels: list[dict]) -> int:
         loops = 0
@@ -187,17 +174,11 @@ class MetricsEngine:
                 loops += 1
         return loops
 
-    def _count_tilt_actions(self, pose_data: list[dict]) -> int:
+    def _count_tilt_actions(self, pose_data: PoseSequence) -> int:
         """Count wrist orientation/tilt actions (proxy for reflection check)."""
-        tilts = 0
-        for i in range(1, len(pose_data)):
-            lms = pose_data[i].get("landmarks", [])
-            if len(lms) > 16:
-                wrist_y = lms[16]["y"]
-                prev_lms = pose_data[i-1].get("landmarks", [])
-                if len(prev_lms) > 16:
-                    if abs(wrist_y - prev_lms[16]["y"]) > 0.03:
-                        tilts += 1
+        wrist_y = pose_data.xy(16)[:, 1]
+        both = pose_data.detected[1:] & pose_data.detected[:-1]
+        tilts = int(np.count_nonzero(both & (np.abs(wrist_y[1:] - wrist_y[:-1]) > 0.03)))
         return tilts // 10  # Normalize to actions
 
     def _count_label_switches(self, labels: list[dict]) -> int:
@@ -216,31 +197,23 @@ class MetricsEngine:
                 count += 1
         return count
 
-    def _compute_ergo(self, pose_data: list[dict]) -> dict:
+    def _compute_ergo(self, pose_data: PoseSequence) -> dict:
         trunk_threshold = self.ergo_thresholds.get("trunk_deg_gt", 40)
         shoulder_threshold = self.ergo_thresholds.get("shoulder_deg_gt", 60)
 
-        trunk_risk_frames = 0
-        shoulder_risk_frames = 0
-        valid_frames = 0
-
-        for frame in pose_data:
-            lms = frame.get("landmarks", [])
-            if len(lms) < 25:
-                continue
-            valid_frames += 1
+        shoulder, elbow, hip, knee = (pose_data.xy(i) for i in (11, 13, 23, 25))
+        valid = pose_data.detected & np.isfinite(np.hstack((shoulder, elbow, hip, knee))).all(axis=1)
+        shoulder, elbow, hip, knee = shoulder[valid], elbow[valid], hip[valid], knee[valid]
 
-            # Trunk: angle at hip (11-23-25 approximation)
-            trunk_angle = PoseEstimator.compute_angle(lms[11], lms[23], lms[25])
-            if abs(180 - trunk_angle) > trunk_threshold:
-                trunk_risk_frames += 1
+        # Trunk: angle at hip (11-23-25 approximation)
+        trunk_angle = PoseEstimator.compute_angles(shoulder, hip, knee)
+        trunk_risk_frames = int(np.count_nonzero(np.abs(180 - trunk_angle) > trunk_threshold))
 
-            # Shoulder: angle at shoulder (13-11-23)
-            shoulder_angle = PoseEstimator.compute_angle(lms[13], lms[11], lms[23])
-            if shoulder_angle > shoulder_threshold:
-                shoulder_risk_frames += 1
+        # Shoulder: angle at shoulder (13-11-23)
+        shoulder_angle = PoseEstimator.compute_angles(elbow, shoulder, hip)
+        shoulder_risk_frames = int(np.count_nonzero(shoulder_angle > shoulder_threshold))
 
-        total = max(valid_frames, 1)
+        total = max(int(np.count_nonzero(valid)), 1)
         return {
             "trunk_risk_ratio": round(trunk_risk_frames / total, 3),
             "shoulder_risk_ratio": round(shoulder_risk_frames / total, 3),
@@ -6,12 +6,29 @@ FactoryVideoAnnotator — Therblig + MOST 分析結果を動画にオーバー
   2. 手首周囲の赤枠 (アプリが着目しているエリア)
   3. 情報パネル (Therbligラベル / MOST A-B-G-P-TMU / 速度 / NVAフラグ)
   4. 下部タイムラインバー (セグメント進捗 + ラベル)
+
+Rendering works on the decoded BGR frame in place:
+  - the info panel is rendered once per label (PIL, for Japanese text) and
+    cached as a premultiplied BGRA patch
+  - the timeline bar is re-rendered only when its fill width or text changes
+  - skeleton and wrist boxes are drawn with OpenCV into a patch covering
+    just the pose bounding box
+  - each patch is alpha-blended into its region of the frame with NumPy
+  - labels are found by binary search over segment start frames, and
+    encoding runs on a writer thread
 """
 
+import bisect
+import queue
+import threading
+import time
+
 import cv2
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
+from pose.store import PoseSequence
+
 # ── Font priority list (IPA Gothic = Japanese support; DejaVu = fallback) ────
 _FONT_PATHS = [
     "/usr/share/fonts/opentype/ipafont-gothic/ipagp.ttf",
@@ -40,13 +57,106 @@ def _load_font(size: int) -> ImageFont.ImageFont:
     return ImageFont.load_default()
 
 
+# Joint radius / RGBA colour: wrists bright green (main focus), elbows orange,
+# shoulders sky blue; everything else grey.
+_JOINT_STYLE = {
+    15: (8, (0, 230, 0, 240)), 16: (8, (0, 230, 0, 240)),
+    13: (6, (255, 140, 0, 210)), 14: (6, (255, 140, 0, 210)),
+    11: (5, (80, 180, 255, 200)), 12: (5, (80, 180, 255, 200)),
+}
+
+_BAR_H = 26
+
+
+def _bgra(rgba: tuple[int, int, int, int]) -> tuple[int, int, int, int]:
+    r, g, b, a = rgba
+    return (b, g, r, a)
+
+
+class _Patch:
+    """
+    Straight-alpha BGRA patch prepared for repeated blending at (x, y).
+
+    sparse=True keeps only the non-transparent pixels (skeleton lines and
+    joints cover a few percent of their bounding box).
+    """
+
+    __slots__ = ("x", "y", "shape", "index", "inv_alpha", "premul")
+
+    def __init__(self, bgra: np.ndarray, x: int = 0, y: int = 0, sparse: bool = False):
+        self.x, self.y = x, y
+        self.shape     = bgra.shape[:2]
+        self.index     = None
+        if sparse:
+            self.index = np.nonzero(bgra[..., 3])
+            bgra = bgra[self.index]
+        alpha          = bgra[..., 3:4].astype(np.float32) * (1.0 / 255.0)
+        self.inv_alpha = 1.0 - alpha
+        self.premul    = bgra[..., :3].astype(np.float32) * alpha + 0.5
+
+    @classmethod
+    def from_pil(cls, image: Image.Image, x: int = 0, y: int = 0) -> "_Patch | None":
+        """Crop an RGBA PIL canvas to its non-transparent area; None if empty."""
+        bbox = image.getbbox()
+        if bbox is None:
+            return None
+        rgba = np.asarray(image.crop(bbox))
+        return cls(rgba[..., [2, 1, 0, 3]], x + bbox[0], y + bbox[1])
+
+    def blend_into(self, frame: np.ndarray) -> None:
+        ph, pw = self.shape
+        roi = frame[self.y:self.y + ph, self.x:self.x + pw]
+        if self.index is not None:
+            ys, xs = self.index
+            roi[ys, xs] = roi[ys, xs] * self.inv_alpha + self.premul
+        elif roi.shape[:2] != (ph, pw):    # clipped by the frame edge
+            ph, pw = roi.shape[:2]
+            roi[:] = roi * self.inv_alpha[:ph, :pw] + self.premul[:ph, :pw]
+        else:
+            roi[:] = roi * self.inv_alpha + self.premul
+
+
+class _FrameWriter:
+    """cv2.VideoWriter on a background thread with a small bounded queue."""
+
+    def __init__(self, writer: cv2.VideoWriter, depth: int = 8):
+        self._writer = writer
+        self._queue: queue.Queue = queue.Queue(maxsize=depth)
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="annotator-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            if self._error is None:
+                try:
+                    self._writer.write(frame)
+                except BaseException as exc:   # surfaced on the caller's thread
+                    self._error = exc
+
+    def write(self, frame: np.ndarray) -> None:
+        if self._error is not None:
+            raise self._error
+        self._queue.put(frame)
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        self._writer.release()
+        if self._error is not None:
+            raise self._error
+
+
 class FactoryVideoAnnotator:
     """Renders per-frame annotations onto a factory worker video."""
 
     def annotate(
         self,
         video_path: str,
-        pose_data: list[dict],
+        pose_data: PoseSequence | list[dict],
         labels: list[dict],
         output_path: str,
         progress_cb=None,
@@ -61,6 +171,7 @@ class FactoryVideoAnnotator:
 
         Returns: output_path
         """
+        pose_data    = PoseSequence.coerce(pose_data)
         cap          = cv2.VideoCapture(video_path)
         fps          = cap.get(cv2.CAP_PROP_FPS) or 30.0
         w            = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
@@ -68,131 +179,145 @@ class FactoryVideoAnnotator:
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or max(len(pose_data), 1)
 
         fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-        out    = cv2.VideoWriter(output_path, fourcc, fps, (w, h))
+        out    = _FrameWriter(cv2.VideoWriter(output_path, fourcc, fps, (w, h)))
 
-        # Build frame → label lookup table
-        frame_label: dict[int, dict] = {}
-        for lbl in labels:
-            for fi in range(int(lbl["start_frame"]), int(lbl["end_frame"]) + 1):
-                frame_label[fi] = lbl
+        # Label lookup by interval: later segments win on shared boundary frames
+        order  = sorted(range(len(labels)), key=lambda i: int(labels[i]["start_frame"]))
+        starts = [int(labels[i]["start_frame"]) for i in order]
 
-        font_lg = _load_font(22)
-        font_sm = _load_font(15)
+        font_lg  = _load_font(22)
+        font_sm  = _load_font(15)
         n_labels = len(labels)
 
-        frame_idx = 0
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            pose_frame = pose_data[frame_idx] if frame_idx < len(pose_data) else {}
-            landmarks  = pose_frame.get("landmarks", [])
-            lbl        = frame_label.get(frame_idx)
-
-            # Work on PIL for Japanese text + alpha blending
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            pil = Image.fromarray(rgb).convert("RGBA")
-
-            overlay = Image.new("RGBA", pil.size, (0, 0, 0, 0))
-
-            self._draw_skeleton(overlay, landmarks, w, h)
-            if lbl:
-                self._draw_hand_box(overlay, landmarks, w, h, lbl)
-                self._draw_info_panel(overlay, lbl, font_lg, font_sm, w, h)
-
-            self._draw_timeline_bar(
-                overlay, lbl, frame_idx, total_frames, n_labels, font_sm, w, h
-            )
-
-            # Alpha composite and convert back to BGR
-            composited = Image.alpha_composite(pil, overlay).convert("RGB")
-            bgr = cv2.cvtColor(np.array(composited), cv2.COLOR_RGB2BGR)
-            out.write(bgr)
-
-            if progress_cb and frame_idx % 60 == 0:
-                progress_cb(
-                    frame_idx / total_frames,
-                    f"アノテーション動画生成中... {frame_idx}/{total_frames} フレーム",
-                )
+        panels: dict[int, _Patch | None] = {}
+        bar_key: tuple | None = None
+        bar_patch: _Patch | None = None
+        started = time.monotonic()
 
-            frame_idx += 1
-
-        cap.release()
-        out.release()
+        frame_idx = 0
+        try:
+            while cap.isOpened():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+
+                pos = bisect.bisect_right(starts, frame_idx) - 1
+                lbl = None
+                if pos >= 0 and frame_idx <= int(labels[order[pos]]["end_frame"]):
+                    lbl = labels[order[pos]]
+
+                if frame_idx < len(pose_data) and pose_data.detected[frame_idx]:
+                    pose_patch = self._render_pose(pose_data.landmarks[frame_idx], w, h, lbl)
+                    if pose_patch is not None:
+                        pose_patch.blend_into(frame)
+
+                if lbl:
+                    key = order[pos]
+                    if key not in panels:
+                        canvas = Image.new("RGBA", (w, min(h, 160)), (0, 0, 0, 0))
+                        self._draw_info_panel(canvas, lbl, font_lg, font_sm, w, h)
+                        panels[key] = _Patch.from_pil(canvas)
+                    if panels[key] is not None:
+                        panels[key].blend_into(frame)
+
+                frac = frame_idx / max(total_frames, 1)
+                key  = (int(w * frac), int(frac * 100), id(lbl))
+                if key != bar_key:
+                    bar_key = key
+                    canvas  = Image.new("RGBA", (w, _BAR_H), (0, 0, 0, 0))
+                    self._draw_timeline_bar(
+                        canvas, lbl, frame_idx, total_frames, n_labels, font_sm, w, _BAR_H
+                    )
+                    bar_patch = _Patch.from_pil(canvas, 0, h - _BAR_H)
+                if bar_patch is not None:
+                    bar_patch.blend_into(frame)
+
+                out.write(frame)
+
+                if progress_cb and frame_idx % 60 == 0:
+                    rate = frame_idx / max(time.monotonic() - started, 1e-6)
+                    progress_cb(
+                        frame_idx / total_frames,
+                        f"アノテーション動画生成中... {frame_idx}/{total_frames} フレーム  ({rate:.1f} fps)",
+                    )
+
+                frame_idx += 1
+        finally:
+            cap.release()
+            out.close()
         return output_path
 
     # ── Drawing helpers ────────────────────────────────────────────────────────
 
     @staticmethod
-    def _draw_skeleton(overlay: Image.Image, landmarks: list[dict], w: int, h: int):
-        if not landmarks:
-            return
-        draw = ImageDraw.Draw(overlay)
+    def _render_pose(row: np.ndarray, w: int, h: int, lbl: dict | None) -> _Patch | None:
+        """Skeleton + wrist boxes drawn with OpenCV into a patch around the pose."""
+        vis = np.round(row[:, 3].astype(np.float64), 3)
+        px  = (row[:, 0].astype(np.float64) * w).astype(np.int64, copy=False)
+        py  = (row[:, 1].astype(np.float64) * h).astype(np.int64, copy=False)
+        shown = np.flatnonzero((vis >= 0.35) & np.isfinite(px + py))
+        if not len(shown):
+            return None
+
+        boxes = []
+        if lbl:
+            is_nva = lbl.get("is_nva", False)
+            label  = lbl.get("label", "")
+            # Colour: bright red for NVA / grasp / position, orange otherwise
+            if is_nva or label in ("H", "UDe", "ADe"):
+                box_color = (255, 40, 40, 220)
+            elif label in ("G", "P", "RL"):
+                box_color = (255, 130, 0, 220)
+            else:
+                box_color = (255, 220, 0, 180)
+            box_half = 60 if label in ("G", "P") else 45
+            for wrist_idx in (15, 16):   # L=15, R=16
+                if vis[wrist_idx] < 0.4:
+                    continue
+                cx, cy = int(px[wrist_idx]), int(py[wrist_idx])
+                boxes.append((max(0, cx - box_half), max(0, cy - box_half),
+                              min(w, cx + box_half), min(h, cy + box_half)))
+
+        # Patch bounds: visible joints (+ largest radius) and wrist boxes (+ 2 px outline)
+        pad = 9
+        x0 = int(px[shown].min()) - pad
+        y0 = int(py[shown].min()) - pad
+        x1 = int(px[shown].max()) + pad
+        y1 = int(py[shown].max()) + pad
+        for bx0, by0, bx1, by1 in boxes:
+            x0, y0 = min(x0, bx0 - 3), min(y0, by0 - 3)
+            x1, y1 = max(x1, bx1 + 3), max(y1, by1 + 3)
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, w - 1), min(y1, h - 1)
+        if x1 < x0 or y1 < y0:
+            return None
+
+        canvas = np.zeros((y1 - y0 + 1, x1 - x0 + 1, 4), dtype=np.uint8)
+
+        def pt(i: int) -> tuple[int, int]:
+            return int(px[i]) - x0, int(py[i]) - y0
 
         for a_i, b_i in _CONNECTIONS:
-            if a_i >= len(landmarks) or b_i >= len(landmarks):
-                continue
-            a, b = landmarks[a_i], landmarks[b_i]
-            if a["visibility"] < 0.35 or b["visibility"] < 0.35:
+            if vis[a_i] < 0.35 or vis[b_i] < 0.35:
                 continue
-            ax, ay = int(a["x"] * w), int(a["y"] * h)
-            bx, by = int(b["x"] * w), int(b["y"] * h)
-            draw.line([(ax, ay), (bx, by)], fill=(200, 200, 200, 160), width=2)
+            cv2.line(canvas, pt(a_i), pt(b_i), _bgra((200, 200, 200, 160)), 2)
 
-        for i, lm in enumerate(landmarks):
-            if lm["visibility"] < 0.35:
-                continue
-            x, y = int(lm["x"] * w), int(lm["y"] * h)
-            if i in {15, 16}:        # wrists — bright green (main focus)
-                r, color = 8, (0, 230, 0, 240)
-            elif i in {13, 14}:      # elbows — orange
-                r, color = 6, (255, 140, 0, 210)
-            elif i in {11, 12}:      # shoulders — sky blue
-                r, color = 5, (80, 180, 255, 200)
-            else:
-                r, color = 4, (200, 200, 200, 140)
-            draw.ellipse([(x - r, y - r), (x + r, y + r)], fill=color)
-
-    @staticmethod
-    def _draw_hand_box(
-        overlay: Image.Image,
-        landmarks: list[dict],
-        w: int,
-        h: int,
-        lbl: dict,
-    ):
-        """Red rectangle around each wrist that is visible."""
-        draw    = ImageDraw.Draw(overlay)
-        is_nva  = lbl.get("is_nva", False)
-        label   = lbl.get("label", "")
-
-        # Colour: bright red for NVA / grasp / position, orange otherwise
-        if is_nva or label in ("H", "UDe", "ADe"):
-            box_color = (255, 40, 40, 220)
-        elif label in ("G", "P", "RL"):
-            box_color = (255, 130, 0, 220)
-        else:
-            box_color = (255, 220, 0, 180)
-
-        box_half = 60 if label in ("G", "P") else 45
+        for i in shown.tolist():
+            r, color = _JOINT_STYLE.get(i, (4, (200, 200, 200, 140)))
+            cv2.circle(canvas, pt(i), r, _bgra(color), -1)
 
-        for wrist_idx in (15, 16):   # L=15, R=16
-            if wrist_idx >= len(landmarks):
-                continue
-            lm = landmarks[wrist_idx]
-            if lm["visibility"] < 0.4:
-                continue
-            cx = int(lm["x"] * w)
-            cy = int(lm["y"] * h)
-            x0, y0 = max(0, cx - box_half), max(0, cy - box_half)
-            x1, y1 = min(w, cx + box_half), min(h, cy + box_half)
+        for bx0, by0, bx1, by1 in boxes:
             for t in range(3):
-                draw.rectangle(
-                    [(x0 - t, y0 - t), (x1 + t, y1 + t)],
-                    outline=box_color,
+                cv2.rectangle(
+                    canvas,
+                    (bx0 - t - x0, by0 - t - y0),
+                    (bx1 + t - x0, by1 + t - y0),
+                    _bgra(box_color),
+                    1,
                 )
 
+        return _Patch(canvas, x0, y0, sparse=True)
+
     @staticmethod
     def _draw_info_panel(
         overlay: Image.Image,
@@ -270,7 +395,7 @@ class FactoryVideoAnnotator:
     ):
         """Bottom progress bar: global progress + current Therblig."""
         draw  = ImageDraw.Draw(overlay)
-        bar_h = 26
+        bar_h = _BAR_H
         y0    = h - bar_h
 
         # Dark background strip
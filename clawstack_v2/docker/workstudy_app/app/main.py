@@ -22,6 +22,7 @@ from analysis.segmenter import AutoSegmenter
 from analysis.labeler import TherbligLabeler
 from analysis.metrics import MetricsEngine
 from report.generator import ReportGenerator
+from screen.click_capture import ClickCapture
 from screen.cursor_tracker import CursorTracker
 from screen.annotator import ScreenAnnotator
 from screen.procedure_writer import ProcedureWriter
@@ -108,12 +109,20 @@ def run_screen_analysis(video_file, template, project_id, project_dir, video_pat
     overall_start = time.monotonic()
 
     # ── Step 1: クリック検出  (progress 0.05 → 0.28) ───────────────────────
+    # Click frames go straight to the OCR / thumbnail pool; it keeps working
+    # through the annotation step and the writers read its results.
     progress(0.05, desc="カーソル追跡・クリック検出 開始...")
     tracker = CursorTracker()
-    result  = tracker.analyze_video(
-        str(video_path),
-        progress_cb=_make_timed_cb(progress, 0.05, 0.28, overall_start),
-    )
+    capture = ClickCapture()
+    try:
+        result = tracker.analyze_video(
+            str(video_path),
+            progress_cb=_make_timed_cb(progress, 0.05, 0.28, overall_start),
+            capture=capture,
+        )
+    except BaseException:
+        capture.close()
+        raise
     events  = result["events"]
 
     with open(project_dir / "click_events.json", "w", encoding="utf-8") as f:
@@ -129,11 +138,15 @@ def run_screen_analysis(video_file, template, project_id, project_dir, video_pat
 
     # ── Step 3 (Phase 1): OCRテキスト抽出  (progress 0.50 → 0.65) ──────────
     progress(0.50, desc="Phase 1: 画面テキスト抽出 (OCR) 開始...")
+    captures = capture.results(
+        progress_cb=_make_timed_cb(progress, 0.50, 0.62, overall_start),
+    )
     writer   = ProcedureWriter()
     txt_path = writer.write_text_log(
         events, str(video_path), project_dir,
         title=f"PC操作 作業手順書 — {template['label']}",
-        progress_cb=_make_timed_cb(progress, 0.50, 0.65, overall_start),
+        progress_cb=_make_timed_cb(progress, 0.62, 0.65, overall_start),
+        captures=captures,
     )
 
     # ── Step 4 (Phase 2): Excel手順書生成  (progress 0.65 → 0.88) ──────────
@@ -142,6 +155,8 @@ def run_screen_analysis(video_file, template, project_id, project_dir, video_pat
         events, str(video_path), project_dir,
         title=f"PC操作 作業手順書 — {template['label']}",
         progress_cb=_make_timed_cb(progress, 0.65, 0.88, overall_start),
+        captures=captures,
+        fps=result["fps"],
     )
 
     # ── Step 5: KPI + KPIレポートPDF  (progress 0.88 → 1.0) ────────────────
@@ -275,10 +290,11 @@ def run_factory_analysis(video_file, template, project_id, project_dir, video_pa
 
     _factory_progress(0.1, "骨格推定中...")
     estimator = PoseEstimator()
-    pose_data = estimator.process(str(video_path))
-    with open(project_dir / "pose.jsonl", "w") as f:
-        for frame in pose_data:
-            f.write(json.dumps(frame, ensure_ascii=False) + "\n")
+    pose_data = estimator.process(
+        str(video_path),
+        progress_cb=_make_timed_cb(progress, 0.1, 0.3, overall_start),
+    )
+    pose_data.save(project_dir / "pose.npz")
 
     _factory_progress(0.3, "自動セグメント分割中...")
     segmenter = AutoSegmenter()
@@ -5,71 +5,271 @@ The legacy mp.solutions.pose was removed in MediaPipe 0.10.14+.
 This module uses the new Tasks API (mp.tasks.vision.PoseLandmarker).
 
 Model: pose_landmarker_lite.task  (~7 MB, downloaded at Docker build time)
-Output: per-frame list of 33 landmark dicts {x, y, z, visibility}
-        — same schema as the old API, so all downstream code is unchanged.
+Output: PoseSequence — (frames, 33, 4) float32 array of x, y, z, visibility
+        (see pose/store.py). Indexing/iterating it still yields the old
+        per-frame dicts {frame, time_sec, fps, landmarks: [{x, y, z, visibility}]}.
+
+Long videos are split into time ranges processed by independent landmarker
+instances in a process pool. Each range starts `warmup_frames` early so the
+VIDEO-mode tracker has re-acquired the pose by the first frame it keeps; the
+ranges are then stitched in order.
+
+With frame_stride > 1 only every n-th frame is run through MediaPipe while
+the wrists move less than `motion_threshold` per frame (the labeler's
+stillness level); skipped frames are linearly interpolated. As soon as motion
+exceeds the threshold, or the pose appears/disappears, every frame is
+processed again until things settle.
+
+Environment:
+  POSE_WORKERS           landmarker processes (default: half the CPUs, max 4)
+  POSE_CHUNK_SEC         seconds of video per range (default 60)
+  POSE_WARMUP_FRAMES     frames decoded before each range to re-establish tracking (default 15)
+  POSE_FRAME_STRIDE      1 = every frame (default)
+  POSE_MOTION_THRESHOLD  per-frame wrist displacement that forces dense sampling (default 0.004)
 """
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import cv2
 import numpy as np
 import mediapipe as mp
 from mediapipe.tasks import python as mp_python
 from mediapipe.tasks.python import vision as mp_vision
 
+from pose.store import NUM_LANDMARKS, PoseSequence
+
 # Path where Dockerfile downloads the model
 _MODEL_PATH = "/app/pose_landmarker_lite.task"
 
+POSE_WORKERS          = int(os.getenv("POSE_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) // 2)))))
+POSE_CHUNK_SEC        = float(os.getenv("POSE_CHUNK_SEC", "60"))
+POSE_WARMUP_FRAMES    = int(os.getenv("POSE_WARMUP_FRAMES", "15"))
+POSE_FRAME_STRIDE     = int(os.getenv("POSE_FRAME_STRIDE", "1"))
+POSE_MOTION_THRESHOLD = float(os.getenv("POSE_MOTION_THRESHOLD", "0.004"))
+
+_MISSING = np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+_WRISTS  = [15, 16]
+
+
+def _create_landmarker():
+    base_options = mp_python.BaseOptions(model_asset_path=_MODEL_PATH)
+    options = mp_vision.PoseLandmarkerOptions(
+        base_options=base_options,
+        running_mode=mp_vision.RunningMode.VIDEO,
+        num_poses=1,
+        min_pose_detection_confidence=0.5,
+        min_pose_presence_confidence=0.5,
+        min_tracking_confidence=0.5,
+    )
+    return mp_vision.PoseLandmarker.create_from_options(options)
+
+
+def _detect(landmarker, frame: np.ndarray, frame_idx: int, fps: float) -> tuple[np.ndarray, bool]:
+    rgb      = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+    ts_ms    = int(frame_idx * 1000 / fps)  # monotonically increasing timestamp
+
+    result = landmarker.detect_for_video(mp_image, ts_ms)
+    if not result.pose_landmarks:
+        return _MISSING, False
+    row = _MISSING.copy()
+    for j, lm in enumerate(result.pose_landmarks[0][:NUM_LANDMARKS]):
+        row[j] = (lm.x, lm.y, lm.z, lm.visibility if lm.visibility is not None else 0.0)
+    # Same precision as the old JSON schema (4 dp coords, 3 dp visibility)
+    row[:, :3] = np.round(row[:, :3], 4)
+    row[:, 3] = np.round(row[:, 3], 3)
+    return row, True
+
+
+def _process_range(
+    video_path: str,
+    start: int,
+    stop: int | None,
+    fps: float,
+    warmup: int = 0,
+    stride: int = 1,
+    motion_threshold: float = POSE_MOTION_THRESHOLD,
+    progress_cb=None,
+) -> tuple[int, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run one landmarker over frames [start, stop) (stop=None: to the end).
+
+    Returns (start, landmarks (n, 33, 4), detected (n,), sampled (n,)) where
+    sampled marks the frames actually run through MediaPipe. Top-level so it
+    can be sent to a worker process.
+    """
+    cap   = cv2.VideoCapture(video_path)
+    first = max(0, start - warmup)
+    if first:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+    landmarker = _create_landmarker()
+
+    rows: list[np.ndarray] = []
+    detected: list[bool] = []
+    sampled: list[bool] = []
+    prev: tuple[int, np.ndarray, bool] | None = None
+    dense = True
+    started = time.monotonic()
+    frame_idx = first
+    try:
+        while stop is None or frame_idx < stop:
+            keep = frame_idx >= start
+            if keep and stride > 1 and not dense and frame_idx % stride:
+                if not cap.grab():
+                    break
+                rows.append(_MISSING)
+                detected.append(False)
+                sampled.append(False)
+                frame_idx += 1
+                continue
 
-class PoseEstimator:
-    def __init__(self):
-        base_options = mp_python.BaseOptions(model_asset_path=_MODEL_PATH)
-        options = mp_vision.PoseLandmarkerOptions(
-            base_options=base_options,
-            running_mode=mp_vision.RunningMode.VIDEO,
-            num_poses=1,
-            min_pose_detection_confidence=0.5,
-            min_pose_presence_confidence=0.5,
-            min_tracking_confidence=0.5,
-        )
-        self._landmarker = mp_vision.PoseLandmarker.create_from_options(options)
-
-    def process(self, video_path: str) -> list[dict]:
-        """Process video and return per-frame pose landmarks."""
-        cap = cv2.VideoCapture(video_path)
-        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
-        frames = []
-        frame_idx = 0
-
-        while cap.isOpened():
             ret, frame = cap.read()
             if not ret:
                 break
-
-            rgb      = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
-            ts_ms    = int(frame_idx * 1000 / fps)  # monotonically increasing timestamp
-
-            result    = self._landmarker.detect_for_video(mp_image, ts_ms)
-            landmarks = []
-
-            if result.pose_landmarks:
-                for lm in result.pose_landmarks[0]:
-                    landmarks.append({
-                        "x":          round(lm.x, 4),
-                        "y":          round(lm.y, 4),
-                        "z":          round(lm.z, 4),
-                        "visibility": round(lm.visibility if lm.visibility is not None else 0.0, 3),
-                    })
-
-            frames.append({
-                "frame":    frame_idx,
-                "time_sec": round(frame_idx / fps, 3),
-                "fps":      fps,
-                "landmarks": landmarks,
-            })
+            row, ok = _detect(landmarker, frame, frame_idx, fps)
+            if stride > 1 and prev is not None:
+                dense = _is_moving(prev, (frame_idx, row, ok), motion_threshold)
+            prev = (frame_idx, row, ok)
+            if keep:
+                rows.append(row)
+                detected.append(ok)
+                sampled.append(True)
             frame_idx += 1
 
+            if progress_cb and frame_idx % 60 == 0:
+                progress_cb(len(rows), time.monotonic() - started)
+    finally:
         cap.release()
-        self._landmarker.close()
-        return frames
+        landmarker.close()
+
+    if not rows:
+        return start, np.empty((0, NUM_LANDMARKS, 4), dtype=np.float32), np.empty(0, dtype=bool), np.empty(0, dtype=bool)
+    return start, np.stack(rows), np.array(detected, dtype=bool), np.array(sampled, dtype=bool)
+
+
+def _is_moving(prev: tuple[int, np.ndarray, bool], curr: tuple[int, np.ndarray, bool], threshold: float) -> bool:
+    """True if the wrists moved faster than threshold per frame between two processed frames."""
+    (i0, row0, ok0), (i1, row1, ok1) = prev, curr
+    if ok0 != ok1:
+        return True
+    if not ok1:
+        return False
+    step = np.abs(row1[_WRISTS, :2] - row0[_WRISTS, :2]).max() / max(i1 - i0, 1)
+    return not step <= threshold  # NaN (landmark missing) counts as moving
+
+
+def interpolate_skipped(landmarks: np.ndarray, detected: np.ndarray, sampled: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fill frames that were not run through MediaPipe.
+
+    A skipped frame between two detected samples is linearly interpolated;
+    one before the first / after the last sample copies that sample; one next
+    to an undetected sample stays undetected.
+    """
+    landmarks = landmarks.copy()
+    detected = detected.copy()
+    idx = np.flatnonzero(sampled)
+    gaps = np.flatnonzero(~sampled)
+    if not len(gaps) or not len(idx):
+        return landmarks, detected
+
+    pos = np.searchsorted(idx, gaps)
+    prev = idx[np.clip(pos - 1, 0, len(idx) - 1)]
+    nxt = idx[np.clip(pos, 0, len(idx) - 1)]
+    prev = np.where(pos == 0, nxt, prev)
+    nxt = np.where(pos == len(idx), prev, nxt)
+
+    span = np.maximum(nxt - prev, 1)
+    w = ((gaps - prev) / span).astype(np.float32)[:, None, None]
+    values = (1 - w) * landmarks[prev] + w * landmarks[nxt]
+    values[..., :3] = np.round(values[..., :3], 4)
+    values[..., 3] = np.round(values[..., 3], 3)
+    ok = detected[prev] & detected[nxt]
+    landmarks[gaps] = np.where(ok[:, None, None], values, _MISSING)
+    detected[gaps] = ok
+    return landmarks, detected
+
+
+class PoseEstimator:
+    def __init__(
+        self,
+        workers: int = POSE_WORKERS,
+        chunk_sec: float = POSE_CHUNK_SEC,
+        warmup_frames: int = POSE_WARMUP_FRAMES,
+        frame_stride: int = POSE_FRAME_STRIDE,
+        motion_threshold: float = POSE_MOTION_THRESHOLD,
+    ):
+        self.workers = max(1, workers)
+        self.chunk_sec = chunk_sec
+        self.warmup_frames = max(0, warmup_frames)
+        self.frame_stride = max(1, frame_stride)
+        self.motion_threshold = motion_threshold
+
+    def process(self, video_path: str, progress_cb=None) -> PoseSequence:
+        """
+        Process video and return per-frame pose landmarks.
+
+        progress_cb: Optional (frac, desc) callback; desc includes frames/sec.
+        """
+        cap   = cv2.VideoCapture(video_path)
+        fps   = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+
+        chunk = max(1, int(self.chunk_sec * fps))
+        if self.workers > 1 and total > chunk:
+            ranges = [(s, s + chunk) for s in range(0, total, chunk)]
+            ranges[-1] = (ranges[-1][0], None)  # frame count is an estimate; read to EOF
+            parts = self._process_parallel(video_path, fps, total, ranges, progress_cb)
+        else:
+            def _cb(done: int, elapsed: float):
+                if progress_cb:
+                    progress_cb(done / max(total, 1), _progress_desc(done, total, elapsed, 1))
+
+            parts = [_process_range(
+                video_path, 0, None, fps,
+                stride=self.frame_stride,
+                motion_threshold=self.motion_threshold,
+                progress_cb=_cb,
+            )]
+
+        parts = [p for p in parts if len(p[1])]
+        if not parts:
+            return PoseSequence.empty(fps)
+        landmarks = np.concatenate([p[1] for p in parts])
+        detected  = np.concatenate([p[2] for p in parts])
+        sampled   = np.concatenate([p[3] for p in parts])
+        if not sampled.all():
+            landmarks, detected = interpolate_skipped(landmarks, detected, sampled)
+        return PoseSequence(landmarks, detected, fps)
+
+    def _process_parallel(self, video_path: str, fps: float, total: int, ranges: list, progress_cb=None) -> list:
+        started = time.monotonic()
+        done = 0
+        parts = []
+        # spawn: the parent may already hold MediaPipe/OpenCV threads
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(ranges)), mp_context=ctx) as pool:
+            futures = [
+                pool.submit(
+                    _process_range, video_path, start, stop, fps,
+                    self.warmup_frames, self.frame_stride, self.motion_threshold,
+                )
+                for start, stop in ranges
+            ]
+            for future in as_completed(futures):
+                part = future.result()
+                parts.append(part)
+                done += len(part[1])
+                if progress_cb:
+                    progress_cb(
+                        min(done / max(total, 1), 1.0),
+                        _progress_desc(done, total, time.monotonic() - started, self.workers),
+                    )
+        parts.sort(key=lambda p: p[0])
+        return parts
 
     @staticmethod
     def compute_angle(a: dict, b: dict, c: dict) -> float:
@@ -78,3 +278,17 @@ class PoseEstimator:
         bc = np.array([c["x"] - b["x"], c["y"] - b["y"]])
         cos_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc) + 1e-8)
         return float(np.degrees(np.arccos(np.clip(cos_angle, -1.0, 1.0))))
+
+    @staticmethod
+    def compute_angles(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+        """Vectorized compute_angle over (frames, 2) x/y arrays."""
+        ba = a - b
+        bc = c - b
+        cos_angle = np.einsum("ij,ij->i", ba, bc) / (np.linalg.norm(ba, axis=1) * np.linalg.norm(bc, axis=1) + 1e-8)
+        return np.degrees(np.arccos(np.clip(cos_angle, -1.0, 1.0)))
+
+
+def _progress_desc(done: int, total: int, elapsed: float, workers: int) -> str:
+    rate = done / elapsed if elapsed > 0 else 0.0
+    par  = f", {workers}並列" if workers > 1 else ""
+    return f"骨格推定中... {done}/{total} フレーム  ({rate:.1f} fps{par})"
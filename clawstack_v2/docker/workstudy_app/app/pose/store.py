@@ -0,0 +1,140 @@
+"""
+Pose Store — columnar container for per-frame pose landmarks.
+
+One float32 array of shape (frames, 33, 4) holding x, y, z, visibility per
+MediaPipe landmark, plus a per-frame "detected" mask. Frames without a pose
+are NaN in the array and False in the mask.
+
+A 30 min / 30 fps video is ~28 MB here versus ~1.8M Python dicts in the old
+list-of-frames schema. Analysis code reads the columns directly
+(``seq.xy(16)``, ``seq.visible(16)``); code that still expects the old schema
+can index or iterate the sequence and gets the same per-frame dicts:
+
+    {"frame": i, "time_sec": ..., "fps": ..., "landmarks": [{x, y, z, visibility}, ...]}
+
+Persistence: ``seq.save("pose.npz")`` / ``PoseSequence.load("pose.npz")``.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+
+class PoseSequence:
+    def __init__(self, landmarks: np.ndarray, detected: np.ndarray, fps: float = 30.0):
+        self.landmarks = np.asarray(landmarks, dtype=np.float32)
+        self.detected = np.asarray(detected, dtype=bool)
+        self.fps = float(fps or 30.0)
+        if self.landmarks.ndim != 3 or self.landmarks.shape[1:] != (NUM_LANDMARKS, 4):
+            raise ValueError(f"landmarks must be (frames, {NUM_LANDMARKS}, 4), got {self.landmarks.shape}")
+        if self.detected.shape != (len(self.landmarks),):
+            raise ValueError("detected mask does not match frame count")
+
+    # ── Construction ──────────────────────────────────────────────────────────
+
+    @classmethod
+    def empty(cls, fps: float = 30.0) -> "PoseSequence":
+        return cls(np.empty((0, NUM_LANDMARKS, 4), dtype=np.float32), np.empty(0, dtype=bool), fps)
+
+    @classmethod
+    def from_frames(cls, frames: list[dict]) -> "PoseSequence":
+        """Build from the legacy list-of-dicts schema (e.g. an old pose.jsonl)."""
+        if not frames:
+            return cls.empty()
+        fps = frames[0].get("fps", 30.0)
+        arr = np.full((len(frames), NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+        detected = np.zeros(len(frames), dtype=bool)
+        for i, frame in enumerate(frames):
+            lms = frame.get("landmarks") or []
+            if not lms:
+                continue
+            detected[i] = True
+            for j, lm in enumerate(lms[:NUM_LANDMARKS]):
+                arr[i, j] = (lm["x"], lm["y"], lm["z"], lm.get("visibility", 0.0))
+        return cls(arr, detected, fps)
+
+    @classmethod
+    def coerce(cls, pose_data) -> "PoseSequence":
+        """Accept either a PoseSequence or the legacy list of frame dicts."""
+        if isinstance(pose_data, cls):
+            return pose_data
+        return cls.from_frames(list(pose_data or []))
+
+    # ── Persistence ───────────────────────────────────────────────────────────
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        with open(path, "wb") as f:
+            np.savez(f, landmarks=self.landmarks, detected=self.detected, fps=np.float64(self.fps))
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "PoseSequence":
+        with np.load(path) as data:
+            return cls(data["landmarks"], data["detected"], float(data["fps"]))
+
+    # ── Column access ─────────────────────────────────────────────────────────
+
+    @property
+    def n_frames(self) -> int:
+        return len(self.landmarks)
+
+    @property
+    def nbytes(self) -> int:
+        return self.landmarks.nbytes + self.detected.nbytes
+
+    # Values are stored at 4 dp (x/y/z) and 3 dp (visibility). Rounding the
+    # float64 copy again recovers exactly the numbers the dict schema held, so
+    # threshold tests (e.g. visibility > 0.3) behave the same on both paths.
+
+    def xy(self, index: int) -> np.ndarray:
+        """(frames, 2) float64 x/y of one landmark; NaN where no pose was detected."""
+        return np.round(self.landmarks[:, index, :2].astype(np.float64), 4)
+
+    def visibility(self, index: int) -> np.ndarray:
+        return np.round(self.landmarks[:, index, 3].astype(np.float64), 3)
+
+    def visible(self, index: int, threshold: float = 0.3) -> np.ndarray:
+        """Frames where the pose was detected and the landmark visibility exceeds threshold."""
+        with np.errstate(invalid="ignore"):
+            return self.detected & (self.visibility(index) > threshold)
+
+    def slice(self, start: int, stop: int) -> "PoseSequence":
+        return PoseSequence(self.landmarks[start:stop], self.detected[start:stop], self.fps)
+
+    # ── Legacy dict adapter ───────────────────────────────────────────────────
+
+    def frame_dict(self, i: int) -> dict:
+        landmarks = []
+        if self.detected[i]:
+            for x, y, z, v in self.landmarks[i].tolist():
+                landmarks.append({"x": round(x, 4), "y": round(y, 4), "z": round(z, 4), "visibility": round(v, 3)})
+        return {
+            "frame": i,
+            "time_sec": round(i / self.fps, 3),
+            "fps": self.fps,
+            "landmarks": landmarks,
+        }
+
+    def __len__(self) -> int:
+        return self.n_frames
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.frame_dict(i) for i in range(*key.indices(self.n_frames))]
+        if key < 0:
+            key += self.n_frames
+        if not 0 <= key < self.n_frames:
+            raise IndexError("pose frame index out of range")
+        return self.frame_dict(key)
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(self.n_frames):
+            yield self.frame_dict(i)
+
+    def to_frames(self) -> list[dict]:
+        return list(self)
@@ -0,0 +1,202 @@
+"""
+ClickCapture — collects what the procedure writers need from each click frame
+(OCR text around the click and the 赤枠 thumbnail) while the video is already
+being decoded by CursorTracker.
+
+Previously write_text_log and write_excel each reopened the recording and
+seeked to every click frame, so a long recording was decoded three times and
+OCR ran strictly one click after another. Now the tracker hands each click
+frame to add(); OCR and thumbnail rendering run in a thread pool (Tesseract
+is a subprocess, so threads overlap fine) while decoding continues, and
+results() returns {frame_index: ClickFrame} for both writers.
+
+Callers that only have events and a video path can use from_video(), which
+makes one forward pass over the click frames — grab() between nearby clicks,
+a keyframe seek across long gaps — instead of one seek per writer per click.
+
+Environment:
+  OCR_WORKERS      parallel OCR / thumbnail jobs (default: CPU count, max 4)
+  OCR_MAX_PENDING  click frames held for processing before add() waits (default 16)
+"""
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from screen.ocr_extractor import OCRExtractor
+
+OCR_WORKERS     = int(os.getenv("OCR_WORKERS", str(max(1, min(4, os.cpu_count() or 1)))))
+OCR_MAX_PENDING = int(os.getenv("OCR_MAX_PENDING", "16"))
+
+# OCR window half-sizes used by the two writers
+TEXT_LOG_RADIUS = 400   # procedure_text.txt — wider context
+EXCEL_RADIUS    = 220   # procedure.xlsx
+
+# Thumbnail dimensions written into the Excel cells (in pixels)
+THUMB_W     = 320
+THUMB_H     = 200
+# Red-border box margin around click point (pixels in *original* resolution)
+_BOX_MARGIN = 70
+
+# Beyond this many frames to the next click, seek instead of grabbing forward
+_SEEK_GAP_FRAMES = 300
+
+
+@dataclass
+class ClickFrame:
+    frame: int
+    text_log: str = ""      # OCR within TEXT_LOG_RADIUS
+    text_near: str = ""     # OCR within EXCEL_RADIUS
+    thumbnail: bytes = b""  # annotated PNG
+
+
+class ClickCapture:
+    def __init__(
+        self,
+        workers: int = OCR_WORKERS,
+        max_pending: int = OCR_MAX_PENDING,
+        ocr: OCRExtractor | None = None,
+    ):
+        self.ocr = ocr or OCRExtractor()
+        self.ocr_available = OCRExtractor.is_available()
+        if workers > 1:
+            # Parallel Tesseract processes each spawning OpenMP threads oversubscribe the CPU
+            os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="click-ocr")
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._jobs: dict = {}
+
+    # ── Feeding ──────────────────────────────────────────────────────────────
+
+    def add(self, frame_idx: int, frame: np.ndarray, x: int, y: int) -> None:
+        """
+        Queue one click frame. The frame is referenced, not copied, until its
+        job finishes — callers must not draw into it afterwards. Blocks while
+        max_pending frames are still being processed.
+        """
+        if frame_idx in self._jobs:
+            return
+        self._slots.acquire()
+        try:
+            self._jobs[frame_idx] = self._pool.submit(self._process, frame_idx, frame, x, y)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    @classmethod
+    def from_video(cls, video_path: str, events: list[dict], **kwargs) -> "ClickCapture":
+        """Capture the click frames of *events* with a single forward pass over the video."""
+        capture = cls(**kwargs)
+        targets = sorted({ev["frame"]: ev for ev in events}.items())
+        cap = cv2.VideoCapture(video_path)
+        pos = 0
+        try:
+            for frame_idx, ev in targets:
+                if frame_idx - pos > _SEEK_GAP_FRAMES:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+                    pos = frame_idx
+                while pos < frame_idx and cap.grab():
+                    pos += 1
+                if pos != frame_idx:
+                    break
+                ret, frame = cap.read()
+                pos += 1
+                if not ret:
+                    break
+                capture.add(frame_idx, frame, ev["x"], ev["y"])
+        finally:
+            cap.release()
+        return capture
+
+    # ── Results ──────────────────────────────────────────────────────────────
+
+    def results(self, progress_cb=None) -> dict[int, ClickFrame]:
+        """Wait for all queued frames and return {frame_index: ClickFrame}."""
+        out: dict[int, ClickFrame] = {}
+        total = max(len(self._jobs), 1)
+        for done, (frame_idx, job) in enumerate(sorted(self._jobs.items()), start=1):
+            out[frame_idx] = job.result()
+            if progress_cb:
+                progress_cb(done / total, f"OCR・スクリーンショット処理中... {done}/{total}")
+        self._pool.shutdown(wait=True)
+        return out
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ── Worker ───────────────────────────────────────────────────────────────
+
+    def _process(self, frame_idx: int, frame: np.ndarray, x: int, y: int) -> ClickFrame:
+        try:
+            item = ClickFrame(frame=frame_idx, thumbnail=render_thumbnail(frame, x, y))
+            if self.ocr_available:
+                item.text_log = self.ocr.extract_near_click(frame, x, y, radius=TEXT_LOG_RADIUS)
+                item.text_near = self.ocr.extract_near_click(frame, x, y, radius=EXCEL_RADIUS)
+            return item
+        finally:
+            self._slots.release()
+
+
+# ── Thumbnail ─────────────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=1)
+def _label_font():
+    # White text (fallback: default PIL font if CJK font not found)
+    try:
+        return ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 13)
+    except Exception:
+        return ImageFont.load_default()
+
+
+def render_thumbnail(frame: np.ndarray, x: int, y: int) -> bytes:
+    """
+    Returns PNG bytes of an annotated thumbnail:
+      • 赤枠 (red rectangle) around click area
+      • Crosshair at exact click point
+      • Small "クリック" label above the box
+    """
+    h_orig, w_orig = frame.shape[:2]
+
+    # Red box boundaries (in original resolution)
+    bx1 = max(0,        x - _BOX_MARGIN)
+    by1 = max(0,        y - _BOX_MARGIN)
+    bx2 = min(w_orig,   x + _BOX_MARGIN)
+    by2 = min(h_orig,   y + _BOX_MARGIN)
+
+    # Convert BGR → RGB for PIL
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    pil = Image.fromarray(rgb)
+    draw = ImageDraw.Draw(pil)
+
+    # 赤枠 — draw 3-pixel-wide rectangle
+    RED = (210, 30, 30)
+    for t in range(3):
+        draw.rectangle(
+            [bx1 - t, by1 - t, bx2 + t, by2 + t],
+            outline=RED,
+        )
+
+    # Crosshair at exact click
+    CROSS = 14
+    draw.line([(x - CROSS, y), (x + CROSS, y)], fill=RED, width=2)
+    draw.line([(x, y - CROSS), (x, y + CROSS)], fill=RED, width=2)
+
+    # "クリック" label — small box above the red border
+    label = "クリック"
+    lx = max(0, bx1)
+    ly = max(0, by1 - 22)
+    # Red background pill
+    draw.rectangle([lx, ly, lx + 72, ly + 18], fill=RED)
+    draw.text((lx + 4, ly + 2), label, fill=(255, 255, 255), font=_label_font())
+
+    # Scale to thumbnail size
+    thumb = pil.resize((THUMB_W, THUMB_H), Image.LANCZOS)
+    buf   = io.BytesIO()
+    thumb.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
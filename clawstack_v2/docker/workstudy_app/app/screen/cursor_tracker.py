@@ -7,6 +7,9 @@ Strategy:
   3. Click = cursor velocity drops near zero for DWELL_FRAMES + significant UI
      frame change detected at that position (button highlight, dropdown open, etc.)
   4. Double-click = two clicks within 0.4 s at the same location
+
+Pass a ClickCapture as `capture` to hand each click frame to the OCR /
+thumbnail pool while decoding, so the procedure writers need no second pass.
 """
 import cv2
 import numpy as np
@@ -27,6 +30,7 @@ class CursorTracker:
         video_path: str,
         sample_every: int = 1,
         progress_cb=None,
+        capture=None,
     ) -> dict:
         """
         Analyze a screen recording for cursor movements and click events.
@@ -36,6 +40,7 @@ class CursorTracker:
             sample_every: Analyse every Nth frame (1 = all frames).
             progress_cb:  Optional callable(fraction: float, desc: str) for
                           real-time progress reporting.  fraction ∈ [0, 1].
+            capture:      Optional ClickCapture; receives every click frame.
 
         Returns:
             {
@@ -161,6 +166,8 @@ class CursorTracker:
                                 "type":       ev_type,
                                 "diff_pixels": current_diff,
                             })
+                            if capture is not None:
+                                capture.add(frame_idx, frame, avg_x, avg_y)
                             last_click_sec = current_sec
 
                 prev_gray = gray
@@ -8,7 +8,14 @@ Usage:
     extractor = OCRExtractor()
     text = extractor.extract_near_click(frame, x=540, y=320, radius=200)
     full = extractor.extract_full_frame(frame)
+
+Results are cached by a hash of the (pre-processed) image region and the
+Tesseract config, so a screen that has not changed around repeated clicks is
+only recognised once. The extractor is safe to share between threads.
 """
+import hashlib
+import threading
+
 import cv2
 import numpy as np
 
@@ -30,6 +37,14 @@ class OCRExtractor:
     # psm 11 = sparse text, no specific order — good for full-frame mixed layouts
     _CFG_SPARSE = "--psm 11 -l jpn+eng"
     _SCALE      = 2       # upscale factor; 2× gives Tesseract sharper glyphs
+    _CACHE_MAX  = 1024    # cached OCR results (oldest evicted first)
+
+    _available: bool | None = None
+
+    def __init__(self):
+        self._cache: dict[bytes, str] = {}
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
 
     # ── Public API ───────────────────────────────────────────────────────────
 
@@ -83,10 +98,31 @@ class OCRExtractor:
 
     # ── Internal ─────────────────────────────────────────────────────────────
 
+    @staticmethod
+    def _roi_key(img: np.ndarray, config: str) -> bytes:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(config.encode())
+        h.update(repr(img.shape).encode())
+        h.update(np.ascontiguousarray(img).data)
+        return h.digest()
+
     def _run_ocr(self, img: np.ndarray, config: str) -> str:
-        """Upscale, binarise, and run Tesseract on an image region."""
+        """Upscale, binarise, and run Tesseract on an image region (cached by ROI hash)."""
         if img is None or img.size == 0:
             return ""
+        key = self._roi_key(img, config)
+        with self._cache_lock:
+            if key in self._cache:
+                self.cache_hits += 1
+                return self._cache[key]
+        text = self._recognise(img, config)
+        with self._cache_lock:
+            if len(self._cache) >= self._CACHE_MAX:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = text
+        return text
+
+    def _recognise(self, img: np.ndarray, config: str) -> str:
         try:
             scaled = cv2.resize(
                 img, None,
@@ -103,13 +139,16 @@ class OCRExtractor:
         except Exception:
             return ""
 
-    @staticmethod
-    def is_available() -> bool:
-        """Return True if Tesseract is installed and callable."""
-        if not _HAVE_TESSERACT:
-            return False
-        try:
-            pytesseract.get_tesseract_version()
-            return True
-        except Exception:
-            return False
+    @classmethod
+    def is_available(cls) -> bool:
+        """Return True if Tesseract is installed and callable (probed once per process)."""
+        if cls._available is None:
+            if not _HAVE_TESSERACT:
+                cls._available = False
+            else:
+                try:
+                    pytesseract.get_tesseract_version()
+                    cls._available = True
+                except Exception:
+                    cls._available = False
+        return cls._available
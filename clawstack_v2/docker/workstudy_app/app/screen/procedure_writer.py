@@ -12,21 +12,22 @@ ProcedureWriter — Generates two output files from screen recording analysis:
          • OCR text extracted near each click
          • Formatted table: Step / 時刻 / スクリーンショット / 操作内容 / 座標 / 備考
        Phase 2 — "画像付き、赤枠付き手順書"
+
+Both read the click frames from a shared {frame: ClickFrame} map (see
+click_capture.py), normally filled during cursor tracking. Without one, the
+frames are captured with a single pass over the video.
 """
 
 import io
-import cv2
-import numpy as np
 from pathlib import Path
 from datetime import datetime
 
-from PIL import Image, ImageDraw, ImageFont
-
 import openpyxl
 from openpyxl.styles import Font as XFont, PatternFill, Alignment, Border, Side
 from openpyxl.drawing.image import Image as XLImage
 from openpyxl.utils import get_column_letter
 
+from screen.click_capture import THUMB_H, THUMB_W, ClickCapture, ClickFrame
 from screen.ocr_extractor import OCRExtractor
 
 
@@ -40,13 +41,8 @@ _FILL_WARN   = PatternFill("solid", fgColor="FFF3CD")   # amber for dblclick
 _SIDE        = Side(style="thin", color="BBBBBB")
 _BORDER      = Border(left=_SIDE, right=_SIDE, top=_SIDE, bottom=_SIDE)
 
-# Thumbnail dimensions written into the Excel cells (in pixels)
-_THUMB_W    = 320
-_THUMB_H    = 200
-# Red-border box margin around click point (pixels in *original* resolution)
-_BOX_MARGIN = 70
 # Excel row height for a thumbnail row (points; 1 px ≈ 0.75 pt)
-_ROW_HEIGHT = _THUMB_H * 0.75 + 8
+_ROW_HEIGHT = THUMB_H * 0.75 + 8
 
 
 class ProcedureWriter:
@@ -61,19 +57,22 @@ class ProcedureWriter:
         project_dir: Path,
         title: str = "PC操作 作業手順書",
         progress_cb=None,
+        captures: dict[int, ClickFrame] | None = None,
     ) -> Path:
         """
         Phase 1: Generate plain-text procedure log with OCR content.
 
+        Args:
+            captures: {frame: ClickFrame} from ClickCapture; captured from
+                      *video_path* when omitted.
+
         Returns:
             Path to procedure_text.txt
         """
         txt_path = project_dir / "procedure_text.txt"
-        ocr = OCRExtractor()
         ocr_available = OCRExtractor.is_available()
-
-        cap = cv2.VideoCapture(video_path)
-        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        if captures is None and ocr_available:
+            captures = ClickCapture.from_video(video_path, events).results()
 
         lines = [
             f"{'=' * 60}",
@@ -102,11 +101,10 @@ class ProcedureWriter:
 
             # OCR text near click
             if ocr_available:
-                cap.set(cv2.CAP_PROP_POS_FRAMES, ev["frame"])
-                ret, frame = cap.read()
-                if ret:
+                clicked = captures.get(ev["frame"])
+                if clicked is not None:
                     # Wider extraction (400px) for full context
-                    text = ocr.extract_near_click(frame, ev["x"], ev["y"], radius=400)
+                    text = clicked.text_log
                     if text:
                         lines.append("  ▼ 画面テキスト:")
                         for tline in text.split("\n"):
@@ -118,8 +116,6 @@ class ProcedureWriter:
 
             lines.append("")
 
-        cap.release()
-
         with open(txt_path, "w", encoding="utf-8") as f:
             f.write("\n".join(lines))
 
@@ -132,16 +128,23 @@ class ProcedureWriter:
         project_dir: Path,
         title: str = "PC操作 作業手順書",
         progress_cb=None,
+        captures: dict[int, ClickFrame] | None = None,
+        fps: float = 30.0,
     ) -> Path:
         """
         Phase 2: Generate Excel work instruction with screenshots + 赤枠 + OCR text.
 
+        Args:
+            captures: {frame: ClickFrame} from ClickCapture; captured from
+                      *video_path* when omitted.
+            fps:      Recording frame rate (CursorTracker result["fps"]).
+
         Returns:
             Path to procedure.xlsx
         """
         xlsx_path = project_dir / "procedure.xlsx"
-        ocr = OCRExtractor()
-        ocr_available = OCRExtractor.is_available()
+        if captures is None:
+            captures = ClickCapture.from_video(video_path, events).results()
 
         wb = openpyxl.Workbook()
         ws = wb.active
@@ -160,8 +163,6 @@ class ProcedureWriter:
         ws.column_dimensions["F"].width = 22   # 備考
 
         # ── Data rows ────────────────────────────────────────────────────────
-        cap   = cv2.VideoCapture(video_path)
-        fps   = cap.get(cv2.CAP_PROP_FPS) or 30.0
         total = max(len(events), 1)
 
         data_row = 3
@@ -173,28 +174,17 @@ class ProcedureWriter:
                     f"手順書生成中... Step {step_no}/{total}  スクリーンショット取得 + 赤枠描画",
                 )
 
-            # Seek to click frame
-            cap.set(cv2.CAP_PROP_POS_FRAMES, ev["frame"])
-            ret, frame = cap.read()
-            if not ret:
+            # Click frame: OCR near click + annotated thumbnail (PNG bytes)
+            clicked = captures.get(ev["frame"])
+            if clicked is None:
                 continue
 
-            # OCR near click
-            ocr_text = ""
-            if ocr_available:
-                ocr_text = ocr.extract_near_click(frame, ev["x"], ev["y"], radius=220)
-
-            # Annotated thumbnail (PNG bytes)
-            thumb_png = self._make_thumbnail(frame, ev["x"], ev["y"])
-
             # Write the row
             self._write_step_row(
-                ws, step_no, ev, fps, ocr_text, thumb_png, data_row
+                ws, step_no, ev, fps, clicked.text_near, clicked.thumbnail, data_row
             )
             data_row += 1
 
-        cap.release()
-
         # ── Click log sheet ──────────────────────────────────────────────────
         ws_log = wb.create_sheet("クリックログ")
         self._write_log_sheet(ws_log, events, fps)
@@ -260,8 +250,8 @@ class ProcedureWriter:
         # Embed annotated thumbnail at column C
         if thumb_png:
             img        = XLImage(io.BytesIO(thumb_png))
-            img.width  = _THUMB_W
-            img.height = _THUMB_H
+            img.width  = THUMB_W
+            img.height = THUMB_H
             ws.add_image(img, f"{get_column_letter(3)}{row}")
 
     def _write_log_sheet(self, ws, events, fps):
@@ -283,57 +273,3 @@ class ProcedureWriter:
 
         for col in range(1, 8):
             ws.column_dimensions[get_column_letter(col)].width = 14
-
-    # ── Image annotation ─────────────────────────────────────────────────────
-
-    def _make_thumbnail(self, frame: np.ndarray, x: int, y: int) -> bytes:
-        """
-        Returns PNG bytes of an annotated thumbnail:
-          • 赤枠 (red rectangle) around click area
-          • Crosshair at exact click point
-          • Small "クリック" label above the box
-        """
-        h_orig, w_orig = frame.shape[:2]
-
-        # Red box boundaries (in original resolution)
-        bx1 = max(0,        x - _BOX_MARGIN)
-        by1 = max(0,        y - _BOX_MARGIN)
-        bx2 = min(w_orig,   x + _BOX_MARGIN)
-        by2 = min(h_orig,   y + _BOX_MARGIN)
-
-        # Convert BGR → RGB for PIL
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        pil = Image.fromarray(rgb)
-        draw = ImageDraw.Draw(pil)
-
-        # 赤枠 — draw 3-pixel-wide rectangle
-        RED = (210, 30, 30)
-        for t in range(3):
-            draw.rectangle(
-                [bx1 - t, by1 - t, bx2 + t, by2 + t],
-                outline=RED,
-            )
-
-        # Crosshair at exact click
-        CROSS = 14
-        draw.line([(x - CROSS, y), (x + CROSS, y)], fill=RED, width=2)
-        draw.line([(x, y - CROSS), (x, y + CROSS)], fill=RED, width=2)
-
-        # "クリック" label — small box above the red border
-        label = "クリック"
-        lx = max(0, bx1)
-        ly = max(0, by1 - 22)
-        # Red background pill
-        draw.rectangle([lx, ly, lx + 72, ly + 18], fill=RED)
-        # White text (fallback: default PIL font if CJK font not found)
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 13)
-        except Exception:
-            font = ImageFont.load_default()
-        draw.text((lx + 4, ly + 2), label, fill=(255, 255, 255), font=font)
-
-        # Scale to thumbnail size
-        thumb = pil.resize((_THUMB_W, _THUMB_H), Image.LANCZOS)
-        buf   = io.BytesIO()
-        thumb.save(buf, format="PNG", optimize=True)
-        return buf.getvalue()
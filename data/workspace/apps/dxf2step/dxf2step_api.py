@@ -1,9 +1,14 @@
 import os
+import sys
+import json
+import time
 import uuid
 import shutil
+import hashlib
 import threading
 import subprocess
-from fastapi import FastAPI, UploadFile, File, Form, BackgroundTasks, HTTPException
+from collections import deque
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
@@ -16,6 +21,9 @@ from ezdxf.addons.drawing.matplotlib import MatplotlibBackend
 import matplotlib.pyplot as plt
 import io
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from job_store import JobStore
+
 app = FastAPI(title="Antigravity DXF2STEP API")
 app.add_middleware(
     CORSMiddleware,
@@ -33,105 +41,305 @@ def read_root():
 BASE_DIR = r"D:\Clawdbot_Docker_20260125\data\workspace\apps\dxf2step"
 JOBS_DIR = os.path.join(BASE_DIR, "jobs")
 WORKER_SCRIPT = os.path.join(BASE_DIR, "dxf2step_worker.py")
+WORKER_LOG = "worker.log"
+
+# Conversions running at once; each one already drives DXF2STEP_FREECAD_WORKERS FreeCAD processes
+MAX_CONCURRENT_JOBS = int(os.getenv("DXF2STEP_MAX_JOBS", "1"))
 
 os.makedirs(JOBS_DIR, exist_ok=True)
 
+store = JobStore(os.getenv("DXF2STEP_DB", os.path.join(JOBS_DIR, "jobs.sqlite3")))
+
 class JobStatus(BaseModel):
     job_id: str
-    state: str
+    state: str                              # queued | running | done | failed
     progress: float
     current: str
     warnings: List[str] = []
-
-# In-memory job state for prototype (should be persistent for production)
-jobs_db = {}
-
-def run_conversion(job_id: str, input_path: str, output_dir: str, thickness: float, layer_configs: str = "{}", manual_mode: bool = False, view_assignments: str = "[]"):
-    jobs_db[job_id]["state"] = "running"
-    jobs_db[job_id]["current"] = "Starting conversion..."
-
-    # -u = unbuffered stdout so print() lines arrive immediately
+    queue_position: Optional[int] = None    # 1 = next to run
+    cached_from: Optional[str] = None       # job whose outputs were reused
+
+class ProgressParser:
+    """Maps worker stdout lines to (progress, current).
+
+    Stateless apart from what it has seen, so replaying worker.log from the
+    top reproduces the live state — used when the API re-attaches to a worker
+    after a restart.
+    """
+
+    def __init__(self):
+        self.progress = 0.0
+        self.current = "Starting conversion..."
+        self.exit_status = None     # "ok" / "failed" once the worker printed its exit marker
+        self.n_layers = 0
+        self.layers_started = 0
+
+    def feed(self, raw_line: str):
+        line = raw_line.rstrip()
+        if not line:
+            return
+
+        if line.startswith("[Worker] exit "):
+            self.exit_status = line.split()[-1]
+            return
+
+        # Always surface the latest line to the UI
+        self.current = line
+
+        # ── Progress heuristics ──────────────────────────────────────
+        if line.startswith("[DXF loaded]"):
+            # "[DXF loaded] 3 layers: View, ProjItem, ..."
+            try:
+                self.n_layers = int(line.split()[2])
+            except Exception:
+                self.n_layers = 1
+            self.progress = 0.05
+
+        elif line.startswith("[Layer "):
+            # "[Layer 2/3] ProjItem — thickness 10.0mm"
+            self.layers_started += 1
+            base = 0.05 + (self.layers_started - 1) / max(self.n_layers, 1) * 0.65
+            self.progress = round(base, 2)
+
+        elif line.startswith("[FreeCAD] STEP generation"):
+            # bump slightly inside the layer slot
+            self.progress = round(self.progress + 0.04, 2)
+
+        elif line.startswith("[FreeCAD] STEP done"):
+            self.progress = round(self.progress + 0.04, 2)
+
+        elif "reconstruction starting" in line.lower():
+            self.progress = 0.78
+            self.current = "3D reconstruction — intersecting front/top/right slabs ..."
+
+        elif line.startswith("[FreeCAD] Running multi-view"):
+            self.progress = 0.82
+
+        elif line.startswith("[FreeCAD] Reconstruction STEP done"):
+            self.progress = 0.92
+
+        elif "Combined STEP generated" in line:
+            self.progress = 0.95
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    """Liveness check that is safe on Windows, where os.kill(pid, 0) would terminate the process."""
+    if not pid:
+        return False
+    if os.name == "nt":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)    # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        ok = kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return bool(ok) and code.value == 259               # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def follow_log(job_id: str, log_path: str, parser: ProgressParser, alive):
+    """Feed worker.log into `parser` until `alive()` turns false, saving progress as it moves."""
+    saved = None
+
+    def save():
+        nonlocal saved
+        state = (parser.progress, parser.current)
+        if state != saved:
+            store.update(job_id, progress=parser.progress, current=parser.current)
+            saved = state
+
+    with open(log_path, encoding="utf-8", errors="replace") as log:
+        partial = ""
+        while True:
+            chunk = log.readline()
+            if chunk:
+                partial += chunk
+                if partial.endswith("\n"):
+                    parser.feed(partial)
+                    partial = ""
+                continue
+            save()
+            if not alive():
+                # whatever the worker wrote between the last read and its exit
+                for line in (partial + log.read()).splitlines():
+                    parser.feed(line)
+                break
+            time.sleep(0.3)
+    save()
+
+def finish_job(job_id: str, parser: ProgressParser, ok: bool):
+    if ok:
+        store.update(job_id, state="done", progress=1.0, current="Conversion complete.",
+                     finished_at=time.time())
+    else:
+        # current holds the last stdout line (likely an error message)
+        store.update(job_id, state="failed", progress=parser.progress, current=parser.current,
+                     finished_at=time.time())
+
+def run_conversion(job: dict):
+    job_id = job["job_id"]
+    params = job["params"]
+    log_path = os.path.join(JOBS_DIR, job_id, WORKER_LOG)
+
+    # An identical job may have finished while this one waited in the queue
+    cached = find_reusable(job["content_key"]) if job["content_key"] else None
+    if cached:
+        store.update(job_id, state="done", progress=1.0, output_dir=cached["output_dir"],
+                     current=f"Conversion complete (reused results of job {cached['job_id']}).",
+                     cached_from=cached["job_id"], finished_at=time.time())
+        return
+
+    store.update(job_id, progress=0.0, current="Starting conversion...")
+
+    # -u = unbuffered stdout so print() lines reach worker.log immediately
     cmd = [
         "python", "-u", WORKER_SCRIPT,
-        "--input", input_path,
-        "--output", output_dir,
-        "--thickness", str(thickness),
-        "--layer-configs", layer_configs
+        "--input", job["input_path"],
+        "--output", job["output_dir"],
+        "--thickness", str(params["thickness"]),
+        "--layer-configs", params["layer_configs"]
     ]
 
-    if manual_mode:
-        cmd += ["--manual-mode", "--view-assignments", view_assignments]
-
-    n_layers = 0
-    layers_started = 0
+    if params["manual_mode"]:
+        cmd += ["--manual-mode", "--view-assignments", params["view_assignments"]]
 
     try:
-        proc = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,   # merge stderr into stdout stream
-            text=True,
-            bufsize=1                   # line-buffered
-        )
-
-        for raw_line in proc.stdout:
-            line = raw_line.rstrip()
-            if not line:
-                continue
-
-            # Always surface the latest line to the UI
-            jobs_db[job_id]["current"] = line
-
-            # ── Progress heuristics ──────────────────────────────────────
-            if line.startswith("[DXF loaded]"):
-                # "[DXF loaded] 3 layers: View, ProjItem, ..."
-                try:
-                    n_layers = int(line.split()[2])
-                except Exception:
-                    n_layers = 1
-                jobs_db[job_id]["progress"] = 0.05
-
-            elif line.startswith("[Layer "):
-                # "[Layer 2/3] ProjItem — thickness 10.0mm"
-                layers_started += 1
-                base = 0.05 + (layers_started - 1) / max(n_layers, 1) * 0.65
-                jobs_db[job_id]["progress"] = round(base, 2)
-
-            elif line.startswith("[FreeCAD] STEP generation"):
-                # bump slightly inside the layer slot
-                jobs_db[job_id]["progress"] = round(
-                    jobs_db[job_id]["progress"] + 0.04, 2)
-
-            elif line.startswith("[FreeCAD] STEP done"):
-                jobs_db[job_id]["progress"] = round(
-                    jobs_db[job_id]["progress"] + 0.04, 2)
-
-            elif "reconstruction starting" in line.lower():
-                jobs_db[job_id]["progress"] = 0.78
-                jobs_db[job_id]["current"] = "3D reconstruction — intersecting front/top/right slabs ..."
-
-            elif line.startswith("[FreeCAD] Running multi-view"):
-                jobs_db[job_id]["progress"] = 0.82
-
-            elif line.startswith("[FreeCAD] Reconstruction STEP done"):
-                jobs_db[job_id]["progress"] = 0.92
-
-            elif "Combined STEP generated" in line:
-                jobs_db[job_id]["progress"] = 0.95
-
-        proc.wait()
-
-        if proc.returncode == 0:
-            jobs_db[job_id]["state"] = "done"
-            jobs_db[job_id]["progress"] = 1.0
-            jobs_db[job_id]["current"] = "Conversion complete."
-        else:
-            jobs_db[job_id]["state"] = "failed"
-            # current already holds the last stdout line (likely an error message)
+        # The worker writes to a file rather than a pipe: it keeps running (and
+        # its progress stays readable) if the API restarts underneath it.
+        with open(log_path, "w", encoding="utf-8") as log:
+            proc = subprocess.Popen(
+                cmd,
+                stdout=log,
+                stderr=subprocess.STDOUT,   # merge stderr into the same log
+                env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+            )
+        store.update(job_id, pid=proc.pid)
+
+        parser = ProgressParser()
+        follow_log(job_id, log_path, parser, alive=lambda: proc.poll() is None)
+        finish_job(job_id, parser, ok=proc.wait() == 0)
 
     except Exception as e:
-        jobs_db[job_id]["state"] = "failed"
-        jobs_db[job_id]["current"] = f"Runtime Error: {str(e)}"
+        store.update(job_id, state="failed", current=f"Runtime Error: {str(e)}", finished_at=time.time())
+
+def resume_conversion(job: dict):
+    """Re-attach to a job that was running when the API stopped."""
+    job_id = job["job_id"]
+    log_path = os.path.join(JOBS_DIR, job_id, WORKER_LOG)
+    parser = ProgressParser()
+    if os.path.exists(log_path):
+        follow_log(job_id, log_path, parser,
+                   alive=lambda: parser.exit_status is None and _pid_alive(job["pid"]))
+    if parser.exit_status is not None:
+        finish_job(job_id, parser, ok=parser.exit_status == "ok")
+    else:
+        # The worker died with the API: run the job again, keeping its place in the queue
+        store.update(job_id, state="queued", progress=0.0, current="Re-queued after API restart.", pid=None)
+
+class JobScheduler:
+    """Runs queued jobs from the store, at most `concurrency` at a time, oldest first."""
+
+    def __init__(self, concurrency: int):
+        self.concurrency = max(1, concurrency)
+        self._wake = threading.Condition()
+        self._resume = deque()
+        self._threads = []
+
+    def start(self):
+        if self._threads:
+            return
+        self._resume.extend(store.by_state("running"))
+        for i in range(self.concurrency):
+            t = threading.Thread(target=self._loop, name=f"dxf2step-job-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def notify(self):
+        with self._wake:
+            self._wake.notify()
+
+    def _next(self):
+        try:
+            return resume_conversion, self._resume.popleft()
+        except IndexError:
+            pass
+        job = store.claim_next()
+        return (run_conversion, job) if job else None
+
+    def _loop(self):
+        while True:
+            task = self._next()
+            if task is None:
+                with self._wake:
+                    self._wake.wait(timeout=2.0)
+                continue
+            run, job = task
+            try:
+                run(job)
+            except Exception as e:
+                store.update(job["job_id"], state="failed", current=f"Runtime Error: {str(e)}",
+                             finished_at=time.time())
+            if run is resume_conversion:
+                self.notify()       # a re-queued job is waiting
+
+scheduler = JobScheduler(MAX_CONCURRENT_JOBS)
+
+@app.on_event("startup")
+def start_scheduler():
+    scheduler.start()
+
+# --- Result reuse ---
+
+def _code_fingerprint() -> bytes:
+    """Cache keys change whenever the conversion code does."""
+    h = hashlib.sha256()
+    for name in ("dxf2step_worker.py", "freecad_pool.py"):
+        try:
+            with open(os.path.join(BASE_DIR, name), "rb") as f:
+                h.update(f.read())
+        except OSError:
+            pass
+    return h.digest()
+
+_CODE_FINGERPRINT = _code_fingerprint()
+
+def _canonical_json(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def content_key(digest, params: dict) -> str:
+    """`digest` already holds the uploaded DXF bytes; add everything else that shapes the output."""
+    digest.update(_CODE_FINGERPRINT)
+    config = {
+        "thickness": float(params["thickness"]),
+        "manual_mode": bool(params["manual_mode"]),
+        "layer_configs": _canonical_json(params["layer_configs"]),
+        # view assignments only matter for manual reconstruction
+        "view_assignments": _canonical_json(params["view_assignments"]) if params["manual_mode"] else None,
+    }
+    digest.update(json.dumps(config, sort_keys=True).encode())
+    return digest.hexdigest()
+
+def find_reusable(key: str) -> Optional[dict]:
+    for job in store.finished_with_key(key):
+        out = job["output_dir"]
+        if out and os.path.isdir(out) and any(f.lower().endswith(".step") for f in os.listdir(out)):
+            return job
+    return None
+
+def job_output_dir(job_id: str) -> str:
+    job = store.get(job_id)
+    if job and job["output_dir"]:
+        return job["output_dir"]
+    return os.path.join(JOBS_DIR, job_id, "output")
 
 @app.get("/api/dxf2step/health")
 def healthcheck():
@@ -149,12 +357,16 @@ def healthcheck():
             "mode": "docker-gateway-exec",
             "freecadcmd": fc_version,
             "python": "3.12"
+        },
+        "jobs": {
+            "max_concurrent": scheduler.concurrency,
+            "running": store.count("running"),
+            "queued": store.count("queued"),
         }
     }
 
 @app.post("/api/dxf2step/jobs")
 async def create_job(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     default_thickness_mm: float = Form(10.0),
     layer_configs: str = Form("{}"),
@@ -167,23 +379,38 @@ async def create_job(
     output_dir = os.path.join(job_dir, "output")
     
     os.makedirs(input_dir, exist_ok=True)
-    os.makedirs(output_dir, exist_ok=True)
     
     input_path = os.path.join(input_dir, file.filename)
+    digest = hashlib.sha256()
     with open(input_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-        
-    jobs_db[job_id] = {
-        "job_id": job_id,
-        "state": "pending",
-        "progress": 0.0,
-        "current": "Job received.",
-        "warnings": []
+        while chunk := file.file.read(1 << 20):
+            digest.update(chunk)
+            buffer.write(chunk)
+
+    params = {
+        "thickness": default_thickness_mm,
+        "layer_configs": layer_configs,
+        "manual_mode": manual_mode,
+        "view_assignments": view_assignments,
     }
-    
-    background_tasks.add_task(run_conversion, job_id, input_path, output_dir, default_thickness_mm, layer_configs, manual_mode, view_assignments)
-    
-    return {"job_id": job_id}
+    key = content_key(digest, params)
+
+    cached = find_reusable(key)
+    if cached:
+        # Same drawing, same settings, same converter: hand back the earlier outputs
+        now = time.time()
+        store.create(job_id, "done", progress=1.0,
+                     current=f"Conversion complete (reused results of job {cached['job_id']}).",
+                     params=params, input_path=input_path, output_dir=cached["output_dir"],
+                     content_key=key, cached_from=cached["job_id"], started_at=now, finished_at=now)
+        return {"job_id": job_id, "cached": True}
+
+    os.makedirs(output_dir, exist_ok=True)
+    store.create(job_id, "queued", current="Job received.", params=params,
+                 input_path=input_path, output_dir=output_dir, content_key=key)
+    scheduler.notify()
+
+    return {"job_id": job_id, "cached": False, "queue_position": store.queue_position(job_id)}
 
 @app.post("/api/dxf2step/scan-layers")
 async def scan_layers(file: UploadFile = File(...)):
@@ -218,13 +445,18 @@ async def scan_layers(file: UploadFile = File(...)):
 
 @app.get("/api/dxf2step/jobs/{job_id}", response_model=JobStatus)
 def get_job_status(job_id: str):
-    if job_id not in jobs_db:
+    job = store.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    return jobs_db[job_id]
+    if job["state"] == "queued":
+        job["queue_position"] = store.queue_position(job_id)
+        ahead = job["queue_position"] - 1 if job["queue_position"] else 0
+        job["current"] = f"Waiting in queue ({ahead} job(s) ahead)."
+    return job
 
 @app.get("/api/dxf2step/jobs/{job_id}/outputs")
 def list_outputs(job_id: str):
-    output_dir = os.path.join(JOBS_DIR, job_id, "output")
+    output_dir = job_output_dir(job_id)
     if not os.path.exists(output_dir):
         raise HTTPException(status_code=404, detail="Outputs not found")
         
@@ -261,7 +493,7 @@ def list_outputs(job_id: str):
 
 @app.get("/api/dxf2step/jobs/{job_id}/download/{filename}")
 def download_output(job_id: str, filename: str):
-    file_path = os.path.join(JOBS_DIR, job_id, "output", filename)
+    file_path = os.path.join(job_output_dir(job_id), filename)
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="File not found")
     return FileResponse(file_path)
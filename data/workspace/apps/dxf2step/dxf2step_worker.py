@@ -4,10 +4,16 @@ import argparse
 import json
 import ezdxf
 import math
+import numpy as np
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from collections import defaultdict
 
+from freecad_pool import FREECAD_CONTAINER, FREECAD_WORKERS, FreeCADPool, FreeCADWorkerError
+
 # --- Geometry Utilities ---
 
 def get_distance(p1, p2):
@@ -16,8 +22,63 @@ def get_distance(p1, p2):
 def snap_point(point, grid_size):
     return tuple(round(coord / grid_size) * grid_size for coord in point)
 
+def find_split_params(line_raw, tol):
+    """For each segment (x1, y1, x2, y2) return the sorted parameters [0.0, ..., 1.0]
+    at which some segment endpoint lies strictly on its interior: t in (tol, 1-tol)
+    and perpendicular distance <= tol.
+
+    Endpoints are bucketed on a uniform grid, so each segment only tests the
+    endpoints in cells overlapping its tol-padded bounding box instead of every
+    endpoint in the layer. The projection test uses the same arithmetic as the
+    pairwise version, vectorised, so the parameters are bit-identical.
+    """
+    if not line_raw:
+        return []
+    pts = np.unique(np.asarray(line_raw, dtype=np.float64).reshape(-1, 2), axis=0)
+
+    # Grid sized for ~1 endpoint per cell, never finer than a few tolerances
+    lo = pts.min(axis=0)
+    span = float((pts.max(axis=0) - lo).max())
+    cell = max(4 * tol, span / math.sqrt(len(pts)), 1e-9)
+    ix = np.floor((pts[:, 0] - lo[0]) / cell).astype(np.int64)
+    iy = np.floor((pts[:, 1] - lo[1]) / cell).astype(np.int64)
+    nx, ny = int(ix.max()) + 1, int(iy.max()) + 1
+    keys = ix * ny + iy
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    px, py = pts[order, 0], pts[order, 1]
+
+    pad = tol * 1.5   # > tol: a hit is within tol of the segment, so inside the padded box
+    result = []
+    for x1, y1, x2, y2 in line_raw:
+        dx, dy = x2 - x1, y2 - y1
+        L2 = dx * dx + dy * dy
+        if L2 < 1e-12:
+            result.append([0.0, 1.0])
+            continue
+        cx0 = max(int(math.floor((min(x1, x2) - pad - lo[0]) / cell)), 0)
+        cx1 = min(int(math.floor((max(x1, x2) + pad - lo[0]) / cell)), nx - 1)
+        cy0 = max(int(math.floor((min(y1, y2) - pad - lo[1]) / cell)), 0)
+        cy1 = min(int(math.floor((max(y1, y2) + pad - lo[1]) / cell)), ny - 1)
+        # Cells of one grid column are contiguous in key order: one slice per column
+        cols = np.arange(cx0, cx1 + 1) * ny
+        starts = np.searchsorted(keys, cols + cy0, 'left')
+        lens = np.searchsorted(keys, cols + cy1, 'right') - starts
+        n = int(lens.sum())
+        if n == 0:
+            result.append([0.0, 1.0])
+            continue
+        idx = np.repeat(starts - (np.cumsum(lens) - lens), lens) + np.arange(n)
+
+        qx, qy = px[idx], py[idx]
+        t = ((qx - x1) * dx + (qy - y1) * dy) / L2
+        dist = np.abs((qx - x1) * dy - (qy - y1) * dx) / math.sqrt(L2)
+        hit = (t > tol) & (t < 1.0 - tol) & (dist <= tol)
+        result.append(sorted({0.0, 1.0, *t[hit].tolist()}))
+    return result
+
 class DXFProcessor:
-    def __init__(self, input_path, output_dir, dedup_tol=0.001, snap_tol=0.02):
+    def __init__(self, input_path, output_dir, dedup_tol=0.001, snap_tol=0.02, freecad_workers=FREECAD_WORKERS):
         self.input_path = input_path
         self.output_dir = output_dir
         self.dedup_tol = dedup_tol
@@ -25,6 +86,10 @@ class DXFProcessor:
         self.doc = ezdxf.readfile(input_path)
         self.msp = self.doc.modelspace()
         self.log_data = {"layers": {}, "timestamp": datetime.now().isoformat()}
+        # 0 = one cold FreeCADCmd per script; otherwise persistent workers shared by all layers
+        self.freecad_workers = freecad_workers
+        self.pool = None
+        self._dxf_lock = threading.Lock()
 
     def parse_thickness_from_name(self, name, default):
         # Try to find something like "PART_5mm" or "T3.2"
@@ -50,22 +115,57 @@ class DXFProcessor:
         n_layers = len(layer_names)
         print(f"[DXF loaded] {n_layers} layers: {', '.join(layer_names)}", flush=True)
 
-        for layer_idx, (layer_name, entities) in enumerate(layers.items(), 1):
-            # Get thickness for this layer
-            thickness = layer_configs.get(layer_name)
-            if thickness is None:
-                thickness = self.parse_thickness_from_name(layer_name, default_thickness)
+        self._start_freecad()
+        try:
+            # Layers are independent until reconstruction: build + render them
+            # concurrently, one FreeCAD worker each, and collect in layer order.
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max(1, self.freecad_workers)) as executor:
+                futures = []
+                for layer_idx, (layer_name, entities) in enumerate(layers.items(), 1):
+                    # Get thickness for this layer
+                    thickness = layer_configs.get(layer_name)
+                    if thickness is None:
+                        thickness = self.parse_thickness_from_name(layer_name, default_thickness)
+                    futures.append(executor.submit(self.process_layer, layer_idx, n_layers,
+                                                   layer_name, entities, thickness))
+
+                for layer_name, future in zip(layer_names, futures):
+                    processed, step_path, layer_log = future.result()
+                    if processed is None:
+                        continue
+                    processed_layers.append(processed)
+                    if step_path:
+                        successful_steps.append(step_path)
+                    self.log_data["layers"][layer_name] = layer_log
+            self.log_data["timings"] = {"layers_s": round(time.perf_counter() - started, 3)}
+            self._write_build_log()
+
+            # Multi-view 3D reconstruction: intersect front/top/right slabs
+            if len(successful_steps) >= 2:
+                self.reconstruct_multiview(processed_layers)
+        finally:
+            self._stop_freecad()
+
+    def process_layer(self, layer_idx, n_layers, layer_name, entities, thickness):
+        """Clean one layer, build its STEP and preview PNG.
+
+        Returns (processed_layer, step_path, layer_log); processed_layer is
+        None when the layer has no usable geometry.
+        """
+        t_start = time.perf_counter()
+        print(f"[Layer {layer_idx}/{n_layers}] {layer_name} - thickness {thickness}mm", flush=True)
 
-            print(f"[Layer {layer_idx}/{n_layers}] {layer_name} - thickness {thickness}mm", flush=True)
+        with self._dxf_lock:
             cleaned_entities = self.clean_geometry(entities)
             if not cleaned_entities:
-                continue
+                return None, None, None
 
             # Resolve T-junctions: split overlapping collinear segments and
             # remove shared internal edges, leaving only the outer boundary.
             outer_lines, arc_entities, circle_entities = self.resolve_tjunctions(cleaned_entities)
             if not outer_lines and not arc_entities and not circle_entities:
-                continue
+                return None, None, None
 
             # Create sub-DXF for FreeCAD
             layer_dxf = os.path.join(self.output_dir, f"{layer_name}.cleaned.dxf")
@@ -79,50 +179,48 @@ class DXFProcessor:
             for e in circle_entities:
                 new_msp.add_circle(e.dxf.center, e.dxf.radius)
             new_doc.saveas(layer_dxf)
-            print(f"[T-junction] {layer_name}: {len(cleaned_entities)} raw → {len(outer_lines)} outer edges + {len(arc_entities)} arcs + {len(circle_entities)} circles", flush=True)
-
-            # Track layer for multi-view reconstruction (original entities for bbox)
-            processed_layers.append({
-                'name': layer_name,
-                'dxf_path': layer_dxf,
-                'entities': entities,
-            })
-
-            # Generate FreeCAD Script
-            step_path = os.path.join(self.output_dir, f"{layer_name}.step")
-            fc_script = self.generate_freecad_script(layer_dxf, step_path, thickness)
-            script_path = os.path.join(self.output_dir, f"{layer_name}.py")
-            with open(script_path, 'w', encoding='utf-8') as f:
-                f.write(fc_script)
-
-            print(f"[FreeCAD] STEP generation for {layer_name} ...", flush=True)
-            rc, msg = self.execute_freecad(script_path)
-            step_exists = os.path.exists(step_path)
-            layer_log = {
-                "entities": len(cleaned_entities),
-                "thickness": thickness,
-                "status": "done" if step_exists else "failed",
-                "freecad_msg": msg[:500] if not step_exists else ""
-            }
-
-            # Generate third-angle projection PNG if STEP was created
-            if step_exists:
-                successful_steps.append(step_path)
-                print(f"[FreeCAD] STEP done - rendering preview for {layer_name} ...", flush=True)
-                png_path = os.path.join(self.output_dir, f"{layer_name}_views.png")
-                png_rc, png_msg = self.render_step_views(step_path, png_path, layer_name)
-                layer_log["png"] = os.path.basename(png_path) if os.path.exists(png_path) else None
-                if not os.path.exists(png_path):
-                    layer_log["png_error"] = png_msg[:300]
-
-            self.log_data["layers"][layer_name] = layer_log
+        print(f"[T-junction] {layer_name}: {len(cleaned_entities)} raw → {len(outer_lines)} outer edges + {len(arc_entities)} arcs + {len(circle_entities)} circles", flush=True)
 
-        with open(os.path.join(self.output_dir, "build_log.json"), 'w') as f:
-            json.dump(self.log_data, f, indent=2)
+        # Track layer for multi-view reconstruction (original entities for bbox)
+        processed = {
+            'name': layer_name,
+            'dxf_path': layer_dxf,
+            'entities': entities,
+        }
+        t_prep = time.perf_counter()
 
-        # Multi-view 3D reconstruction: intersect front/top/right slabs
-        if len(successful_steps) >= 2:
-            self.reconstruct_multiview(processed_layers)
+        # Generate FreeCAD Script
+        step_path = os.path.join(self.output_dir, f"{layer_name}.step")
+        fc_script = self.generate_freecad_script(layer_dxf, step_path, thickness)
+        script_path = os.path.join(self.output_dir, f"{layer_name}.py")
+        with open(script_path, 'w', encoding='utf-8') as f:
+            f.write(fc_script)
+
+        print(f"[FreeCAD] STEP generation for {layer_name} ...", flush=True)
+        rc, msg = self.execute_freecad(script_path)
+        t_step = time.perf_counter()
+        step_exists = os.path.exists(step_path)
+        layer_log = {
+            "entities": len(cleaned_entities),
+            "thickness": thickness,
+            "status": "done" if step_exists else "failed",
+            "freecad_msg": msg[:500] if not step_exists else ""
+        }
+        timings = {"prep_s": round(t_prep - t_start, 3), "step_s": round(t_step - t_prep, 3)}
+
+        # Generate third-angle projection PNG if STEP was created
+        if step_exists:
+            print(f"[FreeCAD] STEP done - rendering preview for {layer_name} ...", flush=True)
+            png_path = os.path.join(self.output_dir, f"{layer_name}_views.png")
+            png_rc, png_msg = self.render_step_views(step_path, png_path, layer_name)
+            layer_log["png"] = os.path.basename(png_path) if os.path.exists(png_path) else None
+            if not os.path.exists(png_path):
+                layer_log["png_error"] = png_msg[:300]
+            timings["render_s"] = round(time.perf_counter() - t_step, 3)
+
+        timings["total_s"] = round(time.perf_counter() - t_start, 3)
+        layer_log["timings"] = timings
+        return processed, step_path if step_exists else None, layer_log
 
     def process_manual(self, view_assignments):
         """Reconstruct 3D from 2D views using intersection."""
@@ -134,7 +232,11 @@ class DXFProcessor:
         with open(script_path, 'w', encoding='utf-8') as f:
             f.write(fc_script)
             
-        self.execute_freecad(script_path)
+        self._start_freecad()
+        try:
+            self.execute_freecad(script_path)
+        finally:
+            self._stop_freecad()
         self.log_data["manual_reconstruction"] = "started"
 
     def generate_manual_reconstruction_script(self, dxf_path, assignments):
@@ -206,9 +308,9 @@ else:
         share a common interior point rather than a common endpoint.
 
         Algorithm:
-          1. Collect all LINE endpoints.
-          2. For each LINE segment, check whether any endpoint lies strictly on
-             its interior. If so, split the segment there.
+          1. Collect all LINE endpoints (grid-bucketed, see find_split_params).
+          2. For each LINE segment, check whether any nearby endpoint lies strictly
+             on its interior. If so, split the segment there.
           3. Count occurrences of each sub-segment (by normalised key).
              Segments that appear EXACTLY ONCE are outer-boundary edges.
              Segments appearing 2+ times are shared internal edges — remove them.
@@ -229,36 +331,9 @@ else:
             elif e.dxftype() == 'CIRCLE':
                 circle_entities.append(e)
 
-        # All endpoints (used as potential split points)
-        endpoints = set()
-        for x1, y1, x2, y2 in line_raw:
-            endpoints.add((x1, y1))
-            endpoints.add((x2, y2))
-
-        def split_param(px, py, x1, y1, x2, y2):
-            """Return t in (tol, 1-tol) if (px,py) lies strictly on seg interior."""
-            dx, dy = x2 - x1, y2 - y1
-            L2 = dx * dx + dy * dy
-            if L2 < 1e-12:
-                return None
-            t = ((px - x1) * dx + (py - y1) * dy) / L2
-            if t <= tol or t >= 1.0 - tol:
-                return None
-            # Perpendicular distance must be within tolerance
-            dist = abs((px - x1) * dy - (py - y1) * dx) / math.sqrt(L2)
-            if dist > tol:
-                return None
-            return t
-
         # Split every segment at all interior endpoint hits
         split_segs = []
-        for x1, y1, x2, y2 in line_raw:
-            ts = [0.0, 1.0]
-            for px, py in endpoints:
-                t = split_param(px, py, x1, y1, x2, y2)
-                if t is not None:
-                    ts.append(t)
-            ts = sorted(set(ts))
+        for (x1, y1, x2, y2), ts in zip(line_raw, find_split_params(line_raw, tol)):
             for i in range(len(ts) - 1):
                 t0, t1 = ts[i], ts[i + 1]
                 px0 = x1 + (x2 - x1) * t0;  py0 = y1 + (y2 - y1) * t0
@@ -778,6 +853,7 @@ else:
             f.write(script)
 
         print("[FreeCAD] Running multi-view reconstruction script ...", flush=True)
+        started = time.perf_counter()
         rc, msg = self.execute_freecad(script_path)
 
         if os.path.exists(combined_step):
@@ -793,16 +869,53 @@ else:
             self.log_data["combined_step"] = None
             self.log_data["combined_error"] = msg[:300] if msg else "Unknown error"
 
+        self.log_data.setdefault("timings", {})["reconstruction_s"] = round(time.perf_counter() - started, 3)
+
         # Re-save build_log.json with combined step info
+        self._write_build_log()
+
+    def _start_freecad(self):
+        if self.freecad_workers > 0 and self.pool is None:
+            self.pool = FreeCADPool(self.freecad_workers, self.output_dir, self._to_container_path)
+            self.log_data["freecad"] = {"mode": "persistent", "workers": self.pool.size}
+
+    def _stop_freecad(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    def _write_build_log(self):
+        if self.pool is not None:
+            self.log_data["freecad"]["worker_starts"] = self.pool.started
         with open(os.path.join(self.output_dir, "build_log.json"), 'w') as f:
             json.dump(self.log_data, f, indent=2)
 
     def execute_freecad(self, script_path):
-        container_name = "clawstack-unified-clawdbot-gateway-1"
         linux_script_path = self._to_container_path(script_path)
+        pool = self.pool
+        if pool is not None:
+            try:
+                rc, out, err, _ = pool.run(linux_script_path, timeout=120)
+            except FreeCADWorkerError as e:
+                # Worker could not start or crashed mid-script: run this script cold.
+                # If workers cannot start at all, stay on cold FreeCADCmd from now on.
+                print(f"FreeCAD worker error, running {os.path.basename(script_path)} with FreeCADCmd: {e}", flush=True)
+                if pool.failed and self.pool is pool:
+                    self.pool = None
+                    self.log_data["freecad"] = {"mode": "cold", "worker_error": str(e)[:300]}
+                    pool.close()
+            else:
+                if rc == -1 and err == "Timeout":
+                    print("FreeCAD timed out after 120s")
+                    return -1, "Timeout"
+                if rc != 0:
+                    print(f"FreeCAD exited with code {rc}: {err}")
+                    return rc, err
+                print(out)
+                return 0, out
 
         # Use bash -c to avoid MSYS/Git Bash path conversion on Windows host
-        cmd = ["docker", "exec", container_name, "bash", "-c", f"FreeCADCmd '{linux_script_path}'"]
+        cmd = ["docker", "exec", FREECAD_CONTAINER, "bash", "-c", f"FreeCADCmd '{linux_script_path}'"]
         try:
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
             if result.returncode != 0:
@@ -825,17 +938,26 @@ if __name__ == "__main__":
     parser.add_argument("--layer-configs", type=str, default="{}")
     parser.add_argument("--manual-mode", action="store_true")
     parser.add_argument("--view-assignments", type=str, default="[]")
+    parser.add_argument("--freecad-workers", type=int, default=FREECAD_WORKERS,
+                        help="persistent FreeCAD workers (0 = cold FreeCADCmd per script)")
     args = parser.parse_args()
     
-    processor = DXFProcessor(args.input, args.output)
-    
-    if args.manual_mode:
-        assignments = json.loads(args.view_assignments)
-        processor.process_manual(assignments)
-    else:
-        layer_configs = {}
-        try:
-            layer_configs = json.loads(args.layer_configs)
-        except:
-            print(f"Warning: Failed to parse layer-configs: {args.layer_configs}")
-        processor.process(args.thickness, layer_configs)
+    # Completion marker for dxf2step_api: lets an API that restarted while this
+    # worker was running settle the job from the log alone.
+    status = "failed"
+    try:
+        processor = DXFProcessor(args.input, args.output, freecad_workers=args.freecad_workers)
+
+        if args.manual_mode:
+            assignments = json.loads(args.view_assignments)
+            processor.process_manual(assignments)
+        else:
+            layer_configs = {}
+            try:
+                layer_configs = json.loads(args.layer_configs)
+            except:
+                print(f"Warning: Failed to parse layer-configs: {args.layer_configs}")
+            processor.process(args.thickness, layer_configs)
+        status = "ok"
+    finally:
+        print(f"[Worker] exit {status}", flush=True)
@@ -0,0 +1,238 @@
+"""
+Persistent FreeCADCmd workers for dxf2step_worker.
+
+Every `docker exec ... FreeCADCmd script.py` pays the full FreeCAD start-up,
+which dominates small layers (one start for the STEP build, another for the
+PNG render, per layer). A FreeCADWorker instead keeps one FreeCADCmd process
+running inside the gateway container and feeds it job scripts over stdin:
+
+  host → worker   one JSON line per job:  {"id": 3, "script": "/home/node/clawd/.../Layer.py"}
+  worker → host   one line per reply:     @@FCWORKER@@{"id": 3, "rc": 0, "out": "...", "err": "..."}
+
+The server exec()s each script in a fresh namespace with stdout/stderr
+captured and closes every document afterwards, so scripts see the same clean
+state as under a cold FreeCADCmd. Anything FreeCAD prints outside a reply
+line (C++ console messages) is attached to the current job's output.
+
+FreeCADPool starts workers lazily, up to `size`, and hands each script to an
+idle one; independent layers therefore build and render in parallel. A worker
+that times out is killed (host process and the FreeCADCmd inside the
+container) and replaced on the next job.
+
+Environment:
+  DXF2STEP_FREECAD_WORKERS    parallel FreeCAD workers (default 2; 0 = cold FreeCADCmd per script)
+  DXF2STEP_FREECAD_CONTAINER  container that runs FreeCADCmd
+"""
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+
+FREECAD_CONTAINER = os.getenv("DXF2STEP_FREECAD_CONTAINER", "clawstack-unified-clawdbot-gateway-1")
+FREECAD_WORKERS = int(os.getenv("DXF2STEP_FREECAD_WORKERS", "2"))
+
+STARTUP_TIMEOUT = 90
+_MARK = "@@FCWORKER@@"
+
+# Runs inside FreeCADCmd. Reply lines go to the original stdout; job output is captured.
+_SERVER_SCRIPT = r'''
+import contextlib, io, json, sys, time, traceback
+import FreeCAD as App
+
+MARK = "@@FCWORKER@@"
+_out = sys.stdout
+
+def reply(**msg):
+    _out.write(MARK + json.dumps(msg) + "\n")
+    _out.flush()
+
+def run(path):
+    out, err = io.StringIO(), io.StringIO()
+    rc = 0
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        try:
+            with open(path, encoding="utf-8") as f:
+                code = compile(f.read(), path, "exec")
+            exec(code, {"__name__": "__main__", "__file__": path})
+        except SystemExit as e:
+            rc = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except BaseException:
+            rc = 1
+            traceback.print_exc()
+    for name in list(App.listDocuments()):
+        try:
+            App.closeDocument(name)
+        except Exception:
+            pass
+    return rc, out.getvalue(), err.getvalue()
+
+reply(ready=True)
+while True:
+    line = sys.stdin.readline()
+    if not line:
+        break
+    job = json.loads(line)
+    if job.get("quit"):
+        break
+    started = time.time()
+    rc, out, err = run(job["script"])
+    reply(id=job["id"], rc=rc, out=out, err=err, elapsed=round(time.time() - started, 3))
+'''
+
+
+class FreeCADWorkerError(Exception):
+    """The worker could not be started or died before answering."""
+
+
+class FreeCADWorker:
+    def __init__(self, index, server_host_path, server_container_path, container=FREECAD_CONTAINER):
+        self.index = index
+        self.container = container
+        self.server_container_path = server_container_path
+        self._server_host_path = server_host_path
+        self._proc = None
+        self._replies = queue.Queue()
+        self._noise = []
+        self._next_id = 0
+
+    @property
+    def alive(self):
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self, timeout=STARTUP_TIMEOUT):
+        with open(self._server_host_path, "w", encoding="utf-8") as f:
+            f.write(_SERVER_SCRIPT)
+        # bash -c avoids MSYS/Git Bash path conversion on a Windows host
+        cmd = ["docker", "exec", "-i", self.container, "bash", "-c",
+               f"exec FreeCADCmd '{self.server_container_path}'"]
+        self._replies = queue.Queue()
+        self._noise = []
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                      stderr=subprocess.STDOUT, text=True, bufsize=1)
+        threading.Thread(target=self._read, args=(self._proc, self._replies),
+                         name=f"freecad-worker-{self.index}", daemon=True).start()
+        msg = self._wait(timeout)
+        if not msg or not msg.get("ready"):
+            output = "".join(self._noise)[-500:]
+            self.kill()
+            raise FreeCADWorkerError(f"FreeCAD worker {self.index} did not start: {output or 'no reply'}")
+
+    def run(self, script_container_path, timeout):
+        """Execute one script; returns (rc, stdout, stderr). rc -1 on timeout."""
+        self._next_id += 1
+        job_id = self._next_id
+        self._noise = []
+        try:
+            self._proc.stdin.write(json.dumps({"id": job_id, "script": script_container_path}) + "\n")
+            self._proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            self.kill()
+            raise FreeCADWorkerError(f"FreeCAD worker {self.index} is gone: {e}")
+
+        deadline = time.monotonic() + timeout
+        while True:
+            msg = self._wait(max(0.0, deadline - time.monotonic()))
+            if msg is None:
+                timed_out = self.alive
+                output = "".join(self._noise)
+                self.kill()
+                if timed_out:
+                    return -1, output, "Timeout"
+                raise FreeCADWorkerError(f"FreeCAD worker {self.index} exited: {output[-500:]}")
+            if msg.get("id") == job_id:
+                noise = "".join(self._noise)
+                return msg["rc"], noise + msg.get("out", ""), msg.get("err", "")
+
+    def stop(self, timeout=10):
+        if self.alive:
+            try:
+                self._proc.stdin.write(json.dumps({"quit": True}) + "\n")
+                self._proc.stdin.close()
+                self._proc.wait(timeout=timeout)
+            except (OSError, subprocess.TimeoutExpired):
+                self.kill()
+        if os.path.exists(self._server_host_path):
+            os.remove(self._server_host_path)
+
+    def kill(self):
+        """Stop the host-side docker exec and the FreeCADCmd it started in the container."""
+        if self._proc is None:
+            return
+        if self._proc.poll() is None:
+            self._proc.kill()
+            try:
+                subprocess.run(["docker", "exec", self.container, "pkill", "-f", self.server_container_path],
+                               capture_output=True, timeout=15)
+            except (OSError, subprocess.SubprocessError):
+                pass
+        self._proc.wait()
+
+    def _wait(self, timeout):
+        try:
+            return self._replies.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _read(self, proc, replies):
+        for line in proc.stdout:
+            if line.startswith(_MARK):
+                try:
+                    replies.put(json.loads(line[len(_MARK):]))
+                    continue
+                except ValueError:
+                    pass
+            self._noise.append(line)
+        replies.put(None)
+
+
+class FreeCADPool:
+    """Bounded set of FreeCADWorkers, started on demand."""
+
+    def __init__(self, size, script_dir, to_container, container=FREECAD_CONTAINER):
+        self.size = max(1, size)
+        self.container = container
+        self.started = 0            # worker start-ups, including restarts
+        self.failed = False         # a worker failed to start: FreeCADCmd cannot serve jobs here
+        self._script_dir = script_dir
+        self._to_container = to_container
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._workers = []
+        self._lock = threading.Lock()
+        for i in range(self.size):
+            self._idle.put(i)
+
+    def run(self, script_container_path, timeout=120):
+        """Run one script on an idle worker; returns (rc, stdout, stderr, worker_index)."""
+        with self._slots:
+            index = self._idle.get()
+            try:
+                worker = self._worker(index)
+                if not worker.alive:
+                    with self._lock:
+                        self.started += 1
+                    try:
+                        worker.start()
+                    except FreeCADWorkerError:
+                        self.failed = True
+                        raise
+                rc, out, err = worker.run(script_container_path, timeout)
+                return rc, out, err, index
+            finally:
+                self._idle.put(index)
+
+    def close(self):
+        for worker in self._workers:
+            if worker is not None:
+                worker.stop()
+
+    def _worker(self, index):
+        with self._lock:
+            while len(self._workers) <= index:
+                self._workers.append(None)
+            if self._workers[index] is None:
+                host_path = os.path.join(self._script_dir, f"_freecad_worker_{os.getpid()}_{index}.py")
+                self._workers[index] = FreeCADWorker(index, host_path, self._to_container(host_path), self.container)
+            return self._workers[index]
@@ -0,0 +1,128 @@
+"""
+SQLite job table for dxf2step_api.
+
+Jobs survive API restarts: the scheduler claims queued rows in submission
+order, running rows are re-attached (or re-queued) on start-up, and finished
+rows keep their output directory and content key for result reuse.
+
+One short-lived connection per call (WAL mode), so the scheduler threads and
+the request handlers never share a connection object.
+"""
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq          INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id       TEXT UNIQUE NOT NULL,
+    state        TEXT NOT NULL,
+    progress     REAL NOT NULL DEFAULT 0,
+    current      TEXT NOT NULL DEFAULT '',
+    warnings     TEXT NOT NULL DEFAULT '[]',
+    params       TEXT NOT NULL DEFAULT '{}',
+    input_path   TEXT,
+    output_dir   TEXT,
+    content_key  TEXT,
+    cached_from  TEXT,
+    pid          INTEGER,
+    created_at   REAL,
+    started_at   REAL,
+    finished_at  REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, seq);
+CREATE INDEX IF NOT EXISTS jobs_content ON jobs (content_key, state);
+"""
+
+_JSON_FIELDS = ("warnings", "params")
+
+
+def _row(row):
+    if row is None:
+        return None
+    job = dict(row)
+    for key in _JSON_FIELDS:
+        job[key] = json.loads(job[key]) if job.get(key) else ([] if key == "warnings" else {})
+    return job
+
+
+class JobStore:
+    def __init__(self, path):
+        self.path = path
+        with self._db() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _db(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # ── Writes ───────────────────────────────────────────────────────────────
+
+    def create(self, job_id, state, **fields):
+        fields = {**fields, "job_id": job_id, "state": state}
+        fields.setdefault("created_at", time.time())
+        for key in _JSON_FIELDS:
+            if key in fields:
+                fields[key] = json.dumps(fields[key])
+        cols = ", ".join(fields)
+        marks = ", ".join("?" for _ in fields)
+        with self._db() as db:
+            db.execute(f"INSERT INTO jobs ({cols}) VALUES ({marks})", list(fields.values()))
+
+    def update(self, job_id, **fields):
+        for key in _JSON_FIELDS:
+            if key in fields:
+                fields[key] = json.dumps(fields[key])
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        with self._db() as db:
+            db.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", [*fields.values(), job_id])
+
+    def claim_next(self):
+        """Atomically move the oldest queued job to 'running' and return it."""
+        with self._db() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT * FROM jobs WHERE state = 'queued' ORDER BY seq LIMIT 1").fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE jobs SET state = 'running', started_at = ?, pid = NULL WHERE seq = ?",
+                       (time.time(), row["seq"]))
+        job = _row(row)
+        job["state"] = "running"
+        return job
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def get(self, job_id):
+        with self._db() as db:
+            return _row(db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone())
+
+    def by_state(self, state):
+        with self._db() as db:
+            return [_row(r) for r in db.execute("SELECT * FROM jobs WHERE state = ? ORDER BY seq", (state,))]
+
+    def count(self, state):
+        with self._db() as db:
+            return db.execute("SELECT COUNT(*) FROM jobs WHERE state = ?", (state,)).fetchone()[0]
+
+    def queue_position(self, job_id):
+        """1-based position among queued jobs, or None if the job is not queued."""
+        with self._db() as db:
+            row = db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state = 'queued' AND seq <= "
+                "(SELECT seq FROM jobs WHERE job_id = ? AND state = 'queued')", (job_id,)).fetchone()
+        return row[0] or None
+
+    def finished_with_key(self, content_key):
+        """Successful jobs (newest first) that produced results for this content key."""
+        with self._db() as db:
+            rows = db.execute("SELECT * FROM jobs WHERE content_key = ? AND state = 'done' "
+                              "AND cached_from IS NULL ORDER BY seq DESC", (content_key,))
+            return [_row(r) for r in rows]
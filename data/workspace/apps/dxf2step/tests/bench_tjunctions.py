@@ -0,0 +1,183 @@
+"""
+T-junction resolution regression / performance harness
+=======================================================
+1. Every layer of tests/dxf_files/*.dxf: resolve_tjunctions must return exactly
+   the edges of the original pairwise implementation (kept below as the oracle)
+2. Synthetic dense die-plate layers (overlapping strips + pierce holes): same
+   identity check where the pairwise version is still affordable, timings for all
+3. --score N: afterwards run tests/score.py round N end-to-end
+   (needs the API on localhost:8002 and FreeCAD in the gateway container)
+
+Usage:
+  python tests/bench_tjunctions.py [--sizes 1000,5000,20000] [--legacy-max 5000] [--score 4]
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import ezdxf
+
+TESTS_DIR = Path(__file__).parent
+DXF_DIR   = TESTS_DIR / "dxf_files"
+
+sys.path.insert(0, str(TESTS_DIR.parent))
+sys.path.insert(0, str(TESTS_DIR))
+from dxf2step_worker import DXFProcessor  # noqa: E402
+
+
+# ── Oracle: the original O(segments × endpoints) implementation ──────────────
+
+def legacy_outer_segments(line_raw, tol=0.02):
+    endpoints = set()
+    for x1, y1, x2, y2 in line_raw:
+        endpoints.add((x1, y1))
+        endpoints.add((x2, y2))
+
+    def split_param(px, py, x1, y1, x2, y2):
+        dx, dy = x2 - x1, y2 - y1
+        L2 = dx * dx + dy * dy
+        if L2 < 1e-12:
+            return None
+        t = ((px - x1) * dx + (py - y1) * dy) / L2
+        if t <= tol or t >= 1.0 - tol:
+            return None
+        dist = abs((px - x1) * dy - (py - y1) * dx) / math.sqrt(L2)
+        if dist > tol:
+            return None
+        return t
+
+    split_segs = []
+    for x1, y1, x2, y2 in line_raw:
+        ts = [0.0, 1.0]
+        for px, py in endpoints:
+            t = split_param(px, py, x1, y1, x2, y2)
+            if t is not None:
+                ts.append(t)
+        ts = sorted(set(ts))
+        for i in range(len(ts) - 1):
+            t0, t1 = ts[i], ts[i + 1]
+            px0 = x1 + (x2 - x1) * t0;  py0 = y1 + (y2 - y1) * t0
+            px1 = x1 + (x2 - x1) * t1;  py1 = y1 + (y2 - y1) * t1
+            split_segs.append((px0, py0, px1, py1))
+
+    def seg_key(x1, y1, x2, y2):
+        g = tol
+        a = (round(x1 / g) * g, round(y1 / g) * g)
+        b = (round(x2 / g) * g, round(y2 / g) * g)
+        return (min(a, b), max(a, b))
+
+    counts = Counter(seg_key(*s) for s in split_segs)
+    seen_keys = set()
+    outer_segs = []
+    for s in split_segs:
+        k = seg_key(*s)
+        if k not in seen_keys and counts[k] == 1:
+            seen_keys.add(k)
+            outer_segs.append(s)
+    return outer_segs
+
+
+def line_coords(entities):
+    out = []
+    for e in entities:
+        if e.dxftype() == 'LINE':
+            s, en = e.dxf.start, e.dxf.end
+            out.append((float(s.x), float(s.y), float(en.x), float(en.y)))
+    return out
+
+
+# ── Synthetic dense layers ───────────────────────────────────────────────────
+
+def dense_layer(n_lines, seed=0):
+    """Die plate: overlapping horizontal/vertical strips (T-junctions, shared edges)
+    plus small square pierce holes and a few diagonal relief cuts."""
+    rng = random.Random(seed)
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    size = 40.0 * math.sqrt(n_lines)
+    count = 0
+
+    def rect(x0, y0, w, h):
+        nonlocal count
+        pts = [(x0, y0), (x0 + w, y0), (x0 + w, y0 + h), (x0, y0 + h)]
+        for a, b in zip(pts, pts[1:] + pts[:1]):
+            msp.add_line(a, b)
+        count += 4
+
+    n_strips = max(2, n_lines // 40)
+    for i in range(n_strips):
+        pos = round(rng.uniform(0, size), 1)
+        if i % 2:
+            rect(0.0, pos, size, 20.0)
+        else:
+            rect(pos, 0.0, 20.0, size)
+    while count < n_lines:
+        if rng.random() < 0.05:
+            x, y = rng.uniform(0, size), rng.uniform(0, size)
+            msp.add_line((x, y), (x + 15.0, y + 9.0))
+            count += 1
+        else:
+            rect(round(rng.uniform(0, size), 1), round(rng.uniform(0, size), 1), 6.0, 6.0)
+    return list(msp)
+
+
+# ── Runner ───────────────────────────────────────────────────────────────────
+
+def check_layer(label, processor, entities, run_legacy):
+    cleaned = processor.clean_geometry(entities)
+    raw = line_coords(cleaned)
+    t0 = time.perf_counter()
+    outer, _, _ = processor.resolve_tjunctions(cleaned)
+    t_new = time.perf_counter() - t0
+    row = f"  {label:<34} lines={len(raw):>6}  outer={len(outer):>6}  grid {t_new * 1000:9.1f} ms"
+    if not run_legacy:
+        print(row + "  (pairwise skipped)")
+        return True
+    t0 = time.perf_counter()
+    expected = legacy_outer_segments(raw)
+    t_old = time.perf_counter() - t0
+    same = outer == expected
+    speedup = t_old / t_new if t_new > 0 else float('inf')
+    print(row + f"  pairwise {t_old * 1000:9.1f} ms  x{speedup:6.1f}  {'OK' if same else 'MISMATCH'}")
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,5000,20000", help="synthetic layer sizes (LINE count)")
+    parser.add_argument("--legacy-max", type=int, default=5000,
+                        help="largest synthetic layer also run through the pairwise oracle")
+    parser.add_argument("--score", type=int, metavar="ROUND", help="run tests/score.py afterwards")
+    args = parser.parse_args()
+
+    ok = True
+    print("tests/dxf_files:")
+    for path in sorted(DXF_DIR.glob("*.dxf")):
+        processor = DXFProcessor(str(path), str(TESTS_DIR / "_bench_out"), freecad_workers=0)
+        for layer, entities in processor.group_by_layer().items():
+            ok &= check_layer(f"{path.stem}/{layer}", processor, entities, True)
+
+    print("synthetic dense layers:")
+    processor = DXFProcessor(str(sorted(DXF_DIR.glob("*.dxf"))[0]), str(TESTS_DIR / "_bench_out"), freecad_workers=0)
+    for n in (int(v) for v in args.sizes.split(",") if v):
+        ok &= check_layer(f"dense_{n}", processor, dense_layer(n), n <= args.legacy_max)
+
+    print("identical output:", "yes" if ok else "NO")
+    if not ok:
+        return 1
+
+    if args.score is not None:
+        import score
+        results = score.run_round(args.score)
+        sc = score.overall(results)
+        score.save_results(results, args.score, sc)
+        print(f"OVERALL SCORE: {sc:.1f}/100")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
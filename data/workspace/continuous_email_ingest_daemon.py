@@ -314,7 +314,10 @@ def run_incremental_index(
     force_query: str | None,
     status: dict[str, Any],
     timeout_seconds: int,
+    sync_mode: str = "delta",
 ) -> dict[str, Any]:
+    # delta: new mail is written to a changeset DB and applied to email_search.db in one transaction.
+    # snapshot: the whole DB is cloned, indexed and promoted back (I/O grows with mailbox size).
     command = [
         "python",
         str(WORKSPACE / "host_gmail_incremental_sync.py"),
@@ -322,6 +325,8 @@ def run_incremental_index(
         str(gmail_max_messages),
         "--gmail-fallback-days",
         str(gmail_fallback_days),
+        "--mode",
+        sync_mode,
     ]
     if force_query:
         command.extend(["--gmail-force-query", force_query])
@@ -474,6 +479,7 @@ def build_initial_status(args: argparse.Namespace) -> dict[str, Any]:
         "learningIntervalCycles": args.learning_interval_cycles,
         "fullBackfillIntervalCycles": args.full_backfill_interval_cycles,
         "indexTimeoutSeconds": args.gmail_index_timeout_seconds,
+        "syncMode": args.sync_mode,
         "lastSuccessAt": state.get("lastSuccessAt"),
         "lastFullBackfillAt": last_full_backfill_at,
         "lastRepairAt": state.get("lastRepairAt"),
@@ -491,6 +497,7 @@ def main() -> None:
     parser.add_argument("--gmail-fallback-days", type=int, default=3)
     parser.add_argument("--gmail-force-query")
     parser.add_argument("--gmail-index-timeout-seconds", type=int, default=900)
+    parser.add_argument("--sync-mode", choices=("delta", "snapshot"), default="delta")
     parser.add_argument("--db-repair-cooldown-minutes", type=int, default=180)
     parser.add_argument("--once", action="store_true")
     parser.add_argument("--skip-full-backfill", action="store_true")
@@ -517,6 +524,7 @@ def main() -> None:
             args.gmail_force_query,
             status,
             args.gmail_index_timeout_seconds,
+            args.sync_mode,
         )
         index_summary = parse_latest_json(index_result.get("stdout", ""))
         status["lastIndexResult"] = index_result
@@ -8,21 +8,33 @@ email_search.db の FTS テーブルを使って高速検索する。
 
 起動:
   python3 data/workspace/email_search_api.py
+
+環境変数:
+  EMAIL_SEARCH_DB  DB パスの明示指定 (未指定なら既定の候補から探す)
 """
 from __future__ import annotations
 
 import json
+import os
+import queue
 import re
 import sqlite3
 import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta, timezone
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
+from email_search_fts import CJK_PATTERN, TRIGRAM_MIN_CHARS, has_table, quote_fts_phrase
+
 JST = timezone(timedelta(hours=9))
 WORKSPACE = Path(__file__).resolve().parent
 DB_CANDIDATES = [
+    *([Path(os.environ["EMAIL_SEARCH_DB"])] if os.environ.get("EMAIL_SEARCH_DB") else []),
     WORKSPACE / "email_search.db",
     Path("/home/node/clawd/email_search.db"),
 ]
@@ -42,12 +54,188 @@ def find_db() -> Path:
 DB_PATH = find_db()
 
 
-def connect() -> sqlite3.Connection:
-    con = sqlite3.connect(DB_PATH, timeout=15)
+POOL_SIZE = 8
+MMAP_SIZE = 256 * 1024 * 1024
+CACHE_SIZE_KIB = 64 * 1024
+STATS_TTL_SEC = 30.0
+SEARCH_CACHE_SIZE = 256
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+def open_connection() -> sqlite3.Connection:
+    """読み取り専用・チューニング済みの接続を開く。"""
+    con = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, timeout=15, check_same_thread=False)
+    try:
+        # connect() は遅延オープンなので、ro で読めるかはスキーマを読んで初めて分かる
+        con.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+    except sqlite3.OperationalError:
+        # WAL の -shm が無い等で ro が開けない環境は通常接続 + query_only で代替
+        con.close()
+        con = sqlite3.connect(DB_PATH, timeout=15, check_same_thread=False)
     con.row_factory = sqlite3.Row
+    con.execute("PRAGMA query_only=ON")
+    con.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    con.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
     return con
 
 
+def db_marker() -> tuple:
+    """インデクサのコミットを検知するマーカー (DB/WAL の inode・サイズ・mtime)。"""
+    parts: list = []
+    for path in (DB_PATH, DB_PATH.with_name(DB_PATH.name + "-wal")):
+        try:
+            st = path.stat()
+            parts.append((st.st_ino, st.st_size, st.st_mtime_ns))
+        except FileNotFoundError:
+            parts.append(None)
+    return tuple(parts)
+
+
+def db_inode() -> int | None:
+    try:
+        return DB_PATH.stat().st_ino
+    except FileNotFoundError:
+        return None
+
+
+class ConnectionPool:
+    """ThreadingHTTPServer はリクエスト毎にスレッドを作るため、thread-local ではなく共有プールで使い回す。
+
+    接続は開いた時点の DB inode と組で保持し、DB ファイルが差し替えられた後は
+    貸出中だった接続も返却時に閉じる (古い unlink 済み inode を読み続けないように)。
+    """
+
+    def __init__(self, size: int = POOL_SIZE) -> None:
+        self._idle: "queue.LifoQueue[tuple[int | None, sqlite3.Connection]]" = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._inode = None
+
+    def _check_replaced(self) -> int | None:
+        # DB ファイルが差し替えられたら古い inode の接続を捨てる
+        inode = db_inode()
+        if inode is None:
+            return self._inode
+        with self._lock:
+            if self._inode == inode:
+                return inode
+            self._inode = inode
+            while True:
+                try:
+                    self._idle.get_nowait()[1].close()
+                except queue.Empty:
+                    break
+        return inode
+
+    @contextmanager
+    def connection(self):
+        inode = self._check_replaced()
+        con = None
+        while con is None:
+            try:
+                tag, idle = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if tag == inode:
+                con = idle
+            else:
+                idle.close()
+        if con is None:
+            tag, con = inode, open_connection()
+        try:
+            yield con
+        finally:
+            if tag != db_inode():
+                con.close()
+            else:
+                try:
+                    self._idle.put_nowait((tag, con))
+                except queue.Full:
+                    con.close()
+
+
+POOL = ConnectionPool()
+
+
+def connect():
+    return POOL.connection()
+
+
+class QueryCache:
+    """同一クエリの LRU キャッシュ。db_marker() が変わったエントリは無効。"""
+
+    def __init__(self, maxsize: int = SEARCH_CACHE_SIZE) -> None:
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, marker, ttl: float | None = None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                cached_marker, stored_at, value = entry
+                fresh = ttl is None or time.monotonic() - stored_at < ttl
+                if cached_marker == marker and fresh:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, marker, value) -> None:
+        with self._lock:
+            self._data[key] = (marker, time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+class LatencyHistogram:
+    def __init__(self, buckets_ms: tuple = LATENCY_BUCKETS_MS) -> None:
+        self.buckets_ms = buckets_ms
+        self._lock = threading.Lock()
+        self._routes: dict[str, dict] = {}
+
+    def observe(self, route: str, elapsed_ms: float) -> None:
+        with self._lock:
+            stat = self._routes.setdefault(
+                route, {"count": 0, "sum_ms": 0.0, "max_ms": 0.0, "buckets": [0] * (len(self.buckets_ms) + 1)}
+            )
+            stat["count"] += 1
+            stat["sum_ms"] += elapsed_ms
+            stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+            for i, upper in enumerate(self.buckets_ms):
+                if elapsed_ms <= upper:
+                    stat["buckets"][i] += 1
+                    break
+            else:
+                stat["buckets"][-1] += 1
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{b}ms" for b in self.buckets_ms] + ["le_inf"]
+        with self._lock:
+            return {
+                route: {
+                    "count": stat["count"],
+                    "avg_ms": round(stat["sum_ms"] / stat["count"], 3) if stat["count"] else 0.0,
+                    "max_ms": round(stat["max_ms"], 3),
+                    "buckets": dict(zip(labels, stat["buckets"])),
+                }
+                for route, stat in self._routes.items()
+            }
+
+
+SEARCH_CACHE = QueryCache()
+STATS_CACHE = QueryCache(maxsize=4)
+LATENCY = LatencyHistogram()
+
+
 # ── ヘルパー ──────────────────────────────────────────────────
 
 GARBLED = ("\x1b", "縺", "繧", "荳", "譛", "�")
@@ -83,31 +271,50 @@ def due_label(due_date: str) -> str:
         return ""
 
 
+def fts_target(con: sqlite3.Connection, query: str) -> tuple[str, str]:
+    """日本語クエリは trigram インデックス (emails_fts_ja) に振り分ける。
+
+    unicode61 は日本語を分かち書きしないため、そのままでは LIKE 全件走査に落ちる。
+    3 文字未満の語は trigram で引けないので従来の emails_fts に任せる。
+    """
+    terms = [t for t in re.split(r"\s+", query) if t]
+    if CJK_PATTERN.search(query) and terms and all(len(t) >= TRIGRAM_MIN_CHARS for t in terms):
+        if has_table(con, "emails_fts_ja"):
+            return "emails_fts_ja", " ".join(quote_fts_phrase(t) for t in terms)
+    return "emails_fts", query
+
+
 # ── 検索ロジック ──────────────────────────────────────────────
 
 def search_emails(query: str, limit: int = DEFAULT_LIMIT) -> list[dict]:
-    con = connect()
-    try:
+    marker = db_marker()
+    key = ("emails", query, limit)
+    cached = SEARCH_CACHE.get(key, marker)
+    if cached is not None:
+        return cached
+    with connect() as con:
         # FTS 検索
+        fts_table, fts_query = fts_target(con, query)
         try:
             rows = con.execute(
-                """
+                f"""
                 SELECT e.source, e.source_id, e.subject, e.sender,
                        e.email_date, e.category, e.person, e.snippet,
-                       bm25(emails_fts) AS score
-                FROM emails_fts
-                JOIN emails e ON e.rowid = emails_fts.rowid
-                WHERE emails_fts MATCH ?
+                       bm25({fts_table}) AS score
+                FROM {fts_table}
+                JOIN emails e ON e.rowid = {fts_table}.rowid
+                WHERE {fts_table} MATCH ?
                 ORDER BY score
                 LIMIT ?
                 """,
-                (query, limit),
+                (fts_query, limit),
             ).fetchall()
         except sqlite3.OperationalError:
             rows = []
+            fts_table = "emails_fts"
 
-        # フォールバック: LIKE 検索
-        if not rows:
+        # フォールバック: LIKE 検索 (trigram で 0 件なら LIKE でも 0 件なので省略)
+        if not rows and fts_table != "emails_fts_ja":
             needle = f"%{query}%"
             rows = con.execute(
                 """
@@ -134,9 +341,8 @@ def search_emails(query: str, limit: int = DEFAULT_LIMIT) -> list[dict]:
                 "person": r["person"] or "",
                 "snippet": clean(r["snippet"], 200),
             })
-        return result
-    finally:
-        con.close()
+    SEARCH_CACHE.put(key, marker, result)
+    return result
 
 
 def search_tasks(
@@ -145,8 +351,13 @@ def search_tasks(
     overdue: bool = False,
     limit: int = DEFAULT_LIMIT,
 ) -> list[dict]:
-    con = connect()
-    try:
+    marker = db_marker()
+    # overdue は日付依存なので当日をキーに含める
+    key = ("tasks", query, status, overdue, limit, date.today().isoformat())
+    cached = SEARCH_CACHE.get(key, marker)
+    if cached is not None:
+        return cached
+    with connect() as con:
         clauses: list[str] = []
         params: list = []
 
@@ -202,14 +413,16 @@ def search_tasks(
                 "replier": clean(r["replier"], 40),
                 "reply_summary": clean(r["reply_summary"], 160),
             })
-        return result
-    finally:
-        con.close()
+    SEARCH_CACHE.put(key, marker, result)
+    return result
 
 
 def get_stats() -> dict:
-    con = connect()
-    try:
+    marker = db_marker()
+    cached = STATS_CACHE.get("stats", marker, ttl=STATS_TTL_SEC)
+    if cached is not None:
+        return cached
+    with connect() as con:
         total_emails = con.execute("SELECT COUNT(*) FROM emails").fetchone()[0]
         total_tasks = con.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
         cached = con.execute(
@@ -220,16 +433,25 @@ def get_stats() -> dict:
         ).fetchone()[0]
         min_date = con.execute("SELECT MIN(request_date) FROM tasks").fetchone()[0]
         max_date = con.execute("SELECT MAX(request_date) FROM tasks").fetchone()[0]
-        return {
-            "total_emails": total_emails,
-            "total_tasks": total_tasks,
-            "open_tasks": open_tasks,
-            "cached_summaries": cached,
-            "date_range": {"min": min_date or "", "max": max_date or ""},
-            "db_path": str(DB_PATH),
-        }
-    finally:
-        con.close()
+    stats = {
+        "total_emails": total_emails,
+        "total_tasks": total_tasks,
+        "open_tasks": open_tasks,
+        "cached_summaries": cached,
+        "date_range": {"min": min_date or "", "max": max_date or ""},
+        "db_path": str(DB_PATH),
+    }
+    STATS_CACHE.put("stats", marker, stats)
+    return stats
+
+
+def get_metrics() -> dict:
+    return {
+        "latency": LATENCY.snapshot(),
+        "search_cache": SEARCH_CACHE.snapshot(),
+        "stats_cache": STATS_CACHE.snapshot(),
+        "pool_size": POOL_SIZE,
+    }
 
 
 # ── HTTP サーバー ─────────────────────────────────────────────
@@ -261,10 +483,14 @@ class Handler(BaseHTTPRequestHandler):
             except ValueError:
                 return default
 
+        started = time.perf_counter()
         try:
             if parsed.path == "/api/stats":
                 data = get_stats()
 
+            elif parsed.path == "/api/metrics":
+                data = get_metrics()
+
             elif parsed.path == "/api/search":
                 q = qstr("q")
                 limit = qint("limit")
@@ -298,6 +524,7 @@ class Handler(BaseHTTPRequestHandler):
             self._cors()
             self.end_headers()
             self.wfile.write(body)
+            LATENCY.observe(parsed.path, (time.perf_counter() - started) * 1000.0)
 
         except Exception as e:
             err = json.dumps({"error": str(e)}, ensure_ascii=False).encode("utf-8")
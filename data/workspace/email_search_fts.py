@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+email_search_fts.py
+
+Query routing between the unicode61 FTS tables and the trigram tables
+(emails_fts_ja / tasks_fts_ja) of email_search.db. Kept free of the indexer's
+dependencies so email_search_api and email_search_query can share it.
+
+The trigram tokenizer cannot match terms shorter than TRIGRAM_MIN_CHARS, so
+2-character Japanese words (品質, 図面, 納期 ...) still go through the LIKE
+full scan in the callers.
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+from typing import List
+
+CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f]")
+TRIGRAM_MIN_CHARS = 3
+
+
+def has_cjk(text: str) -> bool:
+    return bool(CJK_PATTERN.search(text or ""))
+
+
+def has_table(con: sqlite3.Connection, name: str) -> bool:
+    row = con.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+    return row is not None
+
+
+def quote_fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def rewrite_fts_query(con: sqlite3.Connection, terms: List[str], fallback: str = "") -> tuple[str, str]:
+    """Return (fts_table, match_expression) for the tokenized query terms.
+
+    Japanese terms are routed to the trigram index (emails_fts_ja) as quoted
+    substring phrases. Terms shorter than a trigram cannot be matched there and
+    are left to the LIKE fallback.
+    """
+    if any(has_cjk(term) for term in terms) and has_table(con, "emails_fts_ja"):
+        usable = [term for term in terms if len(term) >= TRIGRAM_MIN_CHARS]
+        if usable:
+            return "emails_fts_ja", " OR ".join(quote_fts_phrase(term) for term in usable[:8])
+    fts_query = " OR ".join(
+        f'"{term}"' if re.search(r"\s", term) else term
+        for term in terms[:8]
+    ) or fallback
+    return "emails_fts", fts_query
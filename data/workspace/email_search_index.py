@@ -18,6 +18,8 @@ import base64
 import email
 import hashlib
 import json
+import os
+import random
 import re
 import sqlite3
 import sys
@@ -32,12 +34,16 @@ from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from file_journal import FileJournal, signature_of
 
 
 WORKSPACE_ROOT = Path("/home/node/clawd")
 EMAIL_ROOT = WORKSPACE_ROOT / "paperless_consume" / "email"
 DB_PATH = WORKSPACE_ROOT / "email_search.db"
 STATE_PATH = WORKSPACE_ROOT / "email_search_state.json"
+JOURNAL_NAMESPACE = "email_search_index"
 STATUS_PATH = WORKSPACE_ROOT / "email_search_harness_status.json"
 FILTER_PATH = WORKSPACE_ROOT / "email_rag_sender_filters.json"
 TOKEN_PATH = WORKSPACE_ROOT / "token.json"
@@ -45,6 +51,11 @@ LEGACY_TOKEN_PATH = Path("/home/node/clawd/../work/token.json")
 CREDS_PATH = WORKSPACE_ROOT / "credentials.json"
 LEGACY_CREDS_PATH = Path("/home/node/clawd/../workspace/credentials.json")
 TIMEOUT = 30
+GMAIL_API_BASE = os.getenv("GMAIL_API_BASE", "https://gmail.googleapis.com").rstrip("/")
+GMAIL_MESSAGES_URL = f"{GMAIL_API_BASE}/gmail/v1/users/me/messages"
+GMAIL_FETCH_WORKERS = int(os.getenv("GMAIL_FETCH_WORKERS", "8"))
+GMAIL_MAX_RETRIES = 5
+GMAIL_RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError"}
 USER_AGENT = "claw-email-search-index/1.0"
 TASK_FILTER_CACHE: Optional[dict] = None
 TASK_KEYWORDS = (
@@ -227,6 +238,20 @@ REPLY_DONE_KEYWORDS = ("回答しました", "回答済", "送付しました",
 STATUS_OPEN = "open"
 STATUS_REPLIED = "replied"
 STATUS_UNKNOWN = "unknown"
+EML_BATCH_SIZE = 1000
+# index_meta row set while a --bulk-fts load runs with the emails FTS triggers dropped.
+# connect_db() rebuilds the FTS tables if a killed run left it behind.
+BULK_FTS_PENDING_KEY = "bulk_fts_pending"
+JA_FTS_TABLES = {
+    "emails_fts_ja": {
+        "source": "emails",
+        "columns": ("subject", "sender", "recipients", "cc", "body_text", "attachment_names", "attachment_text"),
+    },
+    "tasks_fts_ja": {
+        "source": "tasks",
+        "columns": ("requester", "assignee", "request_subject", "request_body", "replier", "reply_summary"),
+    },
+}
 
 
 def now_iso() -> str:
@@ -912,6 +937,10 @@ def gmail_session() -> Tuple[requests.Session, dict]:
         save_json(token_path, token)
 
     session = requests.Session()
+    # Sized for the concurrent fetch pool so worker threads reuse keep-alive connections.
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(GMAIL_FETCH_WORKERS, 10))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
     session.headers.update(
         {
             "Authorization": f"Bearer {token['access_token']}",
@@ -921,12 +950,32 @@ def gmail_session() -> Tuple[requests.Session, dict]:
     return session, token
 
 
+def gmail_rate_limited(response: requests.Response) -> bool:
+    if response.status_code == 429 or response.status_code >= 500:
+        return True
+    if response.status_code != 403:
+        return False
+    try:
+        errors = response.json().get("error", {}).get("errors", [])
+    except ValueError:
+        return False
+    return any(item.get("reason") in GMAIL_RATE_LIMIT_REASONS for item in errors)
+
+
 def gmail_request(session: requests.Session, method: str, url: str, **kwargs) -> dict:
-    response = session.request(method, url, timeout=TIMEOUT, **kwargs)
-    if response.status_code == 401:
-        raise RuntimeError("Gmail access token was rejected")
-    response.raise_for_status()
-    return response.json()
+    """Gmail API call with exponential backoff on 429/5xx and 403 rate-limit reasons."""
+    for attempt in range(GMAIL_MAX_RETRIES + 1):
+        response = session.request(method, url, timeout=TIMEOUT, **kwargs)
+        if response.status_code == 401:
+            raise RuntimeError("Gmail access token was rejected")
+        if attempt < GMAIL_MAX_RETRIES and gmail_rate_limited(response):
+            retry_after = response.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else min(2 ** attempt, 32) + random.random()
+            time.sleep(delay)
+            continue
+        response.raise_for_status()
+        return response.json()
+    raise RuntimeError("unreachable")
 
 
 def parse_gmail_headers(payload: dict) -> Dict[str, str]:
@@ -1012,6 +1061,24 @@ def parse_gmail_message(message: dict) -> EmailRecord:
     )
 
 
+EMAIL_FTS_TRIGGERS_SQL = """
+    CREATE TRIGGER IF NOT EXISTS emails_ai AFTER INSERT ON emails BEGIN
+        INSERT INTO emails_fts(rowid, subject, sender, recipients, cc, body_text, attachment_names, attachment_text)
+        VALUES (new.rowid, new.subject, new.sender, new.recipients, new.cc, new.body_text, new.attachment_names, new.attachment_text);
+    END;
+    CREATE TRIGGER IF NOT EXISTS emails_ad AFTER DELETE ON emails BEGIN
+        INSERT INTO emails_fts(emails_fts, rowid, subject, sender, recipients, cc, body_text, attachment_names, attachment_text)
+        VALUES('delete', old.rowid, old.subject, old.sender, old.recipients, old.cc, old.body_text, old.attachment_names, old.attachment_text);
+    END;
+    CREATE TRIGGER IF NOT EXISTS emails_au AFTER UPDATE ON emails BEGIN
+        INSERT INTO emails_fts(emails_fts, rowid, subject, sender, recipients, cc, body_text, attachment_names, attachment_text)
+        VALUES('delete', old.rowid, old.subject, old.sender, old.recipients, old.cc, old.body_text, old.attachment_names, old.attachment_text);
+        INSERT INTO emails_fts(rowid, subject, sender, recipients, cc, body_text, attachment_names, attachment_text)
+        VALUES (new.rowid, new.subject, new.sender, new.recipients, new.cc, new.body_text, new.attachment_names, new.attachment_text);
+    END;
+"""
+
+
 def connect_db() -> sqlite3.Connection:
     con = sqlite3.connect(DB_PATH, timeout=30)
     con.row_factory = sqlite3.Row
@@ -1117,24 +1184,7 @@ def connect_db() -> sqlite3.Connection:
             )
             """
         )
-        con.executescript(
-            """
-            CREATE TRIGGER IF NOT EXISTS emails_ai AFTER INSERT ON emails BEGIN
-                INSERT INTO emails_fts(rowid, subject, sender, recipients, cc, body_text, attachment_names, attachment_text)
-                VALUES (new.rowid, new.subject, new.sender, new.recipients, new.cc, new.body_text, new.attachment_names, new.attachment_text);
-            END;
-            CREATE TRIGGER IF NOT EXISTS emails_ad AFTER DELETE ON emails BEGIN
-                INSERT INTO emails_fts(emails_fts, rowid, subject, sender, recipients, cc, body_text, attachment_names, attachment_text)
-                VALUES('delete', old.rowid, old.subject, old.sender, old.recipients, old.cc, old.body_text, old.attachment_names, old.attachment_text);
-            END;
-            CREATE TRIGGER IF NOT EXISTS emails_au AFTER UPDATE ON emails BEGIN
-                INSERT INTO emails_fts(emails_fts, rowid, subject, sender, recipients, cc, body_text, attachment_names, attachment_text)
-                VALUES('delete', old.rowid, old.subject, old.sender, old.recipients, old.cc, old.body_text, old.attachment_names, old.attachment_text);
-                INSERT INTO emails_fts(rowid, subject, sender, recipients, cc, body_text, attachment_names, attachment_text)
-                VALUES (new.rowid, new.subject, new.sender, new.recipients, new.cc, new.body_text, new.attachment_names, new.attachment_text);
-            END;
-            """
-        )
+        con.executescript(EMAIL_FTS_TRIGGERS_SQL)
     con.execute(
         """
         CREATE TABLE IF NOT EXISTS tasks (
@@ -1198,114 +1248,292 @@ def connect_db() -> sqlite3.Connection:
         END;
         """
     )
+    con.execute("CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    con.commit()
+    ensure_japanese_fts(con)
+    pending = con.execute("SELECT value FROM index_meta WHERE key=?", (BULK_FTS_PENDING_KEY,)).fetchone()
+    if pending:
+        log(f"[WARN] bulk FTS load started at {pending[0]} did not finish; rebuilding emails FTS")
+        resume_email_fts_triggers(con)
     return con
 
 
-def upsert_record(con: sqlite3.Connection, record: EmailRecord) -> None:
+def ensure_japanese_fts(con: sqlite3.Connection) -> None:
+    """Create trigram FTS tables for Japanese text next to the unicode61 ones.
+
+    unicode61 does not segment Japanese, so most queries used to fall back to
+    LIKE scans. The trigram tables are created and populated once on first
+    connect (online migration); afterwards the triggers keep them in sync.
+    """
+    existing = {
+        row[0]
+        for row in con.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE '%_fts_ja'")
+    }
+    for table, spec in JA_FTS_TABLES.items():
+        if table in existing:
+            # IF NOT EXISTS: reinstalls triggers a killed --bulk-fts run left dropped
+            con.executescript(ja_fts_triggers_sql(table))
+            continue
+        source = spec["source"]
+        col_list = ", ".join(spec["columns"])
+        try:
+            con.execute(
+                f"""
+                CREATE VIRTUAL TABLE {table} USING fts5(
+                    {col_list},
+                    content='{source}',
+                    content_rowid='rowid',
+                    tokenize='trigram'
+                )
+                """
+            )
+        except sqlite3.OperationalError as exc:
+            # SQLite < 3.34 has no trigram tokenizer; keep the LIKE fallback.
+            log(f"[WARN] trigram FTS unavailable for {table}: {exc}")
+            return
+        log(f"[INFO] building {table} (trigram) from {source}")
+        con.execute(f"INSERT INTO {table}({table}) VALUES('rebuild')")
+        con.executescript(ja_fts_triggers_sql(table))
+        con.commit()
+
+
+def ja_fts_triggers_sql(table: str) -> str:
+    spec = JA_FTS_TABLES[table]
+    source = spec["source"]
+    columns = spec["columns"]
+    col_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{col}" for col in columns)
+    old_values = ", ".join(f"old.{col}" for col in columns)
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS {source}_ja_ai AFTER INSERT ON {source} BEGIN
+            INSERT INTO {table}(rowid, {col_list}) VALUES (new.rowid, {new_values});
+        END;
+        CREATE TRIGGER IF NOT EXISTS {source}_ja_ad AFTER DELETE ON {source} BEGIN
+            INSERT INTO {table}({table}, rowid, {col_list}) VALUES('delete', old.rowid, {old_values});
+        END;
+        CREATE TRIGGER IF NOT EXISTS {source}_ja_au AFTER UPDATE ON {source} BEGIN
+            INSERT INTO {table}({table}, rowid, {col_list}) VALUES('delete', old.rowid, {old_values});
+            INSERT INTO {table}(rowid, {col_list}) VALUES (new.rowid, {new_values});
+        END;
+    """
+
+
+def suspend_email_fts_triggers(con: sqlite3.Connection) -> None:
+    """Drop the emails FTS triggers for a bulk first load; see resume_email_fts_triggers.
+
+    The pending marker is committed first, so connect_db() can finish the
+    rebuild if the process dies before resume_email_fts_triggers runs.
+    """
     con.execute(
+        "INSERT OR REPLACE INTO index_meta(key, value) VALUES(?, ?)",
+        (BULK_FTS_PENDING_KEY, now_iso()),
+    )
+    con.commit()
+    con.executescript(
         """
-        INSERT INTO emails (
-            source, source_id, subject, sender, recipients, cc, email_date, body_text,
-            attachment_names, filepath, category, person, gmail_thread_id, gmail_message_id,
-            message_id_header, labels_json, internal_ts, snippet, body_hash, raw_sha1,
-            attachment_text, indexed_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(source, source_id) DO UPDATE SET
-            subject=excluded.subject,
-            sender=excluded.sender,
-            recipients=excluded.recipients,
-            cc=excluded.cc,
-            email_date=excluded.email_date,
-            body_text=excluded.body_text,
-            attachment_names=excluded.attachment_names,
-            filepath=excluded.filepath,
-            category=excluded.category,
-            person=excluded.person,
-            gmail_thread_id=excluded.gmail_thread_id,
-            gmail_message_id=excluded.gmail_message_id,
-            message_id_header=excluded.message_id_header,
-            labels_json=excluded.labels_json,
-            internal_ts=excluded.internal_ts,
-            snippet=excluded.snippet,
-            body_hash=excluded.body_hash,
-            raw_sha1=excluded.raw_sha1,
-            attachment_text=CASE WHEN excluded.attachment_text != '' THEN excluded.attachment_text ELSE emails.attachment_text END,
-            indexed_at=excluded.indexed_at
-        """,
-        (
-            record.source,
-            record.source_id,
-            record.subject,
-            record.sender,
-            record.recipients,
-            record.cc,
-            record.email_date,
-            record.body_text,
-            json.dumps(record.attachment_names, ensure_ascii=False),
-            record.filepath,
-            record.category,
-            record.person,
-            record.gmail_thread_id,
-            record.gmail_message_id,
-            record.message_id_header,
-            record.labels_json,
-            record.internal_ts,
-            record.snippet,
-            record.body_hash,
-            record.raw_sha1,
-            record.attachment_text,
-            now_iso(),
-        ),
+        DROP TRIGGER IF EXISTS emails_ai;
+        DROP TRIGGER IF EXISTS emails_ad;
+        DROP TRIGGER IF EXISTS emails_au;
+        DROP TRIGGER IF EXISTS emails_ja_ai;
+        DROP TRIGGER IF EXISTS emails_ja_ad;
+        DROP TRIGGER IF EXISTS emails_ja_au;
+        """
+    )
+
+
+def resume_email_fts_triggers(con: sqlite3.Connection) -> None:
+    """Rebuild the emails FTS tables in one pass and reinstall their triggers."""
+    con.execute("INSERT INTO emails_fts(emails_fts) VALUES('rebuild')")
+    con.executescript(EMAIL_FTS_TRIGGERS_SQL)
+    if con.execute("SELECT 1 FROM sqlite_master WHERE name='emails_fts_ja'").fetchone():
+        con.execute("INSERT INTO emails_fts_ja(emails_fts_ja) VALUES('rebuild')")
+        con.executescript(ja_fts_triggers_sql("emails_fts_ja"))
+    con.execute("DELETE FROM index_meta WHERE key=?", (BULK_FTS_PENDING_KEY,))
+    con.commit()
+
+
+UPSERT_EMAIL_SQL = """
+    INSERT INTO emails (
+        source, source_id, subject, sender, recipients, cc, email_date, body_text,
+        attachment_names, filepath, category, person, gmail_thread_id, gmail_message_id,
+        message_id_header, labels_json, internal_ts, snippet, body_hash, raw_sha1,
+        attachment_text, indexed_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(source, source_id) DO UPDATE SET
+        subject=excluded.subject,
+        sender=excluded.sender,
+        recipients=excluded.recipients,
+        cc=excluded.cc,
+        email_date=excluded.email_date,
+        body_text=excluded.body_text,
+        attachment_names=excluded.attachment_names,
+        filepath=excluded.filepath,
+        category=excluded.category,
+        person=excluded.person,
+        gmail_thread_id=excluded.gmail_thread_id,
+        gmail_message_id=excluded.gmail_message_id,
+        message_id_header=excluded.message_id_header,
+        labels_json=excluded.labels_json,
+        internal_ts=excluded.internal_ts,
+        snippet=excluded.snippet,
+        body_hash=excluded.body_hash,
+        raw_sha1=excluded.raw_sha1,
+        attachment_text=CASE WHEN excluded.attachment_text != '' THEN excluded.attachment_text ELSE emails.attachment_text END,
+        indexed_at=excluded.indexed_at
+"""
+UPSERT_TASK_SQL = """
+    INSERT INTO tasks (
+        source, source_id, thread_key, request_date, due_date, requester, assignee,
+        request_subject, request_body, status, reply_status, replier, reply_summary,
+        reply_date, evidence, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(source, source_id) DO UPDATE SET
+        thread_key=excluded.thread_key,
+        request_date=excluded.request_date,
+        due_date=excluded.due_date,
+        requester=excluded.requester,
+        assignee=excluded.assignee,
+        request_subject=excluded.request_subject,
+        request_body=excluded.request_body,
+        status=excluded.status,
+        reply_status=excluded.reply_status,
+        replier=excluded.replier,
+        reply_summary=excluded.reply_summary,
+        reply_date=CASE WHEN excluded.reply_status='replied' AND tasks.reply_date='' THEN excluded.reply_date ELSE tasks.reply_date END,
+        evidence=excluded.evidence,
+        updated_at=excluded.updated_at
+"""
+
+
+def email_params(record: EmailRecord) -> tuple:
+    return (
+        record.source,
+        record.source_id,
+        record.subject,
+        record.sender,
+        record.recipients,
+        record.cc,
+        record.email_date,
+        record.body_text,
+        json.dumps(record.attachment_names, ensure_ascii=False),
+        record.filepath,
+        record.category,
+        record.person,
+        record.gmail_thread_id,
+        record.gmail_message_id,
+        record.message_id_header,
+        record.labels_json,
+        record.internal_ts,
+        record.snippet,
+        record.body_hash,
+        record.raw_sha1,
+        record.attachment_text,
+        now_iso(),
+    )
+
+
+def task_params(task: TaskRecord) -> tuple:
+    return (
+        task.source,
+        task.source_id,
+        task.thread_key,
+        task.request_date,
+        task.due_date,
+        task.requester,
+        task.assignee,
+        task.request_subject,
+        task.request_body,
+        task.status,
+        task.reply_status,
+        task.replier,
+        task.reply_summary,
+        task.reply_date,
+        task.evidence,
+        now_iso(),
     )
+
+
+def upsert_record(con: sqlite3.Connection, record: EmailRecord) -> None:
+    con.execute(UPSERT_EMAIL_SQL, email_params(record))
     task = extract_task_record(record)
     if task:
-        con.execute(
-            """
-            INSERT INTO tasks (
-                source, source_id, thread_key, request_date, due_date, requester, assignee,
-                request_subject, request_body, status, reply_status, replier, reply_summary,
-                reply_date, evidence, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(source, source_id) DO UPDATE SET
-                thread_key=excluded.thread_key,
-                request_date=excluded.request_date,
-                due_date=excluded.due_date,
-                requester=excluded.requester,
-                assignee=excluded.assignee,
-                request_subject=excluded.request_subject,
-                request_body=excluded.request_body,
-                status=excluded.status,
-                reply_status=excluded.reply_status,
-                replier=excluded.replier,
-                reply_summary=excluded.reply_summary,
-                reply_date=CASE WHEN excluded.reply_status='replied' AND tasks.reply_date='' THEN excluded.reply_date ELSE tasks.reply_date END,
-                evidence=excluded.evidence,
-                updated_at=excluded.updated_at
-            """,
-            (
-                task.source,
-                task.source_id,
-                task.thread_key,
-                task.request_date,
-                task.due_date,
-                task.requester,
-                task.assignee,
-                task.request_subject,
-                task.request_body,
-                task.status,
-                task.reply_status,
-                task.replier,
-                task.reply_summary,
-                task.reply_date,
-                task.evidence,
-                now_iso(),
-            ),
-        )
+        con.execute(UPSERT_TASK_SQL, task_params(task))
     else:
         con.execute("DELETE FROM tasks WHERE source=? AND source_id=?", (record.source, record.source_id))
 
 
-def rebuild_tasks(con: sqlite3.Connection) -> int:
+def upsert_records(
+    con: sqlite3.Connection, items: List[Tuple[EmailRecord, Optional[TaskRecord]]]
+) -> None:
+    """Batched upsert_record: one executemany per statement for a parsed batch."""
+    con.executemany(UPSERT_EMAIL_SQL, [email_params(record) for record, _task in items])
+    con.executemany(UPSERT_TASK_SQL, [task_params(task) for _record, task in items if task])
+    con.executemany(
+        "DELETE FROM tasks WHERE source=? AND source_id=?",
+        [(record.source, record.source_id) for record, task in items if not task],
+    )
+
+
+EMAIL_UPSERT_COLUMNS = (
+    "source", "source_id", "subject", "sender", "recipients", "cc", "email_date", "body_text",
+    "attachment_names", "filepath", "category", "person", "gmail_thread_id", "gmail_message_id",
+    "message_id_header", "labels_json", "internal_ts", "snippet", "body_hash", "raw_sha1",
+    "attachment_text", "indexed_at",
+)
+TASK_UPSERT_COLUMNS = (
+    "source", "source_id", "thread_key", "request_date", "due_date", "requester", "assignee",
+    "request_subject", "request_body", "status", "reply_status", "replier", "reply_summary",
+    "reply_date", "evidence", "updated_at",
+)
+
+
+def connect_changeset_db(path: Path, live: sqlite3.Connection) -> sqlite3.Connection:
+    """Empty DB with the live emails/tasks tables (no FTS, no triggers) that collects one run's writes.
+
+    upsert_record() works on it unchanged; apply_changeset() then replays the
+    rows onto the live DB, so an incremental run touches only new mail instead
+    of cloning and promoting the whole database.
+    """
+    con = sqlite3.connect(path, timeout=30)
+    con.row_factory = sqlite3.Row
+    for (sql,) in live.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name IN ('emails', 'tasks')"):
+        con.execute(sql)
+    con.commit()
+    return con
+
+
+def apply_changeset(con: sqlite3.Connection, changeset_path: Path) -> dict:
+    """Replay a changeset DB onto `con` in one transaction with the same upsert rules as upsert_record.
+
+    Every changed email is upserted; its task is upserted when the changeset
+    has one and deleted otherwise. FTS tables follow through their triggers.
+    """
+    con.execute("ATTACH DATABASE ? AS delta", (str(changeset_path),))
+    try:
+        emails = con.execute(f"SELECT {', '.join(EMAIL_UPSERT_COLUMNS)} FROM delta.emails").fetchall()
+        tasks = con.execute(f"SELECT {', '.join(TASK_UPSERT_COLUMNS)} FROM delta.tasks").fetchall()
+        task_deletes = con.execute(
+            """
+            SELECT e.source, e.source_id FROM delta.emails e
+            WHERE NOT EXISTS (SELECT 1 FROM delta.tasks t WHERE t.source=e.source AND t.source_id=e.source_id)
+            """
+        ).fetchall()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            con.executemany(UPSERT_EMAIL_SQL, [tuple(row) for row in emails])
+            con.executemany(UPSERT_TASK_SQL, [tuple(row) for row in tasks])
+            con.executemany("DELETE FROM tasks WHERE source=? AND source_id=?", [tuple(row) for row in task_deletes])
+        except BaseException:
+            con.rollback()
+            raise
+        con.commit()
+    finally:
+        con.execute("DETACH DATABASE delta")
+    return {"emails": len(emails), "tasks": len(tasks), "taskDeletes": len(task_deletes)}
+
+
+def rebuild_tasks(con: sqlite3.Connection, commit_every: int = 500) -> int:
+    """Re-derive every task from emails. commit_every=0 leaves the transaction to the caller."""
     rows = con.execute("SELECT * FROM emails ORDER BY internal_ts DESC, indexed_at DESC").fetchall()
     con.execute("DELETE FROM tasks")
     rebuilt = 0
@@ -1341,7 +1569,7 @@ def rebuild_tasks(con: sqlite3.Connection) -> int:
             ),
         )
         rebuilt += 1
-        if idx % 500 == 0:
+        if commit_every and idx % commit_every == 0:
             con.commit()
     return rebuilt
 
@@ -1357,12 +1585,49 @@ def remove_deleted_eml(con: sqlite3.Connection, existing: set[str]) -> int:
     return len(missing)
 
 
-def index_eml(con: sqlite3.Connection, state: dict, limit: Optional[int]) -> dict:
+def parse_eml_job(path_str: str) -> Tuple[str, Optional[EmailRecord], Optional[TaskRecord], str]:
+    """Worker-side parse: MIME decoding and task extraction run off the writer."""
+    path = Path(path_str)
+    rel = str(path.relative_to(EMAIL_ROOT)).replace("\\", "/")
+    try:
+        record = parse_eml(path)
+        return rel, record, extract_task_record(record), ""
+    except Exception as exc:
+        return rel, None, None, str(exc)
+
+
+def iter_parsed_eml(paths: List[Path], workers: int) -> Iterable[Tuple[str, Optional[EmailRecord], Optional[TaskRecord], str]]:
+    if workers <= 1:
+        for path in paths:
+            yield parse_eml_job(str(path))
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Bounded window so a huge rescan does not hold every parsed message in memory.
+        window = max(workers * 64, EML_BATCH_SIZE)
+        for offset in range(0, len(paths), window):
+            chunk = [str(path) for path in paths[offset : offset + window]]
+            yield from pool.map(parse_eml_job, chunk, chunksize=16)
+
+
+def index_eml(
+    con: sqlite3.Connection,
+    state: dict,
+    limit: Optional[int],
+    workers: int = 1,
+    bulk_fts: bool = False,
+    full_scan: bool = False,
+) -> dict:
     eml_state = state.setdefault("eml", {})
-    file_state = eml_state.setdefault("files", {})
-    all_files = sorted(EMAIL_ROOT.rglob("*.eml"))
-    if limit:
-        all_files = all_files[:limit]
+    journal = FileJournal(JOURNAL_NAMESPACE)
+    legacy_files = eml_state.pop("files", None)
+    if legacy_files and journal.is_empty():
+        log(f"[INFO] importing {len(legacy_files)} file signatures from {STATE_PATH.name} into the file journal")
+        journal.import_legacy(legacy_files.items())
+    scan = journal.scan(EMAIL_ROOT, suffix=".eml", full=True if full_scan else None)
+    log(f"[INFO] file journal scan: {json.dumps(scan.summary())}")
+    all_files = scan.files[:limit] if limit else scan.files
     existing_ids = {
         row["source_id"]
         for row in con.execute("SELECT source_id FROM emails WHERE source='eml'")
@@ -1371,50 +1636,97 @@ def index_eml(con: sqlite3.Connection, state: dict, limit: Optional[int]) -> dic
     indexed = 0
     skipped = 0
     errors = 0
-    seen_ids: set[str] = set()
-
-    for idx, path in enumerate(all_files, start=1):
-        rel = str(path.relative_to(EMAIL_ROOT)).replace("\\", "/")
-        seen_ids.add(rel)
-        stat = path.stat()
-        signature = f"{stat.st_size}:{stat.st_mtime_ns}"
-        if file_state.get(rel) == signature and rel in existing_ids:
-            skipped += 1
-            continue
-        try:
-            upsert_record(con, parse_eml(path))
-            file_state[rel] = signature
-            indexed += 1
-            if indexed % 200 == 0:
+    commits = 0
+    seen_ids: set[str] = set(all_files)
+    pending: List[Path] = []
+    signatures: Dict[str, str] = dict(scan.pending)
+    started = time.monotonic()
+
+    for rel in all_files:
+        if rel not in signatures:
+            if rel in existing_ids:
+                skipped += 1
+                continue
+            # Journal says done but the row is gone (e.g. rebuilt DB): re-index.
+            signatures[rel] = signature_of((EMAIL_ROOT / rel).stat())
+        pending.append(EMAIL_ROOT / rel)
+
+    deferred_fts = bulk_fts and not existing_ids and len(pending) > 0
+    if bulk_fts and not deferred_fts:
+        log("[INFO] --bulk-fts ignored: emails table already has EML rows")
+    if deferred_fts:
+        log(f"[INFO] bulk first load: FTS triggers suspended for {len(pending)} files")
+        suspend_email_fts_triggers(con)
+
+    def status_payload(processed: int) -> dict:
+        elapsed = max(time.monotonic() - started, 1e-6)
+        return {
+            "task": "email_search_index",
+            "stage": "eml",
+            "updatedAt": now_iso(),
+            "totalFiles": len(all_files),
+            "pendingFiles": len(pending),
+            "processed": processed,
+            "indexed": indexed,
+            "skipped": skipped,
+            "errors": errors,
+            "workers": workers,
+            "commits": commits,
+            "elapsedSec": round(elapsed, 2),
+            "filesPerSec": round((processed - skipped) / elapsed, 2),
+            "indexedPerSec": round(indexed / elapsed, 2),
+        }
+
+    batch: List[Tuple[EmailRecord, Optional[TaskRecord]]] = []
+    processed = skipped
+    last_status = 0
+    try:
+        for rel, record, task, error in iter_parsed_eml(pending, workers):
+            processed += 1
+            if record is None:
+                errors += 1
+                log(f"[WARN] EML parse failed: {rel}: {error}")
+            else:
+                batch.append((record, task))
+            if len(batch) >= EML_BATCH_SIZE:
+                upsert_records(con, batch)
                 con.commit()
-            if idx % 250 == 0:
-                write_status(
-                    {
-                        "task": "email_search_index",
-                        "stage": "eml",
-                        "updatedAt": now_iso(),
-                        "totalFiles": len(all_files),
-                        "processed": idx,
-                        "indexed": indexed,
-                        "skipped": skipped,
-                        "errors": errors,
-                    }
-                )
-        except Exception as exc:
-            errors += 1
-            log(f"[WARN] EML parse failed: {rel}: {exc}")
+                commits += 1
+                journal.mark_done((done.source_id, signatures[done.source_id]) for done, _task in batch)
+                indexed += len(batch)
+                batch = []
+            if processed - last_status >= 250:
+                last_status = processed
+                write_status(status_payload(processed))
+        if batch:
+            upsert_records(con, batch)
+            con.commit()
+            commits += 1
+            journal.mark_done((done.source_id, signatures[done.source_id]) for done, _task in batch)
+            indexed += len(batch)
+    finally:
+        if deferred_fts:
+            log("[INFO] rebuilding emails FTS after bulk load")
+            con.commit()
+            resume_email_fts_triggers(con)
 
     deleted = 0
     if limit is None:
         deleted = remove_deleted_eml(con, seen_ids)
     eml_state["last_scan_at"] = now_iso()
-    eml_state["known_files"] = len(file_state)
+    eml_state["known_files"] = journal.known_files()
+    journal.close()
+    throughput = status_payload(processed)
     return {
         "total": len(all_files),
         "indexed": indexed,
         "skipped": skipped,
         "deleted": deleted,
         "errors": errors,
+        "workers": workers,
+        "scan": scan.summary(),
+        "elapsed_sec": throughput["elapsedSec"],
+        "files_per_sec": throughput["filesPerSec"],
     }
 
 
@@ -1444,7 +1756,7 @@ def list_gmail_message_ids(
         payload = gmail_request(
             session,
             "GET",
-            "https://gmail.googleapis.com/gmail/v1/users/me/messages",
+            GMAIL_MESSAGES_URL,
             params=params,
         )
         ids.extend(item["id"] for item in payload.get("messages", []))
@@ -1454,13 +1766,61 @@ def list_gmail_message_ids(
     return ids
 
 
+def fetch_gmail_message(session: requests.Session, message_id: str) -> dict:
+    return gmail_request(session, "GET", f"{GMAIL_MESSAGES_URL}/{message_id}", params={"format": "full"})
+
+
+def iter_gmail_messages(
+    session: requests.Session, ids: List[str], workers: int
+) -> Iterable[Tuple[str, Optional[dict], Optional[Exception]]]:
+    """Yield (message_id, payload, error) as fetches complete.
+
+    With workers > 1 a bounded thread pool keeps up to workers * 4 requests in
+    flight on the shared session while the caller parses and upserts.
+    """
+    if workers <= 1:
+        for message_id in ids:
+            try:
+                yield message_id, fetch_gmail_message(session, message_id), None
+            except Exception as exc:
+                yield message_id, None, exc
+        return
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    window = workers * 4
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gmail-fetch") as pool:
+        remaining = iter(ids)
+        in_flight = {}
+        for message_id in remaining:
+            in_flight[pool.submit(fetch_gmail_message, session, message_id)] = message_id
+            if len(in_flight) >= window:
+                break
+        while in_flight:
+            done, _pending = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                message_id = in_flight.pop(future)
+                exc = future.exception()
+                yield message_id, (None if exc else future.result()), exc
+            for message_id in remaining:
+                in_flight[pool.submit(fetch_gmail_message, session, message_id)] = message_id
+                if len(in_flight) >= window:
+                    break
+
+
 def index_gmail(
     con: sqlite3.Connection,
     state: dict,
     max_messages: int,
     fallback_days: int,
     force_query: Optional[str],
+    workers: int = 1,
+    existing_hashes: Optional[Dict[str, str]] = None,
 ) -> dict:
+    """Fetch new Gmail messages into `con`.
+
+    existing_hashes (source_id -> raw_sha1) lets the caller write into a
+    changeset DB while skipping unchanged messages of the live DB.
+    """
     session, _token = gmail_session()
     gmail_state = state.setdefault("gmail", {})
     query = force_query or gmail_query_from_state(state, fallback_days)
@@ -1470,20 +1830,18 @@ def index_gmail(
     skipped_by_filter = 0
     errors = 0
     latest_ts = int(gmail_state.get("latest_internal_ts", 0) or 0)
+    started = time.monotonic()
 
-    existing_hashes = {
-        row["source_id"]: row["raw_sha1"]
-        for row in con.execute("SELECT source_id, raw_sha1 FROM emails WHERE source='gmail'")
-    }
+    if existing_hashes is None:
+        existing_hashes = {
+            row["source_id"]: row["raw_sha1"]
+            for row in con.execute("SELECT source_id, raw_sha1 FROM emails WHERE source='gmail'")
+        }
 
-    for idx, message_id in enumerate(ids, start=1):
+    for idx, (message_id, payload, error) in enumerate(iter_gmail_messages(session, ids, workers), start=1):
         try:
-            payload = gmail_request(
-                session,
-                "GET",
-                f"https://gmail.googleapis.com/gmail/v1/users/me/messages/{message_id}",
-                params={"format": "full"},
-            )
+            if error is not None:
+                raise error
             raw_sha1 = hashlib.sha1(
                 json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8", errors="ignore")
             ).hexdigest()
@@ -1513,6 +1871,8 @@ def index_gmail(
                         "skipped": skipped,
                         "skippedByFilter": skipped_by_filter,
                         "errors": errors,
+                        "workers": workers,
+                        "messagesPerSec": round(idx / max(time.monotonic() - started, 1e-6), 2),
                     }
                 )
         except Exception as exc:
@@ -1530,6 +1890,8 @@ def index_gmail(
         "skipped_by_filter": skipped_by_filter,
         "errors": errors,
         "latest_internal_ts": latest_ts,
+        "workers": workers,
+        "elapsed_sec": round(time.monotonic() - started, 2),
     }
 
 
@@ -1556,7 +1918,7 @@ def backfill_attachment_text(con: sqlite3.Connection, limit: int = 200) -> dict:
             payload = gmail_request(
                 session,
                 "GET",
-                f"https://gmail.googleapis.com/gmail/v1/users/me/messages/{message_id}",
+                f"{GMAIL_MESSAGES_URL}/{message_id}",
                 params={"format": "full"},
             )
             _, _, attachment_text = extract_gmail_parts(payload.get("payload", {}))
@@ -1578,7 +1940,14 @@ def cmd_index(args: argparse.Namespace) -> int:
     write_status({"task": "email_search_index", "stage": "starting", "updatedAt": now_iso()})
     con = connect_db()
     try:
-        eml_result = index_eml(con, state, args.eml_limit)
+        eml_result = index_eml(
+            con,
+            state,
+            args.eml_limit,
+            workers=args.workers,
+            bulk_fts=args.bulk_fts,
+            full_scan=args.full_scan,
+        )
         con.commit()
         if args.with_gmail:
             gmail_result = index_gmail(
@@ -1587,6 +1956,7 @@ def cmd_index(args: argparse.Namespace) -> int:
                 args.gmail_max_messages,
                 args.gmail_fallback_days,
                 args.gmail_force_query,
+                workers=args.gmail_workers,
             )
             con.commit()
         else:
@@ -1749,7 +2119,24 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--gmail-max-messages", type=int, default=500)
     parser.add_argument("--gmail-fallback-days", type=int, default=365)
     parser.add_argument("--gmail-force-query")
+    parser.add_argument(
+        "--gmail-workers",
+        type=int,
+        default=GMAIL_FETCH_WORKERS,
+        help="concurrent Gmail message fetches (1 = sequential)",
+    )
     parser.add_argument("--eml-limit", type=int)
+    parser.add_argument("--workers", type=int, default=1, help="process pool size for EML parsing")
+    parser.add_argument(
+        "--bulk-fts",
+        action="store_true",
+        help="first load only: suspend FTS triggers and rebuild the FTS tables once at the end",
+    )
+    parser.add_argument(
+        "--full-scan",
+        action="store_true",
+        help="ignore directory mtimes in the file journal and stat every EML file",
+    )
     return parser
 
 
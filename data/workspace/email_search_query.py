@@ -17,6 +17,8 @@ from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Iterable, List, Optional
 
+from email_search_fts import TRIGRAM_MIN_CHARS, has_table, quote_fts_phrase, rewrite_fts_query
+
 
 COMMON_TERMS = {
     "mail", "gmail", "eml", "summary", "search", "email", "emails", "message", "messages",
@@ -308,18 +310,16 @@ def rows_to_dicts(rows: Iterable[sqlite3.Row]) -> List[dict]:
 
 def search_rows(con: sqlite3.Connection, query: str, limit: int) -> List[sqlite3.Row]:
     rows: List[sqlite3.Row] = []
+    trigram_complete = False
     terms = tokenize_query(query)
     if not terms and query.strip():
         terms = [query.strip()]
     terms = expand_with_mitsui_glossary(terms, max_expansions=10)
 
     try:
-        fts_query = " OR ".join(
-            f'"{term}"' if re.search(r"\s", term) else term
-            for term in terms[:8]
-        ) or query
+        fts_table, fts_query = rewrite_fts_query(con, terms, query)
         rows = con.execute(
-            """
+            f"""
             SELECT
                 e.source,
                 e.source_id,
@@ -331,20 +331,22 @@ def search_rows(con: sqlite3.Connection, query: str, limit: int) -> List[sqlite3
                 e.category,
                 e.person,
                 e.snippet,
-                bm25(emails_fts) AS score,
+                bm25({fts_table}) AS score,
                 e.internal_ts
-            FROM emails_fts
-            JOIN emails e ON e.rowid = emails_fts.rowid
-            WHERE emails_fts MATCH ?
+            FROM {fts_table}
+            JOIN emails e ON e.rowid = {fts_table}.rowid
+            WHERE {fts_table} MATCH ?
             ORDER BY score, e.internal_ts DESC
             LIMIT ?
             """,
             (fts_query, limit),
         ).fetchall()
+        # Trigram hits are a superset of the AND-ed LIKE fallback when every term was indexable.
+        trigram_complete = fts_table == "emails_fts_ja" and all(len(term) >= TRIGRAM_MIN_CHARS for term in terms)
     except sqlite3.OperationalError:
         rows = []
 
-    if len(rows) >= limit:
+    if len(rows) >= limit or trigram_complete:
         return rows
 
     if not terms:
@@ -405,16 +407,13 @@ def count_search_rows(con: sqlite3.Connection, query: str) -> int:
     terms = expand_with_mitsui_glossary(terms, max_expansions=10)
 
     try:
-        fts_query = " OR ".join(
-            f'"{term}"' if re.search(r"\s", term) else term
-            for term in terms[:8]
-        ) or query
+        fts_table, fts_query = rewrite_fts_query(con, terms, query)
         row = con.execute(
-            """
+            f"""
             SELECT COUNT(*) AS total
-            FROM emails_fts
-            JOIN emails e ON e.rowid = emails_fts.rowid
-            WHERE emails_fts MATCH ?
+            FROM {fts_table}
+            JOIN emails e ON e.rowid = {fts_table}.rowid
+            WHERE {fts_table} MATCH ?
             """,
             (fts_query,),
         ).fetchone()
@@ -828,7 +827,13 @@ def task_rows(con: sqlite3.Connection, query: str, limit: int) -> List[sqlite3.R
         params.extend([needle, needle, needle])
 
     terms = tokenize_task_query(query)
+    trigram_tasks = has_table(con, "tasks_fts_ja")
     for term in terms:
+        if trigram_tasks and len(term) >= TRIGRAM_MIN_CHARS:
+            # A trigram phrase match is a substring match over the same six columns.
+            clauses.append("rowid IN (SELECT rowid FROM tasks_fts_ja WHERE tasks_fts_ja MATCH ?)")
+            params.append(quote_fts_phrase(term))
+            continue
         needle = f"%{term}%"
         clauses.append(
             "(requester LIKE ? OR assignee LIKE ? OR request_subject LIKE ? OR request_body LIKE ? OR replier LIKE ? OR reply_summary LIKE ?)"
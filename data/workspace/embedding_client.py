@@ -0,0 +1,621 @@
+#!/usr/bin/env python3
+"""
+embedding_client.py
+
+Shared Infinity embedding + Qdrant upsert client for the ingest scripts.
+
+  - one pooled requests.Session per client (keep-alive instead of a new TCP
+    connection per call)
+  - adaptive batching by estimated token length
+  - retry with exponential backoff on transport errors, 429 and 5xx; a batch the
+    server rejects (400/413/422) is split in halves so one bad text does not cost
+    the whole batch, while an unreachable server fails the call at once
+  - IngestPipeline overlaps embed and upsert batches on a small thread pool
+  - counters via .metrics.snapshot()
+  - persistent content-hash cache keyed by (model, sha256(text)) so unchanged
+    chunks are never re-embedded (SQLite, float16 vectors, LRU-bounded)
+
+Usage:
+  from embedding_client import EmbeddingClient, QdrantUpserter, IngestPipeline
+
+  embedder = EmbeddingClient("http://infinity:7997/embeddings", EMBED_MODEL, EMBED_DIM)
+  vectors = embedder.embed(texts)            # list[list[float] | None]
+  upserter = QdrantUpserter("http://qdrant:6333", COLLECTION)
+  upserter.upsert(points)                    # number of points stored
+
+Cache stats:
+  python3 embedding_client.py cache-stats
+
+Environment:
+  EMBED_CACHE_PATH         SQLite file (default: embedding_cache.db next to this module)
+  EMBED_CACHE_MAX_ENTRIES  LRU bound (default 200000, ~400 MB at 1024 dims)
+  EMBED_CACHE_DISABLE=1    bypass the cache
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+CJK_RE = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f]")
+DEFAULT_MAX_BATCH_ITEMS = 32
+DEFAULT_MAX_BATCH_TOKENS = 8192
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_SEC = 1.0
+CACHE_PATH = Path(os.getenv("EMBED_CACHE_PATH", str(Path(__file__).resolve().parent / "embedding_cache.db")))
+CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "200000"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate: CJK characters ~1 token each, other text ~4 chars per token."""
+    cjk = len(CJK_RE.findall(text or ""))
+    return cjk + (len(text or "") - cjk) // 4 + 1
+
+
+def make_session(pool_size: int = 8) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def embeddings_url(base_url: str) -> str:
+    base = base_url.rstrip("/")
+    return base if base.endswith("/embeddings") else f"{base}/embeddings"
+
+
+class ClientMetrics:
+    """Thread-safe counters shared by the embed and upsert clients."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: dict[str, float] = {}
+
+    def add(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + value
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            values = dict(self._values)
+        for kind, count_key in (("embed", "embed_texts"), ("upsert", "upsert_points")):
+            seconds = values.get(f"{kind}_seconds", 0.0)
+            if seconds > 0:
+                values[f"{kind}_per_sec"] = round(values.get(count_key, 0) / seconds, 2)
+        return {key: round(val, 3) if isinstance(val, float) else val for key, val in values.items()}
+
+
+def _with_retries(
+    func: Callable[[], requests.Response],
+    retries: int,
+    backoff_sec: float,
+    metrics: ClientMetrics,
+    kind: str,
+) -> requests.Response:
+    last_error: Optional[Exception] = None
+    for attempt in range(retries + 1):
+        try:
+            response = func()
+            if response.status_code == 429 or response.status_code >= 500:
+                raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+            response.raise_for_status()
+            return response
+        except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as exc:
+            last_error = exc
+            status = getattr(getattr(exc, "response", None), "status_code", None)
+            if status is not None and 400 <= status < 500 and status != 429:
+                break  # client errors do not get better on retry
+            if attempt < retries:
+                metrics.add(f"{kind}_retries")
+                time.sleep(backoff_sec * (2 ** attempt))
+    assert last_error is not None
+    raise last_error
+
+
+def is_payload_error(exc: Exception) -> bool:
+    """4xx other than 429: the request itself was rejected (too large, bad input)."""
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status is not None and 400 <= status < 500 and status != 429
+
+
+def pack_f16(vec: Sequence[float]) -> bytes:
+    return struct.pack(f"<{len(vec)}e", *vec)
+
+
+def unpack_f16(blob: bytes) -> list[float]:
+    return list(struct.unpack(f"<{len(blob) // 2}e", blob))
+
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+class EmbeddingCache:
+    """On-disk (model, sha256(text)) -> float16 vector cache with LRU eviction.
+
+    Vectors are stored as little-endian float16 (struct "e"), which halves the file
+    size; the rounding is far below what cosine search can distinguish.
+    """
+
+    def __init__(self, path: Path = CACHE_PATH, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._con: Optional[sqlite3.Connection] = None
+        self._count = 0
+        # get_many() never writes: LRU touches and hit/miss counts wait for the next write
+        self._touched: dict[tuple[str, str], float] = {}
+        self._pending_stats = {"hits": 0, "misses": 0}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._con is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            con = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_sha256 TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model, text_sha256)
+                ) WITHOUT ROWID
+                """
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings(last_used)")
+            con.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._count = con.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            self._con = con
+        return self._con
+
+    def _bump(self, con: sqlite3.Connection, **counters: int) -> None:
+        con.executemany(
+            "INSERT INTO stats(name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            [(name, value) for name, value in counters.items() if value],
+        )
+
+    def get_many(self, model: str, hashes: Sequence[str]) -> list[Optional[list[float]]]:
+        if not hashes:
+            return []
+        with self._lock:
+            con = self._connect()
+            found: dict[str, list[float]] = {}
+            unique = list(dict.fromkeys(hashes))
+            for i in range(0, len(unique), 500):
+                part = unique[i : i + 500]
+                rows = con.execute(
+                    f"SELECT text_sha256, vector FROM embeddings WHERE model = ? AND text_sha256 IN ({','.join('?' * len(part))})",
+                    [model, *part],
+                ).fetchall()
+                for digest, blob in rows:
+                    found[digest] = unpack_f16(blob)
+            now = time.time()
+            for digest in found:
+                self._touched[(model, digest)] = now
+            hits = sum(1 for digest in hashes if digest in found)
+            self.hits += hits
+            self.misses += len(hashes) - hits
+            self._pending_stats["hits"] += hits
+            self._pending_stats["misses"] += len(hashes) - hits
+        return [found.get(digest) for digest in hashes]
+
+    def _write_pending(self, con: sqlite3.Connection) -> None:
+        """Apply deferred LRU touches and lookup counters inside the caller's write transaction."""
+        if self._touched:
+            con.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_sha256 = ?",
+                [(used, model, digest) for (model, digest), used in self._touched.items()],
+            )
+            self._touched = {}
+        self._bump(con, **self._pending_stats)
+        self._pending_stats = {"hits": 0, "misses": 0}
+
+    def flush(self) -> None:
+        """Persist deferred touches/counters (for read-only runs that never call put_many)."""
+        with self._lock:
+            if self._con is None or not (self._touched or any(self._pending_stats.values())):
+                return
+            self._write_pending(self._con)
+            self._con.commit()
+
+    def put_many(self, model: str, items: Sequence[tuple[str, list[float]]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = [(model, digest, len(vec), pack_f16(vec), now) for digest, vec in items]
+        with self._lock:
+            con = self._connect()
+            con.executemany(
+                "INSERT OR IGNORE INTO embeddings(model, text_sha256, dim, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._write_pending(con)
+            # Other ingest processes write to the same file, so count inside the write
+            # transaction the INSERT holds (a few ms at 200k rows) instead of tracking inserts.
+            self._count = con.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if self._count > self.max_entries:
+                # Evict the least recently used ~5% beyond the bound in one statement.
+                excess = self._count - int(self.max_entries * 0.95)
+                con.execute(
+                    "DELETE FROM embeddings WHERE (model, text_sha256) IN "
+                    "(SELECT model, text_sha256 FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+                self._count -= excess
+                self.evictions += excess
+                self._bump(con, evictions=excess)
+            con.commit()
+
+    def stats(self) -> dict:
+        self.flush()
+        with self._lock:
+            con = self._connect()
+            totals = dict(con.execute("SELECT name, value FROM stats").fetchall())
+            models = dict(con.execute("SELECT model, COUNT(*) FROM embeddings GROUP BY model").fetchall())
+            self._count = sum(models.values())
+        lookups = totals.get("hits", 0) + totals.get("misses", 0)
+        return {
+            "path": str(self.path),
+            "entries": self._count,
+            "max_entries": self.max_entries,
+            "entries_by_model": models,
+            "session": {"hits": self.hits, "misses": self.misses, "evictions": self.evictions},
+            "total": {
+                "hits": totals.get("hits", 0),
+                "misses": totals.get("misses", 0),
+                "evictions": totals.get("evictions", 0),
+                "hit_rate": round(totals.get("hits", 0) / lookups, 4) if lookups else 0.0,
+            },
+        }
+
+
+_DEFAULT_CACHE: Optional[EmbeddingCache] = None
+_DEFAULT_CACHE_LOCK = threading.Lock()
+
+
+def default_cache() -> Optional[EmbeddingCache]:
+    """Process-wide cache shared by every EmbeddingClient; None when disabled."""
+    global _DEFAULT_CACHE
+    if os.getenv("EMBED_CACHE_DISABLE") == "1":
+        return None
+    with _DEFAULT_CACHE_LOCK:
+        if _DEFAULT_CACHE is None:
+            _DEFAULT_CACHE = EmbeddingCache()
+            atexit.register(_DEFAULT_CACHE.flush)
+        return _DEFAULT_CACHE
+
+
+_USE_DEFAULT = object()
+
+
+class EmbeddingClient:
+    def __init__(
+        self,
+        url: str,
+        model: str,
+        dim: Optional[int] = None,
+        *,
+        max_batch_items: int = DEFAULT_MAX_BATCH_ITEMS,
+        max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+        timeout: float = 120,
+        retries: int = DEFAULT_RETRIES,
+        backoff_sec: float = DEFAULT_BACKOFF_SEC,
+        session: Optional[requests.Session] = None,
+        metrics: Optional[ClientMetrics] = None,
+        log: Optional[Callable[[str, str], None]] = None,
+        cache: Any = _USE_DEFAULT,
+    ) -> None:
+        self.url = embeddings_url(url)
+        self.cache: Optional[EmbeddingCache] = default_cache() if cache is _USE_DEFAULT else cache
+        self.model = model
+        self.dim = dim
+        self.max_batch_items = max_batch_items
+        self.max_batch_tokens = max_batch_tokens
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_sec = backoff_sec
+        self.session = session or make_session()
+        self.metrics = metrics or ClientMetrics()
+        self._log = log
+
+    def log(self, msg: str, level: str = "INFO") -> None:
+        if self._log:
+            self._log(msg, level)
+
+    def plan_batches(self, texts: Sequence[str]) -> list[list[int]]:
+        """Group text indices so each request stays under the item and token budgets."""
+        batches: list[list[int]] = []
+        current: list[int] = []
+        current_tokens = 0
+        for idx, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if current and (
+                len(current) >= self.max_batch_items or current_tokens + tokens > self.max_batch_tokens
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(idx)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _request(self, texts: list[str]) -> list[list[float]]:
+        started = time.monotonic()
+        response = _with_retries(
+            lambda: self.session.post(self.url, json={"model": self.model, "input": texts}, timeout=self.timeout),
+            self.retries,
+            self.backoff_sec,
+            self.metrics,
+            "embed",
+        )
+        data = sorted(response.json()["data"], key=lambda item: item.get("index", 0))
+        self.metrics.add("embed_requests")
+        self.metrics.add("embed_texts", len(texts))
+        self.metrics.add("embed_seconds", time.monotonic() - started)
+        return [item["embedding"] for item in data]
+
+    def _embed_batch(self, texts: list[str]) -> list[Optional[list[float]]]:
+        """Embed one batch; transport and 5xx errors (already retried) propagate."""
+        try:
+            vectors: list[Optional[list[float]]] = list(self._request(texts))
+        except requests.HTTPError as exc:
+            if not is_payload_error(exc):
+                raise
+            if len(texts) == 1:
+                self.metrics.add("embed_failures")
+                self.log(f"  Embed error: {exc}", "WARN")
+                return [None]
+            self.log(f"  Embed batch error (batch_size={len(texts)}): {exc} — splitting", "WARN")
+            mid = len(texts) // 2
+            return self._embed_batch(texts[:mid]) + self._embed_batch(texts[mid:])
+        if self.dim:
+            for i, vec in enumerate(vectors):
+                if vec is not None and len(vec) != self.dim:
+                    self.metrics.add("embed_dim_mismatch")
+                    self.log(f"  Embed dim mismatch: {len(vec)} != {self.dim}", "WARN")
+                    vectors[i] = None
+        return vectors
+
+    def _cached(self, texts: list[str]) -> tuple[list[str], list[Optional[list[float]]]]:
+        hashes = [text_sha256(text) for text in texts]
+        if self.cache is None:
+            return hashes, [None] * len(texts)
+        try:
+            cached = self.cache.get_many(self.model, hashes)
+        except sqlite3.Error as exc:
+            self.log(f"  Embed cache read error: {exc}", "WARN")
+            return hashes, [None] * len(texts)
+        if self.dim:
+            cached = [vec if vec is not None and len(vec) == self.dim else None for vec in cached]
+        hits = sum(1 for vec in cached if vec is not None)
+        self.metrics.add("cache_hits", hits)
+        self.metrics.add("cache_misses", len(texts) - hits)
+        return hashes, cached
+
+    def embed(self, texts: Sequence[str]) -> list[Optional[list[float]]]:
+        """Embed texts in adaptive batches; failed items come back as None.
+
+        Texts already in the embedding cache are not sent to the server. When the
+        server is unreachable or keeps answering 5xx, the remaining batches are
+        not attempted and all their items come back as None.
+        """
+        texts = list(texts)
+        hashes, results = self._cached(texts)
+        # Identical texts inside one call are embedded once.
+        pending: dict[str, list[int]] = {}
+        for i, vec in enumerate(results):
+            if vec is None:
+                pending.setdefault(hashes[i], []).append(i)
+        missing = [indices[0] for indices in pending.values()]
+        fresh: list[tuple[str, list[float]]] = []
+        batches = self.plan_batches([texts[i] for i in missing])
+        for n, batch in enumerate(batches):
+            firsts = [missing[j] for j in batch]
+            try:
+                vectors = self._embed_batch([texts[i] for i in firsts])
+            except Exception as exc:
+                failed = sum(len(rest) for rest in batches[n:])
+                self.metrics.add("embed_failures", failed)
+                self.log(f"  Embed unavailable: {exc} — {failed} texts not embedded", "WARN")
+                break
+            for first, vec in zip(firsts, vectors):
+                for idx in pending[hashes[first]]:
+                    results[idx] = vec
+                if vec is not None:
+                    fresh.append((hashes[first], vec))
+        if self.cache is not None and fresh:
+            try:
+                self.cache.put_many(self.model, fresh)
+            except sqlite3.Error as exc:
+                self.log(f"  Embed cache write error: {exc}", "WARN")
+        return results
+
+    def embed_one(self, text: str) -> Optional[list[float]]:
+        return self.embed([text])[0]
+
+
+class QdrantUpserter:
+    def __init__(
+        self,
+        base_urls: str | Iterable[str],
+        collection: str,
+        *,
+        batch_size: int = 64,
+        wait: bool = True,
+        timeout: float = 30,
+        retries: int = DEFAULT_RETRIES,
+        backoff_sec: float = DEFAULT_BACKOFF_SEC,
+        session: Optional[requests.Session] = None,
+        metrics: Optional[ClientMetrics] = None,
+        log: Optional[Callable[[str, str], None]] = None,
+    ) -> None:
+        urls = [base_urls] if isinstance(base_urls, str) else list(base_urls)
+        # Keep order, drop duplicates (scripts pass env URL + hard-coded fallbacks).
+        self.base_urls = list(dict.fromkeys(url.rstrip("/") for url in urls))
+        self._urls_lock = threading.Lock()  # IngestPipeline workers share base_urls
+        self.collection = collection
+        self.batch_size = batch_size
+        self.wait = wait
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_sec = backoff_sec
+        self.session = session or make_session()
+        self.metrics = metrics or ClientMetrics()
+        self._log = log
+
+    def log(self, msg: str, level: str = "INFO") -> None:
+        if self._log:
+            self._log(msg, level)
+
+    def _put(self, points: list[dict]) -> bool:
+        with self._urls_lock:
+            candidates = list(self.base_urls)
+        for base in candidates:
+            started = time.monotonic()
+            try:
+                _with_retries(
+                    lambda: self.session.put(
+                        f"{base}/collections/{self.collection}/points",
+                        params={"wait": "true" if self.wait else "false"},
+                        json={"points": points},
+                        timeout=self.timeout,
+                    ),
+                    self.retries,
+                    self.backoff_sec,
+                    self.metrics,
+                    "upsert",
+                )
+            except Exception as exc:
+                self.log(f"  Qdrant batch error ({base}): {exc}", "WARN")
+                continue
+            with self._urls_lock:
+                if base != self.base_urls[0]:
+                    # Stick to the endpoint that worked.
+                    self.base_urls.remove(base)
+                    self.base_urls.insert(0, base)
+            self.metrics.add("upsert_requests")
+            self.metrics.add("upsert_points", len(points))
+            self.metrics.add("upsert_seconds", time.monotonic() - started)
+            return True
+        self.metrics.add("upsert_failures", len(points))
+        return False
+
+    def upsert(self, points: Sequence[dict]) -> int:
+        """points = [{"id": int, "vector": list, "payload": dict}]; returns points stored."""
+        stored = 0
+        points = list(points)
+        for i in range(0, len(points), self.batch_size):
+            batch = points[i : i + self.batch_size]
+            if self._put(batch):
+                stored += len(batch)
+        return stored
+
+
+class IngestPipeline:
+    """Overlap embedding and upserting of consecutive batches.
+
+    add() buffers (text, payload, point_id) items; every full batch is handed to
+    a worker that embeds it and upserts the resulting points, so the next batch
+    can be embedded while the previous one is written. on_done(items, stored) is
+    called from the worker thread for each finished batch.
+    """
+
+    def __init__(
+        self,
+        embedder: EmbeddingClient,
+        upserter: QdrantUpserter,
+        *,
+        batch_items: Optional[int] = None,
+        workers: int = 2,
+        max_in_flight: int = 4,
+        on_done: Optional[Callable[[list[tuple], int], None]] = None,
+    ) -> None:
+        self.embedder = embedder
+        self.upserter = upserter
+        self.batch_items = batch_items or embedder.max_batch_items
+        self.on_done = on_done
+        self.max_in_flight = max_in_flight
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+        self._buffer: list[tuple] = []
+        self._futures: list[Future] = []
+        self.stored = 0
+
+    def _run(self, items: list[tuple]) -> int:
+        vectors = self.embedder.embed([item[0] for item in items])
+        points = [
+            {"id": point_id, "vector": vec, "payload": payload}
+            for (_text, payload, point_id, *_rest), vec in zip(items, vectors)
+            if vec is not None
+        ]
+        stored = self.upserter.upsert(points) if points else 0
+        if self.on_done:
+            self.on_done(items, stored)
+        return stored
+
+    def _reap(self, keep: int) -> None:
+        while len(self._futures) > keep:
+            self.stored += self._futures.pop(0).result()
+
+    def add(self, text: str, payload: dict, point_id, *extra) -> None:
+        self._buffer.append((text, payload, point_id, *extra))
+        if len(self._buffer) >= self.batch_items:
+            self.submit_buffer()
+
+    def submit_buffer(self) -> None:
+        if not self._buffer:
+            return
+        items, self._buffer = self._buffer, []
+        self._reap(self.max_in_flight - 1)
+        self._futures.append(self._executor.submit(self._run, items))
+
+    def flush(self) -> int:
+        """Submit the partial batch and wait for every in-flight batch."""
+        self.submit_buffer()
+        self._reap(0)
+        return self.stored
+
+    def close(self) -> int:
+        stored = self.flush()
+        self._executor.shutdown(wait=True)
+        return stored
+
+    def metrics(self) -> dict:
+        merged = self.embedder.metrics.snapshot()
+        if self.upserter.metrics is not self.embedder.metrics:
+            merged.update(self.upserter.metrics.snapshot())
+        return merged
+
+
+def main() -> int:
+    if len(sys.argv) > 1 and sys.argv[1] == "cache-stats":
+        print(json.dumps(EmbeddingCache().stats(), ensure_ascii=False, indent=2))
+        return 0
+    print(__doc__)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+file_journal.py
+
+SQLite-backed file discovery journal shared by the EML indexers
+(email_search_index.py, ingest_eml_to_qdrant.py).
+
+  - directory-level mtime pruning: a directory whose mtime is unchanged since
+    the last scan is not listed again and its files are not stat()ed; only its
+    known subdirectories are visited
+  - per-consumer namespaces, so each indexer tracks what *it* has processed
+  - append-only state: mark_done() upserts the finished rows instead of
+    rewriting a whole JSON state file
+
+Directory mtime changes when entries are added, removed or renamed, which is
+how mail drops arrive. A file rewritten in place keeps its directory mtime;
+use full=True (or FILE_JOURNAL_FULL_SCAN=1) to stat every file again.
+
+Usage:
+  from file_journal import FileJournal
+
+  journal = FileJournal("email_search_index")
+  scan = journal.scan(EMAIL_ROOT, suffix=".eml")
+  for rel, signature in scan.pending:
+      ...
+  journal.mark_done([(rel, signature)])
+
+Stats:
+  python3 file_journal.py stats
+
+Environment:
+  FILE_JOURNAL_PATH       SQLite file (default: file_journal.db next to this module)
+  FILE_JOURNAL_FULL_SCAN  1 = ignore directory mtimes and stat every file
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+
+JOURNAL_PATH = Path(os.getenv("FILE_JOURNAL_PATH", str(Path(__file__).resolve().parent / "file_journal.db")))
+FULL_SCAN = os.getenv("FILE_JOURNAL_FULL_SCAN", "") == "1"
+# done_signature placeholder for rows imported from a legacy state file that
+# recorded "processed" without a signature; adopted on the next scan.
+LEGACY_DONE = "?"
+
+
+@dataclass
+class ScanResult:
+    files: list[str] = field(default_factory=list)  # every matching rel path, sorted
+    pending: list[tuple[str, str]] = field(default_factory=list)  # (rel, signature) not yet done
+    deleted: list[str] = field(default_factory=list)
+    dirs_listed: int = 0
+    dirs_pruned: int = 0
+    files_stated: int = 0
+    elapsed_sec: float = 0.0
+
+    def summary(self) -> dict:
+        return {
+            "files": len(self.files),
+            "pending": len(self.pending),
+            "deleted": len(self.deleted),
+            "dirs_listed": self.dirs_listed,
+            "dirs_pruned": self.dirs_pruned,
+            "files_stated": self.files_stated,
+            "elapsed_sec": round(self.elapsed_sec, 3),
+        }
+
+
+def signature_of(stat: os.stat_result) -> str:
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class FileJournal:
+    """Per-namespace record of directories, file signatures and processed state."""
+
+    def __init__(self, namespace: str, path: Path = JOURNAL_PATH) -> None:
+        self.namespace = namespace
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.con = sqlite3.connect(self.path, timeout=30)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=NORMAL")
+        self.con.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS dirs (
+                namespace TEXT NOT NULL,
+                rel TEXT NOT NULL,
+                parent TEXT,
+                mtime_ns INTEGER NOT NULL,
+                PRIMARY KEY (namespace, rel)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(namespace, parent);
+            CREATE TABLE IF NOT EXISTS files (
+                namespace TEXT NOT NULL,
+                rel TEXT NOT NULL,
+                dir TEXT NOT NULL,
+                signature TEXT,
+                done_signature TEXT,
+                info TEXT,
+                done_at TEXT,
+                PRIMARY KEY (namespace, rel)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS files_dir ON files(namespace, dir);
+            """
+        )
+        self.con.commit()
+
+    def close(self) -> None:
+        self.con.close()
+
+    def __enter__(self) -> "FileJournal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ── State ────────────────────────────────────────────────────────────────
+
+    def is_empty(self) -> bool:
+        row = self.con.execute("SELECT 1 FROM files WHERE namespace = ? LIMIT 1", (self.namespace,)).fetchone()
+        return row is None
+
+    def import_legacy(self, items: Iterable[tuple[str, Optional[str]]]) -> int:
+        """Seed done state from an old JSON state file; signature None = accept what is on disk."""
+        rows = [
+            (self.namespace, rel, rel.rpartition("/")[0], signature or LEGACY_DONE)
+            for rel, signature in items
+        ]
+        self.con.executemany(
+            "INSERT OR IGNORE INTO files(namespace, rel, dir, done_signature) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        self.con.commit()
+        return len(rows)
+
+    def mark_done(self, items: Iterable[Sequence]) -> int:
+        """Record (rel, signature[, info]) as processed; commits immediately."""
+        now = time.strftime("%Y-%m-%dT%H:%M:%S")
+        rows = []
+        for item in items:
+            info = item[2] if len(item) > 2 else None
+            if info is not None and not isinstance(info, str):
+                info = json.dumps(info, ensure_ascii=False)
+            rows.append((item[1], info, now, self.namespace, item[0]))
+        self.con.executemany(
+            "UPDATE files SET done_signature = ?, info = ?, done_at = ? WHERE namespace = ? AND rel = ?",
+            rows,
+        )
+        self.con.commit()
+        return len(rows)
+
+    def known_files(self) -> int:
+        return self.con.execute("SELECT COUNT(*) FROM files WHERE namespace = ? AND signature IS NOT NULL", (self.namespace,)).fetchone()[0]
+
+    def stats(self) -> dict:
+        rows = self.con.execute(
+            """
+            SELECT f.namespace, COUNT(*), SUM(f.signature IS NOT NULL AND f.done_signature = f.signature),
+                   (SELECT COUNT(*) FROM dirs d WHERE d.namespace = f.namespace)
+            FROM files f GROUP BY f.namespace
+            """
+        ).fetchall()
+        return {
+            "path": str(self.path),
+            "namespaces": {
+                ns: {"files": files, "done": done or 0, "dirs": dirs}
+                for ns, files, done, dirs in rows
+            },
+        }
+
+    # ── Scan ─────────────────────────────────────────────────────────────────
+
+    def scan(self, root: Path, suffix: str = ".eml", full: Optional[bool] = None) -> ScanResult:
+        """Walk root, refresh signatures of changed directories and return pending work."""
+        started = time.monotonic()
+        full = FULL_SCAN if full is None else full
+        root = Path(root)
+        result = ScanResult()
+        ns = self.namespace
+        known_dirs = {
+            rel: (parent, mtime_ns)
+            for rel, parent, mtime_ns in self.con.execute("SELECT rel, parent, mtime_ns FROM dirs WHERE namespace = ?", (ns,))
+        }
+        children: dict[str, list[str]] = {}
+        for rel, (parent, _mtime) in known_dirs.items():
+            if parent is not None:
+                children.setdefault(parent, []).append(rel)
+
+        seen_dirs: set[str] = set()
+        dir_rows: list[tuple] = []
+        file_rows: list[tuple] = []
+        listed_dirs: list[str] = []
+        listed_files: set[str] = set()
+        stack: list[tuple[str, Optional[str]]] = [("", None)]
+        while stack:
+            rel_dir, parent = stack.pop()
+            abs_dir = root / rel_dir if rel_dir else root
+            try:
+                mtime_ns = abs_dir.stat().st_mtime_ns
+            except OSError:
+                continue
+            seen_dirs.add(rel_dir)
+            known = known_dirs.get(rel_dir)
+            if not full and known is not None and known[1] == mtime_ns:
+                result.dirs_pruned += 1
+                stack.extend((child, rel_dir) for child in children.get(rel_dir, ()))
+                continue
+            result.dirs_listed += 1
+            listed_dirs.append(rel_dir)
+            try:
+                entries = list(os.scandir(abs_dir))
+            except OSError:
+                continue
+            for entry in entries:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((rel, rel_dir))
+                    elif entry.name.lower().endswith(suffix) and entry.is_file():
+                        result.files_stated += 1
+                        listed_files.add(rel)
+                        file_rows.append((ns, rel, rel_dir, signature_of(entry.stat())))
+                except OSError:
+                    continue
+            # mtime read before listing: an entry added mid-scan bumps it again next time
+            dir_rows.append((ns, rel_dir, parent, mtime_ns))
+
+        con = self.con
+        with con:
+            con.executemany(
+                """
+                INSERT INTO files(namespace, rel, dir, signature) VALUES (?, ?, ?, ?)
+                ON CONFLICT(namespace, rel) DO UPDATE SET
+                    signature = excluded.signature,
+                    done_signature = CASE WHEN files.done_signature = ? THEN excluded.signature ELSE files.done_signature END
+                """,
+                [row + (LEGACY_DONE,) for row in file_rows],
+            )
+            con.executemany(
+                "INSERT OR REPLACE INTO dirs(namespace, rel, parent, mtime_ns) VALUES (?, ?, ?, ?)",
+                dir_rows,
+            )
+            # Files that vanished from a re-listed directory, and everything under vanished directories.
+            for rel_dir in listed_dirs:
+                for (rel,) in con.execute(
+                    "SELECT rel FROM files WHERE namespace = ? AND dir = ? AND signature IS NOT NULL", (ns, rel_dir)
+                ).fetchall():
+                    if rel not in listed_files:
+                        result.deleted.append(rel)
+            gone_dirs = [rel for rel in known_dirs if rel not in seen_dirs]
+            for rel_dir in gone_dirs:
+                result.deleted.extend(
+                    rel for (rel,) in con.execute(
+                        "SELECT rel FROM files WHERE namespace = ? AND dir = ? AND signature IS NOT NULL", (ns, rel_dir)
+                    )
+                )
+            con.executemany("DELETE FROM files WHERE namespace = ? AND rel = ?", [(ns, rel) for rel in result.deleted])
+            con.executemany("DELETE FROM dirs WHERE namespace = ? AND rel = ?", [(ns, rel) for rel in gone_dirs])
+            # Legacy rows never seen on disk.
+            con.execute("DELETE FROM files WHERE namespace = ? AND signature IS NULL", (ns,))
+
+        result.files = [
+            rel for (rel,) in con.execute("SELECT rel FROM files WHERE namespace = ? ORDER BY rel", (ns,))
+        ]
+        result.pending = [
+            (rel, signature)
+            for rel, signature in con.execute(
+                """
+                SELECT rel, signature FROM files
+                WHERE namespace = ? AND (done_signature IS NULL OR done_signature != signature)
+                ORDER BY rel
+                """,
+                (ns,),
+            )
+        ]
+        result.elapsed_sec = time.monotonic() - started
+        return result
+
+
+def main() -> int:
+    if len(sys.argv) > 1 and sys.argv[1] == "stats":
+        with FileJournal("") as journal:
+            print(json.dumps(journal.stats(), ensure_ascii=False, indent=2))
+        return 0
+    print(__doc__)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
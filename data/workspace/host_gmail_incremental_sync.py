@@ -80,6 +80,142 @@ def load_email_search_index():
     return module
 
 
+def rebuild_tasks_if_due(mod, con: sqlite3.Connection, maintenance: dict[str, Any], changes: int,
+                         interval_hours: int, commit_every: int = 500) -> tuple[int, str]:
+    last_rebuild_at = parse_iso(maintenance.get("lastTasksRebuildAt"))
+    now_dt = datetime.now(timezone.utc).astimezone()
+    rebuild_due = changes > 0 and (
+        last_rebuild_at is None
+        or (now_dt - last_rebuild_at.astimezone(now_dt.tzinfo))
+        >= timedelta(hours=interval_hours)
+    )
+    if rebuild_due:
+        rebuilt = mod.rebuild_tasks(con, commit_every=commit_every)
+        con.commit()
+        maintenance["lastTasksRebuildAt"] = mod.now_iso()
+        return rebuilt, "interval_due"
+    if changes <= 0:
+        return 0, "no_changes"
+    return 0, "recent_rebuild"
+
+
+def sync_snapshot(mod, args: argparse.Namespace, state: dict[str, Any], temp_db_path: Path) -> dict[str, Any]:
+    """Index into a full clone of the DB and promote it over the live one."""
+    clone_db_via_backup(HOST_DB_PATH, temp_db_path)
+    mod.DB_PATH = temp_db_path
+    maintenance = state.setdefault("maintenance", {})
+    con = mod.connect_db()
+    try:
+        write_status(
+            {
+                "task": "host_gmail_incremental_sync",
+                "stage": "indexing",
+                "mode": "snapshot",
+                "startedAt": now_text(),
+                "tempDbPath": str(temp_db_path),
+            }
+        )
+        gmail_result = mod.index_gmail(
+            con,
+            state,
+            args.gmail_max_messages,
+            args.gmail_fallback_days,
+            args.gmail_force_query,
+            workers=mod.GMAIL_FETCH_WORKERS,
+        )
+        con.commit()
+
+        changes = int(gmail_result.get("indexed", 0) or 0)
+        rebuilt, rebuild_reason = rebuild_tasks_if_due(
+            mod, con, maintenance, changes, args.task_rebuild_interval_hours
+        )
+
+        state["updatedAt"] = mod.now_iso()
+        mod.save_json(mod.STATE_PATH, state)
+        integrity = con.execute("PRAGMA integrity_check").fetchone()[0]
+        task_count = con.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+    finally:
+        con.close()
+
+    if integrity != "ok":
+        raise RuntimeError(f"temp integrity_check failed: {integrity}")
+
+    promote_db_via_backup(temp_db_path, HOST_DB_PATH)
+    return {
+        "dbPath": str(temp_db_path),
+        "gmail": gmail_result,
+        "taskCount": task_count,
+        "rebuiltTasks": rebuilt,
+        "taskRebuildReason": rebuild_reason,
+        "integrity": integrity,
+    }
+
+
+def sync_delta(mod, args: argparse.Namespace, state: dict[str, Any], changeset_path: Path) -> dict[str, Any]:
+    """Index into a small changeset DB and apply it to the live DB in one transaction.
+
+    Cycle I/O follows the amount of new mail instead of the size of
+    email_search.db (which snapshot mode copies twice per cycle).
+    """
+    maintenance = state.setdefault("maintenance", {})
+    # connect_db() (mod.DB_PATH = HOST_DB_PATH) also runs the WAL setup and schema/FTS migrations
+    live = mod.connect_db()
+    try:
+        existing_hashes = {
+            row["source_id"]: row["raw_sha1"]
+            for row in live.execute("SELECT source_id, raw_sha1 FROM emails WHERE source='gmail'")
+        }
+        write_status(
+            {
+                "task": "host_gmail_incremental_sync",
+                "stage": "indexing",
+                "mode": "delta",
+                "startedAt": now_text(),
+                "changesetPath": str(changeset_path),
+            }
+        )
+        delta = mod.connect_changeset_db(changeset_path, live)
+        try:
+            gmail_result = mod.index_gmail(
+                delta,
+                state,
+                args.gmail_max_messages,
+                args.gmail_fallback_days,
+                args.gmail_force_query,
+                workers=mod.GMAIL_FETCH_WORKERS,
+                existing_hashes=existing_hashes,
+            )
+            delta.commit()
+            integrity = delta.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            delta.close()
+        if integrity != "ok":
+            raise RuntimeError(f"changeset integrity_check failed: {integrity}")
+
+        applied = mod.apply_changeset(live, changeset_path)
+
+        changes = int(gmail_result.get("indexed", 0) or 0)
+        # one transaction on the live DB; closing without commit rolls it back
+        rebuilt, rebuild_reason = rebuild_tasks_if_due(
+            mod, live, maintenance, changes, args.task_rebuild_interval_hours, commit_every=0
+        )
+        task_count = live.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+    finally:
+        live.close()
+
+    state["updatedAt"] = mod.now_iso()
+    mod.save_json(mod.STATE_PATH, state)
+    return {
+        "dbPath": str(HOST_DB_PATH),
+        "gmail": gmail_result,
+        "changeset": {**applied, "bytes": changeset_path.stat().st_size},
+        "taskCount": task_count,
+        "rebuiltTasks": rebuilt,
+        "taskRebuildReason": rebuild_reason,
+        "integrity": integrity,
+    }
+
+
 def write_status(payload: dict[str, Any]) -> None:
     payload = dict(payload)
     payload["updatedAt"] = now_text()
@@ -87,11 +223,17 @@ def write_status(payload: dict[str, Any]) -> None:
 
 
 def main() -> int:
-    parser = argparse.ArgumentParser(description="Host-side Gmail incremental sync using temp SQLite promotion")
+    parser = argparse.ArgumentParser(description="Host-side Gmail incremental sync (changeset apply or temp SQLite promotion)")
     parser.add_argument("--gmail-max-messages", type=int, default=20)
     parser.add_argument("--gmail-fallback-days", type=int, default=3)
     parser.add_argument("--gmail-force-query")
     parser.add_argument("--task-rebuild-interval-hours", type=int, default=24)
+    parser.add_argument(
+        "--mode",
+        choices=("delta", "snapshot"),
+        default="delta",
+        help="delta: apply a changeset of new mail to the live DB; snapshot: clone, index, promote the whole DB",
+    )
     args = parser.parse_args()
 
     lock = EmailDbLock("host_gmail_incremental_sync")
@@ -123,7 +265,6 @@ def main() -> int:
                 "dbPath": str(HOST_DB_PATH),
             }
         )
-        clone_db_via_backup(HOST_DB_PATH, temp_db_path)
         if HOST_STATE_PATH.exists():
             shutil.copy2(HOST_STATE_PATH, temp_state_path)
         else:
@@ -132,7 +273,7 @@ def main() -> int:
         mod = load_email_search_index()
         mod.WORKSPACE_ROOT = WORKSPACE
         mod.EMAIL_ROOT = WORKSPACE / "paperless_consume" / "email"
-        mod.DB_PATH = temp_db_path
+        mod.DB_PATH = HOST_DB_PATH
         mod.STATE_PATH = temp_state_path
         mod.STATUS_PATH = WORKSPACE / "email_search_harness_status.json"
         mod.FILTER_PATH = WORKSPACE / "email_rag_sender_filters.json"
@@ -142,69 +283,19 @@ def main() -> int:
         mod.LEGACY_CREDS_PATH = WORKSPACE / "credentials.json"
 
         state = mod.load_json(mod.STATE_PATH)
-        maintenance = state.setdefault("maintenance", {})
-        con = mod.connect_db()
-        try:
-            write_status(
-                {
-                    "task": "host_gmail_incremental_sync",
-                    "stage": "indexing",
-                    "startedAt": now_text(),
-                    "tempDbPath": str(temp_db_path),
-                }
-            )
-            gmail_result = mod.index_gmail(
-                con,
-                state,
-                args.gmail_max_messages,
-                args.gmail_fallback_days,
-                args.gmail_force_query,
-            )
-            con.commit()
-
-            changes = int(gmail_result.get("indexed", 0) or 0)
-            last_rebuild_at = parse_iso(maintenance.get("lastTasksRebuildAt"))
-            now_dt = datetime.now(timezone.utc).astimezone()
-            rebuild_due = changes > 0 and (
-                last_rebuild_at is None
-                or (now_dt - last_rebuild_at.astimezone(now_dt.tzinfo))
-                >= timedelta(hours=args.task_rebuild_interval_hours)
-            )
-            rebuilt = 0
-            rebuild_reason = "skipped"
-            if rebuild_due:
-                rebuilt = mod.rebuild_tasks(con)
-                con.commit()
-                maintenance["lastTasksRebuildAt"] = mod.now_iso()
-                rebuild_reason = "interval_due"
-            elif changes <= 0:
-                rebuild_reason = "no_changes"
-            else:
-                rebuild_reason = "recent_rebuild"
-
-            state["updatedAt"] = mod.now_iso()
-            mod.save_json(mod.STATE_PATH, state)
-            integrity = con.execute("PRAGMA integrity_check").fetchone()[0]
-            task_count = con.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
-        finally:
-            con.close()
-
-        if integrity != "ok":
-            raise RuntimeError(f"temp integrity_check failed: {integrity}")
-
-        promote_db_via_backup(temp_db_path, HOST_DB_PATH)
+        if args.mode == "snapshot":
+            result = sync_snapshot(mod, args, state, temp_db_path)
+        else:
+            result = sync_delta(mod, args, state, tempdir / "email_search_changeset.db")
+        # state (latest_internal_ts etc.) only advances once the DB holds the new rows
         shutil.copy2(temp_state_path, HOST_STATE_PATH)
 
         payload = {
             "task": "host_gmail_incremental_sync",
             "stage": "completed",
             "updatedAt": mod.now_iso(),
-            "dbPath": str(temp_db_path),
-            "gmail": gmail_result,
-            "taskCount": task_count,
-            "rebuiltTasks": rebuilt,
-            "taskRebuildReason": rebuild_reason,
-            "integrity": integrity,
+            "mode": args.mode,
+            **result,
         }
         write_status(payload)
         print(json.dumps(payload, ensure_ascii=False))
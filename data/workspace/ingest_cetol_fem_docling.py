@@ -26,6 +26,8 @@ import base64
 import sys
 from pathlib import Path
 
+from embedding_client import EmbeddingClient
+
 try:
     import fitz  # PyMuPDF
 except ImportError:
@@ -197,20 +199,14 @@ def chunk_text(text: str) -> list:
     return [c for c in chunks if len(c.strip()) > 30]
 
 # --- Infinity embedding ---
+EMBEDDER = EmbeddingClient(INFINITY_URL, EMBED_MODEL, timeout=120, log=lambda msg, level="INFO": log(msg))
+
 def embed_batch(texts: list) -> list:
-    for attempt in range(3):
-        try:
-            resp = requests.post(
-                f"{INFINITY_URL}/embeddings",
-                json={"model": EMBED_MODEL, "input": texts},
-                timeout=120,
-            )
-            resp.raise_for_status()
-            return [item["embedding"] for item in resp.json()["data"]]
-        except requests.exceptions.Timeout:
-            log(f"    Infinityタイムアウト (試行{attempt+1}/3)、待機後リトライ...")
-            time.sleep(10)
-    raise RuntimeError("Infinity embed 3回失敗")
+    vectors = EMBEDDER.embed(texts)
+    failed = sum(1 for vec in vectors if vec is None)
+    if failed:
+        raise RuntimeError(f"Infinity embed 失敗: {failed}/{len(texts)} チャンク未取得 (リトライ後も応答なし、または入力拒否)")
+    return vectors
 
 # --- Qdrant操作 ---
 def delete_old_points(source_tag: str):
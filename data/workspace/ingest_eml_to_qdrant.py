@@ -6,6 +6,9 @@ ingest_eml_to_qdrant.py
 ソース: /home/node/clawd/paperless_consume/email/**/*.eml
   フォルダ構造: email/{category}/{person}/{filename}.eml
 
+状態: file_journal.db (namespace "ingest_eml_to_qdrant")
+  ディレクトリ mtime が変わっていないフォルダは再走査しない。処理済みは追記更新。
+
 パイプライン:
   .eml 解析 → チャンク収集 → Infinity バッチ embed (32件/回) → Qdrant バッチ upsert
 
@@ -18,16 +21,20 @@ import os
 import sys
 import json
 import hashlib
-import requests
+import threading
 import traceback
 from pathlib import Path
 from datetime import datetime
 from email import message_from_bytes, message_from_string
 from email.header import decode_header
 
+from embedding_client import EmbeddingClient, IngestPipeline, QdrantUpserter
+from file_journal import FileJournal
+
 # ── Configuration ────────────────────────────────────────────────────────────────
 EMAIL_ROOT   = "/home/node/clawd/paperless_consume/email"
-STATE_FILE   = "/home/node/clawd/ingest_eml_state.json"
+STATE_FILE   = "/home/node/clawd/ingest_eml_state.json"   # 旧形式: 初回のみ file journal へ移行
+JOURNAL_NAMESPACE = "ingest_eml_to_qdrant"
 LOG_FILE     = "/home/node/clawd/ingest_eml.log"
 
 INFINITY_URL = "http://infinity:7997/embeddings"
@@ -55,18 +62,24 @@ def log(msg, level="INFO"):
             pass
 
 # ── State ─────────────────────────────────────────────────────────────────────────
-def load_state():
-    if os.path.exists(STATE_FILE):
+def open_journal():
+    """file journal を開き、旧 JSON state があれば初回のみ取り込む。"""
+    journal = FileJournal(JOURNAL_NAMESPACE)
+    if journal.is_empty() and os.path.exists(STATE_FILE):
         try:
             with open(STATE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return {"processed": {}}
-
-def save_state(state):
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(state, f, ensure_ascii=False, indent=2)
+                processed = json.load(f).get("processed", {})
+            legacy = []
+            for filepath in processed:
+                try:
+                    legacy.append((Path(filepath).relative_to(EMAIL_ROOT).as_posix(), None))
+                except ValueError:
+                    continue
+            journal.import_legacy(legacy)
+            log(f"  旧 state から {len(legacy)} 件を file journal へ移行")
+        except Exception as e:
+            log(f"  旧 state の移行に失敗: {e}", "WARN")
+    return journal
 
 # ── Email parsing ────────────────────────────────────────────────────────────────
 def decode_mime_words(s):
@@ -180,50 +193,17 @@ def make_chunks(meta):
         result.append((chunk, {**base_payload, "chunk": ci, "content": chunk}, pid))
     return result
 
-# ── Infinity batch embed ─────────────────────────────────────────────────────────
+# ── Infinity embed / Qdrant upsert (shared client) ─────────────────────────────
+EMBEDDER = EmbeddingClient(INFINITY_URL, EMBED_MODEL, EMBED_DIM, max_batch_items=EMBED_BATCH, log=log)
+UPSERTER = QdrantUpserter(QDRANT_URL, COLLECTION, batch_size=QDRANT_BATCH, metrics=EMBEDDER.metrics, log=log)
+
 def batch_embed(texts):
-    """テキストリストを Infinity にまとめて送り、ベクトルリストを返す。失敗時は1件ずつリトライ。"""
-    try:
-        resp = requests.post(
-            INFINITY_URL,
-            json={"model": EMBED_MODEL, "input": texts},
-            timeout=120,
-        )
-        resp.raise_for_status()
-        data = resp.json()["data"]
-        return [d["embedding"] for d in data]
-    except Exception as e:
-        log(f"  Embed batch error (batch_size={len(texts)}): {e} — 1件ずつリトライ", "WARN")
-        # 1件ずつフォールバック
-        results = []
-        for t in texts:
-            try:
-                r = requests.post(
-                    INFINITY_URL,
-                    json={"model": EMBED_MODEL, "input": t},
-                    timeout=120,
-                )
-                r.raise_for_status()
-                results.append(r.json()["data"][0]["embedding"])
-            except Exception as e2:
-                log(f"  Embed single error: {e2}", "WARN")
-                results.append(None)
-        return results
-
-# ── Qdrant batch upsert ──────────────────────────────────────────────────────────
+    """テキストリストを Infinity にまとめて送り、ベクトルリストを返す。失敗分は None。"""
+    return EMBEDDER.embed(texts)
+
 def batch_upsert(points):
     """points = [{"id": int, "vector": list, "payload": dict}]"""
-    try:
-        resp = requests.put(
-            f"{QDRANT_URL}/collections/{COLLECTION}/points",
-            json={"points": points},
-            timeout=30,
-        )
-        resp.raise_for_status()
-        return len(points)
-    except Exception as e:
-        log(f"  Qdrant batch error: {e}", "WARN")
-        return 0
+    return UPSERTER.upsert(points)
 
 # ── Main ─────────────────────────────────────────────────────────────────────────
 def main():
@@ -233,100 +213,83 @@ def main():
     log(f"  Embed batch={EMBED_BATCH}  Qdrant batch={QDRANT_BATCH}")
     log("=" * 60)
 
-    state     = load_state()
-    processed = state.get("processed", {})
-
-    all_emls = sorted(Path(EMAIL_ROOT).rglob("*.eml"))
-    total    = len(all_emls)
-    pending  = [p for p in all_emls if str(p) not in processed]
+    journal = open_journal()
+    scan    = journal.scan(EMAIL_ROOT, suffix=".eml")
+    total   = len(scan.files)
+    pending = [(Path(EMAIL_ROOT) / rel, rel, sig) for rel, sig in scan.pending]
 
-    log(f"  総ファイル数: {total}  未処理: {len(pending)}")
+    log(f"  総ファイル数: {total}  未処理: {len(pending)}  scan: {json.dumps(scan.summary())}")
     if not pending:
         log("  ✅ 新規ファイルなし。処理終了。")
+        journal.close()
         return
 
     # ── バッチ処理ループ ──
     # emails → chunks → embed (batch) → upsert (batch)
+    # IngestPipeline が次バッチの embed と前バッチの upsert を並行させる
     ok = skip = err = 0
-    chunk_buf   = []   # (text, payload, point_id, filepath)
     file_chunks = {}   # filepath → chunk数（最終集計用）
+    chunks_lock = threading.Lock()
 
-    def flush_buffer():
-        """バッファをEmbed → Qdrant upsertする。"""
-        nonlocal ok
-        if not chunk_buf:
+    def on_batch_done(items, stored):
+        if not stored:
             return
-        texts  = [c[0] for c in chunk_buf]
-        vecs   = batch_embed(texts)
-
-        points = []
-        for (text, payload, pid, fp), vec in zip(chunk_buf, vecs):
-            if vec and len(vec) == EMBED_DIM:
-                points.append({"id": pid, "vector": vec, "payload": {
-                    **payload, "ingested_at": datetime.now().isoformat()
-                }})
+        with chunks_lock:
+            for _text, _payload, _pid, fp in items:
                 file_chunks[fp] = file_chunks.get(fp, 0) + 1
 
-        if points:
-            # Qdrant はバッチサイズ QDRANT_BATCH で分割
-            for i in range(0, len(points), QDRANT_BATCH):
-                batch_upsert(points[i:i + QDRANT_BATCH])
-            ok += len(set(c[3] for c in chunk_buf))
-
-        chunk_buf.clear()
+    pipeline = IngestPipeline(EMBEDDER, UPSERTER, batch_items=EMBED_BATCH, on_done=on_batch_done)
 
     ingested_files = 0
-    for i, path in enumerate(pending):
+    done = []   # (rel, signature, info) — 送信完了後に journal へ追記
+    for i, (path, rel, sig) in enumerate(pending):
         try:
             meta = parse_eml(str(path))
             if not meta:
-                processed[str(path)] = {"chunks": 0, "error": "parse_failed", "ts": datetime.now().isoformat()}
+                done.append((rel, sig, {"chunks": 0, "error": "parse_failed"}))
                 skip += 1
                 continue
 
             chunks = make_chunks(meta)
             if not chunks:
-                processed[str(path)] = {"chunks": 0, "ts": datetime.now().isoformat()}
+                done.append((rel, sig, {"chunks": 0}))
                 skip += 1
                 continue
 
+            ingested_at = datetime.now().isoformat()
             for (chunk_text, payload, pid) in chunks:
-                chunk_buf.append((chunk_text, payload, pid, str(path)))
-
-            # EMBED_BATCH 件ごとにフラッシュ
-            if len(chunk_buf) >= EMBED_BATCH:
-                flush_buffer()
+                pipeline.add(chunk_text, {**payload, "ingested_at": ingested_at}, pid, str(path))
 
             ingested_files += 1
 
             # 処理済みに登録
-            processed[str(path)] = {
-                "subject": meta["subject"][:80],
-                "ts":      datetime.now().isoformat(),
-            }
+            done.append((rel, sig, {"subject": meta["subject"][:80]}))
 
         except Exception as e:
             log(f"  [{i+1}] ERROR {Path(str(path)).name}: {e}", "ERROR")
             log(traceback.format_exc(), "ERROR")
-            processed[str(path)] = {"error": str(e), "ts": datetime.now().isoformat()}
+            done.append((rel, sig, {"error": str(e)}))
             err += 1
 
         # 進捗ログ & 状態保存
         if (i + 1) % LOG_INTERVAL == 0:
-            flush_buffer()  # 残バッファも出力
-            state["processed"] = processed
-            save_state(state)
+            pipeline.flush()  # 状態保存前に送信中バッチを待つ
+            journal.mark_done(done)
+            done = []
+            ok = len(file_chunks)
             pct = (i + 1) / len(pending) * 100
             log(f"  [{i+1}/{len(pending)}] {pct:.1f}%  ok={ok}  skip={skip}  err={err}  Qdrant points↑")
 
     # 残バッファをフラッシュ
-    flush_buffer()
+    pipeline.close()
+    ok = len(file_chunks)
 
     # 最終状態保存
-    state["processed"] = processed
-    save_state(state)
+    journal.mark_done(done)
+    journal.close()
     log(f"  ✅ 完了: ok={ok}  skip={skip}  err={err}  合計={len(pending)}")
     log(f"  Qdrant collection: {COLLECTION}")
+    log(f"  metrics: {json.dumps(pipeline.metrics(), ensure_ascii=False)}")
 
 if __name__ == "__main__":
     main()
@@ -24,6 +24,8 @@ from datetime import datetime
 from email import message_from_bytes, message_from_string
 from email.header import decode_header
 
+from embedding_client import EmbeddingClient, QdrantUpserter
+
 # ── Configuration ────────────────────────────────────────────────────────────────
 EMAIL_ROOT   = "/home/node/clawd/paperless_consume/email"
 STATE_FILE   = "/home/node/clawd/ingest_eml_state.json"
@@ -312,43 +314,15 @@ def extract_attachment_text(att):
                 continue
     return ""
 
-# ── Infinity batch embed ─────────────────────────────────────────────────────────
+# ── Infinity embed / Qdrant upsert (shared client) ─────────────────────────────
+EMBEDDER = EmbeddingClient(INFINITY_URL, EMBED_MODEL, EMBED_DIM, max_batch_items=EMBED_BATCH, timeout=60, log=log)
+UPSERTER = QdrantUpserter(QDRANT_URL, COLLECTION, batch_size=QDRANT_BATCH, metrics=EMBEDDER.metrics, log=log)
+
 def batch_embed(texts):
-    try:
-        resp = requests.post(
-            INFINITY_URL,
-            json={"model": EMBED_MODEL, "input": texts},
-            timeout=60,
-        )
-        resp.raise_for_status()
-        data = resp.json()["data"]
-        return [d["embedding"] for d in data]
-    except Exception as e:
-        log(f"  Embed batch error (n={len(texts)}): {e} — 1件リトライ", "WARN")
-        results = []
-        for t in texts:
-            try:
-                r = requests.post(INFINITY_URL, json={"model": EMBED_MODEL, "input": t}, timeout=30)
-                r.raise_for_status()
-                results.append(r.json()["data"][0]["embedding"])
-            except Exception as e2:
-                log(f"  Embed single error: {e2}", "WARN")
-                results.append(None)
-        return results
-
-# ── Qdrant batch upsert ──────────────────────────────────────────────────────────
+    return EMBEDDER.embed(texts)
+
 def batch_upsert(points):
-    try:
-        resp = requests.put(
-            f"{QDRANT_URL}/collections/{COLLECTION}/points",
-            json={"points": points},
-            timeout=30,
-        )
-        resp.raise_for_status()
-        return len(points)
-    except Exception as e:
-        log(f"  Qdrant batch error: {e}", "WARN")
-        return 0
+    return UPSERTER.upsert(points)
 
 # ── Flush helper ─────────────────────────────────────────────────────────────────
 def flush_buffer(chunk_buf, ok_counter, file_chunks):
@@ -1,5 +1,4 @@
 import os
-import requests
 import json
 import uuid
 import re
@@ -7,6 +6,8 @@ from datetime import datetime
 from qdrant_client import QdrantClient
 from qdrant_client.models import Distance, VectorParams, PointStruct
 
+from embedding_client import EmbeddingClient
+
 # --- Configuration ---
 MD_DIR = r"D:\Clawdbot_Docker_20260125\data\workspace\ingested_books"
 INFINITY_URL = "http://127.0.0.1:7997/embeddings"
@@ -32,20 +33,10 @@ def init_qdrant():
     else:
         log(f"Collection {COLLECTION_NAME} exists.")
 
+EMBEDDER = EmbeddingClient(INFINITY_URL, MODEL_ID, VECTOR_SIZE, timeout=30, log=lambda msg, level="INFO": log(msg))
+
 def get_infinity_embedding(text):
-    try:
-        response = requests.post(INFINITY_URL, json={
-            "model": MODEL_ID,
-            "input": [text]
-        }, timeout=30)
-        if response.status_code == 200:
-            return response.json()["data"][0]["embedding"]
-        else:
-            log(f"Infinity Error ({response.status_code}): {response.text}")
-            return None
-    except Exception as e:
-        log(f"Infinity Connection Error: {e}")
-        return None
+    return EMBEDDER.embed_one(text)
 
 def chunk_markdown(content):
     # Split by headers first to preserve context
@@ -87,12 +78,12 @@ def process_md_file(filepath):
         chunks = chunk_markdown(content)
         points = []
         
-        for i, chunk in enumerate(chunks):
+        vectors = EMBEDDER.embed(chunks)
+        for i, (chunk, vector) in enumerate(zip(chunks, vectors)):
             # Attempt to extract page number if common pattern exists
             page_match = re.search(r'--- Page (\d+) ---', chunk)
             page_num = int(page_match.group(1)) if page_match else None
             
-            vector = get_infinity_embedding(chunk)
             if vector:
                 point_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{rel_path}_{i}"))
                 points.append(PointStruct(
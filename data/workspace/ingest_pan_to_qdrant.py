@@ -20,11 +20,12 @@ import os
 import sys
 import json
 import hashlib
-import requests
 import traceback
 from pathlib import Path
 from datetime import datetime
 
+from embedding_client import EmbeddingClient, QdrantUpserter
+
 # ── Configuration ────────────────────────────────────────────────────────────────
 PAN_ROOT     = "/home/node/clawd/paperless_consume/ミツイ精密/ＰＡN・異常連絡書"
 STATE_FILE   = "/home/node/clawd/ingest_pan_state.json"
@@ -231,35 +232,14 @@ def make_docx_chunks(filepath):
     return chunks
 
 # ── Embed & Upsert ───────────────────────────────────────────────────────────────
+EMBEDDER = EmbeddingClient(INFINITY_URL, EMBED_MODEL, EMBED_DIM, max_batch_items=EMBED_BATCH, log=log)
+UPSERTER = QdrantUpserter(QDRANT_URL, COLLECTION, batch_size=QDRANT_BATCH, metrics=EMBEDDER.metrics, log=log)
+
 def batch_embed(texts):
-    try:
-        resp = requests.post(INFINITY_URL,
-            json={"model": EMBED_MODEL, "input": texts}, timeout=120)
-        resp.raise_for_status()
-        return [d["embedding"] for d in resp.json()["data"]]
-    except Exception as e:
-        log(f"  Embed batch error: {e} — 1件ずつリトライ", "WARN")
-        results = []
-        for t in texts:
-            try:
-                r = requests.post(INFINITY_URL,
-                    json={"model": EMBED_MODEL, "input": t}, timeout=120)
-                r.raise_for_status()
-                results.append(r.json()["data"][0]["embedding"])
-            except Exception as e2:
-                log(f"  Embed single error: {e2}", "WARN")
-                results.append(None)
-        return results
+    return EMBEDDER.embed(texts)
 
 def batch_upsert(points):
-    try:
-        resp = requests.put(f"{QDRANT_URL}/collections/{COLLECTION}/points",
-            json={"points": points}, timeout=30)
-        resp.raise_for_status()
-        return len(points)
-    except Exception as e:
-        log(f"  Qdrant error: {e}", "WARN")
-        return 0
+    return UPSERTER.upsert(points)
 
 def flush_buffer(buf):
     if not buf:
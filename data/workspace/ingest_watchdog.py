@@ -24,6 +24,8 @@ from typing import Iterable
 
 import requests
 
+from embedding_client import EmbeddingClient, QdrantUpserter
+
 
 STATE_FILE = "/home/node/clawd/ingest_watchdog_state.json"
 LOG_FILE = "/home/node/clawd/ingest_watchdog.log"
@@ -413,35 +415,16 @@ def analyze_page_with_vlm(png_bytes: bytes, page_idx: int, total_pages: int, doc
         return ""
 
 
+EMBEDDER = EmbeddingClient(infinity_embeddings_url(), EMBED_MODEL, EMBED_DIM, timeout=30, log=log)
+UPSERTER = QdrantUpserter(qdrant_candidates(), COLLECTION, timeout=15, metrics=EMBEDDER.metrics, log=log)
+
+
 def embed_text(text: str) -> list[float] | None:
-    try:
-        resp = requests.post(
-            infinity_embeddings_url(),
-            json={"model": EMBED_MODEL, "input": text},
-            timeout=30,
-        )
-        resp.raise_for_status()
-        return resp.json()["data"][0]["embedding"]
-    except Exception as exc:
-        log(f"  Embed error: {exc}", "WARN")
-        return None
+    return EMBEDDER.embed_one(text)
 
 
 def upsert_to_qdrant(point_id: int, vector: list[float], payload_data: dict) -> bool:
-    errors: list[str] = []
-    for base_url in qdrant_candidates():
-        try:
-            resp = requests.put(
-                f"{base_url}/collections/{COLLECTION}/points",
-                json={"points": [{"id": point_id, "vector": vector, "payload": payload_data}]},
-                timeout=15,
-            )
-            resp.raise_for_status()
-            return True
-        except Exception as exc:
-            errors.append(f"{base_url}: {exc}")
-    log(f"  Qdrant upsert error: {' | '.join(errors)}", "WARN")
-    return False
+    return UPSERTER.upsert([{"id": point_id, "vector": vector, "payload": payload_data}]) == 1
 
 
 def make_point_id(doc_id: int, page_idx: int, chunk_idx: int) -> int:
@@ -480,11 +463,11 @@ def upsert_chunks(
     group_id: str,
     page_meta: dict | None = None,
 ) -> int:
-    ingested = 0
     page_meta = page_meta or {}
-    for chunk_idx, chunk in enumerate(chunks):
-        vector = embed_text(chunk)
-        if not vector or len(vector) != EMBED_DIM:
+    points: list[dict] = []
+    vectors = EMBEDDER.embed(chunks)
+    for chunk_idx, (chunk, vector) in enumerate(zip(chunks, vectors)):
+        if not vector:
             continue
         point_id = make_point_id(doc_id, page_idx, chunk_idx)
         payload = dict(base_payload)
@@ -498,9 +481,8 @@ def upsert_chunks(
             }
         )
         payload.update(page_meta)
-        if upsert_to_qdrant(point_id, vector, payload):
-            ingested += 1
-    return ingested
+        points.append({"id": point_id, "vector": vector, "payload": payload})
+    return UPSERTER.upsert(points) if points else 0
 
 
 def ingest_raw_text(
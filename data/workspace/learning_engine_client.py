@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+learning_engine_client.py
+
+Learning engine ingest client shared by the memory sync jobs
+(sync_email_learning_memory.py, sync_cae_learning_memory.py).
+
+  - post_json():        one payload to an /ingest/<kind> route
+  - iter_bulk_chunks(): payloads to /ingest/<kind>/bulk in BULK_CHUNK_SIZE
+                        chunks, yielding each chunk's (payload, result) pairs
+                        as soon as it is answered so callers can report progress
+  - post_bulk():        the same, collected into one result list
+
+Each result is {"status": "ok"} or {"status": "error", "error": ...}. When the
+engine has no bulk route yet (404/405) the chunk is posted one payload at a time.
+"""
+from __future__ import annotations
+
+from typing import Any, Iterator
+
+import requests
+
+
+BULK_CHUNK_SIZE = 200
+
+
+def post_json(base_url: str, route: str, payload: dict[str, Any], request_timeout: int) -> dict[str, Any]:
+    resp = requests.post(f"{base_url.rstrip('/')}{route}", json=payload, timeout=request_timeout)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _post_chunk(base_url: str, route: str, chunk: list[dict[str, Any]], request_timeout: int) -> list[dict[str, Any]]:
+    try:
+        resp = requests.post(
+            f"{base_url.rstrip('/')}{route}/bulk",
+            json={"items": chunk},
+            timeout=request_timeout + len(chunk) // 10,
+        )
+        if resp.status_code not in (404, 405):
+            resp.raise_for_status()
+            return resp.json()["results"]
+    except Exception as exc:
+        return [{"status": "error", "error": str(exc)} for _ in chunk]
+    results: list[dict[str, Any]] = []
+    for payload in chunk:
+        try:
+            post_json(base_url, route, payload, request_timeout)
+            results.append({"status": "ok"})
+        except Exception as exc:
+            results.append({"status": "error", "error": str(exc)})
+    return results
+
+
+def iter_bulk_chunks(
+    base_url: str,
+    route: str,
+    payloads: list[dict[str, Any]],
+    request_timeout: int,
+    dry_run: bool = False,
+) -> Iterator[list[tuple[dict[str, Any], dict[str, Any]]]]:
+    for start in range(0, len(payloads), BULK_CHUNK_SIZE):
+        chunk = payloads[start : start + BULK_CHUNK_SIZE]
+        if dry_run:
+            results = [{"status": "ok"} for _ in chunk]
+        else:
+            results = _post_chunk(base_url, route, chunk, request_timeout)
+        yield list(zip(chunk, results))
+
+
+def post_bulk(
+    base_url: str,
+    route: str,
+    payloads: list[dict[str, Any]],
+    request_timeout: int,
+    dry_run: bool = False,
+) -> list[dict[str, Any]]:
+    return [
+        result
+        for pairs in iter_bulk_chunks(base_url, route, payloads, request_timeout, dry_run=dry_run)
+        for _payload, result in pairs
+    ]
@@ -12,7 +12,7 @@ Usage: python nightly_email_enrichment.py [--limit 100] [--days 7] [--model qwen
 import os
 import json
 import sqlite3
-import requests
+import hashlib
 import argparse
 import subprocess
 from datetime import datetime, timedelta, timezone
@@ -20,6 +20,8 @@ from pathlib import Path
 import time
 import sys
 
+from embedding_client import EmbeddingClient, IngestPipeline, QdrantUpserter
+
 # --- Configuration ---
 WORKSPACE = Path(__file__).parent
 SEARCH_DB_PATH = WORKSPACE / "email_search.db"
@@ -29,10 +31,12 @@ ANALYSIS_DB_PATH = WORKSPACE / "email_analysis.db"
 GATEWAY_CONTAINER = "clawstack-unified-clawdbot-gateway-1"
 OLLAMA_HOST = "ollama:11434"
 QDRANT_HOST = "qdrant:6333"
+QDRANT_URLS = ["http://localhost:6333", f"http://{QDRANT_HOST}"] # Host mapping first, container name as fallback
 INFINITY_URL = "http://localhost:7997/embeddings" # Mapped to host
 
 DEFAULT_MODEL = "qwen3:8b" # Faster for CPU nightly batches
 EMBED_MODEL = "mixedbread-ai/mxbai-embed-large-v1"
+EMBED_DIM = 1024
 COLLECTION = "email_analysis_enriched"
 
 JST = timezone(timedelta(hours=9))
@@ -170,40 +174,23 @@ def ensure_qdrant_collection():
     except Exception as e:
         log(f"  Qdrant Setup Error: {e}")
 
-def embed_text(text):
-    try:
-        resp = requests.post(INFINITY_URL, json={
-            "model": EMBED_MODEL,
-            "input": text
-        }, timeout=30)
-        resp.raise_for_status()
-        return resp.json()["data"][0]["embedding"]
-    except Exception as e:
-        log(f"  Embed Error: {e}")
-        return None
+# Batched, cached embedding + keep-alive Qdrant upserts (shared client)
+EMBEDDER = EmbeddingClient(INFINITY_URL, EMBED_MODEL, EMBED_DIM, timeout=30, log=lambda msg, level="INFO": log(f"[{level}] {msg.strip()}"))
+UPSERTER = QdrantUpserter(QDRANT_URLS, COLLECTION, metrics=EMBEDDER.metrics, log=lambda msg, level="INFO": log(f"[{level}] {msg.strip()}"))
 
-def upsert_to_qdrant(email, analysis):
-    vec = embed_text(f"{analysis['summary']} {analysis['request_item']}")
-    if not vec:
-        return
-    
-    import hashlib
+def enrichment_point(email, analysis):
+    """(text, payload, point_id) for IngestPipeline.add()."""
+    text = f"{analysis.get('summary', '')} {analysis.get('request_item', '')}"
     point_id = int(hashlib.md5(email["filepath"].encode()).hexdigest()[:15], 16)
-    
     payload = {
         "filepath": email["filepath"],
         "subject": email["subject"],
-        "summary": analysis["summary"],
-        "request_item": analysis["request_item"],
-        "importance": analysis["importance"],
+        "summary": analysis.get("summary", ""),
+        "request_item": analysis.get("request_item", ""),
+        "importance": analysis.get("importance", "中"),
         "processed_at": datetime.now(JST).isoformat()
     }
-    
-    try:
-        url = f"http://{QDRANT_HOST}/collections/{COLLECTION}/points"
-        run_docker_curl(GATEWAY_CONTAINER, "PUT", url, {"points": [{"id": point_id, "vector": vec, "payload": payload}]})
-    except Exception as e:
-        log(f"  Qdrant Upsert Error: {e}")
+    return text, payload, point_id
 
 def main():
     if sys.platform == "win32":
@@ -229,10 +216,14 @@ def main():
         log("No pending emails found.")
         return
 
+    pipeline = None
     if not args.dry_run:
         ensure_qdrant_collection()
+        # embeds / upserts in batches in the background while the LLM works on the next email
+        pipeline = IngestPipeline(EMBEDDER, UPSERTER)
 
     count = 0
+    analyzed = 0
     for email in emails:
         log(f"Processing ({count+1}/{len(emails)}): {email['subject'][:40]}...")
         if args.dry_run:
@@ -242,12 +233,16 @@ def main():
         analysis = analyze_with_llm(email, args.model)
         if analysis:
             save_analysis(email, analysis)
-            upsert_to_qdrant(email, analysis)
+            pipeline.add(*enrichment_point(email, analysis))
+            analyzed += 1
             log("  Done.")
         else:
             log("  Failed (Check Ollama/Network).")
         count += 1
-        
+
+    if pipeline is not None:
+        stored = pipeline.close()
+        log(f"Qdrant: {stored}/{analyzed} points stored  metrics={json.dumps(pipeline.metrics())}")
     log("Batch finished.")
 
 if __name__ == "__main__":
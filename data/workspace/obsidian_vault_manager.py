@@ -4,6 +4,7 @@ from __future__ import annotations
 import argparse
 import json
 import re
+import sqlite3
 import subprocess
 import sys
 from collections import Counter
@@ -38,7 +39,8 @@ def resolve_vault_root() -> Path:
 
 VAULT_ROOT = resolve_vault_root()
 STATE_DIR = VAULT_ROOT / ".openclaw"
-INDEX_PATH = STATE_DIR / "obsidian_index.json"
+INDEX_PATH = STATE_DIR / "obsidian_index.sqlite3"
+INDEX_SCHEMA_VERSION = "1"
 STATUS_PATH = STATE_DIR / "obsidian_index_status.json"
 INBOX_PATH = VAULT_ROOT / "AI_Inbox.md"
 REPORTS_DIR = VAULT_ROOT / "OpenClaw_Reports"
@@ -686,27 +688,167 @@ def second_brain_batch(query: str | None, include_paths: list[str], limit: int,
     return result
 
 
-def build_index() -> dict[str, Any]:
+# Inverted index: character bigram -> notes, with a bitmask of the score_note fields that contain it.
+# Query terms are runs of one tokenize() character class, so every bigram of a term lies inside one
+# such run of the (lowercased) field text. Intersecting a term's postings therefore yields every
+# note where score_note could find the term as a substring; score_note then scores only those.
+FIELD_PATH = 1
+FIELD_TITLE = 2
+FIELD_HEADINGS = 4
+FIELD_TAGS = 8
+FIELD_KEYWORDS = 16
+FIELD_BODY = 32
+INDEX_RUN_PATTERN = re.compile(r"[a-z0-9_\-/.]{2,}|[一-龠ぁ-んァ-ヶ]{2,}")
+SQLITE_MAX_PARAMS = 900
+
+
+def note_fields(note: dict[str, Any]) -> list[tuple[int, str]]:
+    """The lowercased texts score_note matches query terms against."""
+    return [
+        (FIELD_PATH, str(note.get("path", "")).lower()),
+        (FIELD_TITLE, str(note.get("title", "")).lower()),
+        (FIELD_HEADINGS, " ".join(note.get("headings", [])).lower()),
+        (FIELD_TAGS, " ".join(note.get("tags", [])).lower()),
+        (FIELD_KEYWORDS, " ".join(note.get("keywords", [])).lower()),
+        (FIELD_BODY, str(note.get("body", "")).lower()),
+    ]
+
+
+def note_bigrams(note: dict[str, Any]) -> dict[str, int]:
+    grams: dict[str, int] = {}
+    for flag, text in note_fields(note):
+        for run in INDEX_RUN_PATTERN.findall(text):
+            for pos in range(len(run) - 1):
+                gram = run[pos:pos + 2]
+                grams[gram] = grams.get(gram, 0) | flag
+    return grams
+
+
+def term_bigrams(term: str) -> list[str] | None:
+    """Bigrams to look up for a query term; None if the term cannot be served from the index."""
+    if not INDEX_RUN_PATTERN.fullmatch(term):
+        return None
+    return sorted({term[pos:pos + 2] for pos in range(len(term) - 1)})
+
+
+def connect_index() -> sqlite3.Connection:
+    ensure_state_dir()
+    con = sqlite3.connect(INDEX_PATH, timeout=30)
+    con.execute("PRAGMA busy_timeout=30000")
+    con.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS notes (
+            note_id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL UNIQUE,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            record TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS postings (
+            gram TEXT NOT NULL,
+            note_id INTEGER NOT NULL,
+            fields INTEGER NOT NULL,
+            PRIMARY KEY (gram, note_id)
+        ) WITHOUT ROWID;
+        """
+    )
+    row = con.execute("SELECT value FROM meta WHERE key='schemaVersion'").fetchone()
+    if row is None or row[0] != INDEX_SCHEMA_VERSION:
+        # new file or older layout: start over, build_index() repopulates everything
+        con.executescript("DELETE FROM notes; DELETE FROM postings; DELETE FROM meta;")
+        con.execute("INSERT INTO meta(key, value) VALUES('schemaVersion', ?)", (INDEX_SCHEMA_VERSION,))
+        con.commit()
+    return con
+
+
+def index_meta(con: sqlite3.Connection) -> dict[str, str]:
+    return {key: value for key, value in con.execute("SELECT key, value FROM meta")}
+
+
+def drop_note_postings(con: sqlite3.Connection, note_id: int, record_json: str) -> None:
+    grams = note_bigrams(json.loads(record_json))
+    con.executemany("DELETE FROM postings WHERE gram=? AND note_id=?", [(gram, note_id) for gram in grams])
+
+
+def build_index(full: bool = False) -> dict[str, Any]:
+    """Bring the SQLite index up to date; only notes whose mtime/size changed are re-parsed."""
     ensure_state_dir()
     status = {
         "startedAt": now_jst_text(),
         "vaultRoot": str(VAULT_ROOT),
         "stage": "indexing",
+        "mode": "full" if full else "incremental",
     }
     write_status(status)
-    notes = [note_record(path) for path in iter_note_files()]
+    con = connect_index()
+    try:
+        if full:
+            con.executescript("DELETE FROM notes; DELETE FROM postings;")
+        known = {
+            path: (note_id, mtime_ns, size)
+            for note_id, path, mtime_ns, size in con.execute("SELECT note_id, path, mtime_ns, size FROM notes")
+        }
+        seen: set[str] = set()
+        indexed = 0
+        for path in iter_note_files():
+            rel = relative_note_path(path)
+            seen.add(rel)
+            stat = path.stat()
+            previous = known.get(rel)
+            if previous and previous[1] == stat.st_mtime_ns and previous[2] == stat.st_size:
+                continue
+            record = note_record(path)
+            if previous:
+                note_id = previous[0]
+                old = con.execute("SELECT record FROM notes WHERE note_id=?", (note_id,)).fetchone()
+                drop_note_postings(con, note_id, old[0])
+                con.execute(
+                    "UPDATE notes SET mtime_ns=?, size=?, record=? WHERE note_id=?",
+                    (stat.st_mtime_ns, stat.st_size, json.dumps(record, ensure_ascii=False), note_id),
+                )
+            else:
+                note_id = con.execute(
+                    "INSERT INTO notes(path, mtime_ns, size, record) VALUES(?, ?, ?, ?)",
+                    (rel, stat.st_mtime_ns, stat.st_size, json.dumps(record, ensure_ascii=False)),
+                ).lastrowid
+            con.executemany(
+                "INSERT INTO postings(gram, note_id, fields) VALUES(?, ?, ?)",
+                [(gram, note_id, fields) for gram, fields in note_bigrams(record).items()],
+            )
+            indexed += 1
+        removed = 0
+        for rel, (note_id, _mtime_ns, _size) in known.items():
+            if rel in seen:
+                continue
+            old = con.execute("SELECT record FROM notes WHERE note_id=?", (note_id,)).fetchone()
+            drop_note_postings(con, note_id, old[0])
+            con.execute("DELETE FROM notes WHERE note_id=?", (note_id,))
+            removed += 1
+        generated_at = now_jst_text()
+        con.executemany(
+            "INSERT OR REPLACE INTO meta(key, value) VALUES(?, ?)",
+            [("generatedAt", generated_at), ("vaultRoot", str(VAULT_ROOT))],
+        )
+        con.commit()
+    finally:
+        con.close()
     payload = {
-        "generatedAt": now_jst_text(),
+        "generatedAt": generated_at,
         "vaultRoot": str(VAULT_ROOT),
-        "noteCount": len(notes),
-        "notes": notes,
+        "noteCount": len(seen),
+        "indexed": indexed,
+        "unchanged": len(seen) - indexed,
+        "removed": removed,
+        "indexPath": str(INDEX_PATH),
     }
-    INDEX_PATH.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
     status.update(
         {
             "stage": "completed",
             "finishedAt": now_jst_text(),
-            "noteCount": len(notes),
+            "noteCount": len(seen),
+            "indexed": indexed,
+            "removed": removed,
             "indexPath": str(INDEX_PATH),
         }
     )
@@ -714,10 +856,66 @@ def build_index() -> dict[str, Any]:
     return payload
 
 
+def open_index() -> sqlite3.Connection:
+    """Index connection, building the index first if it has never been built."""
+    con = connect_index()
+    if "generatedAt" not in index_meta(con):
+        con.close()
+        build_index()
+        con = connect_index()
+    return con
+
+
 def load_index() -> dict[str, Any]:
-    if not INDEX_PATH.exists():
-        return build_index()
-    return json.loads(INDEX_PATH.read_text(encoding="utf-8"))
+    con = open_index()
+    try:
+        meta = index_meta(con)
+        notes = [json.loads(record) for (record,) in con.execute("SELECT record FROM notes ORDER BY path")]
+    finally:
+        con.close()
+    return {
+        "generatedAt": meta.get("generatedAt"),
+        "vaultRoot": meta.get("vaultRoot"),
+        "noteCount": len(notes),
+        "notes": notes,
+    }
+
+
+def candidate_notes(query_terms: list[str]) -> list[dict[str, Any]]:
+    """Notes that may contain at least one query term in a score_note field (all notes if a term is not indexable)."""
+    con = open_index()
+    try:
+        term_grams = [term_bigrams(term) for term in query_terms]
+        if any(grams is None for grams in term_grams):
+            rows = con.execute("SELECT record FROM notes ORDER BY path").fetchall()
+            return [json.loads(record) for (record,) in rows]
+        note_ids: set[int] = set()
+        for grams in term_grams:
+            matches: dict[int, int] | None = None
+            for gram in grams:
+                postings = dict(con.execute("SELECT note_id, fields FROM postings WHERE gram=?", (gram,)))
+                if matches is None:
+                    matches = postings
+                else:
+                    # a field can only contain the term if it contains every bigram of it
+                    matches = {
+                        note_id: fields & postings[note_id]
+                        for note_id, fields in matches.items()
+                        if note_id in postings and fields & postings[note_id]
+                    }
+                if not matches:
+                    break
+            note_ids.update(matches or {})
+        ids = sorted(note_ids)
+        notes: list[dict[str, Any]] = []
+        for start in range(0, len(ids), SQLITE_MAX_PARAMS):
+            chunk = ids[start:start + SQLITE_MAX_PARAMS]
+            marks = ", ".join("?" for _ in chunk)
+            rows = con.execute(f"SELECT record FROM notes WHERE note_id IN ({marks}) ORDER BY path", chunk)
+            notes.extend(json.loads(record) for (record,) in rows)
+        return notes
+    finally:
+        con.close()
 
 
 def score_note(note: dict[str, Any], query_terms: list[str], include_path_boost: bool = True) -> tuple[int, list[str]]:
@@ -756,12 +954,11 @@ def score_note(note: dict[str, Any], query_terms: list[str], include_path_boost:
 
 
 def search_notes(query: str, limit: int, tag: str | None = None) -> dict[str, Any]:
-    index = load_index()
     query_terms = [term.lower() for term in tokenize(query)]
     if not query_terms:
         query_terms = [query.lower()]
     results = []
-    for note in index.get("notes", []):
+    for note in candidate_notes(query_terms):
         if tag and tag not in note.get("tags", []):
             continue
         score, reasons = score_note(note, query_terms)
@@ -789,13 +986,12 @@ def search_notes(query: str, limit: int, tag: str | None = None) -> dict[str, An
 
 
 def project_context(query: str, limit: int) -> dict[str, Any]:
-    index = load_index()
     query_terms = [term.lower() for term in tokenize(query)]
     if not query_terms:
         query_terms = [query.lower()]
     preferred = ("task.md", "implementation_plan_", "walkthrough.md", "PORTAL_APPS.md", "AI_Inbox.md")
     results = []
-    for note in index.get("notes", []):
+    for note in candidate_notes(query_terms):
         path = str(note.get("path", ""))
         if not any(pattern in path for pattern in preferred):
             continue
@@ -950,7 +1146,8 @@ def build_parser() -> argparse.ArgumentParser:
     sub = parser.add_subparsers(dest="command", required=True)
 
     build = sub.add_parser("build-index")
-    build.set_defaults(func=lambda args: build_index())
+    build.add_argument("--full", action="store_true", help="re-parse every note instead of only changed ones")
+    build.set_defaults(func=lambda args: build_index(args.full))
 
     search = sub.add_parser("search")
     search.add_argument("query")
@@ -164,6 +164,9 @@ def rebuild_index() -> dict[str, Any]:
         "indexSummary": {
             "generatedAt": parsed.get("generatedAt"),
             "noteCount": parsed.get("noteCount"),
+            # build-index is incremental: only notes whose mtime/size changed are re-parsed
+            "indexed": parsed.get("indexed"),
+            "removed": parsed.get("removed"),
         },
         "indexStatus": read_index_status(),
     }
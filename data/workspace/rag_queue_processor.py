@@ -30,6 +30,7 @@ from pathlib import Path
 
 import requests
 
+from embedding_client import EmbeddingClient, QdrantUpserter
 from outbound_delivery_guard import ensure_allowed_telegram_chat_id, initialize_guard_status
 
 # ── 設定 ─────────────────────────────────────────────────────────────────────
@@ -224,41 +225,22 @@ def extract_text(filepath: Path) -> tuple[str | None, str]:
 
 # ── 埋め込み & Qdrant ────────────────────────────────────────────────────────
 
+EMBEDDER = EmbeddingClient(INFINITY_URL, EMBED_MODEL, EMBED_DIM, timeout=30, log=log)
+UPSERTER = QdrantUpserter(
+    [QDRANT_URL, "http://qdrant:6333", "http://host.docker.internal:6333"],
+    COLLECTION,
+    timeout=15,
+    metrics=EMBEDDER.metrics,
+    log=log,
+)
+
+
 def embed_text(text: str) -> list[float] | None:
-    base = INFINITY_URL.rstrip("/")
-    url  = f"{base}/embeddings" if not base.endswith("/embeddings") else base
-    try:
-        resp = requests.post(
-            url,
-            json={"model": EMBED_MODEL, "input": text},
-            timeout=30,
-        )
-        resp.raise_for_status()
-        vec = resp.json()["data"][0]["embedding"]
-        if len(vec) != EMBED_DIM:
-            log(f"  Embed dim mismatch: {len(vec)} != {EMBED_DIM}", "WARN")
-            return None
-        return vec
-    except Exception as e:
-        log(f"  Embed error: {e}", "WARN")
-        return None
+    return EMBEDDER.embed_one(text)
 
 
 def upsert_to_qdrant(point_id: int, vector: list[float], payload: dict) -> bool:
-    candidates = [QDRANT_URL, "http://qdrant:6333", "http://host.docker.internal:6333"]
-    for base in candidates:
-        try:
-            resp = requests.put(
-                f"{base}/collections/{COLLECTION}/points",
-                json={"points": [{"id": point_id, "vector": vector, "payload": payload}]},
-                timeout=15,
-            )
-            resp.raise_for_status()
-            return True
-        except Exception:
-            continue
-    log("  Qdrant upsert failed on all candidates", "WARN")
-    return False
+    return UPSERTER.upsert([{"id": point_id, "vector": vector, "payload": payload}]) == 1
 
 
 def make_point_id(filename: str, chunk_idx: int) -> int:
@@ -292,40 +274,40 @@ def process_file(filepath: Path, state: dict) -> None:
         )
         return
 
-    # チャンク分割 → 埋め込み → Qdrant
+    # チャンク分割 → 埋め込み (バッチ) → Qdrant (バッチ)
     chunks   = chunk_text(text)
     ingested = 0
     skipped  = 0
 
-    for i, chunk in enumerate(chunks):
-        if not chunk.strip():
-            continue
-        if DRY_RUN:
-            ingested += 1
-            continue
-
-        vector = embed_text(chunk)
-        if not vector:
-            skipped += 1
-            continue
-
-        point_id = make_point_id(fname, i)
-        payload  = {
-            "source":        f"rag_queue/{fname}",
-            "filename":      fname,
-            "title":         filepath.stem,
-            "chunk":         i,
-            "total_chunks":  len(chunks),
-            "content":       chunk,
-            "source_method": method,
-            "file_size_kb":  round(size_kb, 1),
-            "ingested_at":   now().isoformat(),
-            "item_type":     "rag_queue_file",
-        }
-        if upsert_to_qdrant(point_id, vector, payload):
-            ingested += 1
-        else:
-            skipped += 1
+    indexed_chunks = [(i, chunk) for i, chunk in enumerate(chunks) if chunk.strip()]
+    if DRY_RUN:
+        ingested = len(indexed_chunks)
+    else:
+        vectors = EMBEDDER.embed([chunk for _i, chunk in indexed_chunks])
+        points  = []
+        for (i, chunk), vector in zip(indexed_chunks, vectors):
+            if not vector:
+                skipped += 1
+                continue
+            points.append({
+                "id":      make_point_id(fname, i),
+                "vector":  vector,
+                "payload": {
+                    "source":        f"rag_queue/{fname}",
+                    "filename":      fname,
+                    "title":         filepath.stem,
+                    "chunk":         i,
+                    "total_chunks":  len(chunks),
+                    "content":       chunk,
+                    "source_method": method,
+                    "file_size_kb":  round(size_kb, 1),
+                    "ingested_at":   now().isoformat(),
+                    "item_type":     "rag_queue_file",
+                },
+            })
+        stored = UPSERTER.upsert(points) if points else 0
+        ingested += stored
+        skipped  += len(points) - stored
 
     log(f"  {fname}: {len(chunks)} chunks → {ingested} ingested, {skipped} skipped ({method})")
 
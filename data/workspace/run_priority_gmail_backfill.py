@@ -127,7 +127,9 @@ def run_backfill(chunks: list[dict], max_messages_per_chunk: int) -> dict:
         try:
             con = mod.connect_db()
             for chunk in chunks:
-                gmail_result = mod.index_gmail(con, state, max_messages_per_chunk, 30, chunk["query"])
+                gmail_result = mod.index_gmail(
+                    con, state, max_messages_per_chunk, 30, chunk["query"], workers=mod.GMAIL_FETCH_WORKERS
+                )
                 con.commit()
                 rebuilt = mod.rebuild_tasks(con)
                 con.commit()
@@ -10,6 +10,8 @@ from typing import Any
 
 import requests
 
+from learning_engine_client import post_bulk
+
 
 JST = timezone(timedelta(hours=9))
 WORKSPACE_ROOT = Path(__file__).resolve().parent
@@ -110,12 +112,6 @@ def healthcheck(base_url: str, request_timeout: int) -> dict[str, Any]:
     return resp.json()
 
 
-def post_json(base_url: str, route: str, payload: dict[str, Any], request_timeout: int) -> dict[str, Any]:
-    resp = requests.post(f"{base_url.rstrip('/')}{route}", json=payload, timeout=request_timeout)
-    resp.raise_for_status()
-    return resp.json()
-
-
 def base_url_candidates(base_url: str) -> list[str]:
     text = normalize_space(base_url).rstrip("/")
     candidates: list[str] = []
@@ -428,17 +424,14 @@ def main() -> None:
     write_status(status)
 
     last_run_id = normalize_space(state.get("last_run_id"))
-    for payload in payloads:
-        try:
-            if not args.dry_run:
-                post_json(resolved_base_url, "/ingest/cae-run", payload, args.request_timeout)
+    results = post_bulk(resolved_base_url, "/ingest/cae-run", payloads, args.request_timeout, dry_run=args.dry_run)
+    for payload, result in zip(payloads, results):
+        if result.get("status") == "ok":
             status["postedRuns"] += 1
-            status["currentRunId"] = payload["run_id"]
             last_run_id = payload["run_id"]
-            write_status(status)
-        except Exception as exc:
-            status["errors"].append({"id": payload["run_id"], "detail": str(exc)})
-            write_status(status)
+        else:
+            status["errors"].append({"id": payload["run_id"], "detail": result.get("error", "")})
+    write_status(status)
 
     new_state = {
         "last_run_id": last_run_id,
@@ -13,6 +13,8 @@ from typing import Any
 
 import requests
 
+from learning_engine_client import iter_bulk_chunks
+
 
 JST = timezone(timedelta(hours=9))
 SCRIPT_PATH = Path(__file__).resolve()
@@ -22,7 +24,6 @@ STATUS_PATH = WORKSPACE_ROOT / "email_learning_memory_sync_status.json"
 STATE_PATH = WORKSPACE_ROOT / "email_learning_memory_sync_state.json"
 POLICY_PATH = WORKSPACE_ROOT / "email_ops_policy.json"
 LEARNING_ENGINE_URL = "http://localhost:8110"
-STATUS_FLUSH_INTERVAL = 25
 
 
 def now_jst_iso() -> str:
@@ -33,11 +34,6 @@ def write_status(payload: dict[str, Any]) -> None:
     STATUS_PATH.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
 
 
-def maybe_write_status(payload: dict[str, Any], progress_count: int, force: bool = False) -> None:
-    if force or progress_count <= 1 or progress_count % STATUS_FLUSH_INTERVAL == 0:
-        write_status(payload)
-
-
 def load_state() -> dict[str, Any]:
     if not STATE_PATH.exists():
         return {}
@@ -135,12 +131,6 @@ def healthcheck(base_url: str, request_timeout: int) -> dict[str, Any]:
     return resp.json()
 
 
-def post_json(base_url: str, route: str, payload: dict[str, Any], request_timeout: int) -> dict[str, Any]:
-    resp = requests.post(f"{base_url.rstrip('/')}{route}", json=payload, timeout=request_timeout)
-    resp.raise_for_status()
-    return resp.json()
-
-
 def fetch_email_rows(con: sqlite3.Connection, state: dict[str, Any], bootstrap_days: int, limit: int) -> list[sqlite3.Row]:
     last_indexed_at = normalize_space(state.get("last_email_indexed_at"))
     if last_indexed_at:
@@ -358,61 +348,65 @@ def main() -> None:
         last_email_indexed_at = normalize_space(state.get("last_email_indexed_at"))
         last_task_updated_at = normalize_space(state.get("last_task_updated_at"))
 
-        for row in email_rows:
-            status["stage"] = "posting_messages"
-            payload = build_message_payload(row, args.source_org)
-            try:
-                if not args.dry_run:
-                    post_json(args.base_url, "/ingest/email-message", payload, args.request_timeout)
-                posted_messages += 1
-                status["postedMessages"] = posted_messages
-                status["currentMessageId"] = payload["message_id"]
-                maybe_write_status(status, posted_messages)
-            except Exception as exc:
-                status["errors"].append(
-                    {
-                        "stage": "message",
-                        "id": payload["message_id"],
-                        "detail": str(exc),
-                    }
-                )
-                write_status(status)
-            indexed_at = normalize_space(row["indexed_at"])
-            if indexed_at and indexed_at > last_email_indexed_at:
-                last_email_indexed_at = indexed_at
-
+        status["stage"] = "posting_messages"
+        write_status(status)
+        message_payloads = [build_message_payload(row, args.source_org) for row in email_rows]
+        remaining_rows = iter(email_rows)
+        for pairs in iter_bulk_chunks(
+            args.base_url, "/ingest/email-message", message_payloads, args.request_timeout, dry_run=args.dry_run
+        ):
+            for (payload, result), row in zip(pairs, remaining_rows):
+                if result.get("status") == "ok":
+                    posted_messages += 1
+                    status["postedMessages"] = posted_messages
+                    status["currentMessageId"] = payload["message_id"]
+                else:
+                    status["errors"].append(
+                        {
+                            "stage": "message",
+                            "id": payload["message_id"],
+                            "detail": result.get("error", ""),
+                        }
+                    )
+                indexed_at = normalize_space(row["indexed_at"])
+                if indexed_at and indexed_at > last_email_indexed_at:
+                    last_email_indexed_at = indexed_at
+            write_status(status)
+
+        status["stage"] = "posting_threads"
+        write_status(status)
         thread_keys = sorted(set(task_thread_map) | set(thread_message_map))
-        for thread_key in thread_keys:
-            status["stage"] = "posting_threads"
-            tasks = task_thread_map.get(thread_key, [])
-            if not tasks:
-                continue
-            payload = build_thread_payload(
+        thread_tasks = [(thread_key, task_thread_map[thread_key]) for thread_key in thread_keys if task_thread_map.get(thread_key)]
+        thread_payloads = [
+            build_thread_payload(
                 thread_key=thread_key,
                 tasks=tasks,
                 messages=thread_message_map.get(thread_key, []),
                 source_org=args.source_org,
             )
-            try:
-                if not args.dry_run:
-                    post_json(args.base_url, "/ingest/email-thread", payload, args.request_timeout)
+            for thread_key, tasks in thread_tasks
+        ]
+        remaining_threads = iter(thread_tasks)
+        for pairs in iter_bulk_chunks(
+            args.base_url, "/ingest/email-thread", thread_payloads, args.request_timeout, dry_run=args.dry_run
+        ):
+            for (payload, result), (thread_key, tasks) in zip(pairs, remaining_threads):
+                if result.get("status") != "ok":
+                    status["errors"].append(
+                        {
+                            "stage": "thread",
+                            "id": payload["thread_id"],
+                            "detail": result.get("error", ""),
+                        }
+                    )
+                    continue
                 posted_threads += 1
                 status["postedThreads"] = posted_threads
                 status["currentThreadId"] = payload["thread_id"]
-                maybe_write_status(status, posted_threads)
-            except Exception as exc:
-                status["errors"].append(
-                    {
-                        "stage": "thread",
-                        "id": payload["thread_id"],
-                        "detail": str(exc),
-                    }
-                )
-                write_status(status)
-                continue
-            latest_updated = max(normalize_space(task["updated_at"]) for task in tasks)
-            if latest_updated and latest_updated > last_task_updated_at:
-                last_task_updated_at = latest_updated
+                latest_updated = max(normalize_space(task["updated_at"]) for task in tasks)
+                if latest_updated and latest_updated > last_task_updated_at:
+                    last_task_updated_at = latest_updated
+            write_status(status)
 
         new_state = {
             "last_email_indexed_at": last_email_indexed_at,
@@ -0,0 +1,80 @@
+import importlib
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import email_search_index  # noqa: E402
+
+TMP = Path(tempfile.mkdtemp(prefix="email_search_api_test_"))
+api = None
+
+
+def build_db(path: Path, subject: str) -> None:
+    with mock.patch.object(email_search_index, "DB_PATH", path), \
+            mock.patch.object(email_search_index, "log", lambda message: None):
+        con = email_search_index.connect_db()
+    con.execute(
+        "INSERT INTO emails (source, source_id, subject, body_text, internal_ts, indexed_at) VALUES ('eml', ?, ?, 'body', 0, '')",
+        (subject, subject),
+    )
+    con.commit()
+    con.close()
+
+
+def setUpModule():
+    global api
+    build_db(TMP / "email_search.db", "original")
+    with mock.patch.dict(os.environ, {"EMAIL_SEARCH_DB": str(TMP / "email_search.db")}):
+        api = importlib.import_module("email_search_api")
+
+
+def tearDownModule():
+    shutil.rmtree(TMP, ignore_errors=True)
+
+
+def subjects(con):
+    return [row["subject"] for row in con.execute("SELECT subject FROM emails ORDER BY subject")]
+
+
+class ConnectionPoolTests(unittest.TestCase):
+    def test_connection_checked_out_across_db_swap_is_not_reused(self):
+        pool = api.ConnectionPool(size=4)
+        with pool.connection() as con:
+            self.assertEqual(["original"], subjects(con))
+            # indexer promotes a new DB file while this request still holds the connection
+            build_db(TMP / "replacement.db", "replaced")
+            os.replace(TMP / "replacement.db", TMP / "email_search.db")
+        self.assertEqual(0, pool._idle.qsize())
+        with pool.connection() as con:
+            self.assertEqual(["replaced"], subjects(con))
+        self.assertEqual(1, pool._idle.qsize())
+
+    def test_pooled_connections_are_read_only(self):
+        pool = api.ConnectionPool(size=2)
+        with pool.connection() as con:
+            with self.assertRaises(sqlite3.OperationalError):
+                con.execute("DELETE FROM emails")
+
+
+class SearchCacheTests(unittest.TestCase):
+    def test_cached_search_is_invalidated_by_a_write(self):
+        first = api.search_emails("body", limit=10)
+        self.assertEqual(first, api.search_emails("body", limit=10))
+        con = sqlite3.connect(api.DB_PATH)
+        con.execute(
+            "INSERT INTO emails (source, source_id, subject, body_text, internal_ts, indexed_at) VALUES ('eml', 'later', 'later', 'body', 1, '')"
+        )
+        con.commit()
+        con.close()
+        self.assertEqual(len(first) + 1, len(api.search_emails("body", limit=10)))
+
+
+if __name__ == "__main__":
+    unittest.main()
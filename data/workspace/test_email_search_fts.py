@@ -0,0 +1,63 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import email_search_fts  # noqa: E402
+import email_search_index  # noqa: E402
+import email_search_query  # noqa: E402
+
+MAILS = [
+    ("q1", "品質異常の報告", "A社 金型の品質異常について、図面と合わせてご確認ください。"),
+    ("q2", "定例会議", "来週の会議資料を送付します。"),
+]
+
+
+class JapaneseFtsRoutingTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db_path = mock.patch.object(email_search_index, "DB_PATH", Path(tmp.name) / "email_search.db")
+        db_path.start()
+        self.addCleanup(db_path.stop)
+        self.con = email_search_index.connect_db()
+        self.addCleanup(self.con.close)
+        for source_id, subject, body in MAILS:
+            self.con.execute(
+                "INSERT INTO emails (source, source_id, subject, body_text, indexed_at) VALUES ('eml', ?, ?, ?, '')",
+                (source_id, subject, body),
+            )
+        self.con.commit()
+        # keep the glossary (金型図面 etc.) out of the term list so only routing is tested
+        patcher = mock.patch.object(email_search_query, "expand_with_mitsui_glossary", lambda terms, **_kw: terms)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        if not email_search_fts.has_table(self.con, "emails_fts_ja"):
+            self.skipTest("SQLite without the trigram tokenizer")
+
+    def search_ids(self, query):
+        return [row["source_id"] for row in email_search_query.search_rows(self.con, query, 10)]
+
+    def test_three_char_terms_use_trigram_index(self):
+        table, expression = email_search_fts.rewrite_fts_query(self.con, ["品質異常"])
+        self.assertEqual(("emails_fts_ja", '"品質異常"'), (table, expression))
+        self.assertEqual(["q1"], self.search_ids("品質異常"))
+
+    def test_two_char_terms_fall_back_to_like_scan(self):
+        # Below TRIGRAM_MIN_CHARS the trigram table cannot match, so 品質/図面 stay on
+        # emails_fts (unicode61, no hit inside Japanese text) and are found by the LIKE scan.
+        self.assertLess(len("品質"), email_search_fts.TRIGRAM_MIN_CHARS)
+        table, _expression = email_search_fts.rewrite_fts_query(self.con, ["品質"])
+        self.assertEqual("emails_fts", table)
+        self.assertEqual([], self.con.execute(
+            "SELECT rowid FROM emails_fts_ja WHERE emails_fts_ja MATCH ?", ('"品質"',)
+        ).fetchall())
+        self.assertEqual(["q1"], self.search_ids("品質"))
+        self.assertEqual(["q1"], self.search_ids("図面"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import json
+import sys
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import email_search_index  # noqa: E402
+
+MESSAGE_IDS = [f"m{i:02d}" for i in range(12)]
+PAGE_SIZE = 5
+RETRY_AFTER_SEC = 2
+# first list page 2 and these messages answer 429 once before succeeding
+THROTTLED = {"page:p5", "m03", "m08"}
+
+
+class StubGmail:
+    """Gmail messages.list / messages.get with one 429 + Retry-After per throttled key."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.throttled = set()
+        self.fetched = Counter()
+        self.retried_after_sleep = []
+        self.sleeps = []
+
+    def sleep(self, delay):
+        with self.lock:
+            self.sleeps.append(delay)
+
+    def throttle(self, key):
+        with self.lock:
+            if key in THROTTLED and key not in self.throttled:
+                self.throttled.add(key)
+                return True
+            if key in THROTTLED:
+                self.retried_after_sleep.append((key, len(self.sleeps)))
+            return False
+
+    def list_page(self, page_token):
+        start = int(page_token[1:]) if page_token else 0
+        page = MESSAGE_IDS[start:start + PAGE_SIZE]
+        payload = {"messages": [{"id": message_id, "threadId": f"t-{message_id}"} for message_id in page]}
+        if start + PAGE_SIZE < len(MESSAGE_IDS):
+            payload["nextPageToken"] = f"p{start + PAGE_SIZE}"
+        return payload
+
+    def message(self, message_id):
+        with self.lock:
+            self.fetched[message_id] += 1
+        return {
+            "id": message_id,
+            "threadId": f"t-{message_id}",
+            "internalDate": str(1700000000000 + int(message_id[1:])),
+            "snippet": f"body of {message_id}",
+            "payload": {
+                "mimeType": "text/plain",
+                "headers": [{"name": "Subject", "value": f"件名 {message_id}"}],
+                "body": {},
+            },
+        }
+
+
+def make_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            message_id = url.path.rsplit("/", 1)[-1]
+            if message_id == "messages":
+                page_token = parse_qs(url.query).get("pageToken", [""])[0]
+                key = f"page:{page_token}"
+            else:
+                key = message_id
+            if stub.throttle(key):
+                self.send_response(429)
+                self.send_header("Retry-After", str(RETRY_AFTER_SEC))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            payload = stub.list_page(page_token) if message_id == "messages" else stub.message(message_id)
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_args):
+            pass
+
+    return Handler
+
+
+class GmailConcurrentFetchTests(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubGmail()
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(self.stub))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        base = f"http://127.0.0.1:{server.server_address[1]}/gmail/v1/users/me/messages"
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        session = requests.Session()
+        self.addCleanup(session.close)
+        for target, value in [
+            ("DB_PATH", Path(tmp.name) / "email_search.db"),
+            ("GMAIL_MESSAGES_URL", base),
+            ("gmail_session", lambda: (session, {})),
+            ("should_store_gmail_record", lambda record: True),
+            ("write_status", lambda payload: None),
+            ("log", lambda message: None),
+        ]:
+            mock.patch.object(email_search_index, target, value).start()
+        mock.patch.object(email_search_index.time, "sleep", self.stub.sleep).start()
+        self.addCleanup(mock.patch.stopall)
+        self.con = email_search_index.connect_db()
+        self.addCleanup(self.con.close)
+
+    def test_backoff_and_pool_fetch_every_message_once(self):
+        result = email_search_index.index_gmail(self.con, {}, 100, 30, "in:anywhere", workers=4)
+
+        self.assertEqual(len(MESSAGE_IDS), result["candidates"])
+        self.assertEqual(len(MESSAGE_IDS), result["indexed"])
+        self.assertEqual(0, result["errors"])
+        self.assertEqual({message_id: 1 for message_id in MESSAGE_IDS}, dict(self.stub.fetched))
+        self.assertEqual(sorted(MESSAGE_IDS), [
+            row[0] for row in self.con.execute("SELECT source_id FROM emails WHERE source='gmail' ORDER BY 1")
+        ])
+
+        # every 429 waited exactly Retry-After seconds, and each retry came after a wait
+        self.assertEqual([float(RETRY_AFTER_SEC)] * len(THROTTLED), self.stub.sleeps)
+        self.assertEqual(THROTTLED, {key for key, _ in self.stub.retried_after_sleep})
+        self.assertTrue(all(sleeps_before > 0 for _, sleeps_before in self.stub.retried_after_sleep))
+
+
+if __name__ == "__main__":
+    unittest.main()
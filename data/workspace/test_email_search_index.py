@@ -0,0 +1,75 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import email_search_fts  # noqa: E402
+import email_search_index  # noqa: E402
+
+
+def insert_email(con, source_id, subject, body):
+    con.execute(
+        "INSERT INTO emails (source, source_id, subject, body_text, indexed_at) VALUES ('eml', ?, ?, ?, '')",
+        (source_id, subject, body),
+    )
+
+
+def fts_ids(con, table, expression):
+    rows = con.execute(
+        f"SELECT e.source_id FROM {table} JOIN emails e ON e.rowid = {table}.rowid WHERE {table} MATCH ? ORDER BY 1",
+        (expression,),
+    )
+    return [row[0] for row in rows]
+
+
+class InterruptedBulkFtsTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db_path = mock.patch.object(email_search_index, "DB_PATH", Path(tmp.name) / "email_search.db")
+        db_path.start()
+        self.addCleanup(db_path.stop)
+        mock.patch.object(email_search_index, "log", lambda message: None).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_killed_bulk_load_is_rebuilt_on_next_connect(self):
+        con = email_search_index.connect_db()
+        if not email_search_fts.has_table(con, "emails_fts_ja"):
+            con.close()
+            self.skipTest("SQLite without the trigram tokenizer")
+        email_search_index.suspend_email_fts_triggers(con)
+        insert_email(con, "a.eml", "金型メンテナンス報告", "Die maintenance report")
+        con.commit()
+        # killed here: resume_email_fts_triggers never runs
+        con.close()
+
+        con = email_search_index.connect_db()
+        self.addCleanup(con.close)
+        self.assertIsNone(con.execute(
+            "SELECT 1 FROM index_meta WHERE key=?", (email_search_index.BULK_FTS_PENDING_KEY,)
+        ).fetchone())
+        self.assertEqual(["a.eml"], fts_ids(con, "emails_fts", "maintenance"))
+        self.assertEqual(["a.eml"], fts_ids(con, "emails_fts_ja", '"メンテナンス"'))
+
+        # triggers are back: later writes reach both FTS tables without a rebuild
+        insert_email(con, "b.eml", "金型メンテナンス追加", "second maintenance note")
+        con.commit()
+        self.assertEqual(["a.eml", "b.eml"], fts_ids(con, "emails_fts", "maintenance"))
+        self.assertEqual(["a.eml", "b.eml"], fts_ids(con, "emails_fts_ja", '"メンテナンス"'))
+
+    def test_completed_bulk_load_clears_marker(self):
+        con = email_search_index.connect_db()
+        self.addCleanup(con.close)
+        email_search_index.suspend_email_fts_triggers(con)
+        insert_email(con, "a.eml", "subject", "bulk body")
+        con.commit()
+        email_search_index.resume_email_fts_triggers(con)
+        self.assertEqual([], con.execute("SELECT * FROM index_meta").fetchall())
+        self.assertEqual(["a.eml"], fts_ids(con, "emails_fts", "bulk"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import obsidian_vault_manager as ovm  # noqa: E402
+
+NOTES = {
+    "projects/die_maintenance.md": "# 金型メンテナンス計画\n\nプレス金型の定期点検。 #maintenance\n",
+    "quality/burr_report.md": "# バリ発生報告\n\nカバープレートのバリ。金型摩耗が原因。\n",
+    "daily/2026-10-01.md": "# Daily note\n\nMeeting with supplier about shipping schedule.\n",
+}
+
+
+def brute_force_search(query, limit=10):
+    """search_notes over every note, without the bigram candidate filter."""
+    with mock.patch.object(ovm, "candidate_notes", lambda _terms: ovm.load_index()["notes"]):
+        return ovm.search_notes(query, limit)
+
+
+class IncrementalIndexTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.vault = Path(tmp.name)
+        state_dir = self.vault / ".openclaw"
+        for target, value in [
+            ("VAULT_ROOT", self.vault),
+            ("STATE_DIR", state_dir),
+            ("INDEX_PATH", state_dir / "obsidian_index.sqlite3"),
+            ("STATUS_PATH", state_dir / "obsidian_index_status.json"),
+        ]:
+            patcher = mock.patch.object(ovm, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.clock_ns = 1_700_000_000 * 10**9
+        for rel, text in NOTES.items():
+            self.write_note(rel, text)
+
+    def write_note(self, rel, text):
+        path = self.vault / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        # writes within one test can share an mtime; step a fake clock so every write is visible
+        self.clock_ns += 10**9
+        os.utime(path, ns=(self.clock_ns, self.clock_ns))
+
+    def search_paths(self, query):
+        return [item["path"] for item in ovm.search_notes(query, 10)["results"]]
+
+    def test_rebuild_only_touches_changed_notes(self):
+        first = ovm.build_index()
+        self.assertEqual((3, 3, 0, 0), (first["noteCount"], first["indexed"], first["unchanged"], first["removed"]))
+
+        again = ovm.build_index()
+        self.assertEqual((0, 3, 0), (again["indexed"], again["unchanged"], again["removed"]))
+
+        self.write_note("daily/2026-10-01.md", "# Daily note\n\nShipping moved to the new warehouse.\n")
+        (self.vault / "quality/burr_report.md").unlink()
+        changed = ovm.build_index()
+        self.assertEqual((2, 1, 1, 1), (changed["noteCount"], changed["indexed"], changed["unchanged"], changed["removed"]))
+
+        full = ovm.build_index(full=True)
+        self.assertEqual((2, 0), (full["indexed"], full["unchanged"]))
+
+    def test_search_follows_modified_and_deleted_notes(self):
+        ovm.build_index()
+        self.assertEqual(["daily/2026-10-01.md"], self.search_paths("supplier"))
+        self.assertEqual(["quality/burr_report.md"], self.search_paths("バリ"))
+
+        self.write_note("daily/2026-10-01.md", "# Daily note\n\nShipping moved to the new warehouse.\n")
+        (self.vault / "quality/burr_report.md").unlink()
+        ovm.build_index()
+
+        # stale postings of the old text and the deleted note must not come back
+        self.assertEqual([], self.search_paths("supplier"))
+        self.assertEqual(["daily/2026-10-01.md"], self.search_paths("warehouse"))
+        self.assertEqual([], self.search_paths("バリ"))
+
+    def test_two_char_japanese_terms_match_inside_longer_runs(self):
+        ovm.build_index()
+        # 金型 only occurs inside 金型メンテナンス計画 / プレス金型の定期点検 / 金型摩耗が原因
+        candidates = [note["path"] for note in ovm.candidate_notes(["金型"])]
+        self.assertEqual(["projects/die_maintenance.md", "quality/burr_report.md"], candidates)
+        for query in ["金型", "金型メンテナンス", "バリ", "supplier", "maintenance", "原因"]:
+            with self.subTest(query=query):
+                self.assertEqual(brute_force_search(query), ovm.search_notes(query, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()